@@ -0,0 +1,253 @@
+"""
+Kompaktes Binärformat für Access Logs.
+
+Eine Datei beginnt mit MAGIC, danach folgen Records, die jeweils mit einem Typ-Byte beginnen:
+
+- STRING (1): Eintrag der String-Tabelle: <id u32><länge u16><utf-8 bytes>
+- ACCESS (2): Zugriff mit IPv4-Adresse als Integer, feste Länge (ACCESS_STRUCT)
+- ACCESS_IP_STRING (3): wie ACCESS, die Adresse (z.B. IPv6) ist eine String-ID
+- RESET (4): String-Tabelle leeren (die Tabelle ist auf max_strings Einträge begrenzt)
+
+Ein Zugriff belegt 39 Bytes: Zeitstempel in Epoch-Sekunden, Status und sieben String-IDs
+(Methode, Pfad, Protokoll, Referer, User-Agent, X-Forwarded-For, X-Forwarded-Proto). Jeder
+String wird nur beim ersten Auftreten geschrieben; die vielen identischen Heartbeats alter
+Clients kosten danach nur noch den festen Record.
+
+    python binlog.py to-text logs/access_log.2026-10-19.bin > access_log
+"""
+import argparse
+import glob
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+from collections import Counter, namedtuple
+from datetime import datetime
+
+MAGIC = b"EALOG\x00\x01\n"
+
+REC_STRING = 1
+REC_ACCESS = 2
+REC_ACCESS_IP_STRING = 3
+REC_RESET = 4
+
+STRING_STRUCT = struct.Struct("<BIH")
+# Typ, Zeitstempel, IP, Status, Methode, Pfad, Protokoll, Referer, User-Agent, X-Forwarded-For, X-Forwarded-Proto
+ACCESS_STRUCT = struct.Struct("<BIIH7I")
+
+MAX_STRING_BYTES = 0xFFFF
+
+AccessRecord = namedtuple(
+    "AccessRecord",
+    "timestamp source_ip method path version status referer user_agent x_forwarded_for x_forwarded_proto",
+)
+
+def ipv4_to_int(ip):
+    """IPv4-Adresse als Integer oder None (z.B. bei IPv6)."""
+    try:
+        return struct.unpack("!I", socket.inet_aton(ip))[0] if ip.count(".") == 3 else None
+    except OSError:
+        return None
+
+def int_to_ipv4(value):
+    return socket.inet_ntoa(struct.pack("!I", value))
+
+def format_access_line(source_ip, timestamp, method, path, version, status, referer, user_agent, x_forwarded_for, x_forwarded_proto):
+    """Textformat von server.py; timestamp in Epoch-Sekunden (Ortszeit, Suffix wie bisher +0000)."""
+    stamp = datetime.fromtimestamp(timestamp).strftime('[%d/%b/%Y:%H:%M:%S +0000]')
+    return (
+        f"{source_ip} - {stamp} - \"{method} {path} {version}\" - {status}"
+        f" \"{referer}\" \"{user_agent}\" \"{x_forwarded_for}\" \"{x_forwarded_proto}\""
+    )
+
+class BinaryLogWriter:
+    """
+    Gepufferter Writer für das Binärformat. Records werden im Speicher gesammelt und erst bei
+    buffer_size Bytes oder nach flush_interval Sekunden geschrieben. Wie beim Text-Log wird
+    um Mitternacht eine neue Datei begonnen (<prefix>.<YYYY-MM-DD>.bin) und es bleiben
+    backup_count Dateien erhalten.
+    """
+    def __init__(self, directory, prefix='access_log', buffer_size=64 * 1024, flush_interval=1.0, max_strings=65536, backup_count=30):
+        self.directory = directory
+        self.prefix = prefix
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.max_strings = max_strings
+        self.backup_count = backup_count
+        self.path = None
+        self._file = None
+        self._buffer = bytearray()
+        self._strings = {}
+        self._rollover_at = 0.0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _intern(self, value):
+        string_id = self._strings.get(value)
+        if string_id is None:
+            raw = value.encode('utf-8', errors='replace')[:MAX_STRING_BYTES]
+            string_id = len(self._strings)
+            self._strings[value] = string_id
+            self._buffer += STRING_STRUCT.pack(REC_STRING, string_id, len(raw))
+            self._buffer += raw
+        return string_id
+
+    def _open(self, timestamp):
+        self._flush_buffer()
+        if self._file is not None:
+            self._file.close()
+        day = datetime.fromtimestamp(timestamp)
+        self.path = os.path.join(self.directory, f"{self.prefix}.{day:%Y-%m-%d}.bin")
+        is_new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        self._file = open(self.path, 'ab')
+        # Neue Datei: String-Tabelle beginnt leer, bei angehängten Dateien per RESET
+        if is_new:
+            self._buffer += MAGIC
+        else:
+            self._buffer.append(REC_RESET)
+        self._strings.clear()
+        midnight = day.replace(hour=0, minute=0, second=0, microsecond=0)
+        self._rollover_at = midnight.timestamp() + 86400
+        self._delete_old_files()
+
+    def _delete_old_files(self):
+        files = sorted(glob.glob(os.path.join(self.directory, f"{self.prefix}.*.bin")))
+        for path in files[:-self.backup_count] if self.backup_count > 0 else []:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def write(self, timestamp, source_ip, method, path, version, status, referer='-', user_agent='-', x_forwarded_for='-', x_forwarded_proto='-'):
+        timestamp = int(timestamp)
+        with self._lock:
+            if self._file is None or timestamp >= self._rollover_at:
+                self._open(timestamp)
+            # Platz für alle Strings des Records, sonst würde ein RESET mitten im Record IDs ungültig machen
+            if len(self._strings) + 8 > self.max_strings:
+                self._buffer.append(REC_RESET)
+                self._strings.clear()
+            ip = ipv4_to_int(source_ip)
+            record_type = REC_ACCESS
+            if ip is None:
+                record_type = REC_ACCESS_IP_STRING
+                ip = self._intern(source_ip)
+            ids = [self._intern(value) for value in (method, path, version, referer, user_agent, x_forwarded_for, x_forwarded_proto)]
+            self._buffer += ACCESS_STRUCT.pack(record_type, timestamp, ip, status, *ids)
+            if len(self._buffer) >= self.buffer_size or time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush_buffer()
+
+    def _flush_buffer(self):
+        if self._buffer and self._file is not None:
+            self._file.write(self._buffer)
+            self._file.flush()
+            self._buffer.clear()
+        self._last_flush = time.monotonic()
+
+    def flush(self):
+        with self._lock:
+            self._flush_buffer()
+
+    def flush_if_due(self):
+        """Schreibt gepufferte Records, wenn flush_interval abgelaufen ist (auch ohne neue Requests)."""
+        with self._lock:
+            if self._buffer and time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush_buffer()
+
+    def close(self):
+        with self._lock:
+            self._flush_buffer()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+def is_binary_log(path):
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+def _scan(data, on_access):
+    """Läuft über alle Records; on_access(record_type, values, strings) für jeden Zugriff."""
+    if not data.startswith(MAGIC):
+        raise ValueError("Keine binäre Access-Log-Datei")
+    strings = []
+    offset = len(MAGIC)
+    end = len(data)
+    access_size = ACCESS_STRUCT.size
+    string_size = STRING_STRUCT.size
+    unpack_access = ACCESS_STRUCT.unpack_from
+    unpack_string = STRING_STRUCT.unpack_from
+    while offset < end:
+        record_type = data[offset]
+        if record_type == REC_STRING:
+            if offset + string_size > end:
+                break  # abgeschnittener Record am Dateiende (Server noch aktiv)
+            _, string_id, length = unpack_string(data, offset)
+            offset += string_size
+            value = bytes(data[offset:offset + length]).decode('utf-8', errors='replace')
+            offset += length
+            if string_id == len(strings):
+                strings.append(value)
+            else:
+                strings[string_id] = value
+        elif record_type in (REC_ACCESS, REC_ACCESS_IP_STRING):
+            if offset + access_size > end:
+                break
+            on_access(record_type, unpack_access(data, offset), strings)
+            offset += access_size
+        elif record_type == REC_RESET:
+            strings = []
+            offset += 1
+        else:
+            raise ValueError(f"Unbekannter Record-Typ {record_type} bei Offset {offset}")
+
+def read_records(path):
+    """Liest alle Zugriffe einer Binärdatei als AccessRecord."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    records = []
+
+    def on_access(record_type, values, strings):
+        _, timestamp, ip, status, method, req_path, version, referer, user_agent, xff, proto = values
+        source_ip = int_to_ipv4(ip) if record_type == REC_ACCESS else strings[ip]
+        records.append(AccessRecord(
+            timestamp, source_ip, strings[method], strings[req_path], strings[version], status,
+            strings[referer], strings[user_agent], strings[xff], strings[proto],
+        ))
+
+    _scan(data, on_access)
+    return records
+
+def count_ipv4_addresses(path):
+    """Anfragen pro IPv4-Adresse (Integer), ohne Strings zu dekodieren (schneller Pfad für table.py)."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    counts = Counter()
+
+    def on_access(record_type, values, strings):
+        if record_type == REC_ACCESS:
+            counts[values[2]] += 1
+
+    _scan(data, on_access)
+    return counts
+
+def read_ipv4_addresses(path):
+    return set(count_ipv4_addresses(path))
+
+def to_text(path, out):
+    """Schreibt eine Binärdatei im bisherigen Textformat."""
+    for record in read_records(path):
+        out.write(format_access_line(
+            record.source_ip, record.timestamp, record.method, record.path, record.version,
+            record.status if record.status else '?', record.referer, record.user_agent,
+            record.x_forwarded_for, record.x_forwarded_proto,
+        ) + "\n")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Binäre Access Logs umwandeln")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    convert = subcommands.add_parser("to-text", help="Binärdatei im Textformat ausgeben")
+    convert.add_argument("path")
+    args = parser.parse_args()
+    to_text(args.path, sys.stdout)
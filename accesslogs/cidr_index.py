@@ -0,0 +1,95 @@
+"""
+Zuordnung von IPv4-Adressen zu Netz-Verantwortlichen per Longest-Prefix-Match.
+
+Die Präfixe aus der CSV-Datei (CIDR,Team) werden beim Laden in disjunkte, sortierte Intervalle
+zerlegt: Ein spezifischeres Präfix schneidet sein Intervall aus dem umgebenden heraus. Eine
+Abfrage ist danach eine Binärsuche (bisect) über die Intervall-Anfänge, unabhängig davon,
+wie tief die Präfixe verschachtelt sind.
+
+    index = CidrIndex.from_csv("networks.csv")
+    index.lookup("10.20.1.15")  # -> ("team-a", "10.20.0.0/16") oder None
+"""
+import csv
+import ipaddress
+from bisect import bisect_right
+
+from binlog import ipv4_to_int
+
+class CidrIndex:
+    def __init__(self, networks=()):
+        """networks: Iterable von (CIDR, Owner); bei identischen Präfixen gewinnt der letzte Eintrag."""
+        intervals = []
+        for position, (cidr, owner) in enumerate(networks):
+            network = ipaddress.IPv4Network(cidr, strict=False)
+            start = int(network.network_address)
+            end = int(network.broadcast_address)
+            intervals.append((start, -end, position, owner, str(network)))
+        self.size = len(intervals)
+        self._starts = []
+        self._ends = []
+        self._owners = []
+        self._flatten(sorted(intervals))
+
+    @classmethod
+    def from_csv(cls, path):
+        """
+        Liest eine CSV-Datei mit CIDR in der ersten und Owner in der zweiten Spalte. Leerzeilen,
+        Kommentare (#) und eine Kopfzeile werden übersprungen. Fehlerhafte Zeilen: ValueError.
+        """
+        networks = []
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            for line_number, row in enumerate(csv.reader(f), start=1):
+                if not row or not row[0].strip() or row[0].lstrip().startswith('#'):
+                    continue
+                cidr = row[0].strip()
+                if line_number == 1 and not cidr[0].isdigit():
+                    continue  # Kopfzeile
+                if len(row) < 2 or not row[1].strip():
+                    raise ValueError(f"{path}:{line_number}: Owner fehlt")
+                try:
+                    ipaddress.IPv4Network(cidr, strict=False)
+                except ValueError as e:
+                    raise ValueError(f"{path}:{line_number}: Ungültiges IPv4-Netz '{cidr}': {e}") from e
+                networks.append((cidr, row[1].strip()))
+        return cls(networks)
+
+    def _flatten(self, intervals):
+        # Sortiert nach Anfang, bei gleichem Anfang das größere Netz zuerst. CIDR-Blöcke sind
+        # entweder disjunkt oder ineinander enthalten, ein Stack der offenen Netze genügt.
+        stack = []
+        position = 0
+
+        def emit(upto):
+            nonlocal position
+            if stack and position <= upto:
+                _, owner, cidr = stack[-1]
+                self._starts.append(position)
+                self._ends.append(upto)
+                self._owners.append((owner, cidr))
+            position = upto + 1
+
+        for start, negative_end, _, owner, cidr in intervals:
+            while stack and stack[-1][0] < start:
+                emit(stack[-1][0])
+                stack.pop()
+            if stack:
+                emit(start - 1)
+            position = start
+            stack.append((-negative_end, owner, cidr))
+        while stack:
+            emit(stack[-1][0])
+            stack.pop()
+
+    def __len__(self):
+        return self.size
+
+    def lookup_int(self, address):
+        """(Owner, CIDR) für eine IPv4-Adresse als Integer, None ohne Treffer."""
+        i = bisect_right(self._starts, address) - 1
+        if i >= 0 and address <= self._ends[i]:
+            return self._owners[i]
+        return None
+
+    def lookup(self, ip):
+        address = ipv4_to_int(ip)
+        return self.lookup_int(address) if address is not None else None
@@ -0,0 +1,190 @@
+"""
+Live-Statistik für den Dummy-Server mit fest begrenztem Speicher:
+
+- eindeutige Source-IPs: HyperLogLog (2^14 Register, 16 KB, Standardfehler ca. 0,8 %)
+- Top-Talker (IPs) und Top-Apps: Space-Saving mit k Zählern (Zählung überschätzt um höchstens "error")
+- Anfragen pro Sekunde je HTTP-Methode: Ringpuffer aus 60 Sekunden-Buckets
+
+Der Request-Pfad hängt nur ein Tupel an eine begrenzte deque an (atomar, ohne Sperre). Ein
+Hintergrund-Thread bzw. der Abruf der Statistik arbeitet die deque ab und aktualisiert die
+Strukturen; die Sperre dafür teilen sich nur Aggregator und Leser, nie die Responder.
+"""
+import hashlib
+import math
+import threading
+import time
+from collections import deque
+
+KNOWN_METHODS = ('GET', 'POST', 'PUT', 'DELETE', 'HEAD', 'OPTIONS', 'PATCH')
+
+def _hash64(value):
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8', errors='replace'), digest_size=8).digest(), 'big')
+
+class HyperLogLog:
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = bytearray(self.m)
+        self._alpha = 0.7213 / (1 + 1.079 / self.m)
+
+    def add(self, value):
+        x = _hash64(value)
+        index = x >> (64 - self.precision)
+        rest = x & ((1 << (64 - self.precision)) - 1)
+        # Position der ersten 1 in den verbleibenden Bits (1-basiert)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def estimate(self):
+        m = self.m
+        total = sum(2.0 ** -register for register in self.registers)
+        estimate = self._alpha * m * m / total
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)  # Linear Counting für kleine Mengen
+        return estimate
+
+    @property
+    def standard_error(self):
+        return 1.04 / math.sqrt(self.m)
+
+class SpaceSaving:
+    """Häufigste Elemente eines Datenstroms mit höchstens k Zählern (Metwally et al.)."""
+    def __init__(self, k=100):
+        self.k = k
+        self.counts = {}
+        self.errors = {}
+
+    def add(self, item, count=1):
+        if item in self.counts:
+            self.counts[item] += count
+            return
+        if len(self.counts) < self.k:
+            self.counts[item] = count
+            self.errors[item] = 0
+            return
+        # Kleinsten Zähler ersetzen; der neue Eintrag erbt dessen Wert als Fehlerschranke
+        victim = min(self.counts, key=self.counts.__getitem__)
+        floor = self.counts.pop(victim)
+        del self.errors[victim]
+        self.counts[item] = floor + count
+        self.errors[item] = floor
+
+    def top(self, n=10):
+        ranked = sorted(self.counts.items(), key=lambda item: -item[1])[:n]
+        return [{"value": item, "count": count, "error": self.errors[item]} for item, count in ranked]
+
+class RateWindow:
+    """Zählt Ereignisse in Sekunden-Buckets der letzten `seconds` Sekunden."""
+    def __init__(self, seconds=60):
+        self.seconds = seconds
+        self.buckets = [0] * seconds
+        self.stamps = [-1] * seconds
+        self.total = 0
+
+    def add(self, now, count=1):
+        second = int(now)
+        slot = second % self.seconds
+        if self.stamps[slot] != second:
+            self.stamps[slot] = second
+            self.buckets[slot] = 0
+        self.buckets[slot] += count
+        self.total += count
+
+    def rate(self, now, window=None):
+        window = min(window or self.seconds, self.seconds)
+        second = int(now)
+        # Die laufende Sekunde zählt mit, ist aber noch nicht vollständig
+        recent = sum(count for count, stamp in zip(self.buckets, self.stamps) if second - window < stamp <= second)
+        return recent / window
+
+def app_from_path(path):
+    """App-Name aus /eureka/apps/<APP>/..., sonst None (z.B. für den Registry-Abruf)."""
+    path = path.split('?', 1)[0]
+    marker = '/apps/'
+    start = path.find(marker)
+    if start < 0:
+        return None
+    app = path[start + len(marker):].split('/', 1)[0]
+    return app.upper() if app and app != 'delta' else None
+
+class LiveStats:
+    def __init__(self, top_k=100, max_pending=100000, precision=14, interval=0.5):
+        self.interval = interval
+        self.unique_ips = HyperLogLog(precision)
+        self.top_ips = SpaceSaving(top_k)
+        self.top_apps = SpaceSaving(top_k)
+        self.rates = {}
+        self.statuses = {}
+        self.requests_total = 0
+        self.started_at = time.time()
+        self._pending = deque(maxlen=max_pending)
+        self._appended = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def record(self, source_ip, method, path, status):
+        """Request-Pfad: nur anhängen. Läuft die deque über, gehen die ältesten Einträge verloren."""
+        self._pending.append((time.time(), source_ip, method, path, status))
+        self._appended += 1
+
+    def drain(self):
+        with self._lock:
+            pending = self._pending
+            while pending:
+                try:
+                    now, source_ip, method, path, status = pending.popleft()
+                except IndexError:
+                    break
+                self.requests_total += 1
+                self.unique_ips.add(source_ip)
+                self.top_ips.add(source_ip)
+                app = app_from_path(path)
+                if app is not None:
+                    self.top_apps.add(app)
+                method = method if method in KNOWN_METHODS else 'OTHER'
+                window = self.rates.get(method)
+                if window is None:
+                    window = self.rates[method] = RateWindow()
+                window.add(now)
+                self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def snapshot(self, top=10):
+        self.drain()
+        now = time.time()
+        with self._lock:
+            return {
+                "uptime_seconds": round(now - self.started_at, 1),
+                "requests_total": self.requests_total,
+                # Gezählt wird beim Anhängen ohne Sperre; bei Threads kann der Wert leicht abweichen
+                "dropped": max(0, self._appended - self.requests_total - len(self._pending)),
+                "unique_ips": round(self.unique_ips.estimate()),
+                "unique_ips_error": round(self.unique_ips.standard_error, 4),
+                "top_ips": self.top_ips.top(top),
+                "top_apps": self.top_apps.top(top),
+                "methods": {
+                    method: {
+                        "total": window.total,
+                        "per_second_1m": round(window.rate(now), 3),
+                        "per_second_10s": round(window.rate(now, 10), 3),
+                    }
+                    for method, window in sorted(self.rates.items())
+                },
+                "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            }
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.drain()
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="live-stats", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
@@ -1,12 +1,21 @@
 import http.server
+import json
 import socketserver
-from datetime import datetime
 import logging
 from logging.handlers import TimedRotatingFileHandler
 import os
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from binlog import BinaryLogWriter, format_access_line
+from live_stats import LiveStats
 
 LOG_DIR = './logs'
 LOG_FILENAME_PREFIX = 'access_log'
+# text (Standard) oder binary: kompaktes Format aus binlog.py, umwandeln mit "python binlog.py to-text"
+LOG_FORMAT = os.getenv('ACCESS_LOG_FORMAT', 'text')
+# Live-Statistik als JSON; Abrufe dieses Pfads werden weder geloggt noch gezählt
+STATS_PATH = os.getenv('ACCESS_STATS_PATH', '/_stats')
 
 if not os.path.exists(LOG_DIR):
     os.makedirs(LOG_DIR)
@@ -28,15 +37,15 @@ handler = TimedRotatingFileHandler(
 handler.setFormatter(AccessFormatter())
 access_logger.addHandler(handler)
 
-class EurekaHandler(http.server.SimpleHTTPRequestHandler):
-    def log_message(self, format, *args):  
-        now = datetime.now()
-        # Format: [dd/MMM/yyyy:HH:mm:ss ZZZ]
-        timestamp = now.strftime('[%d/%b/%Y:%H:%M:%S +0000]') 
+binary_writer = BinaryLogWriter(LOG_DIR, LOG_FILENAME_PREFIX) if LOG_FORMAT == 'binary' else None
 
-        # Request Line (Methode, Pfad, Protokoll)
-        request_line = f"{self.command} {self.path} {self.request_version}"
+live_stats = LiveStats()
 
+class EurekaHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):  
+        if binary_writer is not None:
+            self._log_binary(binary_writer, args)
+            return
         response_status = args[1] if len(args) > 1 else '?' 
 
         source_ip = self.client_address[0]
@@ -47,13 +56,56 @@ class EurekaHandler(http.server.SimpleHTTPRequestHandler):
         x_forwarded_for = self.headers.get('X-Forwarded-For', '-')
         x_forwarded_proto = self.headers.get('X-Forwarded-Proto', '-')
 
-        log_entry = (
-            f"{source_ip} - {timestamp} - \"{request_line}\" - {response_status}"
-            f" \"{referer}\" \"{user_agent}\" \"{x_forwarded_for}\" \"{x_forwarded_proto}\""
+        # Format: <ip> - [dd/MMM/yyyy:HH:mm:ss ZZZ] - "<request line>" - <status> ...
+        log_entry = format_access_line(
+            source_ip, time.time(), self.command, self.path, self.request_version, response_status,
+            referer, user_agent, x_forwarded_for, x_forwarded_proto,
         )
         access_logger.info(log_entry)
 
+    def _log_binary(self, writer, args):
+        status = str(args[1]) if len(args) > 1 else ''
+        headers = getattr(self, 'headers', None) or {}
+        writer.write(
+            time.time(),
+            self.client_address[0],
+            self.command or '-',
+            getattr(self, 'path', '-'),
+            self.request_version or '-',
+            int(status) if status.isdigit() else 0,
+            headers.get('Referer', '-'),
+            headers.get('User-Agent', '-'),
+            headers.get('X-Forwarded-For', '-'),
+            headers.get('X-Forwarded-Proto', '-'),
+        )
+
+    def log_request(self, code='-', size='-'):
+        if self._is_stats_request():
+            return
+        status = int(code) if isinstance(code, int) or str(code).isdigit() else 0
+        live_stats.record(self.client_address[0], self.command or '-', getattr(self, 'path', '-'), status)
+        super().log_request(code, size)
+
+    def _is_stats_request(self):
+        return self.command == 'GET' and urlsplit(getattr(self, 'path', '')).path == STATS_PATH
+
+    def _send_stats(self):
+        query = parse_qs(urlsplit(self.path).query)
+        try:
+            top = max(1, min(100, int(query.get('top', ['10'])[0])))
+        except ValueError:
+            top = 10
+        body = json.dumps(live_stats.snapshot(top)).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
     def do_GET(self):
+            if self._is_stats_request():
+                self._send_stats()
+                return
             self.send_response(200)
             self.send_header('Content-type', 'text/html')
             self.end_headers()
@@ -67,11 +119,24 @@ class EurekaHandler(http.server.SimpleHTTPRequestHandler):
     def end_headers(self):
         super().end_headers()
 
+class AccessLogServer(socketserver.TCPServer):
+    def service_actions(self):
+        # Läuft in jeder Runde von serve_forever (alle poll_interval Sekunden), damit der
+        # Binär-Puffer nach einer Lastspitze nicht bis zum nächsten Request im Speicher bleibt
+        if binary_writer is not None:
+            binary_writer.flush_if_due()
+
 PORT = 8000
 IP = "0.0.0.0"
 
 if __name__ == "__main__":
     print(f"Start web server dummy. Access Logs will be generated here: '{os.path.abspath(LOG_DIR)}'")
-    with socketserver.TCPServer((IP, PORT), EurekaHandler) as httpd:
-        print(f"Serving at port {PORT}")
-        httpd.serve_forever()
+    with AccessLogServer((IP, PORT), EurekaHandler) as httpd:
+        print(f"Serving at port {PORT}, live statistics at {STATS_PATH}")
+        live_stats.start()
+        try:
+            httpd.serve_forever()
+        finally:
+            live_stats.stop()
+            if binary_writer is not None:
+                binary_writer.close()
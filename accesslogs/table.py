@@ -1,21 +1,34 @@
+import argparse
 import os
 import re
-from collections import defaultdict
+from collections import Counter, defaultdict
+
+from binlog import count_ipv4_addresses, int_to_ipv4, ipv4_to_int, is_binary_log, read_ipv4_addresses
+from cidr_index import CidrIndex
+
+IP_PATTERN = re.compile(r'^(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})\s-\s\[')
+
+# Owner für IPs, die in keinem Netz der CSV-Datei liegen
+UNASSIGNED = '(nicht zugeordnet)'
 
 def analyze_log_file(log_file_path):
     """
     Analysiert ein Logfile und extrahiert eindeutige Source-IPs pro Class B Subnetzwerk.
+    Binäre Logs (binlog.py) werden direkt gelesen, ohne Umweg über das Textformat.
     """
     # Dictionary, um IPs nach Class B Subnetzwerk zu gruppieren
     # Format: {'192.168': {'192.168.1.1', '192.168.1.2'}, '10.0': {'10.0.0.1'}}
     class_b_networks = defaultdict(set) 
-    
-    ip_pattern = re.compile(r'^(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})\s-\s\[')
 
     try:
+        if is_binary_log(log_file_path):
+            # IPs liegen als Integer vor: erst deduplizieren, dann einmal pro IP formatieren
+            for address in read_ipv4_addresses(log_file_path):
+                class_b_networks[f"{address >> 24}.{(address >> 16) & 0xFF}"].add(int_to_ipv4(address))
+            return class_b_networks
         with open(log_file_path, 'r', encoding='utf-8') as f:
             for line in f:
-                match = ip_pattern.match(line)
+                match = IP_PATTERN.match(line)
                 if match:
                     source_ip = match.group(1)
                     if is_valid_ipv4(source_ip):
@@ -32,6 +45,51 @@ def analyze_log_file(log_file_path):
 
     return class_b_networks
 
+def count_source_ips(log_file_path):
+    """
+    Zählt die Anfragen pro IPv4-Adresse (als Integer) in einem Text- oder Binärlog.
+    Gleiche IPs werden zuerst als String gezählt und erst danach einmal umgewandelt.
+    """
+    if is_binary_log(log_file_path):
+        return count_ipv4_addresses(log_file_path)
+    by_text = Counter()
+    with open(log_file_path, 'r', encoding='utf-8', errors='replace') as f:
+        by_text.update(match.group(1) for match in map(IP_PATTERN.match, f) if match)
+    counts = Counter()
+    for ip, hits in by_text.items():
+        address = ipv4_to_int(ip) if is_valid_ipv4(ip) else None
+        if address is not None:
+            counts[address] += hits
+    return counts
+
+def analyze_by_owner(log_file_path, index):
+    """
+    Ordnet die Source-IPs eines Logfiles per Longest-Prefix-Match den Ownern aus dem CidrIndex zu.
+    Ergebnis: {owner: {"requests": n, "ips": {...}, "networks": {...}}}
+    """
+    try:
+        counts = count_source_ips(log_file_path)
+    except FileNotFoundError:
+        print(f"Fehler: Logfile '{log_file_path}' nicht gefunden.")
+        return None
+    except Exception as e:
+        print(f"Ein Fehler ist beim Lesen des Logfiles aufgetreten: {e}")
+        return None
+
+    owners = {}
+    lookup = index.lookup_int
+    for address, hits in counts.items():
+        match = lookup(address)
+        owner, network = match if match is not None else (UNASSIGNED, None)
+        entry = owners.get(owner)
+        if entry is None:
+            entry = owners[owner] = {"requests": 0, "ips": set(), "networks": set()}
+        entry["requests"] += hits
+        entry["ips"].add(int_to_ipv4(address))
+        if network is not None:
+            entry["networks"].add(network)
+    return owners
+
 def is_valid_ipv4(ip):
     """Überprüft, ob ein String eine gültige IPv4-Adresse ist."""
     parts = ip.split('.')
@@ -66,11 +124,41 @@ def display_results(networks_data):
     print("\n--------------------------")
 
 
+def display_owner_results(owner_data):
+    """Zeigt die Zuordnung nach Owner, die meisten Anfragen zuerst."""
+    if not owner_data:
+        print("Keine IP-Adressen gefunden oder Logfile war leer.")
+        return
+
+    print("\n--- Analyse nach Netz-Verantwortlichen ---")
+
+    for owner, entry in sorted(owner_data.items(), key=lambda item: -item[1]["requests"]):
+        print(f"\nOwner: {owner}")
+        if entry["networks"]:
+            print(f"Netze: {', '.join(sorted(entry['networks']))}")
+        print("--------------------------")
+        for ip in sorted(entry["ips"], key=lambda ip: tuple(int(part) for part in ip.split('.'))):
+            print(f"  - {ip}")
+        print(f"Eindeutige IPs: {len(entry['ips'])}, Anfragen: {entry['requests']}")
+    print("\n--------------------------")
+
 # --- Hauptprogramm ---
 if __name__ == "__main__":
-    LOG_FILE_PATH = os.path.join('./logs', 'access_log') 
+    parser = argparse.ArgumentParser(description="Zugreifende IPs aus dem Access Log auswerten")
+    parser.add_argument("log_file", nargs="?", default=os.path.join('./logs', 'access_log'))
+    parser.add_argument("--networks", help="CSV-Datei mit CIDR,Owner; gruppiert nach Owner statt nach /16")
+    args = parser.parse_args()
+
+    LOG_FILE_PATH = args.log_file
     print(f"Load Logfile: {LOG_FILE_PATH}")
 
-    network_data = analyze_log_file(LOG_FILE_PATH)
-    if network_data:
-        display_results(network_data)
+    if args.networks:
+        index = CidrIndex.from_csv(args.networks)
+        print(f"{len(index)} Netze aus {args.networks} geladen.")
+        owner_data = analyze_by_owner(LOG_FILE_PATH, index)
+        if owner_data:
+            display_owner_results(owner_data)
+    else:
+        network_data = analyze_log_file(LOG_FILE_PATH)
+        if network_data:
+            display_results(network_data)
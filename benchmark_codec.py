@@ -0,0 +1,69 @@
+# benchmark_codec.py
+"""
+Vergleicht XML und JSON als Wire-Format: Größe der Registrierung und der Registry
+(roh und gzip) sowie Zeit zum Kodieren der Registrierung und zum Parsen der Registry.
+Die Registry wird vom Fake-Eureka erzeugt, ohne Netzwerk.
+
+    python benchmark_codec.py --instances 2000
+"""
+import argparse
+import time
+from typing import Any, Callable, Dict, List
+
+import eureka_codec
+from discovery import parse_registry_json, parse_registry_xml
+from eureka_client_lib import build_instance_json, build_instance_xml
+from fake_eureka_server import APPS_PREFIX, FakeEurekaServer
+
+def _services(count: int, apps: int) -> List[Dict[str, Any]]:
+    return [
+        {"serviceName": f"bench-{i % apps}", "hostName": f"host-{i}", "httpPort": 9000 + i,
+         "healthEndpointPath": "/health", "infoEndpointPath": "/info"}
+        for i in range(count)
+    ]
+
+def _timed(function: Callable[[], Any], repeat: int) -> float:
+    """Beste Laufzeit von `repeat` Durchläufen in Millisekunden."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+def _sizes(name: str, body: bytes) -> str:
+    return f"{name:<22} {len(body):>10} B {len(eureka_codec.gzip_body(body)):>10} B gzip"
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="XML vs. JSON für Registrierung und Registry")
+    parser.add_argument("--instances", type=int, default=2000)
+    parser.add_argument("--apps", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    services = _services(args.instances, args.apps)
+    server = FakeEurekaServer()
+    for service in services:
+        body = build_instance_xml(service, "10.0.0.1").encode("utf-8")
+        server._handle("POST", f"{APPS_PREFIX}{service['serviceName'].upper()}", body)
+    registry_xml = server.registry_xml().encode("utf-8")
+    registry_json = server.registry_json().encode("utf-8")
+
+    print(f"JSON-Backend: {eureka_codec.JSON_BACKEND}, {args.instances} Instanzen in {args.apps} Apps\n")
+    print(_sizes("Registrierung XML", build_instance_xml(services[0], "10.0.0.1").encode("utf-8")))
+    print(_sizes("Registrierung JSON", build_instance_json(services[0], "10.0.0.1")))
+    print(_sizes("Registry XML", registry_xml))
+    print(_sizes("Registry JSON", registry_json))
+    print()
+
+    encode_xml = _timed(lambda: [build_instance_xml(service, "10.0.0.1") for service in services], args.repeat)
+    encode_json = _timed(lambda: [build_instance_json(service, "10.0.0.1") for service in services], args.repeat)
+    decode_xml = _timed(lambda: parse_registry_xml(registry_xml), args.repeat)
+    decode_json = _timed(lambda: parse_registry_json(registry_json), args.repeat)
+    print(f"{'Kodieren XML':<22} {encode_xml:10.1f} ms ({args.instances} Registrierungen)")
+    print(f"{'Kodieren JSON':<22} {encode_json:10.1f} ms")
+    print(f"{'Parsen XML':<22} {decode_xml:10.1f} ms (Registry)")
+    print(f"{'Parsen JSON':<22} {decode_json:10.1f} ms")
+
+if __name__ == "__main__":
+    main()
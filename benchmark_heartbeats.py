@@ -0,0 +1,142 @@
+# benchmark_heartbeats.py
+"""
+Vergleicht Heartbeats/s und Heartbeats pro CPU-Sekunde zwischen dem synchronen Pfad
+(ein Thread pro Instanz, requests ohne Keep-Alive) und dem asynchronen Transport
+(ein Event-Loop, wenige Keep-Alive-Verbindungen), optional zusätzlich mit gebündelten
+Heartbeats über /peerreplication/batch. Der Fake-Eureka läuft in einem eigenen Prozess,
+damit seine CPU-Zeit nicht mitgemessen wird.
+
+    python benchmark_heartbeats.py --instances 200 --rounds 5
+    python benchmark_heartbeats.py --instances 2000 --rounds 5 --batch 500
+"""
+import argparse
+import asyncio
+import logging
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple
+
+import eureka_client_lib
+from eureka_client_lib import MetricsStore, async_register_instance, async_send_heartbeat, register_instance, send_heartbeat
+from eureka_transport import AsyncHTTPTransport, RequestsTransport
+from heartbeat_batch import HeartbeatBatcher
+
+class Result(NamedTuple):
+    name: str
+    heartbeats: int
+    wall_s: float
+    cpu_s: float
+
+    def report(self) -> str:
+        per_cpu = self.heartbeats / self.cpu_s if self.cpu_s else float("inf")
+        return f"{self.name:<24} {self.heartbeats / self.wall_s:10.0f} HB/s {per_cpu:10.0f} HB/CPU-s"
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _start_server(port: int) -> subprocess.Popen:
+    process = subprocess.Popen([sys.executable, "fake_eureka_server.py", "--port", str(port)], stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return process
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("Fake-Eureka ist nicht gestartet.")
+
+def _services(count: int) -> List[Dict[str, Any]]:
+    return [
+        {"serviceName": f"bench-{i}", "hostName": "localhost", "httpPort": 9000 + i,
+         "healthEndpointPath": "/health", "infoEndpointPath": "/info"}
+        for i in range(count)
+    ]
+
+def run_sync(services: List[Dict[str, Any]], rounds: int) -> Result:
+    metrics_store = MetricsStore()
+    transport = RequestsTransport()
+    for service_data in services:
+        register_instance(service_data, metrics_store, transport=transport)
+
+    def beat(service_data: Dict[str, Any]) -> None:
+        for _ in range(rounds):
+            send_heartbeat(service_data, metrics_store, transport=transport)
+
+    threads = [threading.Thread(target=beat, args=(s,)) for s in services]
+    wall, cpu = time.perf_counter(), time.process_time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return Result("sync (requests)", len(services) * rounds, time.perf_counter() - wall, time.process_time() - cpu)
+
+def run_async(services: List[Dict[str, Any]], rounds: int, connections: int) -> Result:
+    async def main() -> Result:
+        metrics_store = MetricsStore()
+        transport = AsyncHTTPTransport(max_connections_per_host=connections)
+        await asyncio.gather(*(async_register_instance(s, metrics_store, transport) for s in services))
+
+        async def beat(service_data: Dict[str, Any]) -> None:
+            for _ in range(rounds):
+                await async_send_heartbeat(service_data, metrics_store, transport)
+
+        wall, cpu = time.perf_counter(), time.process_time()
+        await asyncio.gather(*(beat(s) for s in services))
+        result = Result(f"async ({connections} Verbindungen)", len(services) * rounds, time.perf_counter() - wall, time.process_time() - cpu)
+        await transport.close()
+        return result
+
+    return asyncio.run(main())
+
+def run_batched(services: List[Dict[str, Any]], rounds: int, connections: int, batch_size: int) -> Result:
+    async def main() -> Result:
+        metrics_store = MetricsStore()
+        transport = AsyncHTTPTransport(max_connections_per_host=connections)
+        await asyncio.gather(*(async_register_instance(s, metrics_store, transport) for s in services))
+        batcher = HeartbeatBatcher(transport, metrics_store, max_batch_size=batch_size, linger=0.01)
+
+        async def beat(service_data: Dict[str, Any]) -> None:
+            for _ in range(rounds):
+                await batcher.heartbeat(service_data)
+
+        wall, cpu = time.perf_counter(), time.process_time()
+        await asyncio.gather(*(beat(s) for s in services))
+        result = Result(f"batch ({batch_size}/Request)", len(services) * rounds, time.perf_counter() - wall, time.process_time() - cpu)
+        print(f"  Requests: {batcher.requests_sent} für {result.heartbeats} Heartbeats ({batcher.fallback_heartbeats} einzeln)")
+        await transport.close()
+        return result
+
+    return asyncio.run(main())
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Heartbeat-Benchmark sync vs. async")
+    parser.add_argument("--instances", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--connections", type=int, default=4)
+    parser.add_argument("--batch", type=int, default=0, help="Zusätzlich gebündelte Heartbeats mit dieser Batch-Größe messen")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    port = _free_port()
+    server = _start_server(port)
+    eureka_client_lib.EUREKA_SERVER_URL = f"http://127.0.0.1:{port}/eureka/apps/"
+    try:
+        services = _services(args.instances)
+        print(f"{args.instances} Instanzen, {args.rounds} Heartbeats pro Instanz")
+        print(run_sync(services, args.rounds).report())
+        print(run_async(services, args.rounds, args.connections).report())
+        if args.batch > 0:
+            print(run_batched(services, args.rounds, args.connections, args.batch).report())
+    finally:
+        server.terminate()
+        server.wait()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,35 +1,23 @@
 # client.py
-import json
+# Schlanker Einstiegspunkt: beim Import keine I/O und keine schweren Imports (requests).
+# Die Eureka-Client-Logik wird erst in main() geladen, wenn wirklich Services gestartet werden.
 import threading
 import time
 import sys
 import signal
 import logging
-import os
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any, Optional
 
-# Importiere die Eureka-Client-Logik und die MetricsStore-Klasse
-from eureka_client_lib import eureka_lifecycle, MetricsStore
-from eureka_client_lib import EUREKA_SERVER_URL # Um die URL im Start-Log auszugeben
-
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-
-# --- Globale Metrik-Speicher-Instanz ---
-# Jeder Client hat seine eigene Instanz von MetricsStore, um seine eigenen Metriken zu verfolgen.
-metrics_store = MetricsStore()
-
-# Logging
-LOG_DIR = "logs"
-if not os.path.exists(LOG_DIR):
-    os.makedirs(LOG_DIR)
-    print(f"Logverzeichnis '{LOG_DIR}' wurde erstellt.")
-else:
-    print(f"Logverzeichnis '{LOG_DIR}' ist vorhanden.")
+from service_config import LOG_DIR, ConfigError, ensure_log_dir, load_services
 
 # --- Globale Listen für Threads und Services (für sauberes Herunterfahren) ---
 eureka_lifecycle_threads: List[threading.Thread] = []
 services_to_manage: List[Dict[str, Any]] = [] # Muss global sein, damit der Signal-Handler darauf zugreifen kann
 stop_events: Dict[str, threading.Event] = {} # Speichert Threading.Event-Objekte für jeden Service-Thread
+health_monitor: Optional[Any] = None # HealthMonitor, falls --health-interval gesetzt ist
+trace_writer: Optional[Any] = None # TraceWriter, falls --record gesetzt ist
+span_trace_file: Optional[str] = None # Ziel für die Tracing-Spans, falls --trace-sample-rate gesetzt ist
+drain_shutdown: Optional[Callable[[], Any]] = None # Drain mit gemeinsamer Frist, falls --drain-timeout gesetzt ist
 
 def graceful_shutdown(signum, frame):
     """
@@ -37,25 +25,190 @@ def graceful_shutdown(signum, frame):
     """
     print("\nEmpfange Herunterfahren-Signal. Starte graziöses Herunterfahren...")
 
-    # 1. Signal an alle Eureka-Lifecycle-Threads senden, sich zu beenden
-    for service_name, event in stop_events.items():
-        print(f"Sende Stopp-Signal an Service '{service_name}'.")
-        event.set()
+    if health_monitor is not None:
+        health_monitor.stop()
+
+    if drain_shutdown is not None:
+        # Alle Instanzen parallel deregistrieren, gemeinsame Frist statt 10 Sekunden pro Thread
+        print("Stoppe alle Services und deregistriere parallel...")
+        print(drain_shutdown().summary())
+    else:
+        # 1. Signal an alle Eureka-Lifecycle-Threads senden, sich zu beenden
+        for service_name, event in stop_events.items():
+            print(f"Sende Stopp-Signal an Service '{service_name}'.")
+            event.set()
+
+        # 2. Warte auf alle Threads, dass sie sich beenden
+        print("Warte auf Beendigung aller Service-Threads...")
+        for thread in eureka_lifecycle_threads:
+            thread.join(timeout=10)
+            if thread.is_alive():
+                print("Warnung: Thread konnte nicht innerhalb von 10 Sekunden beendet werden.")
 
-    # 2. Warte auf alle Threads, dass sie sich beenden
-    print("Warte auf Beendigung aller Service-Threads...")
-    for thread in eureka_lifecycle_threads:
-        thread.join(timeout=10)
-        if thread.is_alive():
-            print("Warnung: Thread konnte nicht innerhalb von 10 Sekunden beendet werden.")
+    if trace_writer is not None:
+        trace_writer.close()
+    write_span_trace()
 
     print("Alle Services wurden heruntergefahren. Beende Anwendung.")
     sys.exit(0)
 
+def write_span_trace() -> None:
+    """Schreibt die gesammelten Tracing-Spans als Chrome-Trace-Datei."""
+    if span_trace_file is None:
+        return
+    from tracing import tracer
+    count = tracer.exporter.write_chrome_trace(span_trace_file)
+    print(f"{count} Tracing-Spans nach '{span_trace_file}' geschrieben.")
+
+def setup_service_logger(service_name: str) -> logging.Logger:
+    log_path = f"{LOG_DIR}/{service_name}.log"
+    logger = logging.getLogger(service_name)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False  # Verhindert Weitergabe an Root-Logger
+
+    # Nur Handler hinzufügen, wenn noch keiner vorhanden ist
+    if not logger.handlers:
+        handler = logging.FileHandler(log_path)
+        formatter = logging.Formatter('%(asctime)s - %(message)s')
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+    return logger
+
+def run_async(services: List[Dict[str, Any]], metrics_store: Any, http2: bool = False, health_interval: float = 0, record_path: Optional[str] = None, batch_heartbeats: bool = False, drain_timeout: float = 0) -> None:
+    """
+    Alle Lifecycles als Coroutinen in einem Event-Loop; sie teilen sich die
+    Keep-Alive-Verbindungen eines AsyncTransport statt je einen Thread zu belegen.
+    Mit batch_heartbeats gehen gleichzeitig fällige Heartbeats als ein Request raus.
+    Mit drain_timeout deregistriert shutdown_drain alle Instanzen parallel innerhalb der Frist.
+    """
+    import asyncio
+    from eureka_client_lib import async_eureka_lifecycle, get_instance_id
+    from eureka_transport import create_async_transport
+    from health_probe import HealthMonitor
+    from service_instances import expand_instances
+    from shutdown_drain import RegistrationTracker, async_drain_tasks
+
+    async def run() -> None:
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop_event.set)
+
+        transport = create_async_transport(http2=http2)
+        writer = None
+        if record_path:
+            from traffic_trace import AsyncRecordingTransport, TraceWriter
+            writer = TraceWriter(record_path)
+            transport = AsyncRecordingTransport(transport, writer)
+        heartbeat = None
+        if batch_heartbeats:
+            from heartbeat_batch import HeartbeatBatcher
+            heartbeat = HeartbeatBatcher(transport, metrics_store).heartbeat
+        tracker = RegistrationTracker()
+        drain = drain_timeout > 0
+        lifecycles: Dict[Any, str] = {}
+        instances = []
+        for service_data in services:
+            service_name_upper = service_data["serviceName"].upper()
+            metrics_store.set_service_registered_status(service_name_upper, 0)
+            logger = setup_service_logger(service_name_upper)
+            for instance_data in expand_instances(service_data):
+                lifecycle = async_eureka_lifecycle(
+                    instance_data, metrics_store, stop_event, transport, logger, heartbeat=heartbeat,
+                    on_event=tracker.listener(instance_data) if drain else None, deregister_on_stop=not drain,
+                )
+                lifecycles[asyncio.ensure_future(lifecycle)] = get_instance_id(instance_data)
+                instances.append((instance_data, logger))
+        if health_interval > 0:
+            lifecycles[asyncio.ensure_future(HealthMonitor(instances, transport, health_interval).run(stop_event))] = "health-monitor"
+
+        print("Eureka Client (async) gestartet. Drücke STRG+C zum Beenden.")
+        try:
+            if drain:
+                # Bis zum Stopp-Signal laufen lassen (oder bis alle Lifecycles von selbst enden)
+                stopped = asyncio.ensure_future(stop_event.wait())
+                await asyncio.wait([stopped, *lifecycles], return_when=asyncio.FIRST_COMPLETED)
+                if stop_event.is_set():
+                    print("Stoppe alle Services und deregistriere parallel...")
+                    report = await async_drain_tasks(lifecycles, tracker, metrics_store, transport, drain_timeout)
+                    print(report.summary())
+                else:
+                    await asyncio.wait(lifecycles)
+                stopped.cancel()
+            results = await asyncio.gather(*lifecycles, return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception) and not isinstance(result, asyncio.CancelledError):
+                    logging.error(f"Fehler im Lifecycle: {result!r}")
+        finally:
+            await transport.close()
+            if writer is not None:
+                writer.close()
+            write_span_trace()
+        print("Alle Services wurden heruntergefahren. Beende Anwendung.")
+
+    asyncio.run(run())
+
 # --- Hauptlogik ---
-def main():
-    global services_to_manage # Zugriff auf die globale Liste
-    config_file = "services.json" # Der Name der Konfigurationsdatei
+def parse_args(argv: Optional[List[str]] = None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Registriert die Services aus services.json bei Eureka.")
+    parser.add_argument("--config", default="services.json", help="Pfad zur Service-Konfiguration")
+    parser.add_argument("--check-config", action="store_true", help="Konfiguration prüfen und beenden")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Alle Lifecycles in einem Event-Loop mit Keep-Alive-Transport")
+    parser.add_argument("--http2", action="store_true", help="Mit --async: HTTP/2 über httpx[http2], falls installiert")
+    parser.add_argument("--batch-heartbeats", action="store_true", help="Mit --async: fällige Heartbeats gebündelt über /peerreplication/batch senden")
+    parser.add_argument("--record", metavar="TRACE", help="Alle Eureka-Requests als NDJSON-Trace aufzeichnen")
+    parser.add_argument("--trace-sample-rate", type=float, default=0, help="Anteil der Lifecycle-Operationen, die als Spans aufgezeichnet werden (0 = aus)")
+    parser.add_argument("--trace-file", default="trace.json", help="Chrome-Trace-Datei für die Spans, geschrieben beim Beenden")
+    parser.add_argument("--health-interval", type=float, default=0, help="Health-Endpunkte alle N Sekunden prüfen und UP/DOWN an Eureka melden (0 = aus)")
+    parser.add_argument("--drain-timeout", type=float, default=0, metavar="SECONDS", help="Beim Beenden alle Instanzen parallel innerhalb von N Sekunden deregistrieren (0 = nacheinander wie bisher)")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None):
+    global services_to_manage, health_monitor, trace_writer, span_trace_file, drain_shutdown # Zugriff auf die globalen Variablen
+    args = parse_args(argv)
+    config_file = args.config # Der Name der Konfigurationsdatei
+
+    try:
+        services_to_manage = load_services(config_file)
+    except ConfigError as e:
+        print(f"Fehler: {e}")
+        sys.exit(1)
+
+    if args.check_config:
+        print(f"Konfiguration '{config_file}' ist gültig ({len(services_to_manage)} Services).")
+        return
+
+    # Erst jetzt die schweren Abhängigkeiten laden
+    from eureka_client_lib import eureka_lifecycle, MetricsStore
+    from eureka_client_lib import EUREKA_SERVER_URL # Um die URL im Start-Log auszugeben
+    from service_instances import expand_instances, lifecycle_name
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    # Jeder Client hat seine eigene Instanz von MetricsStore, um seine eigenen Metriken zu verfolgen.
+    metrics_store = MetricsStore()
+
+    # Logging
+    if ensure_log_dir():
+        print(f"Logverzeichnis '{LOG_DIR}' wurde erstellt.")
+    else:
+        print(f"Logverzeichnis '{LOG_DIR}' ist vorhanden.")
+
+    if args.trace_sample_rate > 0:
+        from tracing import configure_tracing
+        configure_tracing(args.trace_sample_rate)
+        span_trace_file = args.trace_file
+
+    if args.use_async:
+        print(f"Verwende Eureka Server URL: {EUREKA_SERVER_URL}")
+        run_async(services_to_manage, metrics_store, http2=args.http2, health_interval=args.health_interval, record_path=args.record, batch_heartbeats=args.batch_heartbeats, drain_timeout=args.drain_timeout)
+        return
+
+    if args.record:
+        from traffic_trace import enable_recording
+        trace_writer = enable_recording(args.record)
+        print(f"Zeichne Eureka-Requests in '{args.record}' auf.")
 
     # Signal-Handler für SIGINT (CTRL+C) und SIGTERM einrichten
     signal.signal(signal.SIGINT, graceful_shutdown)
@@ -64,65 +217,56 @@ def main():
     print(f"Verwende Eureka Server URL: {EUREKA_SERVER_URL}")
     print(f"Dieser Client wird Services aus '{config_file}' verwalten.")
 
-    try:
-        with open(config_file, "r") as f:
-            services_to_manage = json.load(f)
-    except FileNotFoundError:
-        print(f"Fehler: Konfigurationsdatei '{config_file}' nicht gefunden. Stelle sicher, dass sie im selben Verzeichnis liegt.")
-        sys.exit(1)
-    except json.JSONDecodeError:
-        print(f"Fehler: Ungültiges JSON in der Konfigurationsdatei '{config_file}'. Bitte überprüfen Sie die Syntax.")
-        sys.exit(1)
+    # Im Drain-Modus deregistriert graceful_shutdown alle registrierten Instanzen gemeinsam
+    tracker = None
+    if args.drain_timeout > 0:
+        from functools import partial
+        from shutdown_drain import RegistrationTracker, drain_threads
+        tracker = RegistrationTracker()
+        drain_shutdown = partial(drain_threads, stop_events.values(), eureka_lifecycle_threads, tracker, metrics_store, args.drain_timeout)
 
     # Starte Eureka Client Threads für jeden Service
+    health_instances = []
+    # Pflichtfelder und leaseInfo-Standardwerte wurden bereits in load_services geprüft bzw. ergänzt
     for service_data in services_to_manage:
-        # Validiere erforderliche Felder
-        if "serviceName" not in service_data:
-            print(f"Fehler: Service-Konfiguration fehlt 'serviceName'. Überspringe: {service_data}")
-            continue
-
         service_name_upper = service_data["serviceName"].upper()
-        # Füge leaseInfo hinzu, falls nicht vorhanden
-        if "leaseInfo" not in service_data:
-            service_data["leaseInfo"] = {
-                "renewalIntervalInSecs": 30,
-                "durationInSecs": 90
-            }
 
         # Initialisiere den Metrik-Status für diesen Service in diesem Client
         metrics_store.set_service_registered_status(service_name_upper, 0) # Startet als nicht registriert
 
-        # Erstelle ein Stopp-Event für diesen Thread und speichere es
+        # Erstelle ein Stopp-Event für diesen Service (gilt für alle Replikas) und speichere es
         stop_event = threading.Event()
         stop_events[service_name_upper] = stop_event
 
-        log_path = f"logs/{service_name_upper}.log"
-        logger = logging.getLogger(service_name_upper)
-        logger.setLevel(logging.INFO)
-        logger.propagate = False  # Verhindert Weitergabe an Root-Logger
-
-        # Nur Handler hinzufügen, wenn noch keiner vorhanden ist
-        if not logger.handlers:
-            handler = logging.FileHandler(log_path)
-            formatter = logging.Formatter('%(asctime)s - %(message)s')
-            handler.setFormatter(formatter)
-            logger.addHandler(handler)
+        logger = setup_service_logger(service_name_upper)
 
         def run_lifecycle(svc_data, metrics, stop_evt, log, svc_name):
             try:
-                eureka_lifecycle(svc_data, metrics, stop_evt, log)
+                if tracker is not None:
+                    eureka_lifecycle(svc_data, metrics, stop_evt, log, on_event=tracker.listener(svc_data), deregister_on_stop=False)
+                else:
+                    eureka_lifecycle(svc_data, metrics, stop_evt, log)
             except Exception as e:
                 log.exception(f"Error in eureka_lifecycle thread for {svc_name}: {e}")
 
-        # Starte den Lebenszyklus-Thread für jeden Service
-        thread = threading.Thread(
-            target=run_lifecycle,
-            args=(service_data, metrics_store, stop_event, logger, service_name_upper),
-            name=f"eureka-{service_name_upper}"
-        )
-        eureka_lifecycle_threads.append(thread)
-        thread.daemon = False  # Nicht-Daemon, damit graceful shutdown funktioniert
-        thread.start()
+        # Starte den Lebenszyklus-Thread für jede Instanz (Replikas teilen sich Logger und Stopp-Event)
+        for instance_data in expand_instances(service_data):
+            thread = threading.Thread(
+                target=run_lifecycle,
+                args=(instance_data, metrics_store, stop_event, logger, service_name_upper),
+                name=lifecycle_name(instance_data)
+            )
+            eureka_lifecycle_threads.append(thread)
+            thread.daemon = False  # Nicht-Daemon, damit graceful shutdown funktioniert
+            thread.start()
+            health_instances.append((instance_data, logger))
+
+    if args.health_interval > 0:
+        from eureka_transport import AsyncHTTPTransport
+        from health_probe import HealthMonitor
+        health_monitor = HealthMonitor(health_instances, AsyncHTTPTransport(), args.health_interval)
+        health_monitor.start()
+        print(f"Health-Probes alle {args.health_interval}s aktiv.")
 
     print("Eureka Client gestartet. Drücke STRG+C zum Beenden.")
 
@@ -0,0 +1,180 @@
+# client_registry.py
+"""
+Thread-sichere Client-Registry des Web-Managers. FastAPI führt synchrone Handler im Threadpool
+aus, daher greifen viele Threads gleichzeitig auf die Registry zu.
+
+Lesen ist sperrfrei: Die Konfigurationen liegen in einem Dict, das nie verändert, sondern bei
+jeder Änderung kopiert und als Ganzes ersetzt wird (copy-on-write). Ein Leser sieht also
+immer einen vollständigen Stand, auch während andere Threads schreiben. Schreiber
+serialisieren sich über eine Sperre; Starten, Stoppen und Löschen eines Clients laufen
+zusätzlich unter einer Sperre pro Client, damit Prüfen und Handeln atomar sind. Die Sperre
+eines Clients wird wieder entfernt, sobald es den Client nicht mehr gibt.
+
+Status-Overrides (z.B. OUT_OF_SERVICE) liegen ebenfalls copy-on-write in der Registry, da sie
+aus Request-Handlern gesetzt und aus den Lifecycle-Threads gelesen werden.
+
+Sperr-Reihenfolge: Client-Sperren (mehrere nur sortiert nach Name) vor der Schreibsperre.
+"""
+import threading
+from contextlib import ExitStack, contextmanager
+from typing import Any, Dict, Iterator, List, Mapping, MutableMapping, Optional, Tuple
+
+ClientConfigDict = Dict[str, Any]
+
+class ClientRegistry(MutableMapping[str, ClientConfigDict]):
+    """
+    Name (in Großbuchstaben) -> Client-Konfiguration, dazu Thread und Stop-Event laufender Clients.
+    Als Mapping benutzbar; Iteration und Lesezugriffe arbeiten auf dem aktuellen Snapshot.
+    """
+    def __init__(self, configs: Optional[Mapping[str, ClientConfigDict]] = None) -> None:
+        self._configs: Dict[str, ClientConfigDict] = dict(configs or {})
+        self._write_lock = threading.Lock()
+        self._client_locks: Dict[str, threading.Lock] = {}
+        self._status_overrides: Dict[str, str] = {}
+        self._threads: Dict[str, threading.Thread] = {}
+        self._stop_events: Dict[str, threading.Event] = {}
+
+    # --- Lesen (sperrfrei) ---
+
+    def snapshot(self) -> Mapping[str, ClientConfigDict]:
+        """Aktueller Stand; wird nie verändert und kann ohne Sperre durchlaufen werden."""
+        return self._configs
+
+    def __getitem__(self, name: str) -> ClientConfigDict:
+        return self._configs[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._configs)
+
+    def __len__(self) -> int:
+        return len(self._configs)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._configs
+
+    def is_running(self, name: str) -> bool:
+        thread = self._threads.get(name)
+        return thread is not None and thread.is_alive()
+
+    def running_names(self) -> List[str]:
+        return [name for name in self._configs if self.is_running(name)]
+
+    def status_override(self, name: str) -> Optional[str]:
+        return self._status_overrides.get(name)
+
+    def status_overrides(self) -> Mapping[str, str]:
+        """Aktuelle Status-Overrides; wird wie snapshot() nie verändert."""
+        return self._status_overrides
+
+    # --- Schreiben ---
+
+    def __setitem__(self, name: str, config: ClientConfigDict) -> None:
+        with self._write_lock:
+            self._configs = {**self._configs, name: config}
+
+    def __delitem__(self, name: str) -> None:
+        with self._write_lock:
+            configs = dict(self._configs)
+            del configs[name]
+            self._configs = configs
+
+    def add(self, name: str, config: ClientConfigDict) -> bool:
+        """Legt den Client an, wenn es ihn noch nicht gibt; False, wenn er bereits existiert."""
+        with self._write_lock:
+            if name in self._configs:
+                return False
+            self._configs = {**self._configs, name: config}
+            return True
+
+    def put_many(self, configs: Mapping[str, ClientConfigDict], replace: bool = False) -> Tuple[List[str], List[str], List[str]]:
+        """
+        Übernimmt viele Konfigurationen mit einer einzigen Kopie. Bestehende Clients werden nur
+        mit replace=True und nur, wenn sie nicht laufen, ersetzt. Liefert (added, replaced, skipped)
+        in der Reihenfolge von configs.
+        """
+        added: List[str] = []
+        replaced: List[str] = []
+        skipped: List[str] = []
+        with ExitStack() as stack:
+            for name in sorted(configs):
+                stack.enter_context(self.client_lock(name))
+            with self._write_lock:
+                accepted: Dict[str, ClientConfigDict] = {}
+                for name, config in configs.items():
+                    if name in self._configs:
+                        if not replace or self.is_running(name):
+                            skipped.append(name)
+                            continue
+                        replaced.append(name)
+                    else:
+                        added.append(name)
+                    accepted[name] = config
+                if accepted:
+                    self._configs = {**self._configs, **accepted}
+        return added, replaced, skipped
+
+    def set_status_override(self, name: str, status: Optional[str]) -> None:
+        """Setzt den Status-Override eines Clients; None oder "UP" entfernt ihn."""
+        with self._write_lock:
+            overrides = dict(self._status_overrides)
+            if status is None or status == "UP":
+                overrides.pop(name, None)
+            else:
+                overrides[name] = status
+            self._status_overrides = overrides
+
+    @contextmanager
+    def client_lock(self, name: str) -> Iterator[None]:
+        """Sperre für Lifecycle-Änderungen eines einzelnen Clients (Start, Stopp, Löschen, Ersetzen)."""
+        while True:
+            lock = self._client_locks.get(name)
+            if lock is None:
+                # setdefault ist atomar; ein parallel angelegtes Lock gewinnt
+                lock = self._client_locks.setdefault(name, threading.Lock())
+            with lock:
+                # Während des Wartens kann die Sperre entfernt worden sein, dann die neue nehmen
+                if self._client_locks.get(name) is not lock:
+                    continue
+                try:
+                    yield
+                finally:
+                    if name not in self._configs:
+                        self._client_locks.pop(name, None)
+                return
+
+    def remove_stopped(self, name: str) -> Optional[bool]:
+        """Löscht einen gestoppten Client. None: unbekannt, False: läuft noch, True: gelöscht."""
+        with self.client_lock(name):
+            if self.is_running(name):
+                return False
+            with self._write_lock:
+                if name not in self._configs:
+                    return None
+                configs = dict(self._configs)
+                del configs[name]
+                self._configs = configs
+                if name in self._status_overrides:
+                    self._status_overrides = {key: value for key, value in self._status_overrides.items() if key != name}
+            self._threads.pop(name, None)
+            self._stop_events.pop(name, None)
+            return True
+
+    def attach(self, name: str, thread: threading.Thread, stop_event: threading.Event) -> None:
+        """Merkt Thread und Stop-Event eines gestarteten Clients; Aufrufer hält client_lock(name)."""
+        self._threads[name] = thread
+        self._stop_events[name] = stop_event
+
+    def thread(self, name: str) -> Optional[threading.Thread]:
+        return self._threads.get(name)
+
+    def stop_event(self, name: str) -> Optional[threading.Event]:
+        return self._stop_events.get(name)
+
+    def runtime(self) -> List[Tuple[str, threading.Thread, threading.Event]]:
+        """Threads und Stop-Events aller je gestarteten Clients (für das Herunterfahren)."""
+        result = []
+        for name, thread in list(self._threads.items()):
+            stop_event = self._stop_events.get(name)
+            if stop_event is not None:
+                result.append((name, thread, stop_event))
+        return result
@@ -1,5 +1,4 @@
 # client_wm.py
-import json
 import threading
 import time
 import sys
@@ -13,26 +12,41 @@ from eureka_client_lib import EUREKA_SERVER_URL # Um die URL im Start-Log auszug
 
 # Importiere die Funktion zum Starten des Metrik-Webservers
 from metrics_exporter import run_metrics_web_server # <-- Wichtige Änderung hier
+from shard_supervisor import AggregatedMetricsStore, ShardSupervisor
+from service_instances import expand_instances, lifecycle_name
+from service_config import LOG_DIR, ConfigError, ensure_log_dir, load_services
+from eureka_transport import AsyncHTTPTransport
+from health_probe import HealthMonitor
+from runtime_metrics import RuntimeMetrics
+from shutdown_drain import RegistrationTracker, drain_threads
 
 # --- Konfiguration für den Metrik-Webserver ---
 METRICS_SERVER_HOST = os.getenv("METRICS_SERVER_HOST", "0.0.0.0")
 METRICS_SERVER_PORT = int(os.getenv("METRICS_SERVER_PORT", 9090))
 
-# --- Globale Metrik-Speicher-Instanz ---
-metrics_store = MetricsStore()
+# --- Supervisor-Modus: Services per konsistentem Hash auf N Worker-Prozesse verteilen ---
+EUREKA_CLIENT_WORKERS = int(os.getenv("EUREKA_CLIENT_WORKERS", 1))
+
+# --- Health-Probes: Health-Endpunkte alle N Sekunden prüfen und UP/DOWN an Eureka melden (0 = aus) ---
+HEALTH_PROBE_INTERVAL = float(os.getenv("HEALTH_PROBE_INTERVAL", 0))
+
+# --- Prozess-Kennzahlen (RSS, FDs, Threads, GC) alle N Sekunden sammeln ---
+RUNTIME_METRICS_INTERVAL = float(os.getenv("RUNTIME_METRICS_INTERVAL", 5))
 
-# Logging
-LOG_DIR = "logs"
-if not os.path.exists(LOG_DIR):
-    os.makedirs(LOG_DIR)
-    print(f"Logverzeichnis '{LOG_DIR}' wurde erstellt.")
-else:
-    print(f"Logverzeichnis '{LOG_DIR}' ist vorhanden.")
+# --- Beim Beenden alle Instanzen parallel innerhalb von N Sekunden deregistrieren (0 = wie bisher) ---
+SHUTDOWN_DRAIN_TIMEOUT = float(os.getenv("SHUTDOWN_DRAIN_TIMEOUT", 0))
+
+# --- Globale Metrik-Speicher-Instanz ---
+# Im Supervisor-Modus fasst der AggregatedMetricsStore die Metriken aller Worker zusammen
+metrics_store = AggregatedMetricsStore() if EUREKA_CLIENT_WORKERS > 1 else MetricsStore()
+supervisor = None
+health_monitor = None
 
 # --- Globale Listen für Threads und Services (für sauberes Herunterfahren) ---
 eureka_lifecycle_threads = []
 services_to_manage = []
 stop_events = {} # Speichert Threading.Event-Objekte für jeden Service-Thread
+registration_tracker = RegistrationTracker() # Registrierte Instanzen für den Drain-Modus
 
 def graceful_shutdown(signum, frame):
     """
@@ -40,6 +54,22 @@ def graceful_shutdown(signum, frame):
     """
     print("\nEmpfange Herunterfahren-Signal. Starte graziöses Herunterfahren...")
 
+    if health_monitor is not None:
+        health_monitor.stop()
+
+    if supervisor is not None:
+        # Worker deregistrieren ihre Services selbst (im eureka_lifecycle bzw. per Drain)
+        supervisor.stop()
+        print("Alle Worker beendet. Beende Anwendung.")
+        sys.exit(0)
+
+    if SHUTDOWN_DRAIN_TIMEOUT > 0:
+        # Lifecycles deregistrieren nicht selbst; jede registrierte Instanz genau einmal, parallel
+        print("Stoppe alle Services und deregistriere parallel...")
+        report = drain_threads(stop_events.values(), eureka_lifecycle_threads, registration_tracker, metrics_store, SHUTDOWN_DRAIN_TIMEOUT)
+        print(report.summary())
+        sys.exit(0)
+
     # 1. Signal an alle Eureka-Lifecycle-Threads senden, sich zu beenden
     for service_name, event in stop_events.items():
         print(f"Sende Stopp-Signal an Service '{service_name}'.")
@@ -50,16 +80,23 @@ def graceful_shutdown(signum, frame):
 
     # 3. Services von Eureka deregistrieren
     for service_data in services_to_manage:
-        deregister_instance(service_data, metrics_store)
+        for instance_data in expand_instances(service_data):
+            deregister_instance(instance_data, metrics_store)
 
     print("Alle Services versucht zu deregistrieren. Beende Anwendung.")
     sys.exit(0)
 
 # --- Hauptlogik ---
 def main():
-    global services_to_manage
+    global services_to_manage, supervisor, health_monitor
     config_file = "services.json"
 
+    # Logging
+    if ensure_log_dir():
+        print(f"Logverzeichnis '{LOG_DIR}' wurde erstellt.")
+    else:
+        print(f"Logverzeichnis '{LOG_DIR}' ist vorhanden.")
+
     # Signal-Handler für SIGINT (CTRL+C) und SIGTERM einrichten
     signal.signal(signal.SIGINT, graceful_shutdown)
     signal.signal(signal.SIGTERM, graceful_shutdown)
@@ -68,47 +105,69 @@ def main():
     print(f"Metrik-Server lauscht auf {METRICS_SERVER_HOST}:{METRICS_SERVER_PORT}")
 
     try:
-        with open(config_file, "r") as f:
-            services_to_manage = json.load(f)
-    except FileNotFoundError:
-        print(f"Fehler: Konfigurationsdatei '{config_file}' nicht gefunden. Stelle sicher, dass sie im selben Verzeichnis liegt.")
-        sys.exit(1)
-    except json.JSONDecodeError:
-        print(f"Fehler: Ungültiges JSON in der Konfigurationsdatei '{config_file}'. Bitte überprüfen Sie die Syntax.")
+        # Ergänzt auch fehlende leaseInfo-Standardwerte
+        services_to_manage = load_services(config_file)
+    except ConfigError as e:
+        print(f"Fehler: {e}")
         sys.exit(1)
 
-    # Starte Eureka Client Threads für jeden Service
-    for service_data in services_to_manage:
-        service_name_upper = service_data["serviceName"].upper()
-        if "leaseInfo" not in service_data:
-            service_data["leaseInfo"] = {
-                "renewalIntervalInSecs": 30,
-                "durationInSecs": 90
-            }
-        
-        metrics_store.set_service_registered_status(service_name_upper, 0)
-
-        stop_event = threading.Event()
-        stop_events[service_name_upper] = stop_event
-
-        log_path = f"logs/{service_name_upper}.log"
-        logger = logging.getLogger(service_name_upper)
-        logger.setLevel(logging.INFO)
-        handler = logging.FileHandler(log_path)
-        formatter = logging.Formatter('%(asctime)s - %(message)s')
-        handler.setFormatter(formatter)
-        logger.handlers = [handler] 
-
-        thread = threading.Thread(target=eureka_lifecycle, args=(service_data, metrics_store, stop_event, logger))
-        eureka_lifecycle_threads.append(thread)
-        thread.daemon = True
-        thread.start()
+    if isinstance(metrics_store, AggregatedMetricsStore):
+        # Supervisor-Modus: Lifecycles laufen in Worker-Prozessen
+        # Health-Probes und Drain laufen in den Workern, jeweils für deren Shard
+        supervisor = ShardSupervisor(services_to_manage, EUREKA_CLIENT_WORKERS, metrics_store,
+                                     health_interval=HEALTH_PROBE_INTERVAL, drain_timeout=SHUTDOWN_DRAIN_TIMEOUT)
+        supervisor.start()
+        print(f"Supervisor-Modus: {len(services_to_manage)} Services auf {EUREKA_CLIENT_WORKERS} Worker-Prozesse verteilt.")
+        if HEALTH_PROBE_INTERVAL > 0:
+            print(f"Health-Probes alle {HEALTH_PROBE_INTERVAL}s aktiv (in den Workern).")
+    else:
+        # Starte Eureka Client Threads für jeden Service
+        health_instances = []
+        for service_data in services_to_manage:
+            service_name_upper = service_data["serviceName"].upper()
+            metrics_store.set_service_registered_status(service_name_upper, 0)
+
+            stop_event = threading.Event()
+            stop_events[service_name_upper] = stop_event
+
+            log_path = f"{LOG_DIR}/{service_name_upper}.log"
+            logger = logging.getLogger(service_name_upper)
+            logger.setLevel(logging.INFO)
+            handler = logging.FileHandler(log_path)
+            formatter = logging.Formatter('%(asctime)s - %(message)s')
+            handler.setFormatter(formatter)
+            logger.handlers = [handler]
+
+            for instance_data in expand_instances(service_data):
+                kwargs = {}
+                if SHUTDOWN_DRAIN_TIMEOUT > 0:
+                    kwargs = {"on_event": registration_tracker.listener(instance_data), "deregister_on_stop": False}
+                thread = threading.Thread(target=eureka_lifecycle, args=(instance_data, metrics_store, stop_event, logger), kwargs=kwargs, name=lifecycle_name(instance_data))
+                eureka_lifecycle_threads.append(thread)
+                thread.daemon = True
+                thread.start()
+                health_instances.append((instance_data, logger))
+
+        if HEALTH_PROBE_INTERVAL > 0:
+            health_monitor = HealthMonitor(health_instances, AsyncHTTPTransport(), HEALTH_PROBE_INTERVAL)
+            health_monitor.start()
+            print(f"Health-Probes alle {HEALTH_PROBE_INTERVAL}s aktiv.")
+
+    # Im Supervisor-Modus laufen die Lifecycles in den Workern: Lifecycle-, RSS- und GC-Werte dieses
+    # Prozesses würden nur den Supervisor beschreiben, daher keine Prozess-Kennzahlen exportieren
+    runtime_metrics = RuntimeMetrics(configured_lifecycles=len(eureka_lifecycle_threads), interval=RUNTIME_METRICS_INTERVAL) if supervisor is None else None
+    if runtime_metrics is not None:
+        runtime_metrics.start()
 
     # Starte den Metrik-Webserver in einem separaten Thread
     # Rufe die ausgelagerte Funktion auf
+    app_config = {
+        "services": [service_data["serviceName"].upper() for service_data in services_to_manage],
+        "workers": EUREKA_CLIENT_WORKERS,
+    }
     web_server_thread = threading.Thread(
         target=run_metrics_web_server,
-        args=(metrics_store, METRICS_SERVER_HOST, METRICS_SERVER_PORT)
+        args=(metrics_store, app_config, METRICS_SERVER_HOST, METRICS_SERVER_PORT, runtime_metrics)
     )
     web_server_thread.daemon = True
     web_server_thread.start()
@@ -0,0 +1,455 @@
+# discovery.py
+import hashlib
+import itertools
+import logging
+import random
+import struct
+import threading
+import time
+import xml.etree.ElementTree as ET
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+
+import eureka_client_lib
+import eureka_codec
+from eureka_transport import Transport
+
+logger = logging.getLogger(__name__)
+
+ROUND_ROBIN = "round_robin"
+LEAST_LATENCY = "least_latency"  # Power of two choices nach geglätteter Latenz
+STRATEGIES = (ROUND_ROBIN, LEAST_LATENCY)
+
+class DiscoveryError(Exception):
+    """Die Registry konnte nicht geladen oder gelesen werden."""
+
+class DiscoveredInstance(NamedTuple):
+    instance_id: str
+    app: str
+    host_name: str
+    ip_addr: str
+    port: int
+    secure_port: int
+    secure: bool
+    status: str
+    zone: str
+    vip_address: str
+    metadata: Mapping[str, str]
+
+    def __hash__(self) -> int:
+        # metadata ist ein dict und geht daher nicht in den Hash ein
+        return hash((self.instance_id, self.app, self.host_name, self.port, self.status))
+
+    @property
+    def base_url(self) -> str:
+        if self.secure:
+            return f"https://{self.host_name}:{self.secure_port}"
+        return f"http://{self.host_name}:{self.port}"
+
+def _text(element: ET.Element, tag: str, default: str = "") -> str:
+    child = element.find(tag)
+    return child.text.strip() if child is not None and child.text else default
+
+def parse_instance(element: ET.Element) -> DiscoveredInstance:
+    """Liest ein <instance>-Element aus einem Eureka-Application-Dokument (siehe example/service.xml)."""
+    metadata_element = element.find("metadata")
+    metadata = {child.tag: (child.text or "") for child in metadata_element} if metadata_element is not None else {}
+    secure_port_element = element.find("securePort")
+    # Zone: Spring-Cloud-Konvention metadata.zone, sonst der Name aus dataCenterInfo
+    zone = metadata.get("zone") or _text(element, "dataCenterInfo/name")
+    return DiscoveredInstance(
+        instance_id=_text(element, "instanceId") or f"{_text(element, 'hostName')}:{_text(element, 'app')}",
+        app=_text(element, "app").upper(),
+        host_name=_text(element, "hostName"),
+        ip_addr=_text(element, "ipAddr"),
+        port=int(_text(element, "port", "0")),
+        secure_port=int(_text(element, "securePort", "0")),
+        secure=secure_port_element is not None and secure_port_element.get("enabled") == "true",
+        status=_text(element, "status", "UNKNOWN"),
+        zone=zone,
+        vip_address=_text(element, "vipAddress"),
+        metadata=metadata,
+    )
+
+class RegistryView:
+    """
+    Unveränderlicher Stand der Registry: App-Name -> Instanzen. Wird bei jedem Abruf
+    komplett ersetzt, Leser brauchen daher keine Sperren.
+    """
+    def __init__(self, applications: Mapping[str, Sequence[DiscoveredInstance]], version: int = 0, hashcode: str = "") -> None:
+        self.applications: Dict[str, Tuple[DiscoveredInstance, ...]] = {
+            app.upper(): tuple(instances) for app, instances in applications.items()
+        }
+        self.version = version
+        self.hashcode = hashcode or self.compute_hashcode()
+
+    def compute_hashcode(self) -> str:
+        """Hashcode im Eureka-Format, z.B. "DOWN_1_UP_3_" (Anzahl Instanzen pro Status)."""
+        counts: Dict[str, int] = {}
+        for instances in self.applications.values():
+            for instance in instances:
+                counts[instance.status] = counts.get(instance.status, 0) + 1
+        return "".join(f"{status}_{count}_" for status, count in sorted(counts.items()))
+
+    def digest(self) -> str:
+        """
+        Prüfsumme über alle Instanzen (ID, Endpunkte, Status, Zone, VIP, Metadaten). Anders als der
+        Hashcode ändert sie sich auch, wenn Instanzen bei gleichen Status-Zählern ausgetauscht werden.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for app in sorted(self.applications):
+            for i in sorted(self.applications[app], key=lambda instance: instance.instance_id):
+                fields = (app, i.instance_id, i.host_name, i.ip_addr, i.port, i.secure_port, i.secure, i.status, i.zone, i.vip_address, sorted(i.metadata.items()))
+                digest.update(repr(fields).encode("utf-8"))
+        return digest.hexdigest()
+
+    def instances(self, app: str, only_up: bool = True) -> Tuple[DiscoveredInstance, ...]:
+        instances = self.applications.get(app.upper(), ())
+        return tuple(i for i in instances if i.status == "UP") if only_up else instances
+
+    def by_vip(self, vip_address: str, only_up: bool = True) -> Tuple[DiscoveredInstance, ...]:
+        return tuple(
+            instance
+            for instances in self.applications.values()
+            for instance in instances
+            if instance.vip_address == vip_address and (not only_up or instance.status == "UP")
+        )
+
+    def __len__(self) -> int:
+        return sum(len(instances) for instances in self.applications.values())
+
+def parse_registry_xml(xml: Union[str, bytes]) -> RegistryView:
+    """Parst die Antwort von GET /eureka/apps (<applications>) oder ein einzelnes <application>-Dokument."""
+    try:
+        root = ET.fromstring(xml)
+    except ET.ParseError as e:
+        raise DiscoveryError(f"Ungültiges Registry-XML: {e}") from e
+    application_elements = [root] if root.tag == "application" else root.findall("application")
+    applications: Dict[str, List[DiscoveredInstance]] = {}
+    for application in application_elements:
+        name = _text(application, "name").upper()
+        applications[name] = [parse_instance(instance) for instance in application.findall("instance")]
+    version = int(_text(root, "versions__delta", "0") or 0)
+    return RegistryView(applications, version, _text(root, "apps__hashcode"))
+
+def _as_list(value: Any) -> List[Any]:
+    # Ältere Eureka-Versionen liefern einzelne Elemente als Objekt statt als Liste
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+def _port(value: Any) -> Tuple[int, bool]:
+    if isinstance(value, dict):
+        return int(value.get("$", 0) or 0), str(value.get("@enabled", "")).lower() == "true"
+    return int(value or 0), False
+
+def parse_instance_json(data: Mapping[str, Any]) -> DiscoveredInstance:
+    """Liest eine Instanz im JSON-Format von Eureka ({"port": {"$": 8080, "@enabled": "true"}, ...})."""
+    metadata = {key: str(value) for key, value in (data.get("metadata") or {}).items() if not key.startswith("@")}
+    port, _ = _port(data.get("port"))
+    secure_port, secure = _port(data.get("securePort"))
+    zone = metadata.get("zone") or str((data.get("dataCenterInfo") or {}).get("name", ""))
+    return DiscoveredInstance(
+        instance_id=str(data.get("instanceId") or f"{data.get('hostName', '')}:{data.get('app', '')}"),
+        app=str(data.get("app", "")).upper(),
+        host_name=str(data.get("hostName", "")),
+        ip_addr=str(data.get("ipAddr", "")),
+        port=port,
+        secure_port=secure_port,
+        secure=secure,
+        status=str(data.get("status") or "UNKNOWN"),
+        zone=zone,
+        vip_address=str(data.get("vipAddress", "")),
+        metadata=metadata,
+    )
+
+def parse_registry_json(data: Union[str, bytes]) -> RegistryView:
+    """JSON-Gegenstück zu parse_registry_xml ({"applications": {...}} oder {"application": {...}})."""
+    try:
+        document = eureka_codec.loads(data)
+        if "applications" in document:
+            root = document["applications"]
+            application_list = _as_list(root.get("application"))
+        else:
+            root = document["application"]
+            application_list = [root]
+        applications: Dict[str, List[DiscoveredInstance]] = {}
+        for application in application_list:
+            applications[str(application.get("name", "")).upper()] = [
+                parse_instance_json(instance) for instance in _as_list(application.get("instance"))
+            ]
+        version = int(root.get("versions__delta", 0) or 0)
+        hashcode = str(root.get("apps__hashcode", "") or "")
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        raise DiscoveryError(f"Ungültiges Registry-JSON: {e}") from e
+    return RegistryView(applications, version, hashcode)
+
+def registry_request_headers(wire_format: Optional[str] = None) -> Dict[str, str]:
+    """Header des Registry-Abrufs für XML oder JSON (Standard: EUREKA_WIRE_FORMAT)."""
+    wire_format = wire_format or eureka_client_lib.EUREKA_WIRE_FORMAT
+    accept = "application/json" if wire_format == eureka_codec.FORMAT_JSON else "application/xml"
+    return {"Accept": accept, "Accept-Encoding": "gzip"}
+
+def fetch_registry(transport: Optional[Transport] = None, wire_format: Optional[str] = None) -> RegistryView:
+    """
+    Lädt die vollständige Registry per GET /eureka/apps, als XML oder JSON (Standard:
+    EUREKA_WIRE_FORMAT). Das Format der Antwort wird am Content-Type erkannt.
+    """
+    try:
+        response = (transport or eureka_client_lib.default_transport).request(
+            "GET", eureka_client_lib.EUREKA_SERVER_URL, headers=registry_request_headers(wire_format)
+        )
+    except Exception as e:
+        raise DiscoveryError(f"Registry nicht erreichbar: {e}") from e
+    if response.status_code != 200:
+        raise DiscoveryError(f"Registry-Abruf fehlgeschlagen ({response.status_code}): {response.text}")
+    content = response.content or response.text
+    if eureka_codec.is_json_response(content, response.headers):
+        return parse_registry_json(content)
+    return parse_registry_xml(content)
+
+class _InstanceStats:
+    __slots__ = ("latency_ms", "consecutive_errors", "ejected_until", "ejections")
+
+    def __init__(self) -> None:
+        self.latency_ms = 0.0
+        self.consecutive_errors = 0
+        self.ejected_until = 0.0
+        self.ejections = 0
+
+class LoadBalancer:
+    """
+    Wählt Instanzen einer App aus. choose() ist O(1) und sperrt nicht: es liest nur das
+    aktuelle Auswahl-Tupel, das bei Änderungen (neuer Registry-Stand, Auswurf, Wiederaufnahme)
+    neu berechnet und als Ganzes ersetzt wird.
+
+    - round_robin: reihum über einen atomaren Zähler
+    - least_latency: zwei zufällige Kandidaten, der mit der geringeren geglätteten Latenz gewinnt
+    - zone: bevorzugt Instanzen derselben Zone, sonst alle
+    - Ausreißer: nach consecutive_errors Fehlern in Folge wird eine Instanz für
+      base_ejection_secs * Anzahl Auswürfe (max. max_ejection_secs) ausgeschlossen,
+      höchstens max_ejection_percent der Instanzen gleichzeitig
+    """
+    def __init__(
+        self,
+        instances: Sequence[DiscoveredInstance] = (),
+        strategy: str = ROUND_ROBIN,
+        zone: Optional[str] = None,
+        consecutive_errors: int = 5,
+        base_ejection_secs: float = 30.0,
+        max_ejection_secs: float = 300.0,
+        max_ejection_percent: int = 50,
+        latency_alpha: float = 0.3,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unbekannte Strategie: {strategy}")
+        self.strategy = strategy
+        self.zone = zone
+        self.consecutive_errors = consecutive_errors
+        self.base_ejection_secs = base_ejection_secs
+        self.max_ejection_secs = max_ejection_secs
+        self.max_ejection_percent = max_ejection_percent
+        self.latency_alpha = latency_alpha
+        self._rng = rng or random.Random()
+        self._counter = itertools.count()
+        self._write_lock = threading.Lock()
+        self._instances: Tuple[DiscoveredInstance, ...] = ()
+        self._stats: Dict[str, _InstanceStats] = {}
+        self._pool: Tuple[DiscoveredInstance, ...] = ()
+        self._next_readmit = 0.0
+        self.update(instances)
+
+    def update(self, instances: Sequence[DiscoveredInstance]) -> None:
+        """Übernimmt einen neuen Registry-Stand; Statistiken bestehender Instanzen bleiben erhalten."""
+        with self._write_lock:
+            self._instances = tuple(instances)
+            self._stats = {i.instance_id: self._stats.get(i.instance_id) or _InstanceStats() for i in self._instances}
+            self._rebuild(time.monotonic())
+
+    def _rebuild(self, now: float) -> None:
+        healthy = tuple(i for i in self._instances if self._stats[i.instance_id].ejected_until <= now)
+        if self.zone is not None:
+            local = tuple(i for i in healthy if i.zone == self.zone)
+            healthy = local or healthy
+        pending = [s.ejected_until for s in self._stats.values() if s.ejected_until > now]
+        self._next_readmit = min(pending) if pending else 0.0
+        self._pool = healthy
+
+    def _readmit(self, now: float) -> None:
+        with self._write_lock:
+            if self._next_readmit and now >= self._next_readmit:
+                self._rebuild(now)
+
+    @property
+    def available(self) -> Tuple[DiscoveredInstance, ...]:
+        return self._pool
+
+    def choose(self) -> Optional[DiscoveredInstance]:
+        next_readmit = self._next_readmit
+        if next_readmit:
+            now = time.monotonic()
+            if now >= next_readmit:
+                self._readmit(now)
+        pool = self._pool
+        count = len(pool)
+        if count == 0:
+            return None
+        if count == 1:
+            return pool[0]
+        if self.strategy == ROUND_ROBIN:
+            return pool[next(self._counter) % count]
+
+        first = self._rng.randrange(count)
+        second = self._rng.randrange(count - 1)
+        if second >= first:
+            second += 1
+        a, b = pool[first], pool[second]
+        stats = self._stats
+        a_stats, b_stats = stats.get(a.instance_id), stats.get(b.instance_id)
+        a_latency = a_stats.latency_ms if a_stats else 0.0
+        b_latency = b_stats.latency_ms if b_stats else 0.0
+        return a if a_latency <= b_latency else b
+
+    def record_success(self, instance: DiscoveredInstance, latency_ms: float) -> None:
+        stats = self._stats.get(instance.instance_id)
+        if stats is None:
+            return
+        stats.consecutive_errors = 0
+        if stats.latency_ms == 0.0:
+            stats.latency_ms = latency_ms
+        else:
+            stats.latency_ms += self.latency_alpha * (latency_ms - stats.latency_ms)
+
+    def record_failure(self, instance: DiscoveredInstance) -> None:
+        stats = self._stats.get(instance.instance_id)
+        if stats is None:
+            return
+        stats.consecutive_errors += 1
+        if stats.consecutive_errors >= self.consecutive_errors:
+            self._eject(instance.instance_id)
+
+    def _eject(self, instance_id: str) -> None:
+        with self._write_lock:
+            now = time.monotonic()
+            stats = self._stats.get(instance_id)
+            if stats is None or stats.ejected_until > now:
+                return
+            ejected = sum(1 for s in self._stats.values() if s.ejected_until > now)
+            max_ejected = len(self._instances) * self.max_ejection_percent // 100
+            if ejected >= max_ejected:
+                return
+            stats.ejections += 1
+            stats.consecutive_errors = 0
+            stats.ejected_until = now + min(self.base_ejection_secs * stats.ejections, self.max_ejection_secs)
+            logger.warning(f"Instanz {instance_id} wird für {stats.ejected_until - now:.0f}s ausgeschlossen.")
+            self._rebuild(now)
+
+class DiscoveryClient:
+    """
+    Hält den aktuellen RegistryView und je App einen LoadBalancer. refresh() lädt die
+    Registry neu und aktualisiert alle Balancer; start() tut das periodisch im Hintergrund.
+    Mit snapshot_path wird der letzte Stand auf Platte gehalten und beim Start sofort geladen.
+    Listener (add_listener) bekommen jeden übernommenen Stand, z.B. für registry_watch.RegistryWatcher.
+    """
+    def __init__(self, strategy: str = ROUND_ROBIN, zone: Optional[str] = None, transport: Optional[Transport] = None, snapshot_path: Optional[str] = None, **balancer_options: Any) -> None:
+        self.strategy = strategy
+        self.zone = zone
+        self.transport = transport
+        self.snapshot_path = snapshot_path
+        self._snapshot_digest: Optional[str] = None
+        self.balancer_options = balancer_options
+        self.view = RegistryView({})
+        self._balancers: Dict[str, LoadBalancer] = {}
+        self._listeners: List[Callable[[RegistryView], None]] = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def apply(self, view: RegistryView) -> None:
+        with self._lock:
+            self.view = view
+            for app, balancer in self._balancers.items():
+                balancer.update(view.instances(app))
+        for listener in self._listeners:
+            try:
+                listener(view)
+            except Exception as e:
+                logger.warning(f"Registry-Listener fehlgeschlagen: {e}")
+
+    def add_listener(self, listener: Callable[[RegistryView], None]) -> None:
+        self._listeners.append(listener)
+
+    def refresh(self) -> RegistryView:
+        view = fetch_registry(self.transport)
+        self.apply(view)
+        if self.snapshot_path:
+            digest = view.digest()
+            if digest != self._snapshot_digest:
+                self._save_snapshot(view, digest)
+        return view
+
+    def _save_snapshot(self, view: RegistryView, digest: str) -> None:
+        from registry_snapshot import save_snapshot
+        assert self.snapshot_path is not None
+        try:
+            save_snapshot(view, self.snapshot_path)
+            self._snapshot_digest = digest
+        except (OSError, ValueError, struct.error) as e:
+            # Ein fehlgeschlagener Snapshot darf die bereits übernommene Aktualisierung nicht abbrechen
+            logger.warning(f"Registry-Snapshot konnte nicht geschrieben werden: {e}")
+
+    def warm_start(self) -> bool:
+        """Übernimmt den Registry-Snapshot, falls vorhanden. Liefert True bei Erfolg."""
+        if not self.snapshot_path:
+            return False
+        from registry_snapshot import load_snapshot
+        view = load_snapshot(self.snapshot_path)
+        if view is None:
+            return False
+        self.apply(view)
+        self._snapshot_digest = view.digest()
+        return True
+
+    def balancer(self, app: str) -> LoadBalancer:
+        app = app.upper()
+        balancer = self._balancers.get(app)
+        if balancer is None:
+            with self._lock:
+                balancer = self._balancers.get(app)
+                if balancer is None:
+                    balancer = LoadBalancer(self.view.instances(app), self.strategy, self.zone, **self.balancer_options)
+                    self._balancers[app] = balancer
+        return balancer
+
+    def choose(self, app: str) -> Optional[DiscoveredInstance]:
+        return self.balancer(app).choose()
+
+    def _refresh_loop(self, interval: float, first_delay: float) -> None:
+        delay = first_delay
+        while not self._stop_event.wait(delay):
+            delay = interval
+            try:
+                self.refresh()
+            except DiscoveryError as e:
+                logger.warning(f"Registry-Aktualisierung fehlgeschlagen, verwende letzten Stand: {e}")
+
+    def start(self, interval: float = 30.0) -> None:
+        """
+        Lädt die Registry und aktualisiert sie danach alle interval Sekunden. Gibt es einen
+        Snapshot, ist der Client sofort nutzbar und gleicht sich im Hintergrund mit der Registry ab.
+        """
+        warm = self.warm_start()
+        if not warm:
+            try:
+                self.refresh()
+            except DiscoveryError as e:
+                logger.warning(f"Erster Registry-Abruf fehlgeschlagen: {e}")
+        self._thread = threading.Thread(
+            target=self._refresh_loop, args=(interval, 0.0 if warm else interval), name="eureka-discovery", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
@@ -1,21 +1,46 @@
 # eureka_client_lib.py
-import requests
+import asyncio
+import json
 import threading
 import os
 import socket
 import logging
 import time
 import xml.etree.ElementTree as ET
-from typing import Dict, Any, Optional
+from typing import Awaitable, Callable, Dict, Any, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+from urllib.parse import urlencode
+
+import eureka_codec
+from eureka_transport import AsyncTransport, Body, RequestsTransport, Transport, TransportConnectionError, TransportResponse
+from tracing import STATUS_ERROR, tracer
 
 EUREKA_SERVER_URL = os.getenv("EUREKA_SERVER_URL", "http://localhost:8761/eureka/apps/")
 
+# Wire-Format der Registrierung (xml oder json) und gzip-Kompression der Request-Bodies
+EUREKA_WIRE_FORMAT = os.getenv("EUREKA_WIRE_FORMAT", eureka_codec.FORMAT_XML)
+EUREKA_GZIP = os.getenv("EUREKA_GZIP", "0") == "1"
+
+# Listener für Lifecycle-Events: on_event(event_type, data)
+# Event-Typen: registered, registration_failed, heartbeat_ok, heartbeat_failed, stopped
+EventCallback = Callable[[str, Dict[str, Any]], None]
+
+# Alternative Heartbeat-Funktion für async_eureka_lifecycle, z.B. HeartbeatBatcher.heartbeat;
+# bekommt das on_event des Lifecycles für Neu-Registrierungen und Backoffs
+HeartbeatCallable = Callable[[Mapping[str, Any], Optional[logging.Logger], Optional[EventCallback]], Awaitable[bool]]
+
+# Instanz-Status laut Eureka (InstanceInfo.InstanceStatus)
+INSTANCE_STATUSES = ("UP", "DOWN", "STARTING", "OUT_OF_SERVICE", "UNKNOWN")
+
 class MetricsStore:
     def __init__(self) -> None:
         self._lock = threading.Lock()
         self.successful_registrations_total: int = 0
         self.registration_errors_total: int = 0
         self.service_registered_status: Dict[str, int] = {}
+        # Verspätung des Heartbeats gegenüber dem geplanten Zeitpunkt (letzter Wert pro Service, Summe, Anzahl)
+        self.heartbeat_lag_seconds: Dict[str, float] = {}
+        self.heartbeat_lag_seconds_sum: float = 0.0
+        self.heartbeat_lag_count: int = 0
 
     def increment_successful_registrations(self) -> None:
         with self._lock:
@@ -29,12 +54,21 @@ class MetricsStore:
         with self._lock:
             self.service_registered_status[service_name] = status
 
+    def observe_heartbeat_lag(self, service_name: str, lag_seconds: float) -> None:
+        with self._lock:
+            self.heartbeat_lag_seconds[service_name] = lag_seconds
+            self.heartbeat_lag_seconds_sum += lag_seconds
+            self.heartbeat_lag_count += 1
+
     def get_metrics_data(self) -> Dict[str, Any]:
         with self._lock:
             return {
                 "successful_registrations_total": self.successful_registrations_total,
                 "registration_errors_total": self.registration_errors_total,
-                "service_registered_status": self.service_registered_status.copy()
+                "service_registered_status": self.service_registered_status.copy(),
+                "heartbeat_lag_seconds": self.heartbeat_lag_seconds.copy(),
+                "heartbeat_lag_seconds_sum": self.heartbeat_lag_seconds_sum,
+                "heartbeat_lag_count": self.heartbeat_lag_count,
             }
 
 def get_ip_address(hostname: str) -> str:
@@ -45,33 +79,42 @@ def get_ip_address(hostname: str) -> str:
         print(f"Warnung: IP-Adresse für Hostname '{hostname}' konnte nicht ermittelt werden. Verwende '127.0.0.1'.")
         return "127.0.0.1"
 
-def register_instance(service_data: Dict[str, Any], metrics_store: MetricsStore, logger: Optional[logging.Logger] = None) -> bool:
+def get_instance_id(service_data: Mapping[str, Any]) -> str:
+    """
+    Liefert die instanceId: explizit aus der Konfiguration oder im Format hostname:SERVICENAME:port.
+    """
+    instance_id = service_data.get("instanceId")
+    if instance_id:
+        return instance_id
+    return f"{service_data['hostName']}:{service_data['serviceName'].upper()}:{service_data['httpPort']}"
+
+def get_active_endpoint(service_data: Mapping[str, Any]) -> Tuple[str, Any]:
+    """Liefert Schema und Port, unter denen die Instanz erreichbar ist (abhängig von sslPreferred)."""
+    if service_data.get("sslPreferred", False):
+        return "https", service_data.get("securePort", 443)
+    return "http", service_data["httpPort"]
+
+def get_health_check_url(service_data: Mapping[str, Any]) -> str:
+    """healthCheckUrl der Instanz, wie sie bei Eureka registriert wird."""
+    scheme, active_port = get_active_endpoint(service_data)
+    return f"{scheme}://{service_data['hostName']}:{active_port}{service_data['healthEndpointPath']}"
+
+def build_instance_xml(service_data: Mapping[str, Any], ip_address: str) -> str:
+    """Baut den XML-Payload für die Registrierung einer Instanz."""
     service_name = service_data["serviceName"].upper()
     host_name = service_data["hostName"]
     http_port = service_data["httpPort"]
-    instance_id = f"{host_name}:{service_name}:{http_port}"
-    app_url = f"{EUREKA_SERVER_URL}{service_name}"
-
-    ip_address = get_ip_address(host_name)
     secure_port = service_data.get("securePort", 443)
     data_center_info_name = service_data.get("dataCenterInfoName", "MyOwn")
 
-    # Neues Feld sslPreferred aus services.json
-    ssl_preferred = service_data.get("sslPreferred", False)
-
-    if ssl_preferred:
-        secure_port_enabled = "true"
-        port_enabled = "false"
-        scheme = "https"
-        active_port = service_data.get("securePort", secure_port)
-    else:
-        secure_port_enabled = "false"
-        port_enabled = "true"
-        scheme = "http"
-        active_port = service_data.get("httpPort", http_port)
+    # Feld sslPreferred aus services.json
+    scheme, active_port = get_active_endpoint(service_data)
+    ssl_preferred = scheme == "https"
+    secure_port_enabled = "true" if ssl_preferred else "false"
+    port_enabled = "false" if ssl_preferred else "true"
 
     instance_element = ET.Element("instance")
-    ET.SubElement(instance_element, "instanceId").text = instance_id
+    ET.SubElement(instance_element, "instanceId").text = get_instance_id(service_data)
     ET.SubElement(instance_element, "hostName").text = host_name
     ET.SubElement(instance_element, "app").text = service_name
     ET.SubElement(instance_element, "ipAddr").text = ip_address
@@ -88,133 +131,525 @@ def register_instance(service_data: Dict[str, Any], metrics_store: MetricsStore,
     # URLs abhängig von SSL
     ET.SubElement(instance_element, "homePageUrl").text = f"{scheme}://{host_name}:{active_port}/"
     ET.SubElement(instance_element, "statusPageUrl").text = f"{scheme}://{host_name}:{active_port}{service_data['infoEndpointPath']}"
-    ET.SubElement(instance_element, "healthCheckUrl").text = f"{scheme}://{host_name}:{active_port}{service_data['healthEndpointPath']}"
+    ET.SubElement(instance_element, "healthCheckUrl").text = get_health_check_url(service_data)
+
+    metadata = service_data.get("metadata")
+    if metadata:
+        metadata_element = ET.SubElement(instance_element, "metadata")
+        for key, value in metadata.items():
+            ET.SubElement(metadata_element, key).text = str(value)
 
     data_center_info_element = ET.SubElement(instance_element, "dataCenterInfo",
                                              attrib={"class": "com.netflix.appinfo.InstanceInfo$DefaultDataCenterInfo"})
     ET.SubElement(data_center_info_element, "name").text = data_center_info_name
 
-    xml_payload = ET.tostring(instance_element, encoding='utf-8', xml_declaration=True).decode('utf-8')
+    return ET.tostring(instance_element, encoding='utf-8', xml_declaration=True).decode('utf-8')
+
+def build_instance_dict(service_data: Mapping[str, Any], ip_address: str) -> Dict[str, Any]:
+    """InstanceInfo im JSON-Format von Eureka (Attribute als "@name", Textwerte als "$")."""
+    service_name = service_data["serviceName"].upper()
+    host_name = service_data["hostName"]
+    scheme, active_port = get_active_endpoint(service_data)
+    ssl_preferred = scheme == "https"
+    instance: Dict[str, Any] = {
+        "instanceId": get_instance_id(service_data),
+        "hostName": host_name,
+        "app": service_name,
+        "ipAddr": ip_address,
+        "vipAddress": service_name.lower(),
+        "secureVipAddress": service_name.lower(),
+        "status": "UP",
+        "port": {"$": service_data["httpPort"], "@enabled": "false" if ssl_preferred else "true"},
+        "securePort": {"$": service_data.get("securePort", 443), "@enabled": "true" if ssl_preferred else "false"},
+        "homePageUrl": f"{scheme}://{host_name}:{active_port}/",
+        "statusPageUrl": f"{scheme}://{host_name}:{active_port}{service_data['infoEndpointPath']}",
+        "healthCheckUrl": get_health_check_url(service_data),
+    }
+    metadata = service_data.get("metadata")
+    if metadata:
+        instance["metadata"] = {key: str(value) for key, value in metadata.items()}
+    instance["dataCenterInfo"] = {
+        "@class": "com.netflix.appinfo.InstanceInfo$DefaultDataCenterInfo",
+        "name": service_data.get("dataCenterInfoName", "MyOwn"),
+    }
+    return {"instance": instance}
+
+def build_instance_json(service_data: Mapping[str, Any], ip_address: str) -> bytes:
+    return eureka_codec.dumps(build_instance_dict(service_data, ip_address))
+
+def build_registration_payload(service_data: Mapping[str, Any], ip_address: str) -> str:
+    """
+    Nutzt ein gemeinsames Payload-Template, falls die Instanz eines hat
+    (Replikas aus service_instances.expand_instances), sonst den ElementTree-Weg.
+    """
+    template = getattr(service_data, "payload_template", None)
+    if template is not None:
+        return template.render(service_data, ip_address)
+    return build_instance_xml(service_data, ip_address)
+
+XML_HEADERS = {
+    "Content-Type": "application/xml",
+    "Accept": "application/xml"
+}
+
+# Standard-Transport der synchronen Funktionen; über set_default_transport austauschbar
+default_transport: Transport = RequestsTransport()
+
+def set_default_transport(transport: Transport) -> None:
+    global default_transport
+    default_transport = transport
+
+def _http(transport: Transport, method: str, url: str, data: Body = None, headers: Optional[Dict[str, str]] = None) -> TransportResponse:
+    """HTTP-Roundtrip als eigene Span."""
+    with tracer.span("http", method=method) as span:
+        response = transport.request(method, url, data=data, headers=headers)
+        span.set_attribute("status_code", response.status_code)
+        return response
+
+async def _async_http(transport: AsyncTransport, method: str, url: str, data: Body = None, headers: Optional[Dict[str, str]] = None) -> TransportResponse:
+    with tracer.span("http", method=method) as span:
+        response = await transport.request(method, url, data=data, headers=headers)
+        span.set_attribute("status_code", response.status_code)
+        return response
+
+def _instance_url(service_data: Mapping[str, Any]) -> str:
+    return f"{EUREKA_SERVER_URL}{service_data['serviceName'].upper()}/{get_instance_id(service_data)}"
+
+def _prepare_registration(service_data: Mapping[str, Any], ip_address: str, logger: Optional[logging.Logger]) -> Tuple[str, Body, Dict[str, str]]:
+    """Baut URL, Payload (XML oder JSON, optional gzip) und Header der Registrierung und protokolliert den Versuch."""
+    app_url = f"{EUREKA_SERVER_URL}{service_data['serviceName'].upper()}"
+    data_center_info_name = service_data.get("dataCenterInfoName", "MyOwn")
+    scheme, active_port = get_active_endpoint(service_data)
+    ssl_preferred = scheme == "https"
+
+    with tracer.span("build_payload", format=EUREKA_WIRE_FORMAT):
+        payload: Union[str, bytes]
+        if EUREKA_WIRE_FORMAT == eureka_codec.FORMAT_JSON:
+            payload, headers = build_instance_json(service_data, ip_address), dict(eureka_codec.JSON_HEADERS)
+        else:
+            payload, headers = build_registration_payload(service_data, ip_address), dict(XML_HEADERS)
 
     if logger:
         logger.info(f"Versuche Registrierung bei {app_url} mit IP: {ip_address}, active_port: {active_port}, DataCenter: {data_center_info_name}, SSL: {ssl_preferred}")
-        logger.debug(f"XML-Payload:\n{xml_payload}")
-
-    headers = {
-        "Content-Type": "application/xml",
-        "Accept": "application/xml"
-    }
+        logger.debug(f"Payload:\n{payload if isinstance(payload, str) else payload.decode('utf-8')}")
+    if EUREKA_GZIP:
+        payload, headers = eureka_codec.compress_request(payload, headers)
+    return app_url, payload, headers
+
+def registration_request(service_data: Mapping[str, Any], ip_address: str) -> Tuple[str, Body, Dict[str, str]]:
+    """URL, Payload und Header einer Registrierung, genau wie register_instance sie sendet."""
+    return _prepare_registration(service_data, ip_address, None)
+
+def instance_url(service_data: Mapping[str, Any]) -> str:
+    """URL einer Instanz (Heartbeat per PUT, Deregistrierung per DELETE)."""
+    return _instance_url(service_data)
+
+def _registration_result(service_name: str, response: Optional[TransportResponse], error: Optional[Exception], metrics_store: MetricsStore, logger: Optional[logging.Logger]) -> bool:
+    """Wertet Antwort bzw. Fehler einer Registrierung aus und aktualisiert die Metriken."""
+    if response is not None and response.status_code == 204:
+        if logger:
+            logger.info("Erfolgreich bei Eureka registriert.")
+        metrics_store.increment_successful_registrations()
+        metrics_store.set_service_registered_status(service_name, 1)
+        return True
 
-    try:
-        response = requests.post(app_url, data=xml_payload, headers=headers)
-        if response.status_code == 204:
-            if logger:
-                logger.info("Erfolgreich bei Eureka registriert.")
-            metrics_store.increment_successful_registrations()
-            metrics_store.set_service_registered_status(service_name, 1)
-            return True
+    if logger:
+        if response is not None:
+            logger.error(f"Fehler bei der Registrierung ({response.status_code}): {response.text}")
+        elif isinstance(error, TransportConnectionError):
+            logger.error(f"Verbindungsfehler bei Registrierung: {error}")
         else:
-            if logger:
-                logger.error(f"Fehler bei der Registrierung ({response.status_code}): {response.text}")
-            metrics_store.increment_registration_errors()
-            metrics_store.set_service_registered_status(service_name, 0)
-            return False
-    except requests.exceptions.ConnectionError as e:
+            logger.exception(f"Unerwarteter Fehler bei Registrierung: {error}")
+    metrics_store.increment_registration_errors()
+    metrics_store.set_service_registered_status(service_name, 0)
+    return False
+
+# Ergebnis eines einzelnen Heartbeat-Versuchs
+HEARTBEAT_OK = "ok"
+HEARTBEAT_NOT_FOUND = "not_found"
+HEARTBEAT_RETRY = "retry"
+
+def _heartbeat_outcome(response: Optional[TransportResponse], error: Optional[Exception], attempt: int, logger: Optional[logging.Logger]) -> str:
+    if response is not None and response.status_code == 200:
         if logger:
-            logger.error(f"Verbindungsfehler bei Registrierung: {e}")
-        metrics_store.increment_registration_errors()
-        metrics_store.set_service_registered_status(service_name, 0)
-        return False
-    except Exception as e:
+            logger.info(f"Heartbeat erfolgreich gesendet (Versuch {attempt}).")
+        return HEARTBEAT_OK
+    if response is not None and response.status_code == 404:
         if logger:
-            logger.exception(f"Unerwarteter Fehler bei Registrierung: {e}")
-        metrics_store.increment_registration_errors()
+            logger.warning("Heartbeat 404 – Instanz nicht gefunden. Starte Neu-Registrierung.")
+        return HEARTBEAT_NOT_FOUND
+    if logger:
+        if response is not None:
+            logger.warning(f"Fehler beim Heartbeat ({response.status_code}): {response.text}")
+        elif isinstance(error, TransportConnectionError):
+            logger.error(f"Verbindungsfehler beim Heartbeat: {error}")
+        else:
+            logger.exception(f"Unerwarteter Fehler beim Heartbeat: {error}")
+    return HEARTBEAT_RETRY
+
+def _heartbeat_backoff(attempt: int, logger: Optional[logging.Logger]) -> int:
+    wait_time = min(2 * attempt, 10)
+    if logger:
+        logger.info(f"Warte {wait_time}s vor erneutem Heartbeat-Versuch...")
+    return wait_time
+
+def _reregistration_result(registered: bool, logger: Optional[logging.Logger]) -> bool:
+    if logger:
+        if registered:
+            logger.info("Neu-Registrierung erfolgreich. Sende Heartbeat erneut.")
+        else:
+            logger.error("Neu-Registrierung fehlgeschlagen.")
+    return registered
+
+def _deregistration_result(service_name: str, response: Optional[TransportResponse], error: Optional[Exception], metrics_store: MetricsStore, logger: Optional[logging.Logger]) -> bool:
+    if response is not None and response.status_code == 200:
+        if logger:
+            logger.info("Erfolgreich von Eureka deregistriert.")
         metrics_store.set_service_registered_status(service_name, 0)
-        return False
+        return True
+    if logger:
+        if response is not None:
+            logger.warning(f"Fehler bei Deregistrierung ({response.status_code}): {response.text}")
+        elif isinstance(error, TransportConnectionError):
+            logger.error(f"Verbindungsfehler bei Deregistrierung: {error}")
+        else:
+            logger.exception(f"Unerwarteter Fehler bei Deregistrierung: {error}")
+    return False
 
-def send_heartbeat(service_data: Dict[str, Any], metrics_store: MetricsStore, logger: Optional[logging.Logger] = None, max_retries: int = 3) -> bool:
+def register_instance(service_data: Mapping[str, Any], metrics_store: MetricsStore, logger: Optional[logging.Logger] = None, transport: Optional[Transport] = None) -> bool:
+    service_name = service_data["serviceName"].upper()
+    with tracer.span("register", service=service_name) as span:
+        with tracer.span("dns_lookup"):
+            ip_address = get_ip_address(service_data["hostName"])
+        app_url, payload, headers = _prepare_registration(service_data, ip_address, logger)
+
+        try:
+            response = _http(transport or default_transport, "POST", app_url, data=payload, headers=headers)
+        except Exception as e:
+            registered = _registration_result(service_name, None, e, metrics_store, logger)
+        else:
+            registered = _registration_result(service_name, response, None, metrics_store, logger)
+        if not registered:
+            span.set_status(STATUS_ERROR)
+        return registered
+
+def send_heartbeat(service_data: Mapping[str, Any], metrics_store: MetricsStore, logger: Optional[logging.Logger] = None, max_retries: int = 3, transport: Optional[Transport] = None, on_event: Optional[EventCallback] = None) -> bool:
     """
     Sendet einen Heartbeat an Eureka mit Retry-Mechanismus.
     Bei 404 wird eine Neu-Registrierung durchgeführt.
+    on_event erhält Neu-Registrierungen und Backoffs ("reregistered", "reregistration_failed", "heartbeat_backoff").
+    """
+    heartbeat_url = _instance_url(service_data)
+    transport = transport or default_transport
+
+    with tracer.span("heartbeat", service=service_data["serviceName"].upper()) as span:
+        attempt = 0
+        while attempt < max_retries:
+            attempt += 1
+            span.set_attribute("attempts", attempt)
+            try:
+                outcome = _heartbeat_outcome(_http(transport, "PUT", heartbeat_url), None, attempt, logger)
+            except Exception as e:
+                outcome = _heartbeat_outcome(None, e, attempt, logger)
+
+            if outcome == HEARTBEAT_OK:
+                return True
+            if outcome == HEARTBEAT_NOT_FOUND:
+                # nach erfolgreicher Registrierung direkt neuen Versuch starten
+                with tracer.span("reregister"):
+                    reregistered = register_instance(service_data, metrics_store, logger=logger, transport=transport)
+                emit_event(on_event, "reregistered" if reregistered else "reregistration_failed", logger, attempt=attempt)
+                if _reregistration_result(reregistered, logger):
+                    continue
+                span.set_status(STATUS_ERROR)
+                return False
+
+            # Backoff vor erneutem Versuch
+            wait_time = _heartbeat_backoff(attempt, logger)
+            emit_event(on_event, "heartbeat_backoff", logger, attempt=attempt, retry_in=wait_time)
+            with tracer.span("backoff", seconds=wait_time):
+                time.sleep(wait_time)
+
+        span.set_status(STATUS_ERROR)
+    if logger:
+        logger.error("Alle Heartbeat-Versuche fehlgeschlagen.")
+    return False
+
+# --- Gebündelte Heartbeats über den Peer-Replication-Endpunkt von Eureka ---
+
+PEER_REPLICATION_HEADERS = {
+    "Content-Type": "application/json",
+    "Accept": "application/json",
+    "x-netflix-discovery-replication": "true",
+}
+
+def _peer_replication_url() -> str:
+    """.../eureka/apps/ -> .../eureka/peerreplication/batch"""
+    return EUREKA_SERVER_URL.rstrip("/").rsplit("/", 1)[0] + "/peerreplication/batch"
+
+def _heartbeat_batch_body(instances: Sequence[Mapping[str, Any]]) -> str:
+    return json.dumps({"replicationList": [
+        {"appName": data["serviceName"].upper(), "id": get_instance_id(data), "action": "Heartbeat"}
+        for data in instances
+    ]}, separators=(",", ":"))
+
+def _heartbeat_batch_statuses(response: TransportResponse, count: int) -> Optional[List[int]]:
+    """Statuscodes pro Instanz aus der ReplicationListResponse; None, wenn die Antwort nicht passt."""
+    if response.status_code != 200:
+        return None
+    try:
+        statuses = [int(item["statusCode"]) for item in json.loads(response.text)["responseList"]]
+    except (ValueError, KeyError, TypeError):
+        return None
+    return statuses if len(statuses) == count else None
+
+def post_heartbeat_batch(instances: Sequence[Mapping[str, Any]], transport: Optional[Transport] = None) -> Tuple[int, Optional[List[int]]]:
+    """
+    Sendet die Heartbeats aller Instanzen in einem Request an /peerreplication/batch.
+    Liefert den HTTP-Status (0 bei Verbindungsfehler) und die Statuscodes pro Instanz
+    bzw. None, wenn der Batch als Ganzes fehlgeschlagen ist.
     """
+    with tracer.span("heartbeat_batch", size=len(instances)):
+        try:
+            response = _http(transport or default_transport, "POST", _peer_replication_url(), data=_heartbeat_batch_body(instances), headers=PEER_REPLICATION_HEADERS)
+        except Exception:
+            return 0, None
+        return response.status_code, _heartbeat_batch_statuses(response, len(instances))
+
+def send_heartbeat_batch(instances: Iterable[Mapping[str, Any]], metrics_store: MetricsStore, logger: Optional[logging.Logger] = None, transport: Optional[Transport] = None) -> Dict[str, bool]:
+    """
+    Heartbeats vieler Instanzen in einem Request. Instanzen, die im Batch nicht mit 200 bestätigt
+    werden (oder alle, wenn der Batch scheitert), bekommen einen einzelnen Heartbeat per send_heartbeat,
+    inklusive Neu-Registrierung bei 404. Liefert instanceId -> Erfolg.
+    """
+    instance_list = list(instances)
+    status, statuses = post_heartbeat_batch(instance_list, transport)
+    if statuses is None and logger:
+        logger.warning(f"Heartbeat-Batch fehlgeschlagen ({status}), sende {len(instance_list)} einzelne Heartbeats.")
+    results: Dict[str, bool] = {}
+    for index, service_data in enumerate(instance_list):
+        if statuses is not None and statuses[index] == 200:
+            results[get_instance_id(service_data)] = True
+        else:
+            results[get_instance_id(service_data)] = send_heartbeat(service_data, metrics_store, logger=logger, transport=transport)
+    return results
+
+def deregister_instance(service_data: Mapping[str, Any], metrics_store: MetricsStore, logger: Optional[logging.Logger] = None, transport: Optional[Transport] = None) -> bool:
     service_name = service_data["serviceName"].upper()
-    host_name = service_data["hostName"]
-    http_port = service_data["httpPort"]
-    instance_id = f"{host_name}:{service_name}:{http_port}"
-    heartbeat_url = f"{EUREKA_SERVER_URL}{service_name}/{instance_id}"
+    deregister_url = _instance_url(service_data)
+
+    if logger:
+        logger.info(f"Versuche Deregistrierung von {deregister_url}")
 
-    attempt = 0
-    while attempt < max_retries:
-        attempt += 1
+    with tracer.span("deregister", service=service_name):
         try:
-            response = requests.put(heartbeat_url)
-            if response.status_code == 200:
-                if logger:
-                    logger.info(f"Heartbeat erfolgreich gesendet (Versuch {attempt}).")
-                return True
-            elif response.status_code == 404:
-                if logger:
-                    logger.warning("Heartbeat 404 – Instanz nicht gefunden. Starte Neu-Registrierung.")
-                # Neu-Registrierung durchführen
-                if register_instance(service_data, metrics_store, logger=logger):
-                    if logger:
-                        logger.info("Neu-Registrierung erfolgreich. Sende Heartbeat erneut.")
-                    # nach erfolgreicher Registrierung direkt neuen Versuch starten
-                    continue
-                else:
-                    if logger:
-                        logger.error("Neu-Registrierung fehlgeschlagen.")
-                    return False
-            else:
-                if logger:
-                    logger.warning(f"Fehler beim Heartbeat ({response.status_code}): {response.text}")
-        except requests.exceptions.ConnectionError as e:
-            if logger:
-                logger.error(f"Verbindungsfehler beim Heartbeat: {e}")
+            response = _http(transport or default_transport, "DELETE", deregister_url)
         except Exception as e:
-            if logger:
-                logger.exception(f"Unerwarteter Fehler beim Heartbeat: {e}")
+            return _deregistration_result(service_name, None, e, metrics_store, logger)
+        return _deregistration_result(service_name, response, None, metrics_store, logger)
+
+def _status_request(service_data: Mapping[str, Any], status: str) -> Tuple[str, str]:
+    """
+    Status-Override einer Instanz: DOWN/OUT_OF_SERVICE werden per PUT gesetzt, bei UP wird
+    der Override entfernt, damit wieder der registrierte Status gilt.
+    """
+    if status not in INSTANCE_STATUSES:
+        raise ValueError(f"Unbekannter Instanz-Status: {status}")
+    status_url = f"{_instance_url(service_data)}/status?value={status}"
+    return ("DELETE" if status == "UP" else "PUT"), status_url
 
-        # Backoff vor erneutem Versuch
-        wait_time = min(2 * attempt, 10)
+def _status_result(status: str, response: Optional[TransportResponse], error: Optional[Exception], logger: Optional[logging.Logger]) -> bool:
+    if response is not None and response.status_code == 200:
         if logger:
-            logger.info(f"Warte {wait_time}s vor erneutem Heartbeat-Versuch...")
-        time.sleep(wait_time)
+            logger.info(f"Status bei Eureka auf {status} gesetzt.")
+        return True
+    if logger:
+        if response is not None:
+            logger.warning(f"Fehler beim Setzen des Status {status} ({response.status_code}): {response.text}")
+        else:
+            logger.error(f"Fehler beim Setzen des Status {status}: {error}")
+    return False
+
+def update_status(service_data: Mapping[str, Any], status: str, logger: Optional[logging.Logger] = None, transport: Optional[Transport] = None) -> bool:
+    """Meldet einen Statuswechsel über den Status-Override-Endpunkt, ohne Neu-Registrierung."""
+    method, status_url = _status_request(service_data, status)
+    try:
+        response = (transport or default_transport).request(method, status_url)
+    except Exception as e:
+        return _status_result(status, None, e, logger)
+    return _status_result(status, response, None, logger)
 
+def _metadata_url(service_data: Mapping[str, Any], metadata: Mapping[str, Any]) -> str:
+    return f"{_instance_url(service_data)}/metadata?{urlencode({key: str(value) for key, value in metadata.items()})}"
+
+def _metadata_result(response: Optional[TransportResponse], error: Optional[Exception], logger: Optional[logging.Logger]) -> bool:
+    if response is not None and response.status_code == 200:
+        if logger:
+            logger.info("Metadaten bei Eureka aktualisiert.")
+        return True
+    if logger:
+        if response is not None:
+            logger.warning(f"Fehler beim Aktualisieren der Metadaten ({response.status_code}): {response.text}")
+        else:
+            logger.error(f"Fehler beim Aktualisieren der Metadaten: {error}")
+    return False
+
+def update_metadata(service_data: Mapping[str, Any], metadata: Mapping[str, Any], logger: Optional[logging.Logger] = None, transport: Optional[Transport] = None) -> bool:
+    """Setzt bzw. überschreibt Metadaten-Schlüssel einer registrierten Instanz per PUT .../metadata."""
+    try:
+        response = (transport or default_transport).request("PUT", _metadata_url(service_data, metadata))
+    except Exception as e:
+        return _metadata_result(None, e, logger)
+    return _metadata_result(response, None, logger)
+
+# --- Asynchrone Varianten: viele Lifecycles teilen sich einen AsyncTransport ---
+
+async def async_register_instance(service_data: Mapping[str, Any], metrics_store: MetricsStore, transport: AsyncTransport, logger: Optional[logging.Logger] = None) -> bool:
+    service_name = service_data["serviceName"].upper()
+    with tracer.span("register", service=service_name) as span:
+        # DNS-Auflösung blockiert, daher im Executor
+        with tracer.span("dns_lookup"):
+            ip_address = await asyncio.get_running_loop().run_in_executor(None, get_ip_address, service_data["hostName"])
+        app_url, payload, headers = _prepare_registration(service_data, ip_address, logger)
+
+        try:
+            response = await _async_http(transport, "POST", app_url, data=payload, headers=headers)
+        except Exception as e:
+            registered = _registration_result(service_name, None, e, metrics_store, logger)
+        else:
+            registered = _registration_result(service_name, response, None, metrics_store, logger)
+        if not registered:
+            span.set_status(STATUS_ERROR)
+        return registered
+
+async def async_send_heartbeat(service_data: Mapping[str, Any], metrics_store: MetricsStore, transport: AsyncTransport, logger: Optional[logging.Logger] = None, max_retries: int = 3, on_event: Optional[EventCallback] = None) -> bool:
+    heartbeat_url = _instance_url(service_data)
+
+    with tracer.span("heartbeat", service=service_data["serviceName"].upper()) as span:
+        attempt = 0
+        while attempt < max_retries:
+            attempt += 1
+            span.set_attribute("attempts", attempt)
+            try:
+                outcome = _heartbeat_outcome(await _async_http(transport, "PUT", heartbeat_url), None, attempt, logger)
+            except Exception as e:
+                outcome = _heartbeat_outcome(None, e, attempt, logger)
+
+            if outcome == HEARTBEAT_OK:
+                return True
+            if outcome == HEARTBEAT_NOT_FOUND:
+                with tracer.span("reregister"):
+                    reregistered = await async_register_instance(service_data, metrics_store, transport, logger=logger)
+                emit_event(on_event, "reregistered" if reregistered else "reregistration_failed", logger, attempt=attempt)
+                if _reregistration_result(reregistered, logger):
+                    continue
+                span.set_status(STATUS_ERROR)
+                return False
+
+            wait_time = _heartbeat_backoff(attempt, logger)
+            emit_event(on_event, "heartbeat_backoff", logger, attempt=attempt, retry_in=wait_time)
+            with tracer.span("backoff", seconds=wait_time):
+                await asyncio.sleep(wait_time)
+
+        span.set_status(STATUS_ERROR)
     if logger:
         logger.error("Alle Heartbeat-Versuche fehlgeschlagen.")
     return False
 
-def deregister_instance(service_data: Dict[str, Any], metrics_store: MetricsStore, logger: Optional[logging.Logger] = None) -> None:
+async def async_post_heartbeat_batch(instances: Sequence[Mapping[str, Any]], transport: AsyncTransport) -> Tuple[int, Optional[List[int]]]:
+    with tracer.span("heartbeat_batch", size=len(instances)):
+        try:
+            response = await _async_http(transport, "POST", _peer_replication_url(), data=_heartbeat_batch_body(instances), headers=PEER_REPLICATION_HEADERS)
+        except Exception:
+            return 0, None
+        return response.status_code, _heartbeat_batch_statuses(response, len(instances))
+
+async def async_send_heartbeat_batch(instances: Iterable[Mapping[str, Any]], metrics_store: MetricsStore, transport: AsyncTransport, logger: Optional[logging.Logger] = None, max_concurrency: int = 32) -> Dict[str, bool]:
+    """Wie send_heartbeat_batch; die Einzel-Heartbeats des Fallbacks laufen nebenläufig."""
+    instance_list = list(instances)
+    status, statuses = await async_post_heartbeat_batch(instance_list, transport)
+    if statuses is None and logger:
+        logger.warning(f"Heartbeat-Batch fehlgeschlagen ({status}), sende {len(instance_list)} einzelne Heartbeats.")
+    confirmed = [statuses is not None and statuses[index] == 200 for index in range(len(instance_list))]
+    retried = await _run_batch(
+        [data for data, ok in zip(instance_list, confirmed) if not ok],
+        lambda data: async_send_heartbeat(data, metrics_store, transport, logger=logger),
+        max_concurrency,
+    )
+    return {get_instance_id(data): ok or retried[get_instance_id(data)] for data, ok in zip(instance_list, confirmed)}
+
+async def async_deregister_instance(service_data: Mapping[str, Any], metrics_store: MetricsStore, transport: AsyncTransport, logger: Optional[logging.Logger] = None) -> bool:
     service_name = service_data["serviceName"].upper()
-    host_name = service_data["hostName"]
-    http_port = service_data["httpPort"]
-    instance_id = f"{host_name}:{service_name}:{http_port}"
-    deregister_url = f"{EUREKA_SERVER_URL}{service_name}/{instance_id}"
+    deregister_url = _instance_url(service_data)
 
     if logger:
         logger.info(f"Versuche Deregistrierung von {deregister_url}")
 
+    with tracer.span("deregister", service=service_name):
+        try:
+            response = await _async_http(transport, "DELETE", deregister_url)
+        except Exception as e:
+            return _deregistration_result(service_name, None, e, metrics_store, logger)
+        return _deregistration_result(service_name, response, None, metrics_store, logger)
+
+async def async_update_status(service_data: Mapping[str, Any], status: str, transport: AsyncTransport, logger: Optional[logging.Logger] = None) -> bool:
+    method, status_url = _status_request(service_data, status)
     try:
-        response = requests.delete(deregister_url)
-        if response.status_code == 200:
-            if logger:
-                logger.info("Erfolgreich von Eureka deregistriert.")
-            metrics_store.set_service_registered_status(service_name, 0)
-        else:
-            if logger:
-                logger.warning(f"Fehler bei Deregistrierung ({response.status_code}): {response.text}")
-    except requests.exceptions.ConnectionError as e:
-        if logger:
-            logger.error(f"Verbindungsfehler bei Deregistrierung: {e}")
+        response = await transport.request(method, status_url)
+    except Exception as e:
+        return _status_result(status, None, e, logger)
+    return _status_result(status, response, None, logger)
+
+async def async_update_metadata(service_data: Mapping[str, Any], metadata: Mapping[str, Any], transport: AsyncTransport, logger: Optional[logging.Logger] = None) -> bool:
+    try:
+        response = await transport.request("PUT", _metadata_url(service_data, metadata))
+    except Exception as e:
+        return _metadata_result(None, e, logger)
+    return _metadata_result(response, None, logger)
+
+async def _run_batch(instances: Iterable[Mapping[str, Any]], call: Callable[[Mapping[str, Any]], Awaitable[bool]], max_concurrency: int) -> Dict[str, bool]:
+    semaphore = asyncio.Semaphore(max_concurrency)
+    instance_list = list(instances)
+
+    async def limited(service_data: Mapping[str, Any]) -> bool:
+        async with semaphore:
+            return await call(service_data)
+
+    results = await asyncio.gather(*(limited(data) for data in instance_list))
+    return {get_instance_id(data): result for data, result in zip(instance_list, results)}
+
+async def async_update_status_batch(instances: Iterable[Mapping[str, Any]], status: str, transport: AsyncTransport, max_concurrency: int = 32, logger: Optional[logging.Logger] = None) -> Dict[str, bool]:
+    """
+    Setzt den Status vieler Instanzen nebenläufig über einen gemeinsamen Transport
+    (z.B. OUT_OF_SERVICE für alle Instanzen vor einem Deployment). Liefert instanceId -> Erfolg.
+    """
+    if status not in INSTANCE_STATUSES:
+        raise ValueError(f"Unbekannter Instanz-Status: {status}")
+    return await _run_batch(instances, lambda data: async_update_status(data, status, transport, logger=logger), max_concurrency)
+
+async def async_update_metadata_batch(instances: Iterable[Mapping[str, Any]], metadata: Mapping[str, Any], transport: AsyncTransport, max_concurrency: int = 32, logger: Optional[logging.Logger] = None) -> Dict[str, bool]:
+    """Setzt dieselben Metadaten für viele Instanzen nebenläufig. Liefert instanceId -> Erfolg."""
+    return await _run_batch(instances, lambda data: async_update_metadata(data, metadata, transport, logger=logger), max_concurrency)
+
+def emit_event(on_event: Optional[EventCallback], event_type: str, logger: Optional[logging.Logger] = None, **data: Any) -> None:
+    """
+    Meldet ein Lifecycle-Event an den Listener. Fehler im Listener dürfen den Lifecycle nicht beenden.
+    """
+    if on_event is None:
+        return
+    try:
+        on_event(event_type, data)
     except Exception as e:
         if logger:
-            logger.exception(f"Unerwarteter Fehler bei Deregistrierung: {e}")
+            logger.warning(f"Event-Listener für '{event_type}' fehlgeschlagen: {e}")
 
-def eureka_lifecycle(service_data: Dict[str, Any], metrics_store: MetricsStore, stop_event: threading.Event, logger: Optional[logging.Logger] = None) -> None:
+def eureka_lifecycle(service_data: Mapping[str, Any], metrics_store: MetricsStore, stop_event: threading.Event, logger: Optional[logging.Logger] = None, on_event: Optional[EventCallback] = None, deregister_on_stop: bool = True) -> None:
     """
     Verwaltet den Lebenszyklus eines Services bei Eureka.
     stop_event wird verwendet, um den Thread sauber zu beenden.
+    on_event wird bei Statuswechseln aufgerufen (Registrierung, Heartbeat, Neu-Registrierung, Backoff,
+    Deregistrierung, Stopp).
+    Mit deregister_on_stop=False deregistriert der Aufrufer selbst (z.B. shutdown_drain).
     """
     lease_renewal_interval = service_data.get("leaseInfo", {}).get("renewalIntervalInSecs", 20)
 
@@ -231,9 +666,13 @@ def eureka_lifecycle(service_data: Dict[str, Any], metrics_store: MetricsStore,
         if logger:
             logger.info(f"Registrierungsversuch {reg_attempt}/{max_reg_retries}")
 
-        registered = register_instance(service_data, metrics_store, logger=logger)
-        if not registered:
+        with tracer.span("registration_attempt", service=service_data["serviceName"].upper(), attempt=reg_attempt):
+            registered = register_instance(service_data, metrics_store, logger=logger)
+        if registered:
+            emit_event(on_event, "registered", logger, attempt=reg_attempt)
+        else:
             wait_time = min(5 * reg_attempt, 30)  # Exponential Backoff bis max. 30s
+            emit_event(on_event, "registration_failed", logger, attempt=reg_attempt, retry_in=wait_time)
             if logger:
                 logger.warning(f"Registrierung fehlgeschlagen, erneuter Versuch in {wait_time}s...")
             stop_event.wait(wait_time)
@@ -241,15 +680,24 @@ def eureka_lifecycle(service_data: Dict[str, Any], metrics_store: MetricsStore,
     if not registered:
         if logger:
             logger.error("Registrierung endgültig fehlgeschlagen. Lifecycle beendet.")
+        emit_event(on_event, "stopped", logger, registered=False)
         return
 
     if logger:
         logger.info("Registrierung erfolgreich. Starte Heartbeat-Schleife.")
 
     # --- Heartbeat-Schleife ---
+    service_name = service_data["serviceName"].upper()
+    next_due: Optional[float] = None
     while not stop_event.is_set():
         # send_heartbeat hat bereits einen eingebauten Retry-Mechanismus
-        hb_success = send_heartbeat(service_data, metrics_store=metrics_store, logger=logger, max_retries=3)
+        hb_start = time.monotonic()
+        if next_due is not None:
+            # Wie spät der Heartbeat gegenüber dem geplanten Zeitpunkt startet (Sättigung der Threads)
+            metrics_store.observe_heartbeat_lag(service_name, max(0.0, hb_start - next_due))
+        hb_success = send_heartbeat(service_data, metrics_store=metrics_store, logger=logger, max_retries=3, on_event=on_event)
+        latency_ms = (time.monotonic() - hb_start) * 1000
+        emit_event(on_event, "heartbeat_ok" if hb_success else "heartbeat_failed", logger, latency_ms=latency_ms)
 
         if not hb_success:
             if logger:
@@ -258,12 +706,95 @@ def eureka_lifecycle(service_data: Dict[str, Any], metrics_store: MetricsStore,
             break
 
         # Warte bis zum nächsten Heartbeat oder Stop-Signal
+        next_due = time.monotonic() + lease_renewal_interval
         if stop_event.wait(timeout=lease_renewal_interval):
             if logger:
                 logger.info("Stopp-Signal empfangen. Beende Heartbeat-Schleife.")
             break
 
     # --- Deregistrierung beim Shutdown ---
+    if deregister_on_stop:
+        if logger:
+            logger.info("Deregistriere Service von Eureka...")
+        deregistered = deregister_instance(service_data, metrics_store, logger=logger)
+        emit_event(on_event, "deregistered" if deregistered else "deregistration_failed", logger)
+    emit_event(on_event, "stopped", logger, registered=True, deregistered=deregister_on_stop)
+
+async def wait_for_stop(stop_event: asyncio.Event, timeout: float) -> bool:
+    """Asynchrones Gegenstück zu threading.Event.wait(timeout)."""
+    try:
+        await asyncio.wait_for(stop_event.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+    return stop_event.is_set()
+
+async def async_eureka_lifecycle(service_data: Mapping[str, Any], metrics_store: MetricsStore, stop_event: asyncio.Event, transport: AsyncTransport, logger: Optional[logging.Logger] = None, on_event: Optional[EventCallback] = None, heartbeat: Optional[HeartbeatCallable] = None, deregister_on_stop: bool = True) -> None:
+    """
+    Wie eureka_lifecycle, aber als Coroutine: alle Lifecycles laufen in einem Event-Loop
+    und teilen sich die Verbindungen des übergebenen AsyncTransport.
+    heartbeat ersetzt async_send_heartbeat, z.B. durch einen HeartbeatBatcher.
+    """
+    lease_renewal_interval = service_data.get("leaseInfo", {}).get("renewalIntervalInSecs", 20)
+
     if logger:
-        logger.info("Deregistriere Service von Eureka...")
-    deregister_instance(service_data, metrics_store, logger=logger)
\ No newline at end of file
+        logger.info("Starte Lebenszyklus.")
+
+    max_reg_retries = 10
+    reg_attempt = 0
+    registered = False
+
+    while reg_attempt < max_reg_retries and not registered and not stop_event.is_set():
+        reg_attempt += 1
+        if logger:
+            logger.info(f"Registrierungsversuch {reg_attempt}/{max_reg_retries}")
+
+        with tracer.span("registration_attempt", service=service_data["serviceName"].upper(), attempt=reg_attempt):
+            registered = await async_register_instance(service_data, metrics_store, transport, logger=logger)
+        if registered:
+            emit_event(on_event, "registered", logger, attempt=reg_attempt)
+        else:
+            wait_time = min(5 * reg_attempt, 30)
+            emit_event(on_event, "registration_failed", logger, attempt=reg_attempt, retry_in=wait_time)
+            if logger:
+                logger.warning(f"Registrierung fehlgeschlagen, erneuter Versuch in {wait_time}s...")
+            await wait_for_stop(stop_event, wait_time)
+
+    if not registered:
+        if logger:
+            logger.error("Registrierung endgültig fehlgeschlagen. Lifecycle beendet.")
+        emit_event(on_event, "stopped", logger, registered=False)
+        return
+
+    if logger:
+        logger.info("Registrierung erfolgreich. Starte Heartbeat-Schleife.")
+
+    service_name = service_data["serviceName"].upper()
+    next_due: Optional[float] = None
+    while not stop_event.is_set():
+        hb_start = time.monotonic()
+        if next_due is not None:
+            metrics_store.observe_heartbeat_lag(service_name, max(0.0, hb_start - next_due))
+        if heartbeat is not None:
+            hb_success = await heartbeat(service_data, logger, on_event)
+        else:
+            hb_success = await async_send_heartbeat(service_data, metrics_store, transport, logger=logger, max_retries=3, on_event=on_event)
+        latency_ms = (time.monotonic() - hb_start) * 1000
+        emit_event(on_event, "heartbeat_ok" if hb_success else "heartbeat_failed", logger, latency_ms=latency_ms)
+
+        if not hb_success:
+            if logger:
+                logger.error("Heartbeat endgültig fehlgeschlagen.")
+            break
+
+        next_due = time.monotonic() + lease_renewal_interval
+        if await wait_for_stop(stop_event, lease_renewal_interval):
+            if logger:
+                logger.info("Stopp-Signal empfangen. Beende Heartbeat-Schleife.")
+            break
+
+    if deregister_on_stop:
+        if logger:
+            logger.info("Deregistriere Service von Eureka...")
+        deregistered = await async_deregister_instance(service_data, metrics_store, transport, logger=logger)
+        emit_event(on_event, "deregistered" if deregistered else "deregistration_failed", logger)
+    emit_event(on_event, "stopped", logger, registered=True, deregistered=deregister_on_stop)
@@ -0,0 +1,65 @@
+# eureka_codec.py
+"""
+JSON-Wire-Format und gzip für den Verkehr mit Eureka. Eureka nimmt Registrierungen auch als
+JSON an und liefert /eureka/apps als JSON, wenn "Accept: application/json" gesetzt ist.
+Ist orjson installiert (pip install orjson), wird es für dumps/loads verwendet, sonst das
+json-Modul der Standardbibliothek.
+"""
+import gzip
+import json
+from typing import Any, Dict, Mapping, Tuple, Union
+
+try:
+    import orjson  # pyright: ignore[reportMissingImports]
+except ImportError:  # pragma: no cover - abhängig von der Installation
+    orjson = None
+
+FORMAT_XML = "xml"
+FORMAT_JSON = "json"
+WIRE_FORMATS = (FORMAT_XML, FORMAT_JSON)
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+JSON_HEADERS = {
+    "Content-Type": "application/json",
+    "Accept": "application/json",
+}
+
+# Kleine Bodies lohnen die Kompression nicht
+GZIP_MIN_SIZE = 256
+
+def dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def loads(data: Union[str, bytes]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def gzip_body(body: Union[str, bytes], level: int = 6) -> bytes:
+    """gzip ohne Zeitstempel, damit gleiche Payloads gleiche Bytes ergeben."""
+    raw = body.encode("utf-8") if isinstance(body, str) else body
+    return gzip.compress(raw, compresslevel=level, mtime=0)
+
+def compress_request(body: Union[str, bytes], headers: Mapping[str, str]) -> Tuple[Union[str, bytes], Dict[str, str]]:
+    """Komprimiert den Body ab GZIP_MIN_SIZE Bytes und setzt Content-Encoding."""
+    raw = body.encode("utf-8") if isinstance(body, str) else body
+    if len(raw) < GZIP_MIN_SIZE:
+        return body, dict(headers)
+    return gzip_body(raw), {**headers, "Content-Encoding": "gzip"}
+
+def decode_content(content: bytes, headers: Mapping[str, str]) -> bytes:
+    """Entpackt gzip-kodierte Antworten; Header-Namen in beliebiger Schreibweise."""
+    encoding = next((value for name, value in headers.items() if name.lower() == "content-encoding"), "")
+    if encoding.lower() == "gzip" and content:
+        return gzip.decompress(content)
+    return content
+
+def is_json_response(content: Union[str, bytes], headers: Mapping[str, str]) -> bool:
+    content_type = next((value for name, value in headers.items() if name.lower() == "content-type"), "")
+    if content_type:
+        return "json" in content_type.lower()
+    start = content.lstrip()[:1]
+    return start in ("{", b"{")
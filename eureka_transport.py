@@ -0,0 +1,267 @@
+# eureka_transport.py
+import asyncio
+import logging
+import ssl
+from typing import Any, Dict, List, NamedTuple, Optional, Protocol, Tuple, Union
+from urllib.parse import urlsplit
+
+import requests
+
+import eureka_codec
+
+logger = logging.getLogger(__name__)
+
+Body = Union[str, bytes, None]
+
+class TransportResponse(NamedTuple):
+    status_code: int
+    text: str
+    headers: Dict[str, str] = {}
+    content: bytes = b""
+
+class TransportConnectionError(ConnectionError):
+    """Verbindungsfehler unabhängig von der verwendeten HTTP-Bibliothek."""
+
+class Transport(Protocol):
+    """Synchroner Transport für die Eureka-REST-Aufrufe."""
+    def request(self, method: str, url: str, data: Body = None, headers: Optional[Dict[str, str]] = None) -> TransportResponse: ...
+
+class AsyncTransport(Protocol):
+    """Asynchroner Transport für die Eureka-REST-Aufrufe."""
+    async def request(self, method: str, url: str, data: Body = None, headers: Optional[Dict[str, str]] = None) -> TransportResponse: ...
+
+    async def close(self) -> None: ...
+
+class RequestsTransport:
+    """
+    Standard-Transport über requests. Ohne Session wird wie bisher requests.post/put/...
+    verwendet; mit Session werden Verbindungen per Keep-Alive wiederverwendet.
+    """
+    def __init__(self, session: Optional[requests.Session] = None, timeout: Optional[float] = None) -> None:
+        self.session = session
+        self.timeout = timeout
+
+    def request(self, method: str, url: str, data: Body = None, headers: Optional[Dict[str, str]] = None) -> TransportResponse:
+        kwargs: Dict[str, Any] = {}
+        if data is not None:
+            kwargs["data"] = data
+        if headers is not None:
+            kwargs["headers"] = headers
+        if self.timeout is not None:
+            kwargs["timeout"] = self.timeout
+        client: Any = self.session if self.session is not None else requests
+        try:
+            response = getattr(client, method.lower())(url, **kwargs)
+        except requests.exceptions.ConnectionError as e:
+            raise TransportConnectionError(str(e)) from e
+        content = getattr(response, "content", b"")
+        return TransportResponse(
+            response.status_code,
+            response.text,
+            dict(getattr(response, "headers", None) or {}),
+            content if isinstance(content, bytes) else b"",
+        )
+
+# --- Asynchroner HTTP/1.1-Transport mit Keep-Alive-Pool (nur Standardbibliothek) ---
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.reused = False
+
+    def is_usable(self) -> bool:
+        return not self.writer.is_closing() and not self.reader.at_eof()
+
+    def close(self) -> None:
+        self.writer.close()
+
+class _HostPool:
+    """Begrenzte Anzahl Verbindungen zu einem Host; freie Verbindungen werden LIFO wiederverwendet."""
+    def __init__(self, scheme: str, host: str, port: int, max_connections: int, ssl_context: Optional[ssl.SSLContext]) -> None:
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.ssl_context = ssl_context
+        self.idle: List[_Connection] = []
+        self.semaphore = asyncio.Semaphore(max_connections)
+        self.opened = 0
+
+    async def acquire(self) -> _Connection:
+        await self.semaphore.acquire()
+        try:
+            while self.idle:
+                conn = self.idle.pop()
+                if conn.is_usable():
+                    conn.reused = True
+                    return conn
+                conn.close()
+            reader, writer = await asyncio.open_connection(
+                self.host, self.port, ssl=self.ssl_context if self.scheme == "https" else None
+            )
+            self.opened += 1
+            return _Connection(reader, writer)
+        except BaseException:
+            self.semaphore.release()
+            raise
+
+    def release(self, conn: _Connection, reusable: bool) -> None:
+        if reusable and conn.is_usable():
+            self.idle.append(conn)
+        else:
+            conn.close()
+        self.semaphore.release()
+
+    def close(self) -> None:
+        for conn in self.idle:
+            conn.close()
+        self.idle.clear()
+
+async def _read_response(reader: asyncio.StreamReader, method: str) -> Tuple[int, Dict[str, str], bytes, bool]:
+    status_line = await reader.readline()
+    if not status_line:
+        raise asyncio.IncompleteReadError(b"", None)
+    version, status, *_ = status_line.decode("latin-1").split(" ", 2)
+    status_code = int(status)
+
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+
+    if method == "HEAD" or status_code in (204, 304) or 100 <= status_code < 200:
+        body = b""
+    elif headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks: List[bytes] = []
+        while True:
+            size = int((await reader.readline()).split(b";", 1)[0].strip(), 16)
+            if size == 0:
+                # Trailer bis zur Leerzeile überspringen
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        body = b"".join(chunks)
+    elif "content-length" in headers:
+        body = await reader.readexactly(int(headers["content-length"]))
+    else:
+        body = await reader.read()
+        keep_alive = False
+
+    return status_code, headers, body, keep_alive
+
+class AsyncHTTPTransport:
+    """
+    Asynchroner HTTP/1.1-Client auf Basis von asyncio-Streams mit Keep-Alive-Pool pro Host.
+    Viele Lifecycles teilen sich so wenige Verbindungen; max_connections_per_host begrenzt
+    die gleichzeitig offenen Verbindungen, weitere Requests warten auf eine freie Verbindung.
+    """
+    def __init__(self, max_connections_per_host: int = 4, timeout: float = 10.0, ssl_context: Optional[ssl.SSLContext] = None) -> None:
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+        self.ssl_context = ssl_context or ssl.create_default_context()
+        self._pools: Dict[Tuple[str, str, int], _HostPool] = {}
+
+    @property
+    def connections_opened(self) -> int:
+        return sum(pool.opened for pool in self._pools.values())
+
+    def _pool(self, scheme: str, host: str, port: int) -> _HostPool:
+        key = (scheme, host, port)
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = _HostPool(scheme, host, port, self.max_connections_per_host, self.ssl_context)
+            self._pools[key] = pool
+        return pool
+
+    async def request(self, method: str, url: str, data: Body = None, headers: Optional[Dict[str, str]] = None) -> TransportResponse:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Nicht unterstützte URL: {url}")
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        target = parts.path or "/"
+        if parts.query:
+            target += f"?{parts.query}"
+        body = data.encode("utf-8") if isinstance(data, str) else (data or b"")
+
+        host_header = parts.hostname if parts.port is None else f"{parts.hostname}:{parts.port}"
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {host_header}", f"Content-Length: {len(body)}"]
+        for name, value in (headers or {}).items():
+            lines.append(f"{name}: {value}")
+        raw_request = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+        pool = self._pool(parts.scheme, parts.hostname, port)
+        # Eine wiederverwendete Verbindung kann serverseitig bereits geschlossen sein:
+        # dann genau einmal mit einer neuen Verbindung wiederholen.
+        for attempt in range(2):
+            try:
+                conn = await asyncio.wait_for(pool.acquire(), self.timeout)
+            except (OSError, asyncio.TimeoutError) as e:
+                raise TransportConnectionError(f"Verbindung zu {parts.hostname}:{port} fehlgeschlagen: {e!r}") from e
+            reusable = False
+            try:
+                conn.writer.write(raw_request)
+                await conn.writer.drain()
+                status_code, response_headers, content, reusable = await asyncio.wait_for(
+                    _read_response(conn.reader, method), self.timeout
+                )
+                # wie requests/httpx: komprimierte Antworten transparent entpacken
+                content = eureka_codec.decode_content(content, response_headers)
+                return TransportResponse(status_code, content.decode("utf-8", errors="replace"), response_headers, content)
+            except (asyncio.IncompleteReadError, ConnectionResetError, BrokenPipeError) as e:
+                reusable = False
+                if conn.reused and attempt == 0:
+                    continue
+                raise TransportConnectionError(f"Verbindung zu {parts.hostname}:{port} abgebrochen: {e!r}") from e
+            except (OSError, asyncio.TimeoutError) as e:
+                reusable = False
+                raise TransportConnectionError(f"Request an {url} fehlgeschlagen: {e!r}") from e
+            finally:
+                pool.release(conn, reusable)
+        raise TransportConnectionError(f"Request an {url} fehlgeschlagen")
+
+    async def close(self) -> None:
+        for pool in self._pools.values():
+            pool.close()
+        self._pools.clear()
+
+class HttpxAsyncTransport:
+    """Optionaler Transport über httpx, u.a. für HTTP/2-Multiplexing (pip install 'httpx[http2]')."""
+    def __init__(self, http2: bool = True, max_connections: int = 4, timeout: float = 10.0) -> None:
+        import httpx
+        self._httpx = httpx
+        self._client = httpx.AsyncClient(
+            http2=http2,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def request(self, method: str, url: str, data: Body = None, headers: Optional[Dict[str, str]] = None) -> TransportResponse:
+        try:
+            response = await self._client.request(method, url, content=data, headers=headers)
+        except self._httpx.TransportError as e:
+            raise TransportConnectionError(str(e)) from e
+        return TransportResponse(response.status_code, response.text, dict(response.headers), response.content)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+def create_async_transport(http2: bool = False, max_connections: int = 4, timeout: float = 10.0) -> AsyncTransport:
+    """
+    Liefert den asynchronen Transport. HTTP/2 wird nur genutzt, wenn httpx mit h2 installiert ist;
+    sonst wird auf den eingebauten HTTP/1.1-Keep-Alive-Transport zurückgefallen.
+    """
+    if http2:
+        try:
+            import h2  # noqa: F401  # pyright: ignore[reportMissingImports]
+            import httpx  # noqa: F401
+            return HttpxAsyncTransport(http2=True, max_connections=max_connections, timeout=timeout)
+        except ImportError:
+            logger.warning("HTTP/2 angefordert, aber httpx[http2] ist nicht installiert. Verwende HTTP/1.1.")
+    return AsyncHTTPTransport(max_connections_per_host=max_connections, timeout=timeout)
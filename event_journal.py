@@ -0,0 +1,164 @@
+# event_journal.py
+"""
+Strukturiertes Event-Journal der Lifecycles: pro Service ein Ringpuffer fester Größe mit den
+letzten Events (Registrierung, Heartbeat mit Latenz, Neu-Registrierung nach 404, Backoff,
+Deregistrierung, Stopp). Für die Diagnose muss so kein Log geparst werden.
+
+Der Puffer wird beim Anlegen vollständig reserviert: parallele Arrays für Zeitstempel, Event-Typ,
+Messwert (Latenz bzw. Wartezeit) und Versuch. Ein Eintrag kostet 21 Bytes, neue Events
+überschreiben die ältesten, und das Schreiben legt keine Objekte an. Jeder Eintrag hat eine
+fortlaufende Nummer (seq), über die Abfragen seitenweise weiterblättern.
+
+    journals = JournalRegistry(capacity=1024)
+    eureka_lifecycle(service_data, metrics_store, stop_event, on_event=journals.listener("ORDERS"))
+    journals.get("ORDERS").query(types={"heartbeat_failed"}, limit=50)
+"""
+import math
+import threading
+import time
+from array import array
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+# Reihenfolge = gespeicherter Code, neue Typen nur anhängen
+EVENT_TYPES: Tuple[str, ...] = (
+    "started",
+    "registered",
+    "registration_failed",
+    "heartbeat_ok",
+    "heartbeat_failed",
+    "heartbeat_backoff",
+    "reregistered",
+    "reregistration_failed",
+    "deregistered",
+    "deregistration_failed",
+    "stopped",
+    "status_up",
+    "status_down",
+    "status_out_of_service",
+    "status_starting",
+    "status_unknown",
+)
+_EVENT_CODES: Dict[str, int] = {event_type: code for code, event_type in enumerate(EVENT_TYPES)}
+
+# Welches Feld der Event-Daten als Messwert gespeichert wird
+VALUE_FIELDS: Dict[str, str] = {
+    "heartbeat_ok": "latency_ms",
+    "heartbeat_failed": "latency_ms",
+    "registration_failed": "retry_in",
+    "heartbeat_backoff": "retry_in",
+}
+
+DEFAULT_CAPACITY = 1024
+
+class EventJournal:
+    """Ringpuffer mit den letzten `capacity` Events eines Services (thread-sicher)."""
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity muss größer als 0 sein")
+        self.capacity = capacity
+        self._times = array("d", bytes(8 * capacity))
+        self._values = array("d", bytes(8 * capacity))
+        self._attempts = array("i", bytes(4 * capacity))
+        self._codes = array("B", bytes(capacity))
+        # seq des nächsten Eintrags = Anzahl aller bisher geschriebenen Events
+        self._next_seq = 0
+        self._lock = threading.Lock()
+
+    def record(self, event_type: str, data: Optional[Dict[str, Any]] = None, timestamp: Optional[float] = None) -> bool:
+        """Schreibt ein Event; unbekannte Typen werden ignoriert (False)."""
+        code = _EVENT_CODES.get(event_type)
+        if code is None:
+            return False
+        value = math.nan
+        attempt = 0
+        if data:
+            field = VALUE_FIELDS.get(event_type)
+            if field is not None and data.get(field) is not None:
+                value = float(data[field])
+            attempt = int(data.get("attempt") or 0)
+        with self._lock:
+            slot = self._next_seq % self.capacity
+            self._times[slot] = time.time() if timestamp is None else timestamp
+            self._values[slot] = value
+            self._attempts[slot] = attempt
+            self._codes[slot] = code
+            self._next_seq += 1
+        return True
+
+    def __len__(self) -> int:
+        return min(self._next_seq, self.capacity)
+
+    @property
+    def total(self) -> int:
+        """Anzahl aller jemals geschriebenen Events."""
+        return self._next_seq
+
+    def _entry(self, seq: int) -> Dict[str, Any]:
+        slot = seq % self.capacity
+        event_type = EVENT_TYPES[self._codes[slot]]
+        entry: Dict[str, Any] = {"seq": seq, "time": round(self._times[slot], 3), "event": event_type}
+        value = self._values[slot]
+        if not math.isnan(value):
+            entry[VALUE_FIELDS[event_type]] = round(value, 3)
+        if self._attempts[slot]:
+            entry["attempt"] = self._attempts[slot]
+        return entry
+
+    def query(
+        self, types: Optional[Set[str]] = None, since: Optional[float] = None, min_latency_ms: Optional[float] = None,
+        before: Optional[int] = None, limit: int = 100,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        Neueste Events zuerst. before: nur Einträge mit kleinerer seq (Cursor der vorherigen Seite).
+        Liefert die Einträge und den Cursor für die nächste Seite (None, wenn es keine weitere gibt).
+        """
+        codes = {_EVENT_CODES[t] for t in types if t in _EVENT_CODES} if types is not None else None
+        items: List[Dict[str, Any]] = []
+        with self._lock:
+            oldest = max(0, self._next_seq - self.capacity)
+            seq = self._next_seq - 1 if before is None else min(before, self._next_seq) - 1
+            while seq >= oldest:
+                slot = seq % self.capacity
+                if since is not None and self._times[slot] < since:
+                    break  # Zeitstempel sind aufsteigend, ältere Einträge passen auch nicht
+                if (codes is None or self._codes[slot] in codes) and (
+                    min_latency_ms is None or self._values[slot] >= min_latency_ms
+                ):
+                    if len(items) == limit:
+                        return items, items[-1]["seq"]
+                    items.append(self._entry(seq))
+                seq -= 1
+        return items, None
+
+class JournalRegistry:
+    """Ein EventJournal pro Service, angelegt beim ersten Event."""
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        self.capacity = capacity
+        self._journals: Dict[str, EventJournal] = {}
+        self._lock = threading.Lock()
+
+    def journal(self, name: str) -> EventJournal:
+        journal = self._journals.get(name)
+        if journal is None:
+            with self._lock:
+                journal = self._journals.get(name)
+                if journal is None:
+                    journal = self._journals[name] = EventJournal(self.capacity)
+        return journal
+
+    def get(self, name: str) -> Optional[EventJournal]:
+        return self._journals.get(name)
+
+    def record(self, name: str, event_type: str, data: Optional[Dict[str, Any]] = None) -> None:
+        if event_type in _EVENT_CODES:
+            self.journal(name).record(event_type, data)
+
+    def listener(self, name: str) -> Callable[[str, Dict[str, Any]], None]:
+        """on_event-Callback für eureka_lifecycle."""
+        def on_event(event_type: str, data: Dict[str, Any]) -> None:
+            self.record(name, event_type, data)
+        return on_event
+
+    def remove(self, name: str) -> None:
+        with self._lock:
+            self._journals.pop(name, None)
@@ -0,0 +1,270 @@
+# fake_eureka_server.py
+"""
+Minimaler In-Memory-Ersatz für den Eureka-Server (HTTP/1.1 mit Keep-Alive) für Tests
+und Benchmarks. Unterstützt Registrierung (POST), Heartbeat (PUT), Deregistrierung (DELETE),
+Status-Overrides (PUT/DELETE .../status?value=...), Metadaten (PUT .../metadata?key=value),
+gebündelte Heartbeats (POST /eureka/peerreplication/batch) und den Registry-Abruf (GET /eureka/apps).
+Registrierung und Registry gibt es als XML oder JSON, Request- und Response-Bodies auch gzip-komprimiert:
+
+    python fake_eureka_server.py --port 8761
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import threading
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+APPS_PREFIX = "/eureka/apps/"
+BATCH_PATH = "/eureka/peerreplication/batch"
+
+_REASONS = {200: "OK", 204: "No Content", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+def _element_to_json(element: ET.Element) -> Any:
+    """XML -> JSON nach der Eureka-Konvention: Attribute als "@name", Text neben Attributen als "$"."""
+    attributes = {f"@{name}": value for name, value in element.attrib.items()}
+    children = list(element)
+    if not children:
+        return {**attributes, "$": element.text or ""} if attributes else (element.text or "")
+    return {**attributes, **{child.tag: _element_to_json(child) for child in children}}
+
+def _json_to_element(tag: str, value: Any) -> ET.Element:
+    element = ET.Element(tag)
+    if isinstance(value, dict):
+        for key, child in value.items():
+            if key.startswith("@"):
+                element.set(key[1:], str(child))
+            elif key == "$":
+                element.text = str(child)
+            else:
+                element.append(_json_to_element(key, child))
+    elif value is not None:
+        element.text = str(value)
+    return element
+
+class FakeEurekaServer:
+    """
+    Hält registrierte Instanzen als (APP, instanceId) im Speicher. Die instanceId einer
+    Registrierung wird aus dem <instanceId>-Element des XML-Payloads gelesen.
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, batch_enabled: bool = True) -> None:
+        self.host = host
+        self.port = port
+        # False simuliert eine Registry ohne Peer-Replication-Endpunkt (404)
+        self.batch_enabled = batch_enabled
+        self.batched_heartbeats = 0
+        self.instances: Set[Tuple[str, str]] = set()
+        self.payloads: Dict[Tuple[str, str], str] = {}
+        self.status_overrides: Dict[Tuple[str, str], str] = {}
+        self.metadata: Dict[Tuple[str, str], Dict[str, str]] = {}
+        self.request_counts: Dict[str, int] = {}
+        self.connections_accepted = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}{APPS_PREFIX}"
+
+    def registry_xml(self) -> str:
+        """Registry im Format von GET /eureka/apps, aufgebaut aus den registrierten Payloads."""
+        apps: Dict[str, List[str]] = {}
+        for key in sorted(self.instances):
+            payload = self.payloads.get(key, "")
+            payload = payload[payload.find("<instance>"):] if "<instance>" in payload else payload
+            status = self.status_overrides.get(key)
+            if status is not None:
+                payload = payload.replace("<status>UP</status>", f"<status>{status}</status>", 1)
+            apps.setdefault(key[0], []).append(payload)
+        applications = "".join(
+            f"<application><name>{app}</name>{''.join(instances)}</application>" for app, instances in apps.items()
+        )
+        return f"<applications><versions__delta>1</versions__delta><apps__hashcode></apps__hashcode>{applications}</applications>"
+
+    def registry_json(self) -> str:
+        """Registry im JSON-Format von GET /eureka/apps (Accept: application/json)."""
+        root = ET.fromstring(self.registry_xml())
+        applications = [
+            {"name": app.findtext("name", ""), "instance": [_element_to_json(instance) for instance in app.findall("instance")]}
+            for app in root.findall("application")
+        ]
+        return json.dumps({"applications": {"versions__delta": "1", "apps__hashcode": "", "application": applications}})
+
+    def _handle(self, method: str, path: str, body: bytes, headers: Optional[Dict[str, str]] = None) -> Tuple[int, str]:
+        self.request_counts[method] = self.request_counts.get(method, 0) + 1
+        headers = headers or {}
+        url = urlsplit(path)
+        if method == "GET" and url.path.rstrip("/") == APPS_PREFIX.rstrip("/"):
+            if "application/json" in headers.get("accept", ""):
+                return 200, self.registry_json()
+            return 200, self.registry_xml()
+        if url.path == BATCH_PATH and self.batch_enabled:
+            return self._handle_batch(method, body)
+        if not url.path.startswith(APPS_PREFIX):
+            return 404, ""
+        parts = url.path[len(APPS_PREFIX):].split("/")
+        if method == "POST" and len(parts) == 1:
+            text = body.decode("utf-8", errors="replace")
+            if "json" in headers.get("content-type", ""):
+                try:
+                    text = ET.tostring(_json_to_element("instance", json.loads(text)["instance"]), encoding="unicode")
+                except (ValueError, KeyError, TypeError):
+                    return 400, ""
+            start = text.find("<instanceId>")
+            end = text.find("</instanceId>")
+            if start < 0 or end < start:
+                return 400, ""
+            key = (parts[0], text[start + len("<instanceId>"):end])
+            self.instances.add(key)
+            self.payloads[key] = text
+            return 204, ""
+        return self._handle_instance(method, url.query, parts), ""
+
+    def _handle_batch(self, method: str, body: bytes) -> Tuple[int, str]:
+        """ReplicationList -> ReplicationListResponse; unterstützt nur die Aktion Heartbeat."""
+        if method != "POST":
+            return 405, ""
+        try:
+            items = json.loads(body)["replicationList"]
+        except (ValueError, KeyError, TypeError):
+            return 400, ""
+        responses = []
+        for item in items:
+            if item.get("action") != "Heartbeat":
+                responses.append({"statusCode": 400})
+                continue
+            self.batched_heartbeats += 1
+            key = (str(item.get("appName")), str(item.get("id")))
+            responses.append({"statusCode": 200 if key in self.instances else 404})
+        return 200, json.dumps({"responseList": responses})
+
+    def _handle_instance(self, method: str, query: str, parts: List[str]) -> int:
+        if len(parts) == 3 and parts[2] == "status":
+            key = (parts[0], parts[1])
+            if key not in self.instances:
+                return 404
+            if method == "PUT":
+                self.status_overrides[key] = parse_qs(query).get("value", ["UP"])[0]
+                return 200
+            if method == "DELETE":
+                self.status_overrides.pop(key, None)
+                return 200
+            return 405
+        if len(parts) == 3 and parts[2] == "metadata":
+            key = (parts[0], parts[1])
+            if key not in self.instances:
+                return 404
+            if method != "PUT":
+                return 405
+            self.metadata.setdefault(key, {}).update({k: v[-1] for k, v in parse_qs(query).items()})
+            return 200
+        if len(parts) != 2:
+            return 404
+        key = (parts[0], parts[1])
+        if method == "PUT":
+            return 200 if key in self.instances else 404
+        if method == "DELETE":
+            if key not in self.instances:
+                return 404
+            self.instances.discard(key)
+            self.payloads.pop(key, None)
+            self.status_overrides.pop(key, None)
+            return 200
+        return 405
+
+    @staticmethod
+    def _content_type(payload: bytes) -> str:
+        if not payload:
+            return ""
+        return "Content-Type: application/json\r\n" if payload.startswith(b"{") else "Content-Type: application/xml\r\n"
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections_accepted += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, version = request_line.decode("latin-1").split()
+                headers: Dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", "0")))
+                if headers.get("content-encoding", "").lower() == "gzip":
+                    body = gzip.decompress(body)
+
+                status, response_body = self._handle(method, path, body, headers)
+                payload = response_body.encode("utf-8")
+                content_type = self._content_type(payload)
+                encoding = ""
+                if payload and "gzip" in headers.get("accept-encoding", ""):
+                    payload = gzip.compress(payload, mtime=0)
+                    encoding = "Content-Encoding: gzip\r\n"
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"{content_type}{encoding}"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + payload
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def start_async(self) -> None:
+        self._server = await asyncio.start_server(self._serve_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop_async(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def _run(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        self._loop.run_until_complete(self.start_async())
+        self._ready.set()
+        self._loop.run_forever()
+        self._loop.run_until_complete(self.stop_async())
+        self._loop.close()
+
+    def start(self) -> None:
+        """Startet den Server in einem eigenen Thread (für synchrone Aufrufer)."""
+        self._thread = threading.Thread(target=self._run, name="fake-eureka", daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+
+    def stop(self) -> None:
+        if self._loop is not None and self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="In-Memory-Eureka für Tests und Benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8761)
+    args = parser.parse_args()
+
+    async def _main() -> None:
+        server = FakeEurekaServer(args.host, args.port)
+        await server.start_async()
+        print(f"Fake-Eureka läuft auf {server.base_url}")
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(_main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,155 @@
+# health_probe.py
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Mapping, NamedTuple, Optional, Any, Tuple
+
+from eureka_client_lib import async_update_status, get_health_check_url, get_instance_id, wait_for_stop
+from eureka_transport import AsyncHTTPTransport, AsyncTransport, TransportResponse
+
+logger = logging.getLogger(__name__)
+
+STATUS_UP = "UP"
+STATUS_DOWN = "DOWN"
+
+# Listener für Statuswechsel: on_change(service_data, status)
+StatusCallback = Callable[[Mapping[str, Any], str], None]
+
+class ProbeResult(NamedTuple):
+    status: str
+    latency_ms: float
+    checked_at: float
+    detail: str = ""
+
+def evaluate_health(response: TransportResponse) -> Tuple[str, str]:
+    """
+    Bewertet die Antwort eines Health-Endpunkts: 2xx gilt als UP, außer der Body ist
+    ein Spring-Actuator-JSON mit einem anderen "status" als UP.
+    """
+    if not 200 <= response.status_code < 300:
+        return STATUS_DOWN, f"HTTP {response.status_code}"
+    try:
+        body = json.loads(response.text) if response.text else None
+    except ValueError:
+        return STATUS_UP, f"HTTP {response.status_code}"
+    if isinstance(body, dict) and "status" in body:
+        status = str(body["status"]).upper()
+        return (STATUS_UP if status == STATUS_UP else STATUS_DOWN), f"status={status}"
+    return STATUS_UP, f"HTTP {response.status_code}"
+
+class HealthProber:
+    """
+    Prüft Health-Endpunkte nebenläufig: höchstens max_concurrency Probes gleichzeitig,
+    jede mit eigenem Timeout. Ergebnisse werden cache_ttl Sekunden pro URL zwischengespeichert,
+    gleichzeitige Probes derselben URL werden zu einem Request zusammengefasst.
+    """
+    def __init__(self, transport: AsyncTransport, max_concurrency: int = 16, timeout: float = 2.0, cache_ttl: float = 1.0) -> None:
+        self.transport = transport
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._cache: Dict[str, ProbeResult] = {}
+        self._inflight: Dict[str, "asyncio.Future[ProbeResult]"] = {}
+
+    async def _probe(self, url: str) -> ProbeResult:
+        async with self._semaphore:
+            start = time.monotonic()
+            try:
+                response = await asyncio.wait_for(self.transport.request("GET", url, headers={"Accept": "application/json"}), self.timeout)
+                status, detail = evaluate_health(response)
+            except asyncio.TimeoutError:
+                status, detail = STATUS_DOWN, f"Timeout nach {self.timeout}s"
+            except Exception as e:
+                status, detail = STATUS_DOWN, str(e)
+            now = time.monotonic()
+            return ProbeResult(status, (now - start) * 1000, now, detail)
+
+    async def probe(self, url: str) -> ProbeResult:
+        cached = self._cache.get(url)
+        if cached is not None and time.monotonic() - cached.checked_at < self.cache_ttl:
+            return cached
+        future = self._inflight.get(url)
+        if future is None:
+            future = asyncio.ensure_future(self._probe(url))
+            self._inflight[url] = future
+            future.add_done_callback(lambda _: self._inflight.pop(url, None))
+        result = await asyncio.shield(future)
+        self._cache[url] = result
+        return result
+
+class HealthMonitor:
+    """
+    Pollt alle probe_interval Sekunden die Health-Endpunkte der Instanzen und meldet
+    Statuswechsel über den Status-Override-Endpunkt an Eureka, ohne Neu-Registrierung.
+    Da die Registrierung mit UP erfolgt, gilt UP als Ausgangsstatus jeder Instanz.
+    """
+    def __init__(
+        self,
+        instances: List[Tuple[Mapping[str, Any], Optional[logging.Logger]]],
+        eureka_transport: AsyncTransport,
+        probe_interval: float = 10.0,
+        prober: Optional[HealthProber] = None,
+        on_change: Optional[StatusCallback] = None,
+    ) -> None:
+        self.instances = instances
+        self.eureka_transport = eureka_transport
+        self.probe_interval = probe_interval
+        self.prober = prober
+        self.on_change = on_change
+        self.reported_status: Dict[str, str] = {get_instance_id(data): STATUS_UP for data, _ in instances}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._thread: Optional[threading.Thread] = None
+
+    async def _check(self, service_data: Mapping[str, Any], service_logger: Optional[logging.Logger]) -> None:
+        assert self.prober is not None
+        result = await self.prober.probe(get_health_check_url(service_data))
+        instance_id = get_instance_id(service_data)
+        if result.status == self.reported_status.get(instance_id):
+            return
+        if service_logger:
+            service_logger.warning(f"Health-Status {instance_id}: {result.status} ({result.detail}).")
+        # Schlägt die Meldung fehl, bleibt der alte Status stehen und wird beim nächsten Durchlauf erneut gemeldet
+        if await async_update_status(service_data, result.status, self.eureka_transport, logger=service_logger):
+            self.reported_status[instance_id] = result.status
+            if self.on_change is not None:
+                try:
+                    self.on_change(service_data, result.status)
+                except Exception as e:
+                    logger.warning(f"Status-Listener fehlgeschlagen: {e}")
+
+    async def probe_once(self) -> None:
+        if self.prober is None:
+            self.prober = HealthProber(AsyncHTTPTransport(), cache_ttl=self.probe_interval / 2)
+        await asyncio.gather(*(self._check(data, service_logger) for data, service_logger in self.instances))
+
+    async def run(self, stop_event: asyncio.Event) -> None:
+        while not stop_event.is_set():
+            await self.probe_once()
+            await wait_for_stop(stop_event, self.probe_interval)
+        if self.prober is not None:
+            await self.prober.transport.close()
+
+    def _run_in_thread(self) -> None:
+        assert self._loop is not None and self._stop_event is not None
+        try:
+            self._loop.run_until_complete(self.run(self._stop_event))
+            self._loop.run_until_complete(self.eureka_transport.close())
+        finally:
+            self._loop.close()
+
+    def start(self) -> None:
+        """Startet den Monitor mit eigenem Event-Loop in einem Hintergrund-Thread (für Thread-Clients)."""
+        self._loop = asyncio.new_event_loop()
+        self._stop_event = asyncio.Event()
+        self._thread = threading.Thread(target=self._run_in_thread, name="health-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._loop is None or self._thread is None or self._stop_event is None:
+            return
+        if self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._stop_event.set)
+        self._thread.join(timeout=timeout)
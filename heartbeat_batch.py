@@ -0,0 +1,108 @@
+# heartbeat_batch.py
+"""
+Bündelt fällige Heartbeats vieler asynchroner Lifecycles zu einem Request an Eureka
+(POST /eureka/peerreplication/batch). Heartbeats, die innerhalb von `linger` Sekunden
+eintreffen, gehen gemeinsam raus (höchstens max_batch_size pro Request). Instanzen, die im
+Batch nicht bestätigt werden, bekommen einen einzelnen PUT inklusive Neu-Registrierung bei 404.
+Lehnt die Registry den Endpunkt ab (404/405/501), sendet der Batcher danach nur noch einzeln.
+
+    batcher = HeartbeatBatcher(transport, metrics_store)
+    await async_eureka_lifecycle(..., heartbeat=batcher.heartbeat)
+"""
+import asyncio
+import logging
+from typing import Any, List, Mapping, Optional, Set, Tuple
+
+from eureka_client_lib import EventCallback, MetricsStore, async_post_heartbeat_batch, async_send_heartbeat
+from eureka_transport import AsyncTransport
+
+logger = logging.getLogger(__name__)
+
+# HTTP-Status, mit denen eine Registry zeigt, dass sie keine Batches annimmt
+UNSUPPORTED_STATUSES = (404, 405, 501)
+
+_Pending = Tuple[Mapping[str, Any], Optional[logging.Logger], Optional[EventCallback], "asyncio.Future[bool]"]
+
+class HeartbeatBatcher:
+    def __init__(self, transport: AsyncTransport, metrics_store: MetricsStore, max_batch_size: int = 500, linger: float = 0.05) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size muss mindestens 1 sein")
+        self.transport = transport
+        self.metrics_store = metrics_store
+        self.max_batch_size = max_batch_size
+        self.linger = linger
+        self.supported = True
+        # Statistik
+        self.requests_sent = 0
+        self.batched_heartbeats = 0
+        self.fallback_heartbeats = 0
+        self._pending: List[_Pending] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    async def heartbeat(self, service_data: Mapping[str, Any], service_logger: Optional[logging.Logger] = None, on_event: Optional[EventCallback] = None) -> bool:
+        """
+        Passt als heartbeat-Parameter von async_eureka_lifecycle. on_event erhält die Events der
+        Einzel-Heartbeats (Neu-Registrierung, Backoff) wie bei async_send_heartbeat.
+        """
+        if not self.supported:
+            self.requests_sent += 1
+            return await async_send_heartbeat(service_data, self.metrics_store, self.transport, logger=service_logger, on_event=on_event)
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[bool]" = loop.create_future()
+        self._pending.append((service_data, service_logger, on_event, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.linger, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._send(batch))
+            # Referenz halten, bis der Task fertig ist
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: List[_Pending]) -> None:
+        try:
+            self.requests_sent += 1
+            status, statuses = await async_post_heartbeat_batch([data for data, _, _, _ in batch], self.transport)
+            if statuses is None and status in UNSUPPORTED_STATUSES and self.supported:
+                self.supported = False
+                logger.warning(f"Registry nimmt keine Heartbeat-Batches an ({status}), sende Heartbeats einzeln.")
+            elif statuses is None:
+                logger.warning(f"Heartbeat-Batch mit {len(batch)} Instanzen fehlgeschlagen ({status}), sende einzeln.")
+
+            fallbacks = []
+            for index, (service_data, service_logger, on_event, future) in enumerate(batch):
+                if statuses is not None and statuses[index] == 200:
+                    self.batched_heartbeats += 1
+                    if service_logger:
+                        service_logger.info("Heartbeat erfolgreich gesendet (Batch).")
+                    if not future.done():
+                        future.set_result(True)
+                else:
+                    fallbacks.append(self._single(service_data, service_logger, on_event, future))
+            await asyncio.gather(*fallbacks)
+        except Exception as e:
+            for _, _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    async def _single(self, service_data: Mapping[str, Any], service_logger: Optional[logging.Logger], on_event: Optional[EventCallback], future: "asyncio.Future[bool]") -> None:
+        self.fallback_heartbeats += 1
+        self.requests_sent += 1
+        try:
+            result = await async_send_heartbeat(service_data, self.metrics_store, self.transport, logger=service_logger, on_event=on_event)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        # Der wartende Lifecycle kann inzwischen abgebrochen worden sein
+        if not future.done():
+            future.set_result(result)
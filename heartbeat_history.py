@@ -0,0 +1,233 @@
+# heartbeat_history.py
+"""
+Heartbeat-Verlauf pro Service für die Web-UI, ohne Prometheus: Erfolgsquote und Latenz der
+letzten 24 Stunden in Buckets fester Länge (Standard 1440 x 60 Sekunden).
+
+Alle Buckets liegen beim Anlegen in vorab reservierten Arrays (array-Modul): Zähler für
+erfolgreiche und fehlgeschlagene Heartbeats, Latenzsumme und -maximum sowie ein Histogramm mit
+festen Latenz-Grenzen. Rückt die Zeit weiter, werden die übersprungenen Buckets geleert. Der
+Speicher pro Service ist damit konstant (rund 63 KB bei den Standardwerten), egal wie viele
+Heartbeats eintreffen.
+
+Ein Fenster besteht so aus höchstens zwei zusammenhängenden Slices des Rings; Summen, Maximum
+und Histogramm werden pro Feld über Slices gebildet statt Bucket für Bucket in Python.
+p95 über mehrere Buckets entsteht durch Addieren der Histogramme und Interpolation innerhalb
+der Klasse, in die das 95. Perzentil fällt (nach oben begrenzt durch das gemessene Maximum).
+"""
+import math
+import threading
+import time
+from array import array
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# Obergrenzen der Latenzklassen in ms; die letzte Klasse ist nach oben offen
+LATENCY_BOUNDS_MS: Tuple[float, ...] = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, math.inf)
+BINS = len(LATENCY_BOUNDS_MS)
+_MAX_COUNT = 0xFFFF
+
+DEFAULT_BUCKET_SECONDS = 60
+DEFAULT_BUCKETS = 1440
+
+def _histogram_percentile(histogram: List[int], q: float, max_ms: float) -> Optional[float]:
+    total = sum(histogram)
+    if total == 0:
+        return None
+    rank = q / 100 * total
+    cumulative = 0
+    lower = 0.0
+    for count, upper in zip(histogram, LATENCY_BOUNDS_MS):
+        if count and cumulative + count >= rank:
+            if math.isinf(upper):
+                return max_ms
+            return min(max_ms, lower + (upper - lower) * (rank - cumulative) / count)
+        cumulative += count
+        lower = upper
+    return max_ms
+
+class HeartbeatHistory:
+    """Ring aus `buckets` Zeitabschnitten à `bucket_seconds` für einen Service (thread-sicher)."""
+    def __init__(self, bucket_seconds: int = DEFAULT_BUCKET_SECONDS, buckets: int = DEFAULT_BUCKETS) -> None:
+        if bucket_seconds <= 0 or buckets <= 0:
+            raise ValueError("bucket_seconds und buckets müssen größer als 0 sein")
+        self.bucket_seconds = bucket_seconds
+        self.buckets = buckets
+        self._ok = array("I", bytes(4 * buckets))
+        self._failed = array("I", bytes(4 * buckets))
+        self._latency_sum = array("d", bytes(8 * buckets))
+        self._latency_max = array("f", bytes(4 * buckets))
+        self._histogram = array("H", bytes(2 * buckets * BINS))
+        # Jüngster beschriebener Zeitabschnitt (Unix-Zeit // bucket_seconds). Beim Weiterrücken werden
+        # alle übersprungenen Buckets geleert, daher gehört jeder Bucket zu einem der letzten
+        # `buckets` Abschnitte bis _latest, und ein Fenster ist ein bzw. zwei zusammenhängende Slices.
+        self._latest: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def window_seconds(self) -> int:
+        return self.bucket_seconds * self.buckets
+
+    def _bin(self, latency_ms: float) -> int:
+        for index, upper in enumerate(LATENCY_BOUNDS_MS):
+            if latency_ms <= upper:
+                return index
+        return BINS - 1
+
+    def record(self, ok: bool, latency_ms: Optional[float] = None, now: Optional[float] = None) -> None:
+        period = int((time.time() if now is None else now) // self.bucket_seconds)
+        with self._lock:
+            if self._latest is None or period > self._latest:
+                self._advance(period)
+            elif period <= self._latest - self.buckets:
+                return  # älter als der gespeicherte Verlauf
+            slot = period % self.buckets
+            if ok:
+                self._ok[slot] += 1
+            else:
+                self._failed[slot] += 1
+            if latency_ms is not None:
+                self._latency_sum[slot] += latency_ms
+                if latency_ms > self._latency_max[slot]:
+                    self._latency_max[slot] = latency_ms
+                index = slot * BINS + self._bin(latency_ms)
+                if self._histogram[index] < _MAX_COUNT:
+                    self._histogram[index] += 1
+
+    def _advance(self, period: int) -> None:
+        """Leert die Buckets der Abschnitte nach _latest bis einschließlich period."""
+        first = period - self.buckets + 1 if self._latest is None else max(self._latest + 1, period - self.buckets + 1)
+        for start, stop in self._slices(first, period):
+            count = stop - start
+            self._ok[start:stop] = array("I", bytes(4 * count))
+            self._failed[start:stop] = array("I", bytes(4 * count))
+            self._latency_sum[start:stop] = array("d", bytes(8 * count))
+            self._latency_max[start:stop] = array("f", bytes(4 * count))
+            self._histogram[start * BINS:stop * BINS] = array("H", bytes(2 * count * BINS))
+        self._latest = period
+
+    def _slices(self, first: int, last: int) -> List[Tuple[int, int]]:
+        """Slot-Bereiche [start, stop) der Abschnitte first..last (höchstens `buckets` viele)."""
+        count = last - first + 1
+        if count <= 0:
+            return []
+        start = first % self.buckets
+        if start + count <= self.buckets:
+            return [(start, start + count)]
+        return [(start, self.buckets), (0, start + count - self.buckets)]
+
+    def _range(self, window: float, now: float) -> Tuple[int, int]:
+        """Erster und letzter Zeitabschnitt des Fensters, höchstens die gespeicherten Buckets."""
+        last = int(now // self.bucket_seconds)
+        count = max(1, min(self.buckets, math.ceil(window / self.bucket_seconds)))
+        return last - count + 1, last
+
+    def _sums(self, first: int, last: int) -> "_Sums":
+        """Summen über first..last mit Slice-Summen pro Feld statt einer Schleife pro Bucket."""
+        ok = failed = 0
+        latency_sum = 0.0
+        latency_max = 0.0
+        histogram = [0] * BINS
+        if self._latest is not None:
+            first = max(first, self._latest - self.buckets + 1)
+            last = min(last, self._latest)
+            for start, stop in self._slices(first, last):
+                ok += sum(self._ok[start:stop])
+                failed += sum(self._failed[start:stop])
+                latency_sum += sum(self._latency_sum[start:stop])
+                latency_max = max(latency_max, max(self._latency_max[start:stop]))
+                block = self._histogram[start * BINS:stop * BINS]
+                for index in range(BINS):
+                    histogram[index] += sum(block[index::BINS])
+        return _Sums(ok, failed, latency_sum, latency_max, histogram)
+
+    def rollup(self, window: Optional[float] = None, now: Optional[float] = None) -> Dict[str, Any]:
+        """Erfolgsquote, p95, Durchschnitt und Maximum über das Fenster (Standard: alles Gespeicherte)."""
+        first, last = self._range(window or self.window_seconds, time.time() if now is None else now)
+        with self._lock:
+            return _stats(self._sums(first, last))
+
+    def series(self, window: Optional[float] = None, points: int = 96, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Verlauf über das Fenster, heruntergerechnet auf höchstens `points` Punkte (z.B. für
+        Sparklines). Jeder Punkt fasst gleich viele aufeinanderfolgende Buckets zusammen.
+        """
+        return self.overview(window, points, now)[1]
+
+    def overview(self, window: Optional[float] = None, points: int = 96, now: Optional[float] = None) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """rollup() und series() in einem Durchgang: die Gesamtwerte werden aus den Punkten addiert."""
+        if points <= 0:
+            raise ValueError("points muss größer als 0 sein")
+        first, last = self._range(window or self.window_seconds, time.time() if now is None else now)
+        per_point = math.ceil((last - first + 1) / points)
+        groups: List[Tuple[int, _Sums]] = []
+        with self._lock:
+            # Am Ende ausrichten: der letzte Punkt endet mit dem aktuellen Bucket
+            start = last - per_point * math.ceil((last - first + 1) / per_point) + 1
+            for group_start in range(start, last + 1, per_point):
+                groups.append((group_start, self._sums(max(group_start, first), group_start + per_point - 1)))
+        series = [{**_stats(sums), "t": group_start * self.bucket_seconds} for group_start, sums in groups]
+        total = _Sums(
+            sum(sums.ok for _, sums in groups),
+            sum(sums.failed for _, sums in groups),
+            sum(sums.latency_sum for _, sums in groups),
+            max(sums.latency_max for _, sums in groups),
+            [sum(counts) for counts in zip(*(sums.histogram for _, sums in groups))],
+        )
+        return _stats(total), series
+
+class _Sums(NamedTuple):
+    ok: int
+    failed: int
+    latency_sum: float
+    latency_max: float
+    histogram: List[int]
+
+def _stats(sums: _Sums) -> Dict[str, Any]:
+    count = sums.ok + sums.failed
+    measured = sum(sums.histogram)
+    p95 = _histogram_percentile(sums.histogram, 95, sums.latency_max)
+    return {
+        "ok": sums.ok,
+        "failed": sums.failed,
+        "success_ratio": round(sums.ok / count, 4) if count else None,
+        "p95_ms": round(p95, 3) if p95 is not None else None,
+        "avg_ms": round(sums.latency_sum / measured, 3) if measured else None,
+        "max_ms": round(sums.latency_max, 3) if measured else None,
+    }
+
+class HistoryRegistry:
+    """Ein HeartbeatHistory pro Service, angelegt beim ersten Heartbeat."""
+    def __init__(self, bucket_seconds: int = DEFAULT_BUCKET_SECONDS, buckets: int = DEFAULT_BUCKETS) -> None:
+        self.bucket_seconds = bucket_seconds
+        self.buckets = buckets
+        self._histories: Dict[str, HeartbeatHistory] = {}
+        self._lock = threading.Lock()
+
+    def history(self, name: str) -> HeartbeatHistory:
+        history = self._histories.get(name)
+        if history is None:
+            with self._lock:
+                history = self._histories.get(name)
+                if history is None:
+                    history = self._histories[name] = HeartbeatHistory(self.bucket_seconds, self.buckets)
+        return history
+
+    def get(self, name: str) -> Optional[HeartbeatHistory]:
+        return self._histories.get(name)
+
+    def names(self) -> List[str]:
+        return sorted(self._histories)
+
+    def record_event(self, name: str, event_type: str, data: Optional[Dict[str, Any]] = None) -> None:
+        """Übernimmt heartbeat_ok/heartbeat_failed-Events des Lifecycles (mit latency_ms)."""
+        if event_type in ("heartbeat_ok", "heartbeat_failed"):
+            self.history(name).record(event_type == "heartbeat_ok", (data or {}).get("latency_ms"))
+
+    def listener(self, name: str) -> Callable[[str, Dict[str, Any]], None]:
+        """on_event-Callback für eureka_lifecycle."""
+        def on_event(event_type: str, data: Dict[str, Any]) -> None:
+            self.record_event(name, event_type, data)
+        return on_event
+
+    def remove(self, name: str) -> None:
+        with self._lock:
+            self._histories.pop(name, None)
@@ -0,0 +1,302 @@
+# load_generator.py
+"""
+Lastgenerator für Kapazitätstests einer Eureka-Registry (offene Schleife).
+
+Simuliert N virtuelle Instanzen und startet Registrierungen, Heartbeats und Registry-Abrufe
+mit fester Ankunftsrate, unabhängig davon, wie schnell die Registry antwortet. Payloads, URLs
+und Header kommen aus eureka_client_lib bzw. discovery, also dieselben Requests wie im Client.
+
+Latenzen werden ab dem geplanten Startzeitpunkt gemessen, nicht ab dem tatsächlichen Senden.
+Staut sich die Last (volle Verbindungspools, ausgelasteter Event-Loop), zählt die Wartezeit mit,
+statt dass die langsamen Requests einfach seltener gemessen werden (Coordinated Omission).
+Zum Vergleich wird die Service-Zeit ab Übergabe an den Transport mit ausgegeben.
+
+    python load_generator.py --instances 2000 --rate 500 --duration 30
+    python load_generator.py --target http://gmk:8761/eureka/apps/ --rate 200 --mix heartbeat=90,fetch=9,register=1 --json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+import eureka_client_lib
+from discovery import registry_request_headers
+from eureka_client_lib import get_ip_address, instance_url, registration_request
+from eureka_transport import AsyncHTTPTransport, AsyncTransport, Body
+from service_instances import expand_instances
+from traffic_replay import percentile
+
+OP_REGISTER = "register"
+OP_HEARTBEAT = "heartbeat"
+OP_FETCH = "fetch"
+OPERATIONS = (OP_REGISTER, OP_HEARTBEAT, OP_FETCH)
+
+# Pro Instanz ein Heartbeat alle 30 s, pro Client ein Registry-Abruf alle 30 s, selten Registrierungen
+DEFAULT_MIX = "heartbeat=90,fetch=9,register=1"
+
+class LoadResult(NamedTuple):
+    op: str
+    status: int
+    # ab geplantem Start (korrigiert) bzw. ab Übergabe an den Transport
+    latency_ms: float
+    service_ms: float
+    lag_ms: float
+
+    @property
+    def ok(self) -> bool:
+        expected = 204 if self.op == OP_REGISTER else 200
+        return self.status == expected
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """"heartbeat=90,fetch=9,register=1" -> Anteile pro Operation (Summe 1)."""
+    weights: Dict[str, float] = {}
+    for part in spec.split(","):
+        op, sep, weight = part.strip().partition("=")
+        if not sep or op not in OPERATIONS:
+            raise ValueError(f"Ungültiger Mix-Eintrag '{part}' (erwartet z.B. {DEFAULT_MIX})")
+        weights[op] = float(weight)
+    total = sum(weights.values())
+    if total <= 0 or any(weight < 0 for weight in weights.values()):
+        raise ValueError("Mix-Gewichte müssen positiv sein")
+    return {op: weight / total for op, weight in weights.items() if weight > 0}
+
+def synthesize_instances(count: int, apps: int = 10, host_name: str = "localhost", base_port: int = 20000) -> List[Mapping[str, Any]]:
+    """Verteilt count virtuelle Instanzen gleichmäßig auf apps Applikationen (LOADGEN-0 ...)."""
+    if count <= 0 or apps <= 0:
+        raise ValueError("count und apps müssen größer als 0 sein")
+    apps = min(apps, count)
+    instances: List[Mapping[str, Any]] = []
+    for app in range(apps):
+        replicas = count // apps + (1 if app < count % apps else 0)
+        first_port = base_port + len(instances)
+        instances.extend(expand_instances({
+            "serviceName": f"loadgen-{app}",
+            "hostName": host_name,
+            "httpPort": first_port,
+            "healthEndpointPath": "/actuator/health",
+            "infoEndpointPath": "/actuator/info",
+            "replicas": {"ports": f"{first_port}-{first_port + replicas - 1}"},
+        }))
+    return instances
+
+def schedule(rate: float, duration: float, mix: Mapping[str, float], poisson: bool = False, seed: int = 0) -> Iterator[Tuple[float, str]]:
+    """
+    Ankunftszeitpunkte (Sekunden ab Start) mit Operation: feste Abstände 1/rate oder
+    exponentialverteilte Abstände (Poisson-Prozess) mit derselben mittleren Rate.
+    """
+    if rate <= 0:
+        raise ValueError("rate muss größer als 0 sein")
+    rng = random.Random(seed)
+    ops = list(mix)
+    weights = [mix[op] for op in ops]
+    t = 0.0
+    while t < duration:
+        yield t, rng.choices(ops, weights)[0]
+        t += rng.expovariate(rate) if poisson else 1 / rate
+
+class _Request(NamedTuple):
+    method: str
+    url: str
+    data: Body
+    headers: Optional[Dict[str, str]]
+
+class LoadGenerator:
+    """
+    Erzeugt die Requests vorab (Payloads, URLs), damit während der Messung kein Aufbau der
+    Payloads und keine DNS-Auflösung die Ankunftsrate verfälscht.
+    """
+    def __init__(self, instances: Sequence[Mapping[str, Any]], transport: AsyncTransport, wire_format: Optional[str] = None) -> None:
+        if not instances:
+            raise ValueError("Mindestens eine Instanz erforderlich")
+        ip_addresses: Dict[str, str] = {}
+        self.transport = transport
+        self._registrations: List[_Request] = []
+        self._heartbeats: List[_Request] = []
+        for instance_data in instances:
+            host_name = instance_data["hostName"]
+            if host_name not in ip_addresses:
+                ip_addresses[host_name] = get_ip_address(host_name)
+            url, payload, headers = registration_request(instance_data, ip_addresses[host_name])
+            self._registrations.append(_Request("POST", url, payload, headers))
+            self._heartbeats.append(_Request("PUT", instance_url(instance_data), None, None))
+        self._fetch = _Request("GET", eureka_client_lib.EUREKA_SERVER_URL, None, registry_request_headers(wire_format))
+        self._next = {OP_REGISTER: 0, OP_HEARTBEAT: 0}
+        # Zeit vom ersten bis zum letzten gestarteten Request des letzten Laufs
+        self.send_duration = 0.0
+
+    def _request(self, op: str) -> _Request:
+        if op == OP_FETCH:
+            return self._fetch
+        # Instanzen reihum, wie viele Clients mit gleichem Intervall
+        requests = self._registrations if op == OP_REGISTER else self._heartbeats
+        index = self._next[op]
+        self._next[op] = (index + 1) % len(requests)
+        return requests[index]
+
+    async def _send(self, op: str, request: _Request, due: float) -> LoadResult:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            response = await self.transport.request(request.method, request.url, data=request.data, headers=request.headers)
+            status = response.status_code
+        except Exception:
+            status = 0
+        finished = loop.time()
+        return LoadResult(op, status, (finished - due) * 1000, (finished - started) * 1000, (started - due) * 1000)
+
+    async def register_all(self, max_concurrency: int = 32) -> int:
+        """Registriert alle Instanzen vor der Messung; liefert die Anzahl der Fehlschläge."""
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def register(request: _Request) -> bool:
+            async with semaphore:
+                result = await self._send(OP_REGISTER, request, asyncio.get_running_loop().time())
+                return result.ok
+
+        results = await asyncio.gather(*(register(request) for request in self._registrations))
+        return results.count(False)
+
+    async def deregister_all(self, max_concurrency: int = 32) -> None:
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def deregister(request: _Request) -> None:
+            async with semaphore:
+                try:
+                    await self.transport.request("DELETE", request.url)
+                except Exception:
+                    pass
+
+        await asyncio.gather(*(deregister(request) for request in self._heartbeats))
+
+    async def run(self, rate: float, duration: float, mix: Mapping[str, float], poisson: bool = False, seed: int = 0) -> List[LoadResult]:
+        """
+        Startet jeden Request zu seinem geplanten Zeitpunkt, ohne auf vorherige Antworten zu
+        warten. Hängt der Generator hinterher, werden die überfälligen Requests sofort gestartet,
+        ihre Latenz zählt aber ab dem geplanten Zeitpunkt.
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        tasks: List["asyncio.Task[LoadResult]"] = []
+        for offset, op in schedule(rate, duration, mix, poisson, seed):
+            due = start + offset
+            delay = due - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.ensure_future(self._send(op, self._request(op), due)))
+        self.send_duration = loop.time() - start
+        return list(await asyncio.gather(*tasks))
+
+def summarize(results: Sequence[LoadResult], duration: float) -> Dict[str, Dict[str, Any]]:
+    """Kennzahlen pro Operation; p*-Werte korrigiert (ab geplantem Start), service_p99 unkorrigiert."""
+    by_op: Dict[str, List[LoadResult]] = {}
+    for result in results:
+        by_op.setdefault(result.op, []).append(result)
+    summary: Dict[str, Dict[str, Any]] = {}
+    for op, op_results in sorted(by_op.items()):
+        latencies = [r.latency_ms for r in op_results]
+        errors = sum(1 for r in op_results if not r.ok)
+        summary[op] = {
+            "count": len(op_results),
+            "rate": round(len(op_results) / duration, 2) if duration > 0 else 0.0,
+            "errors": errors,
+            "error_rate": round(errors / len(op_results), 4),
+            "statuses": {str(status): count for status, count in sorted(_count_statuses(op_results).items())},
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p90_ms": round(percentile(latencies, 90), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+            "p999_ms": round(percentile(latencies, 99.9), 3),
+            "max_ms": round(max(latencies), 3),
+            "service_p99_ms": round(percentile([r.service_ms for r in op_results], 99), 3),
+            "max_lag_ms": round(max(r.lag_ms for r in op_results), 3),
+        }
+    return summary
+
+def _count_statuses(results: Sequence[LoadResult]) -> Dict[int, int]:
+    counts: Dict[int, int] = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+    return counts
+
+async def run_load_test(
+    instances: int, rate: float, duration: float, mix: Mapping[str, float], target: Optional[str] = None,
+    apps: int = 10, connections: int = 16, poisson: bool = False, seed: int = 0, keep: bool = False,
+) -> Dict[str, Any]:
+    """Kompletter Lauf: Instanzen registrieren, Last erzeugen, aufräumen. Ohne target gegen einen lokalen Fake-Eureka."""
+    server = None
+    if target is None:
+        from fake_eureka_server import FakeEurekaServer
+        server = FakeEurekaServer()
+        await server.start_async()
+        target = server.base_url
+    previous_url = eureka_client_lib.EUREKA_SERVER_URL
+    eureka_client_lib.EUREKA_SERVER_URL = target
+    transport = AsyncHTTPTransport(max_connections_per_host=connections)
+    try:
+        generator = LoadGenerator(synthesize_instances(instances, apps), transport)
+        failed_registrations = await generator.register_all()
+        started = time.monotonic()
+        results = await generator.run(rate, duration, mix, poisson, seed)
+        elapsed = time.monotonic() - started
+        if not keep:
+            await generator.deregister_all()
+        return {
+            "target": target,
+            "instances": instances,
+            "target_rate": rate,
+            # erfolgreich beantwortete Requests pro Sekunde, gemessen bis zur letzten Antwort
+            "achieved_rate": round(sum(1 for result in results if result.ok) / elapsed, 2) if elapsed > 0 else 0.0,
+            "send_duration_s": round(generator.send_duration, 3),
+            "duration_s": round(elapsed, 3),
+            "failed_registrations": failed_registrations,
+            "operations": summarize(results, elapsed),
+        }
+    finally:
+        eureka_client_lib.EUREKA_SERVER_URL = previous_url
+        await transport.close()
+        if server is not None:
+            await server.stop_async()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Lastgenerator (offene Schleife) für eine Eureka-Registry")
+    parser.add_argument("--target", help="Eureka-Basis-URL (Standard: lokaler Fake-Eureka)")
+    parser.add_argument("--instances", type=int, default=1000, help="Anzahl virtueller Instanzen")
+    parser.add_argument("--apps", type=int, default=10, help="Applikationen, auf die die Instanzen verteilt werden")
+    parser.add_argument("--rate", type=float, default=100, help="Requests pro Sekunde (alle Operationen zusammen)")
+    parser.add_argument("--duration", type=float, default=10, help="Dauer der Messung in Sekunden")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Anteile der Operationen (Standard: {DEFAULT_MIX})")
+    parser.add_argument("--poisson", action="store_true", help="Exponentialverteilte statt fester Abstände")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--connections", type=int, default=16, help="Maximale Verbindungen zur Registry")
+    parser.add_argument("--keep", action="store_true", help="Instanzen nach dem Lauf nicht deregistrieren")
+    parser.add_argument("--json", action="store_true", help="Ergebnis als JSON ausgeben")
+    args = parser.parse_args(argv)
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        print(f"Fehler: {e}")
+        return 1
+
+    logging.disable(logging.CRITICAL)
+    report = asyncio.run(run_load_test(
+        args.instances, args.rate, args.duration, mix, target=args.target, apps=args.apps,
+        connections=args.connections, poisson=args.poisson, seed=args.seed, keep=args.keep,
+    ))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    print(f"{report['instances']} Instanzen gegen {report['target']}: {report['achieved_rate']:.1f} von "
+          f"{report['target_rate']:.1f} Requests/s über {report['duration_s']:.1f}s "
+          f"({report['failed_registrations']} Registrierungen vorab fehlgeschlagen)")
+    print(f"{'op':<11}{'count':>7}{'err %':>8}{'p50':>9}{'p90':>9}{'p99':>9}{'p99.9':>9}{'max':>9}{'svc p99':>9}")
+    for op, stats in report["operations"].items():
+        print(f"{op:<11}{stats['count']:>7}{stats['error_rate'] * 100:>8.2f}{stats['p50_ms']:>9.2f}{stats['p90_ms']:>9.2f}"
+              f"{stats['p99_ms']:>9.2f}{stats['p999_ms']:>9.2f}{stats['max_ms']:>9.2f}{stats['service_p99_ms']:>9.2f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
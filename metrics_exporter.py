@@ -2,19 +2,20 @@
 import json
 import logging
 from http.server import BaseHTTPRequestHandler, HTTPServer
-from typing import Dict, Any, Type
+from typing import Dict, Any, Optional, Type
 
 # Importiere die MetricsStore-Klasse aus der Eureka-Client-Bibliothek
 from eureka_client_lib import MetricsStore
+from runtime_metrics import RuntimeMetrics
 
 # Logger für den Metrics Exporter
 logger = logging.getLogger(__name__)
 
-def create_metrics_handler(metrics_store_instance: MetricsStore, app_config: Dict[str, Any]) -> Type[BaseHTTPRequestHandler]:
+def create_metrics_handler(metrics_store_instance: MetricsStore, app_config: Dict[str, Any], runtime_metrics: Optional[RuntimeMetrics] = None) -> Type[BaseHTTPRequestHandler]:
     """
     Eine Fabrikfunktion, die eine CustomMetricsHandler-Klasse erstellt.
     Diese Klasse hat Zugriff auf die übergebene MetricsStore-Instanz
-    und die Anwendungs-Konfigurationsdaten.
+    und die Anwendungs-Konfigurationsdaten. Mit runtime_metrics kommen die Prozess-Kennzahlen hinzu.
     """
     if metrics_store_instance is None:
         raise ValueError("metrics_store_instance darf nicht None sein")
@@ -75,6 +76,20 @@ def create_metrics_handler(metrics_store_instance: MetricsStore, app_config: Dic
                 for service_name, status in metrics_data['service_registered_status'].items():
                     output.append(f"python_eureka_service_registered{{service_name=\"{service_name}\"}} {status}")
 
+                # Verspätung der Heartbeats gegenüber dem geplanten Zeitpunkt: erstes Zeichen für überlastete Threads
+                output.append("\n# HELP python_eureka_heartbeat_lag_seconds Delay of heartbeats behind their scheduled time.")
+                output.append("# TYPE python_eureka_heartbeat_lag_seconds summary")
+                output.append(f"python_eureka_heartbeat_lag_seconds_sum {metrics_data.get('heartbeat_lag_seconds_sum', 0.0):.6f}")
+                output.append(f"python_eureka_heartbeat_lag_seconds_count {metrics_data.get('heartbeat_lag_count', 0)}")
+
+                output.append("\n# HELP python_eureka_heartbeat_last_lag_seconds Delay of the last heartbeat per service.")
+                output.append("# TYPE python_eureka_heartbeat_last_lag_seconds gauge")
+                for service_name, lag in metrics_data.get('heartbeat_lag_seconds', {}).items():
+                    output.append(f"python_eureka_heartbeat_last_lag_seconds{{service_name=\"{service_name}\"}} {lag:.6f}")
+
+                if runtime_metrics is not None:
+                    output.extend(runtime_metrics.prometheus_lines())
+
                 return "\n".join(output) + "\n"
             except Exception as e:
                 logger.exception(f"Fehler beim Generieren der Prometheus-Metriken: {e}")
@@ -82,13 +97,13 @@ def create_metrics_handler(metrics_store_instance: MetricsStore, app_config: Dic
 
     return CustomMetricsHandler
 
-def run_metrics_web_server(metrics_store_instance: MetricsStore, app_config: Dict[str, Any], host: str, port: int) -> None:
+def run_metrics_web_server(metrics_store_instance: MetricsStore, app_config: Dict[str, Any], host: str, port: int, runtime_metrics: Optional[RuntimeMetrics] = None) -> None:
     """
     Startet einen einfachen HTTP-Webserver in einem Thread, der Metriken und Info exponiert.
     """
     try:
         # Erstelle den Handler mit der MetricsStore-Instanz und der App-Konfiguration
-        handler_class = create_metrics_handler(metrics_store_instance, app_config)
+        handler_class = create_metrics_handler(metrics_store_instance, app_config, runtime_metrics)
         server_address = (host, port)
         httpd = HTTPServer(server_address, handler_class)
 
@@ -1,5 +1,7 @@
 # models.py
-from pydantic import BaseModel
+from typing import Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field
 
 class ClientConfig(BaseModel):
     serviceName: str
@@ -13,3 +15,18 @@ class ClientConfig(BaseModel):
         "renewalIntervalInSecs": 30,
         "durationInSecs": 90
     }
+
+InstanceStatus = Literal["UP", "DOWN", "STARTING", "OUT_OF_SERVICE", "UNKNOWN"]
+
+class StatusUpdate(BaseModel):
+    status: InstanceStatus
+
+class MetadataUpdate(BaseModel):
+    metadata: Dict[str, str] = Field(min_length=1)
+
+class BatchStatusUpdate(StatusUpdate):
+    # None = alle laufenden Clients
+    names: Optional[List[str]] = None
+
+class BatchMetadataUpdate(MetadataUpdate):
+    names: Optional[List[str]] = None
@@ -0,0 +1,143 @@
+# registry_snapshot.py
+"""
+Binärer Snapshot des letzten bekannten Registry-Stands für den Warmstart der Discovery.
+
+Aufbau (Little Endian):
+    Header: Magic "EKRS", Formatversion, Registry-Version, Zeitstempel, CRC32 des Rumpfs
+    Rumpf:  Stringtabelle (jeder String einmal), Hashcode, dann je ein Block fester Records
+            für Apps, Instanzen und Metadaten-Paare (Indizes in die Stringtabelle)
+"""
+import itertools
+import logging
+import os
+import struct
+import time
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from discovery import DiscoveredInstance, RegistryView
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"EKRS"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<4sHqdI")  # Registry-Version vorzeichenbehaftet (versions__delta kann negativ sein)
+_U32 = struct.Struct("<I")
+_APP = struct.Struct("<II")
+# instance_id, host_name, ip_addr, status, zone, vip_address, port, secure_port, secure, Metadaten-Anzahl
+_INSTANCE = struct.Struct("<IIIIIIHHBH")
+_PAIR = struct.Struct("<II")
+# Hashcode-Index, Anzahl Apps, Instanzen, Metadaten-Paare
+_COUNTS = struct.Struct("<IIII")
+
+class SnapshotError(Exception):
+    """Der Snapshot ist beschädigt oder hat ein unbekanntes Format."""
+
+class _StringTable:
+    def __init__(self) -> None:
+        self.index: Dict[str, int] = {}
+        self.strings: List[str] = []
+
+    def add(self, value: str) -> int:
+        position = self.index.get(value)
+        if position is None:
+            position = len(self.strings)
+            self.index[value] = position
+            self.strings.append(value)
+        return position
+
+def encode_snapshot(view: RegistryView, saved_at: Optional[float] = None) -> bytes:
+    table = _StringTable()
+    hashcode_index = table.add(view.hashcode)
+    app_records: List[bytes] = []
+    instance_records: List[bytes] = []
+    pair_records: List[bytes] = []
+    for app, instances in view.applications.items():
+        app_records.append(_APP.pack(table.add(app), len(instances)))
+        for instance in instances:
+            instance_records.append(_INSTANCE.pack(
+                table.add(instance.instance_id), table.add(instance.host_name), table.add(instance.ip_addr),
+                table.add(instance.status), table.add(instance.zone), table.add(instance.vip_address),
+                instance.port, instance.secure_port, int(instance.secure), len(instance.metadata),
+            ))
+            for key, value in instance.metadata.items():
+                pair_records.append(_PAIR.pack(table.add(key), table.add(value)))
+
+    # Strings als ein Block mit NUL-Trennzeichen: beim Laden genügt ein decode() und split()
+    blob = "\0".join(value.replace("\0", "") for value in table.strings).encode("utf-8")
+    body = b"".join([
+        _U32.pack(len(blob)), blob,
+        _COUNTS.pack(hashcode_index, len(app_records), len(instance_records), len(pair_records)),
+        *app_records, *instance_records, *pair_records,
+    ])
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, view.version, time.time() if saved_at is None else saved_at, zlib.crc32(body))
+    return header + body
+
+def decode_snapshot(data: bytes) -> Tuple[RegistryView, float]:
+    """Liefert den RegistryView und den Speicherzeitpunkt des Snapshots."""
+    if len(data) < _HEADER.size:
+        raise SnapshotError("Snapshot ist zu kurz")
+    magic, format_version, version, saved_at, crc = _HEADER.unpack_from(data)
+    if magic != MAGIC or format_version != FORMAT_VERSION:
+        raise SnapshotError(f"Unbekanntes Snapshot-Format ({magic!r}, Version {format_version})")
+    body = memoryview(data)[_HEADER.size:]
+    if zlib.crc32(body) != crc:
+        raise SnapshotError("Prüfsumme des Snapshots stimmt nicht")
+
+    try:
+        (blob_length,) = _U32.unpack_from(body, 0)
+        offset = _U32.size
+        strings = str(body[offset:offset + blob_length], "utf-8").split("\0")
+        offset += blob_length
+        hashcode_index, app_count, instance_count, pair_count = _COUNTS.unpack_from(body, offset)
+        offset += _COUNTS.size
+
+        def block(record: struct.Struct, count: int) -> Iterator[Tuple[int, ...]]:
+            nonlocal offset
+            start, offset = offset, offset + record.size * count
+            return record.iter_unpack(body[start:offset])
+
+        apps = list(block(_APP, app_count))
+        instance_records = block(_INSTANCE, instance_count)
+        pairs = block(_PAIR, pair_count)
+
+        applications: Dict[str, List[DiscoveredInstance]] = {}
+        for app_index, count in apps:
+            app = strings[app_index]
+            instances: List[DiscoveredInstance] = []
+            for _ in range(count):
+                (instance_id, host_name, ip_addr, status, zone, vip_address,
+                 port, secure_port, secure, metadata_count) = next(instance_records)
+                metadata = {strings[key]: strings[value] for key, value in itertools.islice(pairs, metadata_count)}
+                instances.append(DiscoveredInstance(
+                    strings[instance_id], app, strings[host_name], strings[ip_addr], port, secure_port,
+                    bool(secure), strings[status], strings[zone], strings[vip_address], metadata,
+                ))
+            applications[app] = instances
+        hashcode = strings[hashcode_index]
+    except (struct.error, IndexError, StopIteration, UnicodeDecodeError) as e:
+        raise SnapshotError(f"Snapshot ist beschädigt: {e}") from e
+    return RegistryView(applications, version, hashcode), saved_at
+
+def save_snapshot(view: RegistryView, path: str) -> None:
+    """Schreibt den Snapshot atomar (temporäre Datei + rename)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(encode_snapshot(view))
+    os.replace(tmp_path, path)
+
+def load_snapshot(path: str) -> Optional[RegistryView]:
+    """Lädt den Snapshot; fehlende oder beschädigte Dateien ergeben None."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    try:
+        view, saved_at = decode_snapshot(data)
+    except SnapshotError as e:
+        logger.warning(f"Registry-Snapshot '{path}' wird ignoriert: {e}")
+        return None
+    logger.info(f"Registry-Snapshot geladen: {len(view)} Instanzen, Stand {time.time() - saved_at:.0f}s alt.")
+    return view
@@ -0,0 +1,250 @@
+# registry_watch.py
+"""
+Änderungs-Abos auf die Registry: Anwendungen melden sich für eine App oder eine VIP-Adresse an
+und bekommen nur die Unterschiede zum vorherigen Stand (neue, entfernte und geänderte Instanzen),
+statt selbst die komplette Liste zu pollen und zu vergleichen.
+
+Die Unterschiede werden bei jedem Registry-Stand einmal pro beobachtetem Schlüssel berechnet,
+nicht pro Abonnent, und nur für Schlüssel, die jemand beobachtet. Ist die Instanzliste
+unverändert, bleibt es beim Vergleich der Tupel.
+
+Langsame Abonnenten bremsen niemanden: Jedes Abo hält höchstens eine ausstehende Änderung. Kommt
+ein neuer Stand, bevor die letzte abgeholt wurde, wird sie damit zusammengefasst (hinzugefügt und
+wieder entfernt hebt sich auf), der Speicher ist also durch die Zahl der Instanzen begrenzt.
+
+    watcher = RegistryWatcher(discovery_client)
+    watcher.subscribe(lambda diff: print(diff.added, diff.removed), app="ORDERS")
+
+    async for diff in watcher.watch_async(vip="orders"):
+        ...
+"""
+import asyncio
+import logging
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from discovery import DiscoveredInstance, DiscoveryClient, RegistryView
+
+logger = logging.getLogger(__name__)
+
+# Instanz-ID -> (vorher, nachher); None = nicht vorhanden
+_Changes = Dict[str, Tuple[Optional[DiscoveredInstance], Optional[DiscoveredInstance]]]
+
+class RegistryDiff(NamedTuple):
+    key: str  # "app:ORDERS" bzw. "vip:orders"
+    added: Tuple[DiscoveredInstance, ...]
+    removed: Tuple[DiscoveredInstance, ...]
+    changed: Tuple[Tuple[DiscoveredInstance, DiscoveredInstance], ...]  # (vorher, nachher)
+    version: int
+    updates: int  # Anzahl zusammengefasster Registry-Stände
+
+def _key(app: Optional[str], vip: Optional[str]) -> str:
+    if (app is None) == (vip is None):
+        raise ValueError("Genau eines von app und vip angeben")
+    return f"app:{app.upper()}" if app is not None else f"vip:{vip}"
+
+def _merge(pending: _Changes, changes: _Changes) -> None:
+    """Fasst neue Änderungen mit noch nicht abgeholten zusammen."""
+    for instance_id, (before, after) in changes.items():
+        if instance_id in pending:
+            before = pending[instance_id][0]
+        if before == after:
+            pending.pop(instance_id, None)
+        else:
+            pending[instance_id] = (before, after)
+
+def _diff(old: Dict[str, DiscoveredInstance], new: Dict[str, DiscoveredInstance]) -> _Changes:
+    changes: _Changes = {}
+    for instance_id, instance in new.items():
+        previous = old.get(instance_id)
+        if previous != instance:
+            changes[instance_id] = (previous, instance)
+    for instance_id, instance in old.items():
+        if instance_id not in new:
+            changes[instance_id] = (instance, None)
+    return changes
+
+class Subscription:
+    """
+    Ein Abo auf einen Schlüssel. take() holt die zusammengefassten Änderungen ab (blockierend),
+    in asyncio dient das Abo als async Iterator. close() beendet das Abo.
+    """
+    def __init__(self, watcher: "RegistryWatcher", key: str, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        self.key = key
+        self.closed = False
+        # Wie oft ein neuer Stand mit einem noch nicht abgeholten zusammengefasst wurde
+        self.coalesced = 0
+        self._watcher = watcher
+        self._pending: _Changes = {}
+        self._updates = 0
+        self._version = 0
+        self._cond = threading.Condition()
+        self._loop = loop
+        self._ready = asyncio.Event() if loop is not None else None
+
+    def _push(self, changes: _Changes, version: int) -> None:
+        with self._cond:
+            if self.closed:
+                return
+            if self._pending:
+                self.coalesced += 1
+            _merge(self._pending, changes)
+            self._updates += 1
+            self._version = version
+            self._cond.notify_all()
+        self._wake()
+
+    def _wake(self) -> None:
+        if self._loop is not None and self._ready is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._ready.set)
+            except RuntimeError:
+                pass  # Event-Loop bereits geschlossen
+
+    def _take_pending(self) -> Optional[RegistryDiff]:
+        if not self._pending:
+            return None
+        items = sorted(self._pending.items())
+        diff = RegistryDiff(
+            key=self.key,
+            added=tuple(after for _, (before, after) in items if before is None and after is not None),
+            removed=tuple(before for _, (before, after) in items if after is None and before is not None),
+            changed=tuple((before, after) for _, (before, after) in items if before is not None and after is not None),
+            version=self._version,
+            updates=self._updates,
+        )
+        self._pending = {}
+        self._updates = 0
+        return diff
+
+    def take(self, timeout: Optional[float] = None) -> Optional[RegistryDiff]:
+        """Wartet auf Änderungen; None nach Ablauf von timeout oder wenn das Abo geschlossen ist."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._pending or self.closed, timeout)
+            return self._take_pending()
+
+    def close(self) -> None:
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+        self._wake()
+        self._watcher._unsubscribe(self)
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> RegistryDiff:
+        if self._ready is None:
+            raise TypeError("Abo wurde nicht über watch_async angelegt")
+        while True:
+            with self._cond:
+                diff = self._take_pending()
+                if diff is None and self.closed:
+                    raise StopAsyncIteration
+                self._ready.clear()
+            if diff is not None:
+                return diff
+            await self._ready.wait()
+
+class RegistryWatcher:
+    """
+    Verteilt Änderungen an Abonnenten. publish() nimmt jeden neuen RegistryView entgegen; mit
+    einem DiscoveryClient geschieht das bei jeder Aktualisierung automatisch.
+    only_up=True behandelt Instanzen, die nicht UP sind, wie entfernte (wie RegistryView.instances).
+    """
+    def __init__(self, client: Optional[DiscoveryClient] = None, only_up: bool = True) -> None:
+        self.only_up = only_up
+        self._view = RegistryView({})
+        self._subscriptions: Dict[str, List[Subscription]] = {}
+        # Letzter gemeldeter Stand je beobachtetem Schlüssel
+        self._last: Dict[str, Tuple[DiscoveredInstance, ...]] = {}
+        self._lock = threading.Lock()
+        if client is not None:
+            # Erst den aktuellen Stand übernehmen, damit er keine schon eingetroffene Aktualisierung überschreibt
+            self.publish(client.view)
+            client.add_listener(self.publish)
+
+    def _select(self, view: RegistryView, key: str, vip_index: Optional[Dict[str, List[DiscoveredInstance]]]) -> Tuple[DiscoveredInstance, ...]:
+        kind, name = key.split(":", 1)
+        if kind == "app":
+            return view.instances(name, self.only_up)
+        return tuple(vip_index.get(name, ())) if vip_index is not None else ()
+
+    def _vip_index(self, view: RegistryView) -> Optional[Dict[str, List[DiscoveredInstance]]]:
+        """Alle VIP-Adressen in einem Durchlauf statt einem Durchlauf pro beobachteter VIP."""
+        if not any(key.startswith("vip:") for key in self._subscriptions):
+            return None
+        index: Dict[str, List[DiscoveredInstance]] = {}
+        for instances in view.applications.values():
+            for instance in instances:
+                if not self.only_up or instance.status == "UP":
+                    index.setdefault(instance.vip_address, []).append(instance)
+        return index
+
+    def publish(self, view: RegistryView) -> None:
+        """Übernimmt einen Registry-Stand; ältere Versionen als der aktuelle werden ignoriert."""
+        with self._lock:
+            if view.version < self._view.version:
+                return
+            self._view = view
+            vip_index = self._vip_index(view)
+            for key, subscriptions in self._subscriptions.items():
+                instances = self._select(view, key, vip_index)
+                previous = self._last.get(key, ())
+                if instances == previous:
+                    continue
+                changes = _diff({i.instance_id: i for i in previous}, {i.instance_id: i for i in instances})
+                self._last[key] = instances
+                if changes:
+                    for subscription in subscriptions:
+                        subscription._push(changes, view.version)
+
+    def _subscribe(self, key: str, loop: Optional[asyncio.AbstractEventLoop] = None) -> Subscription:
+        subscription = Subscription(self, key, loop)
+        with self._lock:
+            if key not in self._subscriptions:
+                self._subscriptions[key] = []
+                self._last[key] = self._select(self._view, key, self._vip_index(self._view) if key.startswith("vip:") else None)
+            self._subscriptions[key].append(subscription)
+            # Erste Lieferung: aktueller Stand als hinzugefügte Instanzen
+            current = self._last[key]
+            if current:
+                subscription._push({i.instance_id: (None, i) for i in current}, self._view.version)
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.key, [])
+            if subscription in subscriptions:
+                subscriptions.remove(subscription)
+            if not subscriptions:
+                self._subscriptions.pop(subscription.key, None)
+                self._last.pop(subscription.key, None)
+
+    def watch(self, app: Optional[str] = None, vip: Optional[str] = None) -> Subscription:
+        """Abo zum Abholen mit take()."""
+        return self._subscribe(_key(app, vip))
+
+    def watch_async(self, app: Optional[str] = None, vip: Optional[str] = None) -> Subscription:
+        """Abo als async Iterator; muss im laufenden Event-Loop angelegt werden."""
+        return self._subscribe(_key(app, vip), asyncio.get_running_loop())
+
+    def subscribe(self, callback: Callable[[RegistryDiff], None], app: Optional[str] = None, vip: Optional[str] = None) -> Subscription:
+        """
+        Ruft callback in einem eigenen Thread pro Abo auf. Solange der Callback läuft, werden
+        neue Stände zusammengefasst und danach in einem Aufruf geliefert.
+        """
+        subscription = self.watch(app, vip)
+
+        def deliver() -> None:
+            while True:
+                diff = subscription.take()
+                if diff is None:
+                    return
+                try:
+                    callback(diff)
+                except Exception as e:
+                    logger.warning(f"Registry-Abo {subscription.key}: Callback fehlgeschlagen: {e}")
+
+        threading.Thread(target=deliver, name=f"registry-watch-{subscription.key}", daemon=True).start()
+        return subscription
@@ -0,0 +1,151 @@
+# runtime_metrics.py
+"""
+Selbstüberwachung des Client-Prozesses für den Metrics-Exporter: RSS, offene Dateideskriptoren,
+Threads (gesamt und Lifecycle-Threads gegenüber den konfigurierten Instanzen) und GC-Pausen.
+Die Werte werden von einem Hintergrund-Thread in festen Abständen gesammelt; ein Scrape liest
+nur den letzten Stand. GC-Pausen werden über gc.callbacks gemessen.
+"""
+import gc
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+def read_rss_bytes() -> Optional[int]:
+    """Aktueller Resident Set Size (Linux: /proc/self/statm), sonst None."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+def count_open_fds() -> Optional[int]:
+    for fd_dir in ("/proc/self/fd", "/dev/fd"):
+        try:
+            return len(os.listdir(fd_dir))
+        except OSError:
+            continue
+    return None
+
+def max_open_fds() -> Optional[int]:
+    try:
+        import resource
+        return resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+    except (ImportError, OSError, ValueError):
+        return None
+
+class GCPauseTracker:
+    """
+    Misst die Dauer jeder Garbage Collection pro Generation. Der Callback läuft in dem Thread,
+    der die Collection auslöst, daher ohne Lock (eine Sperre könnte dort bereits gehalten werden).
+    """
+    def __init__(self) -> None:
+        generations = len(gc.get_count())
+        self.collections: List[int] = [0] * generations
+        self.pause_seconds: List[float] = [0.0] * generations
+        self.max_pause_seconds = 0.0
+        self._started = 0.0
+        self._installed = False
+
+    def _callback(self, phase: str, info: Dict[str, Any]) -> None:
+        if phase == "start":
+            self._started = time.perf_counter()
+            return
+        pause = time.perf_counter() - self._started
+        generation = info.get("generation", 0)
+        if 0 <= generation < len(self.collections):
+            self.collections[generation] += 1
+            self.pause_seconds[generation] += pause
+        if pause > self.max_pause_seconds:
+            self.max_pause_seconds = pause
+
+    def install(self) -> None:
+        if not self._installed:
+            gc.callbacks.append(self._callback)
+            self._installed = True
+
+    def uninstall(self) -> None:
+        if self._installed:
+            gc.callbacks.remove(self._callback)
+            self._installed = False
+
+class RuntimeMetrics:
+    """
+    Sammelt die Prozess-Kennzahlen alle `interval` Sekunden. configured_lifecycles ist die Anzahl
+    der gestarteten Lifecycle-Instanzen; weniger lebende eureka-*-Threads heißt, dass Lifecycles beendet sind.
+    """
+    def __init__(self, configured_lifecycles: int = 0, interval: float = 5.0, thread_prefix: str = "eureka-") -> None:
+        self.configured_lifecycles = configured_lifecycles
+        self.interval = interval
+        self.thread_prefix = thread_prefix
+        self.gc_pauses = GCPauseTracker()
+        self._snapshot: Dict[str, Any] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def collect(self) -> Dict[str, Any]:
+        threads = threading.enumerate()
+        snapshot: Dict[str, Any] = {
+            "rss_bytes": read_rss_bytes(),
+            "open_fds": count_open_fds(),
+            "max_fds": max_open_fds(),
+            "threads": len(threads),
+            "lifecycle_threads": sum(1 for thread in threads if thread.name.startswith(self.thread_prefix)),
+            "configured_lifecycles": self.configured_lifecycles,
+            "gc_collections": list(self.gc_pauses.collections),
+            "gc_pause_seconds": list(self.gc_pauses.pause_seconds),
+            "gc_max_pause_seconds": self.gc_pauses.max_pause_seconds,
+            "collected_at": time.time(),
+        }
+        # Referenz tauschen statt Dict verändern: Leser sehen immer einen vollständigen Stand
+        self._snapshot = snapshot
+        return snapshot
+
+    def snapshot(self) -> Dict[str, Any]:
+        return self._snapshot or self.collect()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.collect()
+            self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        self.gc_pauses.install()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="runtime-metrics", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        self.gc_pauses.uninstall()
+
+    def prometheus_lines(self) -> List[str]:
+        data = self.snapshot()
+        output: List[str] = []
+
+        def gauge(name: str, help_text: str, value: Any) -> None:
+            if value is None:
+                return
+            output.append(f"\n# HELP {name} {help_text}")
+            output.append(f"# TYPE {name} gauge")
+            output.append(f"{name} {value}")
+
+        gauge("python_eureka_process_resident_memory_bytes", "Resident memory size in bytes.", data["rss_bytes"])
+        gauge("python_eureka_process_open_fds", "Number of open file descriptors.", data["open_fds"])
+        gauge("python_eureka_process_max_fds", "Maximum number of open file descriptors.", data["max_fds"])
+        gauge("python_eureka_threads", "Number of live threads in the process.", data["threads"])
+        gauge("python_eureka_lifecycle_threads", "Number of live eureka lifecycle threads.", data["lifecycle_threads"])
+        gauge("python_eureka_configured_lifecycles", "Number of configured lifecycle instances.", data["configured_lifecycles"])
+
+        output.append("\n# HELP python_eureka_gc_collections_total Number of garbage collections per generation.")
+        output.append("# TYPE python_eureka_gc_collections_total counter")
+        for generation, count in enumerate(data["gc_collections"]):
+            output.append(f"python_eureka_gc_collections_total{{generation=\"{generation}\"}} {count}")
+        output.append("\n# HELP python_eureka_gc_pause_seconds_total Time spent in garbage collection per generation.")
+        output.append("# TYPE python_eureka_gc_pause_seconds_total counter")
+        for generation, seconds in enumerate(data["gc_pause_seconds"]):
+            output.append(f"python_eureka_gc_pause_seconds_total{{generation=\"{generation}\"}} {seconds:.6f}")
+        gauge("python_eureka_gc_max_pause_seconds", "Longest garbage collection pause since start.", f"{data['gc_max_pause_seconds']:.6f}")
+        return output
@@ -0,0 +1,138 @@
+# sampling_profiler.py
+"""
+Sampling-Profiler für laufende Threads: liest in festen Abständen die Stacks über
+sys._current_frames() und zählt identische Stacks. Das Ergebnis ist im "collapsed"-Format
+(eine Zeile pro Stack, Frames mit ";" getrennt, danach die Anzahl), das flamegraph.pl und
+speedscope direkt einlesen. Zusätzlich wird die CPU-Zeit pro Thread-Name gemessen.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import CodeType, FrameType
+from typing import Dict, List, NamedTuple, Optional
+
+def thread_cpu_seconds(native_id: int) -> Optional[float]:
+    """CPU-Zeit eines Threads des eigenen Prozesses (Linux, /proc); None, wenn nicht verfügbar."""
+    try:
+        with open(f"/proc/self/task/{native_id}/schedstat", "rb") as f:
+            return int(f.read().split()[0]) / 1e9
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        with open(f"/proc/self/task/{native_id}/stat", "rb") as f:
+            # Der Thread-Name in Klammern kann Leerzeichen enthalten, daher ab der letzten ")" zählen
+            fields = f.read().rsplit(b")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+class ProfileReport(NamedTuple):
+    stacks: Dict[str, int]
+    samples: int
+    duration: float
+    threads: Dict[str, Dict[str, float]]
+
+    def collapsed(self) -> str:
+        """Stacks im collapsed-Format, häufigste zuerst."""
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items(), key=lambda item: -item[1]))
+
+class SamplingProfiler:
+    """
+    Tastet alle Threads ab, deren Name mit thread_prefix beginnt (leer = alle Threads).
+    Der Profiler-Thread selbst wird nie erfasst. Die CPU-Zeit wird nur alle cpu_every Samples
+    gelesen (ein /proc-Zugriff pro Thread); für Threads, die während des Profils enden, gilt der
+    zuletzt gelesene Wert.
+    """
+    def __init__(self, interval: float = 0.01, thread_prefix: str = "eureka-", max_depth: int = 64, cpu_every: int = 10) -> None:
+        if cpu_every < 1:
+            raise ValueError("cpu_every muss mindestens 1 sein")
+        self.interval = interval
+        self.thread_prefix = thread_prefix
+        self.max_depth = max_depth
+        self.cpu_every = cpu_every
+        self._labels: Dict[CodeType, str] = {}
+
+    def _label(self, code: CodeType) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{os.path.basename(code.co_filename)}:{code.co_name}"
+            self._labels[code] = label
+        return label
+
+    def _stack(self, thread_name: str, frame: Optional[FrameType]) -> str:
+        labels: List[str] = []
+        while frame is not None and len(labels) < self.max_depth:
+            labels.append(self._label(frame.f_code))
+            frame = frame.f_back
+        labels.append(thread_name)
+        labels.reverse()
+        return ";".join(labels)
+
+    def _threads(self) -> Dict[int, threading.Thread]:
+        own = threading.get_ident()
+        return {
+            thread.ident: thread for thread in threading.enumerate()
+            if thread.ident is not None and thread.ident != own and thread.name.startswith(self.thread_prefix)
+        }
+
+    def _cpu_times(self, threads: Dict[int, threading.Thread], into: Dict[int, float]) -> None:
+        for ident, thread in threads.items():
+            if thread.native_id is not None:
+                cpu = thread_cpu_seconds(thread.native_id)
+                if cpu is not None:
+                    into[ident] = cpu
+
+    def run(self, duration: float) -> ProfileReport:
+        """Tastet für duration Sekunden ab (blockierend)."""
+        stacks: Counter[str] = Counter()
+        samples = 0
+        cpu_start: Dict[int, float] = {}
+        cpu_last: Dict[int, float] = {}
+        names: Dict[int, str] = {}
+        seen: Counter[int] = Counter()
+
+        threads = self._threads()
+        self._cpu_times(threads, cpu_start)
+        started = time.monotonic()
+        next_tick = started
+        deadline = started + duration
+        while True:
+            frames = sys._current_frames()
+            for ident, thread in threads.items():
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                names[ident] = thread.name
+                seen[ident] += 1
+                stacks[self._stack(thread.name, frame)] += 1
+            del frames
+            samples += 1
+
+            next_tick += self.interval
+            now = time.monotonic()
+            if next_tick >= deadline:
+                break
+            if next_tick > now:
+                time.sleep(next_tick - now)
+            else:
+                next_tick = now  # Rückstand nicht nachholen
+            threads = self._threads()
+            # Nach dem Ende eines Threads ist /proc/self/task/<tid> schon weg, daher den letzten
+            # Stand regelmäßig mitführen statt erst beim Verschwinden zu lesen
+            if samples % self.cpu_every == 0:
+                self._cpu_times(threads, cpu_last)
+        self._cpu_times(threads, cpu_last)
+        elapsed = time.monotonic() - started
+
+        per_name: Dict[str, Dict[str, float]] = {}
+        for ident, name in names.items():
+            stats = per_name.setdefault(name, {"cpu_seconds": 0.0, "cpu_percent": 0.0, "samples": 0})
+            if ident in cpu_last:
+                stats["cpu_seconds"] += cpu_last[ident] - cpu_start.get(ident, 0.0)
+            stats["samples"] += seen[ident]
+        for stats in per_name.values():
+            stats["cpu_seconds"] = round(stats["cpu_seconds"], 6)
+            stats["cpu_percent"] = round(100 * stats["cpu_seconds"] / elapsed, 2) if elapsed > 0 else 0.0
+        return ProfileReport(dict(stacks), samples, elapsed, per_name)
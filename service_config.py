@@ -0,0 +1,60 @@
+# service_config.py
+# Bewusst nur mit leichten Standard-Imports, damit Konfigurationsprüfungen ohne
+# requests/FastAPI auskommen.
+import json
+import os
+from typing import Any, Dict, List
+
+DEFAULT_LEASE_INFO = {
+    "renewalIntervalInSecs": 30,
+    "durationInSecs": 90
+}
+
+REQUIRED_FIELDS = frozenset({"serviceName", "hostName", "httpPort", "healthEndpointPath", "infoEndpointPath"})
+
+LOG_DIR = "logs"
+
+class ConfigError(Exception):
+    """Die Konfigurationsdatei fehlt oder ist ungültig."""
+
+def apply_defaults(service_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Ergänzt fehlende Standardwerte (leaseInfo) direkt im übergebenen Dict."""
+    if "leaseInfo" not in service_data:
+        service_data["leaseInfo"] = dict(DEFAULT_LEASE_INFO)
+    return service_data
+
+def parse_services(raw: bytes, source: str = "services.json") -> List[Dict[str, Any]]:
+    """
+    Parst und prüft eine Service-Liste in einem Durchgang. Fehlende Pflichtfelder
+    werden über eine Mengen-Differenz geprüft, ohne Schema-Validierung per pydantic.
+    """
+    try:
+        services = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise ConfigError(f"Ungültiges JSON in der Konfigurationsdatei '{source}': {e.msg} (Zeile {e.lineno})") from e
+    if not isinstance(services, list):
+        raise ConfigError(f"Die Konfigurationsdatei '{source}' muss eine Liste von Services enthalten.")
+
+    for index, service_data in enumerate(services):
+        if not isinstance(service_data, dict):
+            raise ConfigError(f"Eintrag {index} in '{source}' ist kein Objekt.")
+        missing = REQUIRED_FIELDS - service_data.keys()
+        if missing:
+            raise ConfigError(f"Eintrag {index} in '{source}' fehlen die Felder: {', '.join(sorted(missing))}")
+        apply_defaults(service_data)
+    return services
+
+def load_services(path: str = "services.json") -> List[Dict[str, Any]]:
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+    except FileNotFoundError as e:
+        raise ConfigError(f"Konfigurationsdatei '{path}' nicht gefunden. Stelle sicher, dass sie im selben Verzeichnis liegt.") from e
+    return parse_services(raw, path)
+
+def ensure_log_dir(log_dir: str = LOG_DIR) -> bool:
+    """Legt das Logverzeichnis an. Liefert True, wenn es neu erstellt wurde."""
+    if os.path.isdir(log_dir):
+        return False
+    os.makedirs(log_dir, exist_ok=True)
+    return True
@@ -0,0 +1,101 @@
+# service_instances.py
+import itertools
+from collections import ChainMap
+from typing import Any, Dict, Iterator, List, Mapping, Sequence, Tuple, Union
+from xml.sax.saxutils import escape
+
+from eureka_client_lib import build_instance_xml, get_active_endpoint, get_instance_id
+
+# Trennzeichen für Platzhalter im Payload-Template (kommt in gültigen Konfigurationswerten nicht vor)
+_MARK = "\x1f"
+
+PortSpec = Union[int, str, Sequence[Union[int, str]]]
+
+def parse_ports(spec: PortSpec) -> Sequence[int]:
+    """
+    Parst eine Port-Angabe: 8080, "8080-8089" oder eine Liste aus beidem.
+    Bereiche bleiben range-Objekte und werden nicht materialisiert.
+    """
+    if isinstance(spec, int):
+        return [spec]
+    if isinstance(spec, str):
+        first, sep, last = spec.partition("-")
+        if not sep:
+            return [int(first)]
+        start, end = int(first), int(last)
+        if end < start:
+            raise ValueError(f"Ungültiger Port-Bereich: {spec}")
+        return range(start, end + 1)
+    ports: List[int] = []
+    for part in spec:
+        ports.extend(parse_ports(part))
+    return ports
+
+class PayloadTemplate:
+    """
+    XML-Payload, der einmal pro Service-Eintrag per ElementTree gebaut und für jede
+    Replika nur noch durch Einsetzen von instanceId, hostName, ipAddr und Ports gefüllt wird.
+    """
+    FIELDS = ("instanceId", "hostName", "httpPort", "securePort")
+
+    def __init__(self, base: Mapping[str, Any]) -> None:
+        placeholders: Dict[str, Any] = {field: f"{_MARK}{field}{_MARK}" for field in self.FIELDS}
+        xml = build_instance_xml(ChainMap(placeholders, dict(base)), f"{_MARK}ipAddr{_MARK}")
+        parts = xml.split(_MARK)
+        # Ungerade Indizes sind Feldnamen, gerade Indizes fester Text
+        self._parts: List[Tuple[bool, str]] = [(index % 2 == 1, part) for index, part in enumerate(parts)]
+
+    def render(self, service_data: Mapping[str, Any], ip_address: str) -> str:
+        values = {
+            "instanceId": escape(get_instance_id(service_data)),
+            "hostName": escape(str(service_data["hostName"])),
+            "httpPort": str(service_data["httpPort"]),
+            "securePort": str(service_data.get("securePort", 443)),
+            "ipAddr": escape(ip_address),
+        }
+        return "".join([values[part] if is_field else part for is_field, part in self._parts])
+
+class InstanceView(ChainMap):
+    """
+    Sicht auf eine Replika: ein kleines Overlay (hostName, Ports, instanceId) über der
+    unveränderten Basis-Konfiguration, ohne die Konfiguration zu kopieren.
+    """
+    def __init__(self, overlay: Dict[str, Any], base: Mapping[str, Any], template: PayloadTemplate, index: int) -> None:
+        super().__init__(overlay, base)  # type: ignore[arg-type]
+        self.payload_template = template
+        self.index = index
+
+def expand_instances(service_data: Mapping[str, Any]) -> Iterator[Mapping[str, Any]]:
+    """
+    Expandiert einen Service-Eintrag mit "replicas" lazy in einzelne Instanzen:
+
+        "replicas": {"ports": "8080-8089", "hostNames": ["a.lan", "b.lan"]}
+
+    Die Port-Angabe gilt für httpPort; bei sslPreferred wird securePort um denselben
+    Offset (Abstand zum niedrigsten Port) verschoben. Einträge ohne "replicas" werden unverändert geliefert.
+    """
+    replicas = service_data.get("replicas")
+    if not replicas:
+        yield service_data
+        return
+
+    hosts: Sequence[str] = replicas.get("hostNames") or [service_data["hostName"]]
+    ports = parse_ports(replicas["ports"]) if "ports" in replicas else [service_data["httpPort"]]
+    base_port = min(ports) if ports else service_data["httpPort"]
+    base_secure_port = service_data.get("securePort", 443)
+    shift_secure_port = get_active_endpoint(service_data)[0] == "https"
+    explicit_id = service_data.get("instanceId")
+    template = PayloadTemplate(service_data)
+
+    for index, (host_name, port) in enumerate(itertools.product(hosts, ports)):
+        overlay: Dict[str, Any] = {"hostName": host_name, "httpPort": port}
+        if shift_secure_port:
+            overlay["securePort"] = base_secure_port + (port - base_port)
+        overlay["instanceId"] = f"{explicit_id}-{index}" if explicit_id else get_instance_id(ChainMap(overlay, service_data))  # type: ignore[arg-type]
+        yield InstanceView(overlay, service_data, template, index)
+
+def lifecycle_name(service_data: Mapping[str, Any]) -> str:
+    """Thread-Name eines Lifecycles: eureka-SERVICE bzw. eureka-SERVICE#n für Replikas."""
+    service_name = service_data["serviceName"].upper()
+    index = getattr(service_data, "index", None)
+    return f"eureka-{service_name}" if index is None else f"eureka-{service_name}#{index}"
@@ -0,0 +1,294 @@
+# shard_supervisor.py
+import bisect
+import hashlib
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Mapping, Optional, Set, Tuple
+
+from eureka_client_lib import MetricsStore, eureka_lifecycle
+from eureka_transport import AsyncHTTPTransport
+from health_probe import HealthMonitor
+from service_instances import expand_instances, lifecycle_name
+from shutdown_drain import RegistrationTracker, drain_threads
+
+logger = logging.getLogger(__name__)
+
+LOG_DIR = "logs"
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+class HashRing:
+    """
+    Konsistentes Hashing der Service-Namen auf Worker-Nummern.
+    Jeder Worker bekommt mehrere virtuelle Knoten, damit die Verteilung gleichmäßig ist
+    und eine Änderung der Worker-Anzahl nur einen kleinen Teil der Services verschiebt.
+    """
+    def __init__(self, num_nodes: int, virtual_nodes: int = 64) -> None:
+        if num_nodes < 1:
+            raise ValueError("num_nodes muss mindestens 1 sein")
+        points: List[Tuple[int, int]] = sorted(
+            (_hash(f"worker-{node}#{replica}"), node)
+            for node in range(num_nodes)
+            for replica in range(virtual_nodes)
+        )
+        self._keys = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def node_for(self, key: str) -> int:
+        index = bisect.bisect(self._keys, _hash(key)) % len(self._keys)
+        return self._nodes[index]
+
+def shard_services(services: List[Dict[str, Any]], num_workers: int) -> List[List[Dict[str, Any]]]:
+    """Verteilt die Services anhand des Service-Namens auf num_workers Shards."""
+    ring = HashRing(num_workers)
+    shards: List[List[Dict[str, Any]]] = [[] for _ in range(num_workers)]
+    for service_data in services:
+        shards[ring.node_for(service_data["serviceName"].upper())].append(service_data)
+    return shards
+
+class AggregatedMetricsStore(MetricsStore):
+    """
+    MetricsStore-Sicht über alle Worker-Prozesse. Worker senden regelmäßig ihren
+    vollständigen Snapshot unter einem Schlüssel (Worker-Nummer, Generation); Zähler
+    beendeter Worker werden in retired-Summen übernommen, damit die Counter nach einem
+    Neustart nicht zurückspringen. Verspätete Snapshots beendeter Worker werden ignoriert.
+    """
+    def __init__(self) -> None:
+        super().__init__()
+        self._worker_snapshots: Dict[Hashable, Dict[str, Any]] = {}
+        self._retired_keys: Set[Hashable] = set()
+        self._retired_successful = 0
+        self._retired_errors = 0
+        self._retired_lag_sum = 0.0
+        self._retired_lag_count = 0
+
+    def update_worker(self, worker_key: Hashable, snapshot: Dict[str, Any]) -> None:
+        with self._lock:
+            if worker_key not in self._retired_keys:
+                self._worker_snapshots[worker_key] = snapshot
+
+    def retire_worker(self, worker_key: Hashable) -> None:
+        with self._lock:
+            self._retired_keys.add(worker_key)
+            snapshot = self._worker_snapshots.pop(worker_key, None)
+            if snapshot is None:
+                return
+            self._retired_successful += snapshot["successful_registrations_total"]
+            self._retired_errors += snapshot["registration_errors_total"]
+            self._retired_lag_sum += snapshot.get("heartbeat_lag_seconds_sum", 0.0)
+            self._retired_lag_count += snapshot.get("heartbeat_lag_count", 0)
+            # Services des abgestürzten Workers gelten bis zum nächsten Snapshot als nicht registriert
+            for service_name in snapshot["service_registered_status"]:
+                self.service_registered_status[service_name] = 0
+
+    def get_metrics_data(self) -> Dict[str, Any]:
+        with self._lock:
+            successful = self.successful_registrations_total + self._retired_successful
+            errors = self.registration_errors_total + self._retired_errors
+            status = self.service_registered_status.copy()
+            lag = self.heartbeat_lag_seconds.copy()
+            lag_sum = self.heartbeat_lag_seconds_sum + self._retired_lag_sum
+            lag_count = self.heartbeat_lag_count + self._retired_lag_count
+            for snapshot in self._worker_snapshots.values():
+                successful += snapshot["successful_registrations_total"]
+                errors += snapshot["registration_errors_total"]
+                status.update(snapshot["service_registered_status"])
+                lag.update(snapshot.get("heartbeat_lag_seconds", {}))
+                lag_sum += snapshot.get("heartbeat_lag_seconds_sum", 0.0)
+                lag_count += snapshot.get("heartbeat_lag_count", 0)
+            return {
+                "successful_registrations_total": successful,
+                "registration_errors_total": errors,
+                "service_registered_status": status,
+                "heartbeat_lag_seconds": lag,
+                "heartbeat_lag_seconds_sum": lag_sum,
+                "heartbeat_lag_count": lag_count,
+            }
+
+def _setup_service_logger(service_name: str) -> logging.Logger:
+    service_logger = logging.getLogger(service_name)
+    service_logger.setLevel(logging.INFO)
+    service_logger.propagate = False
+    if not service_logger.handlers:
+        handler = logging.FileHandler(os.path.join(LOG_DIR, f"{service_name}.log"))
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
+        service_logger.addHandler(handler)
+    return service_logger
+
+def worker_main(worker_key: Hashable, services: List[Dict[str, Any]], metrics_queue: Any, stop_event: Any, report_interval: float, health_interval: float = 0.0, drain_timeout: float = 0.0) -> None:
+    """
+    Einstiegspunkt eines Worker-Prozesses: startet die Lifecycle-Threads seines Shards
+    und meldet periodisch den MetricsStore-Snapshot an den Supervisor. health_interval > 0
+    prüft die Health-Endpunkte des Shards, drain_timeout > 0 deregistriert beim Beenden alle
+    Instanzen parallel (wie HEALTH_PROBE_INTERVAL und SHUTDOWN_DRAIN_TIMEOUT ohne Supervisor).
+    """
+    # Der Supervisor koordiniert das Herunterfahren über stop_event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    os.makedirs(LOG_DIR, exist_ok=True)
+
+    metrics_store = MetricsStore()
+    thread_stop = threading.Event()
+    threads: List[threading.Thread] = []
+    tracker = RegistrationTracker() if drain_timeout > 0 else None
+    health_instances: List[Tuple[Mapping[str, Any], Optional[logging.Logger]]] = []
+    for service_data in services:
+        service_name = service_data["serviceName"].upper()
+        metrics_store.set_service_registered_status(service_name, 0)
+        service_logger = _setup_service_logger(service_name)
+        for instance_data in expand_instances(service_data):
+            kwargs: Dict[str, Any] = {}
+            if tracker is not None:
+                kwargs = {"on_event": tracker.listener(instance_data), "deregister_on_stop": False}
+            thread = threading.Thread(
+                target=eureka_lifecycle,
+                args=(instance_data, metrics_store, thread_stop, service_logger),
+                kwargs=kwargs,
+                name=lifecycle_name(instance_data),
+            )
+            threads.append(thread)
+            thread.start()
+            health_instances.append((instance_data, service_logger))
+
+    health_monitor = None
+    if health_interval > 0 and health_instances:
+        health_monitor = HealthMonitor(health_instances, AsyncHTTPTransport(), health_interval)
+        health_monitor.start()
+
+    while not stop_event.wait(report_interval):
+        metrics_queue.put((worker_key, metrics_store.get_metrics_data()))
+
+    if health_monitor is not None:
+        health_monitor.stop()
+    if tracker is not None:
+        # Lifecycles deregistrieren nicht selbst; jede registrierte Instanz genau einmal, parallel
+        report = drain_threads([thread_stop], threads, tracker, metrics_store, drain_timeout)
+        logger.info(f"Worker {worker_key}: {report.summary()}")
+    else:
+        thread_stop.set()
+        for thread in threads:
+            thread.join(timeout=10)
+    metrics_queue.put((worker_key, metrics_store.get_metrics_data()))
+
+class ShardSupervisor:
+    """
+    Verteilt die Services per konsistentem Hash auf num_workers Prozesse, sammelt deren
+    Metriken in einem AggregatedMetricsStore und startet abgestürzte Worker neu.
+    health_interval und drain_timeout werden an die Worker weitergegeben (siehe worker_main).
+    """
+    def __init__(
+        self,
+        services: List[Dict[str, Any]],
+        num_workers: int,
+        metrics_store: Optional[AggregatedMetricsStore] = None,
+        report_interval: float = 5.0,
+        worker_target: Callable[..., None] = worker_main,
+        max_restart_backoff: float = 30.0,
+        mp_context: str = "spawn",
+        health_interval: float = 0.0,
+        drain_timeout: float = 0.0,
+    ) -> None:
+        self.num_workers = num_workers
+        self.health_interval = health_interval
+        self.drain_timeout = drain_timeout
+        self.shards = shard_services(services, num_workers)
+        self.metrics_store = metrics_store if metrics_store is not None else AggregatedMetricsStore()
+        self.report_interval = report_interval
+        self.worker_target = worker_target
+        self.max_restart_backoff = max_restart_backoff
+        self.restart_counts: List[int] = [0] * num_workers
+
+        self._ctx: Any = multiprocessing.get_context(mp_context)
+        self._metrics_queue = self._ctx.Queue()
+        self._stop_event = self._ctx.Event()
+        self._processes: List[Optional[Any]] = [None] * num_workers
+        self._restart_at: List[float] = [0.0] * num_workers
+        self._stopping = threading.Event()
+        self._monitor_thread: Optional[threading.Thread] = None
+
+        for shard in self.shards:
+            for service_data in shard:
+                self.metrics_store.set_service_registered_status(service_data["serviceName"].upper(), 0)
+
+    def _worker_key(self, worker_id: int) -> Tuple[int, int]:
+        return (worker_id, self.restart_counts[worker_id])
+
+    def _spawn(self, worker_id: int) -> None:
+        process = self._ctx.Process(
+            target=self.worker_target,
+            args=(self._worker_key(worker_id), self.shards[worker_id], self._metrics_queue, self._stop_event, self.report_interval),
+            kwargs={"health_interval": self.health_interval, "drain_timeout": self.drain_timeout},
+            name=f"eureka-worker-{worker_id}",
+        )
+        process.start()
+        self._processes[worker_id] = process
+        logger.info(f"Worker {worker_id} gestartet (PID {process.pid}, {len(self.shards[worker_id])} Services).")
+
+    def start(self) -> None:
+        for worker_id in range(self.num_workers):
+            if self.shards[worker_id]:
+                self._spawn(worker_id)
+        self._monitor_thread = threading.Thread(target=self._monitor, name="shard-supervisor", daemon=True)
+        self._monitor_thread.start()
+
+    def _drain_metrics(self, timeout: float) -> None:
+        try:
+            worker_key, snapshot = self._metrics_queue.get(timeout=timeout)
+        except queue.Empty:
+            return
+        self.metrics_store.update_worker(worker_key, snapshot)
+        while True:
+            try:
+                worker_key, snapshot = self._metrics_queue.get_nowait()
+            except queue.Empty:
+                return
+            self.metrics_store.update_worker(worker_key, snapshot)
+
+    def _check_workers(self) -> None:
+        now = time.monotonic()
+        for worker_id, process in enumerate(self._processes):
+            if process is None or process.is_alive():
+                continue
+            if self._restart_at[worker_id] == 0.0:
+                self.metrics_store.retire_worker(self._worker_key(worker_id))
+                self.restart_counts[worker_id] += 1
+                backoff = min(2 ** (self.restart_counts[worker_id] - 1), self.max_restart_backoff)
+                self._restart_at[worker_id] = now + backoff
+                logger.error(f"Worker {worker_id} beendet (Exitcode {process.exitcode}). Neustart in {backoff}s.")
+            elif now >= self._restart_at[worker_id]:
+                self._restart_at[worker_id] = 0.0
+                self._spawn(worker_id)
+
+    def _monitor(self) -> None:
+        while not self._stopping.is_set():
+            self._drain_metrics(timeout=0.5)
+            if not self._stopping.is_set():
+                self._check_workers()
+
+    def stop(self, timeout: float = 15.0) -> None:
+        """
+        Stoppt alle Worker; Nachzügler werden nach timeout Sekunden beendet, mit Drain frühestens
+        einige Sekunden nach drain_timeout, damit die Worker ihre Instanzen noch deregistrieren.
+        """
+        timeout = max(timeout, self.drain_timeout + 5.0) if self.drain_timeout > 0 else timeout
+        self._stopping.set()
+        self._stop_event.set()
+        if self._monitor_thread is not None:
+            self._monitor_thread.join(timeout=2)
+
+        deadline = time.monotonic() + timeout
+        for worker_id, process in enumerate(self._processes):
+            if process is None:
+                continue
+            process.join(timeout=max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning(f"Worker {worker_id} reagiert nicht, wird beendet.")
+                process.terminate()
+                process.join(timeout=2)
+        self._drain_metrics(timeout=0.1)
@@ -0,0 +1,197 @@
+# shutdown_drain.py
+"""
+Herunterfahren mit einer gemeinsamen Frist ("Drain") für client.py und client_with_metrics.py.
+
+Ohne Drain wartet client.py jeden Lifecycle-Thread nacheinander bis zu 10 Sekunden ab;
+client_with_metrics.py schläft 2 Sekunden und deregistriert danach jede Instanz einzeln, auch
+die, die ihr Lifecycle bereits deregistriert hat. Bei hunderten Instanzen reicht die
+Grace-Period von Kubernetes dafür nicht.
+
+Im Drain-Modus deregistrieren die Lifecycles nicht selbst (deregister_on_stop=False):
+1. Stopp-Signal an alle Lifecycles
+2. höchstens die halbe Frist warten, bis laufende Heartbeats abgeschlossen sind
+3. alle registrierten Instanzen parallel deregistrieren, jede Instanz-ID genau einmal
+4. Instanzen, die sich erst danach (noch) registriert haben, z.B. aus einer laufenden
+   Registrierung oder einer Neu-Registrierung nach 404, ebenfalls deregistrieren
+5. Bericht, welche Deregistrierungen fehlgeschlagen oder nicht rechtzeitig fertig geworden sind
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence
+
+from eureka_client_lib import EventCallback, MetricsStore, async_deregister_instance, get_instance_id
+from eureka_transport import AsyncHTTPTransport, AsyncTransport
+
+DEFAULT_MAX_CONCURRENCY = 64
+
+class DrainReport(NamedTuple):
+    deregistered: List[str]
+    failed: List[str]
+    timed_out: List[str]
+    # Lifecycles, die bei Ablauf der Frist noch liefen
+    running: List[str]
+    elapsed: float
+
+    @property
+    def complete(self) -> bool:
+        return not (self.failed or self.timed_out or self.running)
+
+    def summary(self) -> str:
+        lines = [
+            f"Drain nach {self.elapsed:.2f}s: {len(self.deregistered)} deregistriert, "
+            f"{len(self.failed)} fehlgeschlagen, {len(self.timed_out)} nicht rechtzeitig fertig."
+        ]
+        if self.failed:
+            lines.append(f"Fehlgeschlagen: {', '.join(self.failed)}")
+        if self.timed_out:
+            lines.append(f"Nicht rechtzeitig deregistriert: {', '.join(self.timed_out)}")
+        if self.running:
+            lines.append(f"Noch laufende Lifecycles: {', '.join(self.running)}")
+        return "\n".join(lines)
+
+class RegistrationTracker:
+    """
+    Merkt sich, welche Instanzen erfolgreich registriert wurden, damit der Drain nur diese
+    deregistriert. listener() liefert den on_event-Callback für den Lifecycle einer Instanz.
+    Nach begin_drain() eintreffende Registrierungen liefert late_instances().
+    """
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._registered: Dict[str, Mapping[str, Any]] = {}
+        self._draining = False
+        self._late: Dict[str, Mapping[str, Any]] = {}
+
+    def listener(self, instance_data: Mapping[str, Any], forward: Optional[EventCallback] = None) -> EventCallback:
+        instance_id = get_instance_id(instance_data)
+
+        def on_event(event_type: str, data: Dict[str, Any]) -> None:
+            if event_type in ("registered", "reregistered"):
+                with self._lock:
+                    self._registered[instance_id] = instance_data
+                    if self._draining:
+                        self._late[instance_id] = instance_data
+            elif event_type == "stopped" and data.get("deregistered"):
+                with self._lock:
+                    self._registered.pop(instance_id, None)
+            if forward is not None:
+                forward(event_type, data)
+        return on_event
+
+    def instances(self) -> List[Mapping[str, Any]]:
+        with self._lock:
+            return list(self._registered.values())
+
+    def begin_drain(self) -> List[Mapping[str, Any]]:
+        """Registrierte Instanzen zu Beginn des Drains; spätere Registrierungen zählen als verspätet."""
+        with self._lock:
+            self._draining = True
+            self._late = {}
+            return list(self._registered.values())
+
+    def late_instances(self) -> List[Mapping[str, Any]]:
+        """Seit begin_drain() (bzw. dem letzten Aufruf) registrierte Instanzen."""
+        with self._lock:
+            late, self._late = list(self._late.values()), {}
+            return late
+
+def _unique(instances: Iterable[Mapping[str, Any]]) -> Dict[str, Mapping[str, Any]]:
+    unique: Dict[str, Mapping[str, Any]] = {}
+    for instance_data in instances:
+        unique.setdefault(get_instance_id(instance_data), instance_data)
+    return unique
+
+async def async_drain(instances: Iterable[Mapping[str, Any]], metrics_store: MetricsStore, transport: AsyncTransport, deadline: float, max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> DrainReport:
+    """
+    Deregistriert alle Instanzen parallel (jede Instanz-ID einmal) bis zur Frist `deadline`
+    (time.monotonic()). Nicht fertige Deregistrierungen werden abgebrochen und gemeldet.
+    """
+    started = time.monotonic()
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def deregister(instance_data: Mapping[str, Any]) -> bool:
+        async with semaphore:
+            return await async_deregister_instance(instance_data, metrics_store, transport)
+
+    tasks = {asyncio.ensure_future(deregister(data)): instance_id for instance_id, data in _unique(instances).items()}
+    deregistered: List[str] = []
+    failed: List[str] = []
+    timed_out: List[str] = []
+    if tasks:
+        done, pending = await asyncio.wait(tasks, timeout=max(0.0, deadline - time.monotonic()))
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        for task, instance_id in tasks.items():
+            if task in pending:
+                timed_out.append(instance_id)
+            elif not task.exception() and task.result():
+                deregistered.append(instance_id)
+            else:
+                failed.append(instance_id)
+    return DrainReport(sorted(deregistered), sorted(failed), sorted(timed_out), [], time.monotonic() - started)
+
+def _combine(first: DrainReport, second: DrainReport) -> DrainReport:
+    """Ergebnis des Nachzügler-Durchlaufs zählt für Instanzen, die in beiden vorkommen."""
+    later = set(second.deregistered) | set(second.failed) | set(second.timed_out)
+
+    def merged(a: List[str], b: List[str]) -> List[str]:
+        return sorted({i for i in a if i not in later} | set(b))
+
+    return DrainReport(
+        merged(first.deregistered, second.deregistered),
+        merged(first.failed, second.failed),
+        merged(first.timed_out, second.timed_out),
+        [],
+        first.elapsed + second.elapsed,
+    )
+
+async def async_drain_tasks(lifecycles: Mapping["asyncio.Task[Any]", str], tracker: RegistrationTracker, metrics_store: MetricsStore, transport: AsyncTransport, timeout: float, max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> DrainReport:
+    """Drain für async_eureka_lifecycle-Tasks; das Stop-Event muss bereits gesetzt sein."""
+    started = time.monotonic()
+    deadline = started + timeout
+    if lifecycles:
+        await asyncio.wait(lifecycles, timeout=timeout / 2)
+    report = await async_drain(tracker.begin_drain(), metrics_store, transport, deadline, max_concurrency)
+    pending = [task for task in lifecycles if not task.done()]
+    if pending:
+        await asyncio.wait(pending, timeout=max(0.0, deadline - time.monotonic()))
+    late = tracker.late_instances()
+    if late:
+        report = _combine(report, await async_drain(late, metrics_store, transport, deadline, max_concurrency))
+    running = sorted(label for task, label in lifecycles.items() if not task.done())
+    for task in lifecycles:
+        if not task.done():
+            task.cancel()
+    return report._replace(running=running, elapsed=time.monotonic() - started)
+
+def _join_until(threads: Sequence[threading.Thread], deadline: float) -> None:
+    for thread in threads:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        thread.join(remaining)
+
+def drain_threads(stop_events: Iterable[threading.Event], threads: Sequence[threading.Thread], tracker: RegistrationTracker, metrics_store: MetricsStore, timeout: float, max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> DrainReport:
+    """Drain für Lifecycle-Threads (eureka_lifecycle mit deregister_on_stop=False)."""
+    started = time.monotonic()
+    deadline = started + timeout
+    for event in stop_events:
+        event.set()
+    _join_until(threads, started + timeout / 2)
+
+    async def run(instances: List[Mapping[str, Any]]) -> DrainReport:
+        transport = AsyncHTTPTransport(max_connections_per_host=max_concurrency)
+        try:
+            return await async_drain(instances, metrics_store, transport, deadline, max_concurrency)
+        finally:
+            await transport.close()
+
+    report = asyncio.run(run(tracker.begin_drain()))
+    _join_until(threads, deadline)
+    late = tracker.late_instances()
+    if late:
+        report = _combine(report, asyncio.run(run(late)))
+    running = sorted(thread.name for thread in threads if thread.is_alive())
+    return report._replace(running=running, elapsed=time.monotonic() - started)
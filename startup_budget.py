@@ -0,0 +1,87 @@
+# startup_budget.py
+"""
+Misst die Importzeit eines Moduls mit `python -X importtime` und prüft sie gegen ein Budget.
+
+    python startup_budget.py client --budget-ms 60
+"""
+import argparse
+import subprocess
+import sys
+from typing import List, NamedTuple, Optional
+
+class ImportTiming(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+def parse_importtime(stderr: str) -> List[ImportTiming]:
+    """Parst die Ausgabe von -X importtime ("import time: self | cumulative | name")."""
+    timings: List[ImportTiming] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # Kopfzeile
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        depth = (len(name) - len(stripped) - 1) // 2
+        timings.append(ImportTiming(stripped, int(fields[0]), int(fields[1]), depth))
+    return timings
+
+def measure_import(module: str, python: Optional[str] = None) -> List[ImportTiming]:
+    """Importiert das Modul in einem frischen Interpreter und liefert die Import-Zeiten."""
+    result = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Import von '{module}' fehlgeschlagen:\n{result.stderr}")
+    return parse_importtime(result.stderr)
+
+def module_imports(timings: List[ImportTiming], module: str) -> List[ImportTiming]:
+    """
+    Liefert den Eintrag des Moduls samt aller dadurch ausgelösten Imports. In der Ausgabe von
+    -X importtime stehen die Unter-Imports direkt vor der Zeile des Moduls.
+    """
+    for end in range(len(timings) - 1, -1, -1):
+        if timings[end].depth == 0 and timings[end].module == module:
+            start = end
+            while start > 0 and timings[start - 1].depth > 0:
+                start -= 1
+            return timings[start:end + 1]
+    return []
+
+def module_ms(timings: List[ImportTiming], module: str) -> float:
+    """Kumulative Importzeit des Moduls selbst, ohne den Interpreter-Start (site, encodings)."""
+    own = module_imports(timings, module)
+    return own[-1].cumulative_us / 1000 if own else 0.0
+
+def interpreter_ms(timings: List[ImportTiming], module: str) -> float:
+    return sum(t.cumulative_us for t in timings if t.depth == 0 and t.module != module) / 1000
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Importzeit-Budget prüfen")
+    parser.add_argument("module", nargs="?", default="client")
+    parser.add_argument("--budget-ms", type=float, default=50.0)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    timings = measure_import(args.module)
+    total = module_ms(timings, args.module)
+    print(f"Importzeit '{args.module}': {total:.1f} ms (Budget {args.budget_ms:.1f} ms)")
+    print(f"Interpreter-Start (site, encodings): {interpreter_ms(timings, args.module):.1f} ms")
+    print("Teuerste Imports (kumulativ):")
+    for timing in sorted(module_imports(timings, args.module), key=lambda t: t.cumulative_us, reverse=True)[:args.top]:
+        print(f"  {timing.cumulative_us / 1000:8.1f} ms  {'  ' * timing.depth}{timing.module}")
+
+    if total > args.budget_ms:
+        print("Budget überschritten.")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,24 +1,159 @@
+// Zeilen pro Client, damit Statusänderungen nur die betroffene Zeile anfassen
+const rows = new Map();
+
+const STATUS_LABELS = {
+  starting: '🟡 startet',
+  up: '🟢 läuft',
+  registration_failed: '🟠 Registrierung fehlgeschlagen',
+  heartbeat_failed: '🟠 Heartbeat fehlgeschlagen',
+  down: '🔴 down',
+  out_of_service: '⚪ außer Betrieb',
+  unknown: '⚪ unbekannt',
+  stopped: '🔴 gestoppt'
+};
+
+function statusLabel(client) {
+  return STATUS_LABELS[client.status] || (client.running ? '🟢 läuft' : '🔴 gestoppt');
+}
+
+function createRow(client) {
+  const li = document.createElement('li');
+  li.dataset.name = client.serviceName;
+
+  const info = document.createElement('span');
+  const title = document.createElement('strong');
+  title.textContent = client.serviceName;
+  const status = document.createElement('span');
+  status.className = 'status';
+  const slo = document.createElement('span');
+  slo.className = 'slo';
+  const sparkline = document.createElementNS(SVG_NS, 'svg');
+  sparkline.setAttribute('class', 'sparkline');
+  sparkline.setAttribute('viewBox', `0 0 ${SPARKLINE_WIDTH} ${SPARKLINE_HEIGHT}`);
+  info.append(title, ' - ', status, slo, sparkline);
+
+  const actions = document.createElement('div');
+  const buttons = [
+    ['Start', '', () => start(client.serviceName)],
+    ['Stop', 'stop', () => stop(client.serviceName)],
+    ['Löschen', '', () => del(client.serviceName)],
+    ['Show Logs', '', () => toggleLogs(client.serviceName)]
+  ];
+  buttons.forEach(([label, cls, handler]) => {
+    const button = document.createElement('button');
+    button.textContent = label;
+    if (cls) button.className = cls;
+    button.addEventListener('click', handler);
+    actions.appendChild(button);
+  });
+
+  li.append(info, actions);
+  return { li, status, slo, sparkline };
+}
+
+// --- Heartbeat-Verlauf (Erfolgsquote und p95 der letzten 24 h) ---
+const SVG_NS = 'http://www.w3.org/2000/svg';
+const SPARKLINE_WIDTH = 96;
+const SPARKLINE_HEIGHT = 20;
+
+function drawSparkline(svg, values) {
+  const known = values.filter(v => v !== null);
+  const max = Math.max(...known, 1);
+  const step = values.length > 1 ? SPARKLINE_WIDTH / (values.length - 1) : 0;
+  const points = [];
+  values.forEach((value, i) => {
+    if (value === null) return;
+    const y = SPARKLINE_HEIGHT - 1 - (value / max) * (SPARKLINE_HEIGHT - 2);
+    points.push(`${(i * step).toFixed(1)},${y.toFixed(1)}`);
+  });
+  const line = document.createElementNS(SVG_NS, 'polyline');
+  line.setAttribute('points', points.join(' '));
+  svg.replaceChildren(line);
+}
+
+function renderHeartbeats(name, stats) {
+  const row = rows.get(name);
+  if (!row) return;
+  if (stats.success_ratio === null) {
+    row.slo.textContent = '';
+    row.sparkline.replaceChildren();
+    return;
+  }
+  const ratio = (stats.success_ratio * 100).toFixed(2);
+  row.slo.textContent = ` ${ratio} % OK, p95 ${stats.p95_ms ?? '-'} ms`;
+  row.sparkline.setAttribute('aria-label', `p95-Latenz der letzten 24 h, max ${stats.max_ms} ms`);
+  drawSparkline(row.sparkline, stats.p95_series);
+}
+
+async function loadHeartbeats() {
+  try {
+    const res = await fetch('/clients/heartbeats?points=48');
+    if (!res.ok) return;
+    const data = await res.json();
+    Object.entries(data.clients).forEach(([name, stats]) => renderHeartbeats(name, stats));
+  } catch (err) {
+    // Nächster Versuch beim nächsten Intervall
+  }
+}
+
+function upsertClient(client) {
+  let row = rows.get(client.serviceName);
+  if (!row) {
+    row = createRow(client);
+    rows.set(client.serviceName, row);
+    document.getElementById('client-list').appendChild(row.li);
+  }
+  row.status.textContent = statusLabel(client);
+}
+
+function removeClient(name) {
+  const row = rows.get(name);
+  if (!row) return;
+  const logViewer = document.getElementById(`log-${name}`);
+  if (logViewer) logViewer.remove();
+  row.li.remove();
+  rows.delete(name);
+}
+
+function renderSnapshot(clients) {
+  const list = document.getElementById('client-list');
+  list.replaceChildren();
+  rows.clear();
+  const fragment = document.createDocumentFragment();
+  clients.forEach(client => {
+    const row = createRow(client);
+    row.status.textContent = statusLabel(client);
+    rows.set(client.serviceName, row);
+    fragment.appendChild(row.li);
+  });
+  list.appendChild(fragment);
+}
+
 async function loadClients() {
   const res = await fetch('/clients');
-  const clients = await res.json();
-  const list = document.getElementById('client-list');
-  list.innerHTML = '';
+  renderSnapshot(await res.json());
+}
 
-  clients.forEach(client => {
-    const li = document.createElement('li');
-    li.innerHTML = `
-      <strong>${client.serviceName}</strong> - ${client.running ? '🟢 läuft' : '🔴 gestoppt'}
-      <div>
-        <button onclick="start('${client.serviceName}')">Start</button>
-        <button class="stop" onclick="stop('${client.serviceName}')">Stop</button>
-        <button onclick="del('${client.serviceName}')">Löschen</button>
-        <button onclick="toggleLogs('${client.serviceName}')">Show Logs</button>
-      </div>
-    `;
-    list.appendChild(li);
-
-    const logViewer = createLogViewer(client.serviceName);
-    list.appendChild(logViewer);
+function connectEvents() {
+  if (!window.EventSource) {
+    // Fallback ohne SSE-Unterstützung: periodisch neu laden
+    loadClients();
+    setInterval(loadClients, 5000);
+    return;
+  }
+  const source = new EventSource('/clients/events');
+  source.addEventListener('snapshot', e => renderSnapshot(JSON.parse(e.data)));
+  source.addEventListener('status', e => {
+    const update = JSON.parse(e.data);
+    const row = rows.get(update.serviceName);
+    if (row) row.status.textContent = statusLabel(update);
+  });
+  source.addEventListener('added', e => upsertClient(JSON.parse(e.data)));
+  source.addEventListener('deleted', e => removeClient(JSON.parse(e.data).serviceName));
+  source.addEventListener('resync', () => {
+    // Server hat Events verworfen: neu verbinden liefert einen frischen Snapshot
+    source.close();
+    connectEvents();
   });
 }
 
@@ -31,8 +166,6 @@ async function start(name) {
     }
   } catch (err) {
     alert(`❌ Netzwerkfehler beim Starten von ${name}`);
-  } finally {
-    loadClients();
   }
 }
 
@@ -45,8 +178,6 @@ async function stop(name) {
     }
   } catch (err) {
     alert(`❌ Netzwerkfehler beim Stoppen von ${name}`);
-  } finally {
-    loadClients();
   }
 }
 
@@ -59,8 +190,6 @@ async function del(name) {
     }
   } catch (err) {
     alert(`❌ Netzwerkfehler beim Löschen von ${name}`);
-  } finally {
-    loadClients();
   }
 }
 
@@ -68,8 +197,13 @@ function createLogViewer(name) {
   const logDiv = document.createElement('div');
   logDiv.id = `log-${name}`;
   logDiv.className = 'log-viewer';
-  logDiv.style.display = 'none'; 
-  logDiv.innerHTML = `<pre><code id="log-content-${name}">Logs werden geladen...</code></pre>`;
+  logDiv.style.display = 'none';
+  const pre = document.createElement('pre');
+  const code = document.createElement('code');
+  code.id = `log-content-${name}`;
+  code.textContent = 'Logs werden geladen...';
+  pre.appendChild(code);
+  logDiv.appendChild(pre);
   return logDiv;
 }
 
@@ -97,10 +231,16 @@ async function showLogs(name) {
 }
 
 function toggleLogs(name) {
-  const logDiv = document.getElementById(`log-${name}`);
+  let logDiv = document.getElementById(`log-${name}`);
   if (!logDiv) {
-    alert(`⚠️ Log-Container für ${name} nicht gefunden.`);
-    return;
+    // Log-Viewer erst bei Bedarf anlegen
+    const row = rows.get(name);
+    if (!row) {
+      alert(`⚠️ Log-Container für ${name} nicht gefunden.`);
+      return;
+    }
+    logDiv = createLogViewer(name);
+    row.li.after(logDiv);
   }
 
   if (logDiv.style.display === 'block') {
@@ -126,11 +266,12 @@ document.getElementById('add-form').onsubmit = async (e) => {
     body: JSON.stringify(data)
   });
   e.target.reset();
-  loadClients();
 };
 
 document.getElementById('theme-switch').addEventListener('change', (e) => {
   document.body.classList.toggle('dark', e.target.checked);
 });
 
-loadClients();
+connectEvents();
+loadHeartbeats();
+setInterval(loadHeartbeats, 60000);
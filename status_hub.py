@@ -0,0 +1,132 @@
+# status_hub.py
+import asyncio
+import json
+import threading
+import time
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Abbildung der Lifecycle-Events auf den in der UI angezeigten Status.
+# Events, die hier fehlen, ändern den Status nicht.
+EVENT_STATUS: Dict[str, str] = {
+    "started": "starting",
+    "registered": "up",
+    "registration_failed": "registration_failed",
+    "heartbeat_ok": "up",
+    "heartbeat_failed": "heartbeat_failed",
+    "stopped": "stopped",
+    # Status-Overrides über die Manager-API
+    "status_up": "up",
+    "status_down": "down",
+    "status_out_of_service": "out_of_service",
+    "status_starting": "starting",
+    "status_unknown": "unknown",
+}
+
+Message = Tuple[str, Dict[str, Any]]
+
+def format_sse(event: str, data: Any) -> str:
+    """Formatiert eine Nachricht im Server-Sent-Events-Format."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+class Subscription:
+    """
+    Ein SSE-Abonnent mit begrenzter Queue. Läuft die Queue voll, wird der
+    Abonnent als übergelaufen markiert und muss sich per Snapshot neu synchronisieren.
+    """
+    def __init__(self, maxsize: int) -> None:
+        self.queue: asyncio.Queue[Message] = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+class StatusHub:
+    """
+    Hält den letzten Status jedes Clients und verteilt Statuswechsel an SSE-Abonnenten.
+    publish() wird aus den Lifecycle-Threads aufgerufen; die Zustellung an die
+    asyncio-Queues erfolgt über call_soon_threadsafe im Event-Loop des Webservers.
+    Heartbeats ohne Statuswechsel erzeugen keine Nachricht.
+    """
+    def __init__(self, queue_size: int = 1000) -> None:
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: Set[Subscription] = set()
+        self._state: Dict[str, Dict[str, Any]] = {}
+        self._seq = 0
+        self._queue_size = queue_size
+
+    def attach(self, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        self._loop = loop
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self._queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def status(self, name: str) -> Dict[str, Any]:
+        entry = self._state.get(name)
+        if entry is None:
+            return {"status": "stopped", "running": False}
+        return {"status": entry["status"], "running": entry["running"]}
+
+    def is_running(self, name: str) -> bool:
+        entry = self._state.get(name)
+        return entry is not None and entry["running"]
+
+    def publish(self, name: str, event_type: str, data: Optional[Dict[str, Any]] = None) -> None:
+        status = EVENT_STATUS.get(event_type)
+        if status is None:
+            return
+        running = event_type != "stopped"
+        with self._lock:
+            current = self._state.get(name)
+            if current is not None and current["status"] == status and current["running"] == running:
+                return
+            self._seq += 1
+            entry = {
+                "serviceName": name,
+                "status": status,
+                "running": running,
+                "seq": self._seq,
+                "updatedAt": time.time(),
+            }
+            self._state[name] = entry
+            subscribers = list(self._subscribers)
+        self._broadcast(("status", dict(entry)), subscribers)
+
+    def publish_added(self, summary: Dict[str, Any]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        self._broadcast(("added", summary), subscribers)
+
+    def publish_deleted(self, name: str) -> None:
+        with self._lock:
+            self._state.pop(name, None)
+            subscribers = list(self._subscribers)
+        self._broadcast(("deleted", {"serviceName": name}), subscribers)
+
+    def _broadcast(self, message: Message, subscribers: List[Subscription]) -> None:
+        loop = self._loop
+        if loop is None or not subscribers or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._deliver, message, subscribers)
+        except RuntimeError:
+            # Event-Loop wurde zwischenzeitlich geschlossen (Shutdown)
+            pass
+
+    @staticmethod
+    def _deliver(message: Message, subscribers: List[Subscription]) -> None:
+        for subscription in subscribers:
+            if subscription.overflowed:
+                continue
+            try:
+                subscription.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                subscription.overflowed = True
+                logger.warning("SSE-Abonnent zu langsam, erzwinge Resync.")
@@ -0,0 +1,176 @@
+import io
+import os
+import socketserver
+import sys
+import threading
+import time
+import urllib.request
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "accesslogs"))
+
+import server
+from binlog import (
+    ACCESS_STRUCT,
+    MAGIC,
+    BinaryLogWriter,
+    format_access_line,
+    is_binary_log,
+    read_ipv4_addresses,
+    read_records,
+    to_text,
+)
+from table import analyze_log_file
+
+TS = int(time.mktime((2026, 3, 28, 10, 0, 0, 0, 0, -1)))
+
+
+def write_records(writer, count, ip="10.20.1.15", **overrides):
+    for n in range(count):
+        writer.write(
+            TS + n, ip, "PUT", f"/eureka/apps/APP/host{n % 3}", "HTTP/1.1", 200,
+            user_agent=overrides.get("user_agent", "Java-EurekaClient/v1.10"),
+        )
+
+
+class TestBinaryLogWriter:
+    def test_roundtrip(self, tmp_path):
+        writer = BinaryLogWriter(str(tmp_path))
+        write_records(writer, 5)
+        writer.write(TS + 10, "::1", "GET", "/", "HTTP/1.0", 404, "ref", "curl", "1.2.3.4", "https")
+        writer.close()
+
+        assert writer.path is not None
+        assert os.path.basename(writer.path) == "access_log.2026-03-28.bin"
+        assert is_binary_log(writer.path)
+        records = read_records(writer.path)
+        assert len(records) == 6
+        assert records[0].source_ip == "10.20.1.15"
+        assert records[4].path == "/eureka/apps/APP/host1"
+        assert records[5] == (TS + 10, "::1", "GET", "/", "HTTP/1.0", 404, "ref", "curl", "1.2.3.4", "https")
+
+    def test_interned_strings_keep_records_small(self, tmp_path):
+        writer = BinaryLogWriter(str(tmp_path))
+        write_records(writer, 1000)
+        writer.close()
+        assert writer.path is not None
+        # Nach den ersten Records kostet jeder weitere Zugriff nur den festen Record
+        assert os.path.getsize(writer.path) < 1000 * ACCESS_STRUCT.size + 300
+
+    def test_string_table_reset(self, tmp_path):
+        writer = BinaryLogWriter(str(tmp_path), max_strings=10)
+        for n in range(20):
+            writer.write(TS, "10.0.0.1", "GET", f"/path/{n}", "HTTP/1.1", 200, user_agent=f"agent-{n}")
+        writer.close()
+        assert writer.path is not None
+        records = read_records(writer.path)
+        assert [r.path for r in records] == [f"/path/{n}" for n in range(20)]
+        assert [r.user_agent for r in records] == [f"agent-{n}" for n in range(20)]
+
+    def test_reopen_appends_to_existing_file(self, tmp_path):
+        for _ in range(2):
+            writer = BinaryLogWriter(str(tmp_path))
+            write_records(writer, 2, user_agent="restart")
+            writer.close()
+        (path,) = tmp_path.glob("*.bin")
+        assert [r.user_agent for r in read_records(str(path))] == ["restart"] * 4
+
+    def test_buffer_is_flushed_by_size(self, tmp_path):
+        writer = BinaryLogWriter(str(tmp_path), buffer_size=200, flush_interval=3600)
+        write_records(writer, 1)
+        assert writer.path is not None
+        assert os.path.getsize(writer.path) == 0
+        write_records(writer, 3)
+        assert os.path.getsize(writer.path) > len(MAGIC)
+        writer.close()
+
+    def test_truncated_tail_is_ignored(self, tmp_path):
+        writer = BinaryLogWriter(str(tmp_path))
+        write_records(writer, 3)
+        writer.close()
+        assert writer.path is not None
+        with open(writer.path, "ab") as f:
+            f.write(ACCESS_STRUCT.pack(2, TS, 1, 200, 0, 0, 0, 0, 0, 0, 0)[:10])
+        assert len(read_records(writer.path)) == 3
+
+    def test_midnight_rotation_and_backups(self, tmp_path):
+        writer = BinaryLogWriter(str(tmp_path), backup_count=2)
+        for day in range(4):
+            write_records(writer, 1)
+            writer.write(TS + day * 86400, "10.0.0.1", "GET", "/", "HTTP/1.1", 200)
+        writer.close()
+        assert len(list(tmp_path.glob("access_log.*.bin"))) == 2
+
+
+class TestConversion:
+    def test_to_text_matches_text_format(self, tmp_path):
+        writer = BinaryLogWriter(str(tmp_path))
+        writer.write(TS, "10.20.1.15", "GET", "/", "HTTP/1.1", 200)
+        writer.close()
+        assert writer.path is not None
+        out = io.StringIO()
+        to_text(writer.path, out)
+        assert out.getvalue() == '10.20.1.15 - [28/Mar/2026:10:00:00 +0000] - "GET / HTTP/1.1" - 200 "-" "-" "-" "-"\n'
+        assert out.getvalue() == format_access_line(
+            "10.20.1.15", TS, "GET", "/", "HTTP/1.1", 200, "-", "-", "-", "-"
+        ) + "\n"
+
+    def test_table_reads_binary_log(self, tmp_path):
+        writer = BinaryLogWriter(str(tmp_path))
+        for ip in ("10.20.1.15", "10.20.3.42", "192.168.1.1", "10.20.1.15", "::1"):
+            writer.write(TS, ip, "GET", "/", "HTTP/1.1", 200)
+        writer.close()
+        assert writer.path is not None
+        assert len(read_ipv4_addresses(writer.path)) == 3
+        result = analyze_log_file(writer.path)
+        assert result == {"10.20": {"10.20.1.15", "10.20.3.42"}, "192.168": {"192.168.1.1"}}
+
+
+class TestServerBinaryFormat:
+    def test_requests_are_logged_binary(self, tmp_path, monkeypatch):
+        writer = BinaryLogWriter(str(tmp_path))
+        monkeypatch.setattr(server, "binary_writer", writer)
+        with socketserver.TCPServer(("127.0.0.1", 0), server.EurekaHandler) as httpd:
+            thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+            thread.start()
+            request = urllib.request.Request(
+                f"http://127.0.0.1:{httpd.server_address[1]}/eureka/apps/ORDERS",
+                headers={"User-Agent": "Java-EurekaClient/v1.10", "X-Forwarded-Proto": "https"},
+            )
+            with urllib.request.urlopen(request) as resp:
+                assert resp.status == 200
+            httpd.shutdown()
+        writer.close()
+        assert writer.path is not None
+        (record,) = read_records(writer.path)
+        assert record.source_ip == "127.0.0.1"
+        assert (record.method, record.path, record.status) == ("GET", "/eureka/apps/ORDERS", 200)
+        assert record.user_agent == "Java-EurekaClient/v1.10"
+        assert record.x_forwarded_proto == "https"
+
+    def test_idle_server_flushes_buffer(self, tmp_path, monkeypatch):
+        writer = BinaryLogWriter(str(tmp_path), flush_interval=0.3)
+        monkeypatch.setattr(server, "binary_writer", writer)
+        with server.AccessLogServer(("127.0.0.1", 0), server.EurekaHandler) as httpd:
+            thread = threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+            thread.start()
+            with urllib.request.urlopen(f"http://127.0.0.1:{httpd.server_address[1]}/eureka/apps/ORDERS") as resp:
+                assert resp.status == 200
+            assert writer.path is not None
+            deadline = time.monotonic() + 2
+            while os.path.getsize(writer.path) <= len(MAGIC) and time.monotonic() < deadline:
+                time.sleep(0.02)
+            # ohne weitere Requests und ohne close() auf der Platte
+            assert len(read_records(writer.path)) == 1
+            httpd.shutdown()
+        writer.close()
+
+
+@pytest.mark.parametrize("ip", ["not-an-ip", "1.2.3"])
+def test_non_ipv4_addresses_are_stored_as_strings(tmp_path, ip):
+    writer = BinaryLogWriter(str(tmp_path))
+    writer.write(TS, ip, "GET", "/", "HTTP/1.1", 200)
+    writer.close()
+    assert writer.path is not None
+    assert read_records(writer.path)[0].source_ip == ip
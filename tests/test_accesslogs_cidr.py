@@ -0,0 +1,120 @@
+import ipaddress
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "accesslogs"))
+
+from binlog import BinaryLogWriter
+from cidr_index import CidrIndex
+from table import UNASSIGNED, analyze_by_owner
+
+NETWORKS = [
+    ("10.0.0.0/8", "platform"),
+    ("10.20.0.0/16", "team-a"),
+    ("10.20.5.0/24", "team-b"),
+    ("10.20.5.128/25", "team-c"),
+    ("192.168.0.0/16", "office"),
+]
+
+LOG_LINE = '{ip} - [28/Mar/2026:10:00:00 +0000] - "GET / HTTP/1.1" - 200 "-" "-" "-" "-"\n'
+
+
+def owner(index, ip):
+    match = index.lookup(ip)
+    return match[0] if match else None
+
+
+class TestCidrIndex:
+    @pytest.mark.parametrize("ip,expected", [
+        ("10.1.2.3", "platform"),
+        ("10.20.1.1", "team-a"),
+        ("10.20.5.1", "team-b"),
+        ("10.20.5.127", "team-b"),
+        ("10.20.5.128", "team-c"),
+        ("10.20.5.255", "team-c"),
+        ("10.20.6.0", "team-a"),
+        ("10.21.0.0", "platform"),
+        ("10.255.255.255", "platform"),
+        ("11.0.0.0", None),
+        ("192.168.7.7", "office"),
+        ("0.0.0.0", None),
+        ("not-an-ip", None),
+    ])
+    def test_longest_prefix_match(self, ip, expected):
+        assert owner(CidrIndex(NETWORKS), ip) == expected
+
+    def test_lookup_returns_matched_network(self):
+        assert CidrIndex(NETWORKS).lookup("10.20.5.200") == ("team-c", "10.20.5.128/25")
+
+    def test_default_route_and_host_routes(self):
+        index = CidrIndex([("0.0.0.0/0", "internet"), ("8.8.8.8/32", "dns"), ("255.255.255.255/32", "broadcast")])
+        assert owner(index, "8.8.8.7") == "internet"
+        assert owner(index, "8.8.8.8") == "dns"
+        assert owner(index, "8.8.8.9") == "internet"
+        assert owner(index, "255.255.255.255") == "broadcast"
+
+    def test_duplicate_prefix_last_wins(self):
+        index = CidrIndex([("10.0.0.0/8", "old"), ("10.0.0.0/8", "new")])
+        assert owner(index, "10.1.1.1") == "new"
+
+    def test_matches_linear_scan(self):
+        rng = random.Random(7)
+        networks = [
+            (ipaddress.IPv4Network((rng.getrandbits(32), length), strict=False), f"o{n}")
+            for n, length in enumerate(rng.randint(8, 30) for _ in range(300))
+        ]
+        index = CidrIndex([(str(network), name) for network, name in networks])
+        for _ in range(2000):
+            address = ipaddress.IPv4Address(rng.getrandbits(32))
+            matches = [(network.prefixlen, n, name) for n, (network, name) in enumerate(networks) if address in network]
+            match = index.lookup_int(int(address))
+            assert (match[0] if match else None) == (max(matches)[2] if matches else None)
+
+    def test_from_csv(self, tmp_path):
+        csv_file = tmp_path / "networks.csv"
+        csv_file.write_text("cidr,team\n# Kommentar\n\n10.0.0.0/8,platform\n10.20.0.0/16, team-a ,extra\n")
+        index = CidrIndex.from_csv(str(csv_file))
+        assert len(index) == 2
+        assert owner(index, "10.20.0.1") == "team-a"
+
+    @pytest.mark.parametrize("content", ["10.0.0.0/33,x\n", "10.0.0.0/8\n", "2001:db8::/32,v6\n"])
+    def test_from_csv_rejects_invalid_rows(self, tmp_path, content):
+        csv_file = tmp_path / "networks.csv"
+        csv_file.write_text(content)
+        with pytest.raises(ValueError):
+            CidrIndex.from_csv(str(csv_file))
+
+
+class TestAnalyzeByOwner:
+    def test_text_log(self, tmp_path):
+        log_file = tmp_path / "access_log"
+        log_file.write_text(
+            LOG_LINE.format(ip="10.20.5.1") * 3
+            + LOG_LINE.format(ip="10.20.5.200")
+            + LOG_LINE.format(ip="172.16.0.1")
+            + "kaputte zeile\n"
+        )
+        result = analyze_by_owner(str(log_file), CidrIndex(NETWORKS))
+        assert result is not None
+        assert result["team-b"] == {"requests": 3, "ips": {"10.20.5.1"}, "networks": {"10.20.5.0/24"}}
+        assert result["team-c"]["requests"] == 1
+        assert result[UNASSIGNED] == {"requests": 1, "ips": {"172.16.0.1"}, "networks": set()}
+
+    def test_binary_log_gives_same_result(self, tmp_path):
+        ips = ["10.20.5.1", "10.20.5.1", "10.1.1.1", "192.168.1.1"]
+        log_file = tmp_path / "access_log"
+        log_file.write_text("".join(LOG_LINE.format(ip=ip) for ip in ips))
+        writer = BinaryLogWriter(str(tmp_path / "bin"))
+        os.makedirs(writer.directory)
+        for ip in ips:
+            writer.write(0, ip, "GET", "/", "HTTP/1.1", 200)
+        writer.close()
+        assert writer.path is not None
+        index = CidrIndex(NETWORKS)
+        assert analyze_by_owner(writer.path, index) == analyze_by_owner(str(log_file), index)
+
+    def test_missing_file(self):
+        assert analyze_by_owner("/nonexistent/access_log", CidrIndex(NETWORKS)) is None
@@ -0,0 +1,140 @@
+import json
+import os
+import random
+import socketserver
+import sys
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "accesslogs"))
+
+import server
+from live_stats import HyperLogLog, LiveStats, RateWindow, SpaceSaving, app_from_path
+
+
+class TestHyperLogLog:
+    @pytest.mark.parametrize("count", [0, 10, 1000, 100000])
+    def test_estimate_within_error(self, count):
+        hll = HyperLogLog()
+        for n in range(count):
+            hll.add(f"10.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}")
+            hll.add(f"10.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}")  # Duplikate zählen nicht
+        assert abs(hll.estimate() - count) <= max(2, count * 4 * hll.standard_error)
+
+    def test_memory_is_fixed(self):
+        hll = HyperLogLog(precision=12)
+        for n in range(50000):
+            hll.add(str(n))
+        assert len(hll.registers) == 4096
+
+
+class TestSpaceSaving:
+    def test_finds_heavy_hitters_in_bounded_memory(self):
+        rng = random.Random(3)
+        sketch = SpaceSaving(k=20)
+        stream = ["heavy-a"] * 3000 + ["heavy-b"] * 2000 + [f"noise-{rng.randint(0, 5000)}" for _ in range(10000)]
+        rng.shuffle(stream)
+        for item in stream:
+            sketch.add(item)
+        assert len(sketch.counts) == 20
+        top = sketch.top(2)
+        assert [entry["value"] for entry in top] == ["heavy-a", "heavy-b"]
+        for entry, exact in zip(top, (3000, 2000)):
+            assert entry["count"] - entry["error"] <= exact <= entry["count"]
+
+
+class TestRateWindow:
+    def test_rate_over_window(self):
+        window = RateWindow(seconds=60)
+        for second in range(100, 160):
+            window.add(second + 0.5, count=2)
+        assert window.rate(159.9) == 2.0
+        assert window.rate(159.9, 10) == 2.0
+        assert window.rate(200) == pytest.approx(2 * 19 / 60)
+        assert window.rate(1000) == 0
+        assert window.total == 120
+
+
+@pytest.mark.parametrize("path,app", [
+    ("/eureka/apps/orders/host:orders:8080?status=UP", "ORDERS"),
+    ("/eureka/apps/ORDERS", "ORDERS"),
+    ("/eureka/apps/", None),
+    ("/eureka/apps/delta", None),
+    ("/", None),
+])
+def test_app_from_path(path, app):
+    assert app_from_path(path) == app
+
+
+class TestLiveStats:
+    def test_snapshot(self):
+        stats = LiveStats(top_k=10)
+        for n in range(30):
+            stats.record("10.0.0.1", "PUT", "/eureka/apps/ORDERS/h1", 200)
+        stats.record("10.0.0.2", "POST", "/eureka/apps/BILLING", 501)
+        stats.record("10.0.0.3", "BREW", "/", 501)
+        snapshot = stats.snapshot(top=2)
+        assert snapshot["requests_total"] == 32
+        assert snapshot["unique_ips"] == 3
+        assert snapshot["top_ips"][0] == {"value": "10.0.0.1", "count": 30, "error": 0}
+        assert [entry["value"] for entry in snapshot["top_apps"]] == ["ORDERS", "BILLING"]
+        assert snapshot["methods"]["PUT"]["total"] == 30
+        assert snapshot["methods"]["OTHER"]["total"] == 1
+        assert snapshot["statuses"] == {"200": 30, "501": 2}
+        assert snapshot["dropped"] == 0
+
+    def test_overflow_drops_oldest(self):
+        stats = LiveStats(max_pending=5)
+        for n in range(8):
+            stats.record(f"10.0.0.{n}", "GET", "/", 200)
+        snapshot = stats.snapshot()
+        assert snapshot["requests_total"] == 5
+        assert snapshot["dropped"] == 3
+
+    def test_concurrent_recording_with_background_drain(self):
+        stats = LiveStats(interval=0.01)
+        stats.start()
+        try:
+            def worker(offset):
+                for n in range(2000):
+                    stats.record(f"10.1.{offset}.{n % 200}", "PUT", "/eureka/apps/APP", 200)
+
+            threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            stats.stop()
+        snapshot = stats.snapshot()
+        assert snapshot["requests_total"] == 8000
+        assert snapshot["top_apps"][0] == {"value": "APP", "count": 8000, "error": 0}
+        assert abs(snapshot["unique_ips"] - 800) <= 800 * 0.05
+
+
+class TestStatsEndpoint:
+    def test_endpoint_reports_traffic(self, monkeypatch):
+        monkeypatch.setattr(server, "live_stats", LiveStats())
+        with socketserver.TCPServer(("127.0.0.1", 0), server.EurekaHandler) as httpd:
+            thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+            thread.start()
+            base = f"http://127.0.0.1:{httpd.server_address[1]}"
+            try:
+                for _ in range(3):
+                    urllib.request.urlopen(f"{base}/eureka/apps/ORDERS").read()
+                with pytest.raises(urllib.error.HTTPError):
+                    urllib.request.urlopen(urllib.request.Request(f"{base}/eureka/apps/BILLING", data=b"x", method="POST"))
+                with urllib.request.urlopen(f"{base}{server.STATS_PATH}?top=5") as resp:
+                    assert resp.headers.get("Content-type") == "application/json"
+                    snapshot = json.loads(resp.read())
+            finally:
+                httpd.shutdown()
+        assert snapshot["requests_total"] == 4
+        assert snapshot["unique_ips"] == 1
+        assert snapshot["top_ips"][0]["value"] == "127.0.0.1"
+        assert snapshot["top_apps"][0] == {"value": "ORDERS", "count": 3, "error": 0}
+        assert snapshot["methods"]["GET"]["total"] == 3
+        assert snapshot["statuses"] == {"200": 3, "501": 1}
@@ -0,0 +1,130 @@
+import threading
+import time
+
+from client_registry import ClientRegistry
+
+
+def config(name, **overrides):
+    return {"serviceName": name.lower(), "hostName": "h", "httpPort": 8080, **overrides}
+
+
+def start_thread(registry, name):
+    """Hängt einen laufenden Dummy-Thread an; der Aufrufer beendet ihn über das Stop-Event."""
+    stop = threading.Event()
+    thread = threading.Thread(target=stop.wait, name=f"eureka-{name}")
+    thread.start()
+    registry.attach(name, thread, stop)
+    return stop, thread
+
+
+class TestClientRegistry:
+    def test_snapshot_is_not_changed_by_writes(self):
+        registry = ClientRegistry({"A": config("a")})
+        snapshot = registry.snapshot()
+        registry["B"] = config("b")
+        del registry["A"]
+        assert list(snapshot) == ["A"]
+        assert list(registry) == ["B"]
+        assert registry.get("A") is None
+
+    def test_add_is_atomic_across_threads(self):
+        registry = ClientRegistry()
+        results = []
+        barrier = threading.Barrier(8)
+
+        def worker(index):
+            barrier.wait()
+            for n in range(200):
+                results.append(registry.add(f"SVC{n}", config(f"svc{n}", worker=index)))
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(registry) == 200
+        assert results.count(True) == 200
+
+    def test_put_many_skip_and_replace(self):
+        registry = ClientRegistry({"A": config("a"), "B": config("b")})
+        stop, thread = start_thread(registry, "B")
+        try:
+            added, replaced, skipped = registry.put_many(
+                {"C": config("c"), "A": config("a", httpPort=1), "B": config("b", httpPort=1)}, replace=True
+            )
+        finally:
+            stop.set()
+            thread.join()
+        assert (added, replaced, skipped) == (["C"], ["A"], ["B"])
+        assert registry["A"]["httpPort"] == 1
+        assert registry["B"]["httpPort"] == 8080
+
+        added, replaced, skipped = registry.put_many({"A": config("a", httpPort=2)})
+        assert (added, replaced, skipped) == ([], [], ["A"])
+
+    def test_remove_stopped(self):
+        registry = ClientRegistry({"A": config("a")})
+        stop, thread = start_thread(registry, "A")
+        assert registry.running_names() == ["A"]
+        assert registry.remove_stopped("A") is False
+        stop.set()
+        thread.join()
+        assert registry.remove_stopped("A") is True
+        assert registry.remove_stopped("A") is None
+        assert registry.runtime() == []
+
+    def test_client_lock_is_exclusive_per_name(self):
+        registry = ClientRegistry({"A": config("a"), "B": config("b")})
+        entered = threading.Event()
+
+        def other(name):
+            with registry.client_lock(name):
+                entered.set()
+
+        with registry.client_lock("A"):
+            thread = threading.Thread(target=other, args=("A",))
+            thread.start()
+            assert not entered.wait(0.05)
+            with registry.client_lock("B"):
+                pass
+        thread.join()
+        assert entered.is_set()
+
+    def test_client_lock_is_dropped_with_client(self):
+        registry = ClientRegistry({"A": config("a")})
+        with registry.client_lock("A"):
+            pass
+        assert list(registry._client_locks) == ["A"]
+        assert registry.remove_stopped("A") is True
+        with registry.client_lock("UNKNOWN"):
+            pass
+        assert registry._client_locks == {}
+
+    def test_waiter_takes_new_lock_after_removal(self):
+        registry = ClientRegistry({"A": config("a")})
+        held = []
+
+        def waiter():
+            with registry.client_lock("A"):
+                held.append(registry._client_locks.get("A"))
+
+        with registry.client_lock("A"):
+            old_lock = registry._client_locks["A"]
+            thread = threading.Thread(target=waiter)
+            thread.start()
+            time.sleep(0.05)  # der Wartende hängt an der alten Sperre
+            del registry["A"]
+        thread.join(timeout=1)
+        assert len(held) == 1 and held[0] is not None and held[0] is not old_lock
+        assert registry._client_locks == {}
+
+    def test_status_overrides(self):
+        registry = ClientRegistry({"A": config("a")})
+        snapshot = registry.status_overrides()
+        registry.set_status_override("A", "OUT_OF_SERVICE")
+        assert registry.status_override("A") == "OUT_OF_SERVICE" and snapshot == {}
+        registry.set_status_override("A", "UP")
+        assert registry.status_override("A") is None
+        registry.set_status_override("A", "DOWN")
+        assert registry.remove_stopped("A") is True
+        assert registry.status_overrides() == {}
@@ -0,0 +1,166 @@
+import random
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+import eureka_client_lib
+from discovery import (
+    LEAST_LATENCY,
+    DiscoveredInstance,
+    DiscoveryClient,
+    DiscoveryError,
+    LoadBalancer,
+    RegistryView,
+    fetch_registry,
+    parse_registry_xml,
+)
+from eureka_client_lib import MetricsStore, register_instance, update_status
+from fake_eureka_server import FakeEurekaServer
+
+EXAMPLE_XML = Path(__file__).resolve().parent.parent / "example" / "service.xml"
+
+
+def instance(n, zone="a", status="UP"):
+    return DiscoveredInstance(f"host{n}:APP:80", "APP", f"host{n}", f"10.0.0.{n}", 80, 443, False, status, zone, "app", {})
+
+
+def pick(chooser, *args):
+    chosen = chooser.choose(*args)
+    assert chosen is not None
+    return chosen
+
+
+@pytest.fixture
+def fake_server(monkeypatch):
+    server = FakeEurekaServer()
+    server.start()
+    monkeypatch.setattr(eureka_client_lib, "EUREKA_SERVER_URL", server.base_url)
+    yield server
+    server.stop()
+
+
+class TestParseRegistry:
+    def test_example_application_document(self):
+        view = parse_registry_xml(EXAMPLE_XML.read_bytes())
+        (registry,) = view.instances("serviceregistry")
+        assert registry.instance_id == "gmk:serviceregistry:8761"
+        assert registry.base_url == "http://gmk:8761"
+        assert registry.zone == "MyOwn"
+        assert registry.metadata == {"management.port": "8761"}
+        assert view.hashcode == "UP_1_"
+
+    def test_applications_document_filters_non_up(self):
+        xml = (
+            "<applications><versions__delta>3</versions__delta><apps__hashcode>DOWN_1_UP_1_</apps__hashcode>"
+            "<application><name>A</name>"
+            "<instance><instanceId>a1</instanceId><app>A</app><hostName>h1</hostName><status>UP</status>"
+            "<port enabled=\"false\">80</port><securePort enabled=\"true\">8443</securePort>"
+            "<metadata><zone>z1</zone></metadata></instance>"
+            "<instance><instanceId>a2</instanceId><app>A</app><hostName>h2</hostName><status>DOWN</status></instance>"
+            "</application></applications>"
+        )
+        view = parse_registry_xml(xml)
+        assert view.version == 3
+        assert [i.instance_id for i in view.instances("a")] == ["a1"]
+        assert len(view.instances("a", only_up=False)) == 2
+        assert view.instances("a")[0].base_url == "https://h1:8443"
+        assert view.instances("a")[0].zone == "z1"
+
+    def test_invalid_xml(self):
+        with pytest.raises(DiscoveryError):
+            parse_registry_xml("<applications>")
+
+
+class TestLoadBalancer:
+    def test_round_robin_is_even(self):
+        lb = LoadBalancer([instance(n) for n in range(3)])
+        picks = Counter(pick(lb).instance_id for _ in range(300))
+        assert set(picks.values()) == {100}
+
+    def test_empty_pool(self):
+        assert LoadBalancer().choose() is None
+
+    def test_least_latency_prefers_fast_instance(self):
+        instances = [instance(n) for n in range(4)]
+        lb = LoadBalancer(instances, strategy=LEAST_LATENCY, rng=random.Random(1))
+        for n, latency in enumerate([100.0, 100.0, 5.0, 100.0]):
+            lb.record_success(instances[n], latency)
+        picks = Counter(pick(lb).instance_id for _ in range(1000))
+        assert picks.most_common(1)[0][0] == instances[2].instance_id
+        assert picks[instances[2].instance_id] > 400
+
+    def test_zone_affinity_with_fallback(self):
+        local, remote = instance(1, zone="a"), instance(2, zone="b")
+        lb = LoadBalancer([local, remote], zone="a", consecutive_errors=1, max_ejection_percent=100)
+        assert {lb.choose() for _ in range(10)} == {local}
+        lb.record_failure(local)
+        assert {lb.choose() for _ in range(10)} == {remote}
+
+    def test_outlier_ejection_and_readmission(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr("discovery.time.monotonic", lambda: now[0])
+        bad, good = instance(1), instance(2)
+        lb = LoadBalancer([bad, good], consecutive_errors=3, base_ejection_secs=10)
+        for _ in range(3):
+            lb.record_failure(bad)
+        assert lb.available == (good,)
+        now[0] += 11
+        assert lb.choose() is not None
+        assert set(lb.available) == {bad, good}
+
+    def test_max_ejection_percent_keeps_capacity(self):
+        instances = [instance(n) for n in range(2)]
+        lb = LoadBalancer(instances, consecutive_errors=1, max_ejection_percent=50)
+        lb.record_failure(instances[0])
+        lb.record_failure(instances[1])
+        assert lb.available == (instances[1],)
+
+    def test_success_resets_error_streak(self):
+        bad, good = instance(1), instance(2)
+        lb = LoadBalancer([bad, good], consecutive_errors=2)
+        lb.record_failure(bad)
+        lb.record_success(bad, 1.0)
+        lb.record_failure(bad)
+        assert len(lb.available) == 2
+
+    def test_update_keeps_stats(self):
+        instances = [instance(n) for n in range(3)]
+        lb = LoadBalancer(instances[:2], consecutive_errors=1)
+        lb.record_failure(instances[0])
+        lb.update(instances)
+        assert instances[0] not in lb.available
+        assert len(lb.available) == 2
+
+
+class TestDiscoveryClient:
+    def test_refresh_from_registry(self, fake_server):
+        store = MetricsStore()
+        services = [
+            {"serviceName": "orders", "hostName": f"h{n}", "httpPort": 8080 + n,
+             "healthEndpointPath": "/h", "infoEndpointPath": "/i"}
+            for n in range(3)
+        ]
+        for service in services:
+            register_instance(service, store)
+        update_status(services[2], "OUT_OF_SERVICE")
+
+        client = DiscoveryClient()
+        view = client.refresh()
+        assert len(view) == 3
+        chosen = {pick(client, "orders").host_name for _ in range(10)}
+        assert chosen == {"h0", "h1"}
+
+        update_status(services[2], "UP")
+        client.refresh()
+        assert {pick(client, "orders").host_name for _ in range(10)} == {"h0", "h1", "h2"}
+
+    def test_fetch_error(self, monkeypatch):
+        monkeypatch.setattr(eureka_client_lib, "EUREKA_SERVER_URL", "http://127.0.0.1:1/eureka/apps/")
+        with pytest.raises(DiscoveryError):
+            fetch_registry()
+
+    def test_unknown_app(self):
+        client = DiscoveryClient()
+        client.apply(RegistryView({}))
+        assert client.choose("missing") is None
@@ -1,6 +1,7 @@
 import threading
 from unittest.mock import patch, MagicMock
 
+import pytest
 import requests
 
 from eureka_client_lib import (
@@ -9,6 +10,9 @@ from eureka_client_lib import (
     register_instance,
     send_heartbeat,
     deregister_instance,
+    eureka_lifecycle,
+    update_metadata,
+    update_status,
 )
 
 SERVICE_DATA = {
@@ -78,7 +82,7 @@ class TestRegisterInstance:
     def test_success_204(self):
         store = MetricsStore()
         mock_resp = MagicMock(status_code=204)
-        with patch("eureka_client_lib.requests.post", return_value=mock_resp):
+        with patch("eureka_transport.requests.post", return_value=mock_resp):
             result = register_instance(SERVICE_DATA, store)
         assert result is True
         data = store.get_metrics_data()
@@ -88,7 +92,7 @@ class TestRegisterInstance:
     def test_failure_non_204(self):
         store = MetricsStore()
         mock_resp = MagicMock(status_code=500, text="Internal Error")
-        with patch("eureka_client_lib.requests.post", return_value=mock_resp):
+        with patch("eureka_transport.requests.post", return_value=mock_resp):
             result = register_instance(SERVICE_DATA, store)
         assert result is False
         data = store.get_metrics_data()
@@ -97,7 +101,7 @@ class TestRegisterInstance:
 
     def test_connection_error(self):
         store = MetricsStore()
-        with patch("eureka_client_lib.requests.post", side_effect=requests.exceptions.ConnectionError):
+        with patch("eureka_transport.requests.post", side_effect=requests.exceptions.ConnectionError):
             result = register_instance(SERVICE_DATA, store)
         assert result is False
         assert store.get_metrics_data()["registration_errors_total"] == 1
@@ -106,7 +110,7 @@ class TestRegisterInstance:
         store = MetricsStore()
         ssl_data = {**SERVICE_DATA, "sslPreferred": True, "securePort": 8443}
         mock_resp = MagicMock(status_code=204)
-        with patch("eureka_client_lib.requests.post", return_value=mock_resp) as mock_post:
+        with patch("eureka_transport.requests.post", return_value=mock_resp) as mock_post:
             register_instance(ssl_data, store)
         xml_payload = mock_post.call_args[1]["data"]
         assert "https://" in xml_payload
@@ -114,7 +118,7 @@ class TestRegisterInstance:
     def test_no_ssl_uses_http_urls(self):
         store = MetricsStore()
         mock_resp = MagicMock(status_code=204)
-        with patch("eureka_client_lib.requests.post", return_value=mock_resp) as mock_post:
+        with patch("eureka_transport.requests.post", return_value=mock_resp) as mock_post:
             register_instance(SERVICE_DATA, store)
         xml_payload = mock_post.call_args[1]["data"]
         assert "http://" in xml_payload
@@ -123,7 +127,7 @@ class TestRegisterInstance:
         """instanceId muss das Format hostname:SERVICENAME:port haben."""
         store = MetricsStore()
         mock_resp = MagicMock(status_code=204)
-        with patch("eureka_client_lib.requests.post", return_value=mock_resp) as mock_post:
+        with patch("eureka_transport.requests.post", return_value=mock_resp) as mock_post:
             register_instance(SERVICE_DATA, store)
         xml_payload = mock_post.call_args[1]["data"]
         assert "localhost:TESTSERVICE:8080" in xml_payload
@@ -133,7 +137,7 @@ class TestSendHeartbeat:
     def test_success_200(self):
         store = MetricsStore()
         mock_resp = MagicMock(status_code=200)
-        with patch("eureka_client_lib.requests.put", return_value=mock_resp):
+        with patch("eureka_transport.requests.put", return_value=mock_resp):
             result = send_heartbeat(SERVICE_DATA, store)
         assert result is True
 
@@ -142,14 +146,14 @@ class TestSendHeartbeat:
         not_found = MagicMock(status_code=404)
         ok = MagicMock(status_code=200)
         reg_ok = MagicMock(status_code=204)
-        with patch("eureka_client_lib.requests.put", side_effect=[not_found, ok]), \
-             patch("eureka_client_lib.requests.post", return_value=reg_ok):
+        with patch("eureka_transport.requests.put", side_effect=[not_found, ok]), \
+             patch("eureka_transport.requests.post", return_value=reg_ok):
             result = send_heartbeat(SERVICE_DATA, store, max_retries=3)
         assert result is True
 
     def test_connection_error_exhausts_retries(self):
         store = MetricsStore()
-        with patch("eureka_client_lib.requests.put", side_effect=requests.exceptions.ConnectionError), \
+        with patch("eureka_transport.requests.put", side_effect=requests.exceptions.ConnectionError), \
              patch("eureka_client_lib.time.sleep"):
             result = send_heartbeat(SERVICE_DATA, store, max_retries=2)
         assert result is False
@@ -157,7 +161,7 @@ class TestSendHeartbeat:
     def test_non_200_non_404_exhausts_retries(self):
         store = MetricsStore()
         mock_resp = MagicMock(status_code=503, text="Service Unavailable")
-        with patch("eureka_client_lib.requests.put", return_value=mock_resp), \
+        with patch("eureka_transport.requests.put", return_value=mock_resp), \
              patch("eureka_client_lib.time.sleep"):
             result = send_heartbeat(SERVICE_DATA, store, max_retries=2)
         assert result is False
@@ -168,17 +172,89 @@ class TestDeregisterInstance:
         store = MetricsStore()
         store.set_service_registered_status("TESTSERVICE", 1)
         mock_resp = MagicMock(status_code=200)
-        with patch("eureka_client_lib.requests.delete", return_value=mock_resp):
+        with patch("eureka_transport.requests.delete", return_value=mock_resp):
             deregister_instance(SERVICE_DATA, store)
         assert store.get_metrics_data()["service_registered_status"]["TESTSERVICE"] == 0
 
     def test_connection_error_does_not_raise(self):
         store = MetricsStore()
-        with patch("eureka_client_lib.requests.delete", side_effect=requests.exceptions.ConnectionError):
+        with patch("eureka_transport.requests.delete", side_effect=requests.exceptions.ConnectionError):
             deregister_instance(SERVICE_DATA, store)  # darf keine Exception werfen
 
     def test_non_200_does_not_raise(self):
         store = MetricsStore()
         mock_resp = MagicMock(status_code=404, text="Not Found")
-        with patch("eureka_client_lib.requests.delete", return_value=mock_resp):
+        with patch("eureka_transport.requests.delete", return_value=mock_resp):
             deregister_instance(SERVICE_DATA, store)  # darf keine Exception werfen
+
+
+class TestStatusAndMetadata:
+    def test_out_of_service_uses_put_override(self):
+        mock_resp = MagicMock(status_code=200)
+        with patch("eureka_transport.requests.put", return_value=mock_resp) as mock_put:
+            assert update_status(SERVICE_DATA, "OUT_OF_SERVICE") is True
+        assert mock_put.call_args[0][0].endswith("/TESTSERVICE/localhost:TESTSERVICE:8080/status?value=OUT_OF_SERVICE")
+
+    def test_up_removes_override(self):
+        mock_resp = MagicMock(status_code=200)
+        with patch("eureka_transport.requests.delete", return_value=mock_resp) as mock_delete:
+            assert update_status(SERVICE_DATA, "UP") is True
+        assert mock_delete.call_args[0][0].endswith("/status?value=UP")
+
+    def test_unknown_status_is_rejected(self):
+        with pytest.raises(ValueError):
+            update_status(SERVICE_DATA, "SLEEPING")
+
+    def test_metadata_is_url_encoded(self):
+        mock_resp = MagicMock(status_code=200)
+        with patch("eureka_transport.requests.put", return_value=mock_resp) as mock_put:
+            assert update_metadata(SERVICE_DATA, {"version": "1.2 beta", "zone": "a"}) is True
+        assert mock_put.call_args[0][0].endswith("/metadata?version=1.2+beta&zone=a")
+
+    def test_metadata_failure_returns_false(self):
+        with patch("eureka_transport.requests.put", side_effect=requests.exceptions.ConnectionError):
+            assert update_metadata(SERVICE_DATA, {"zone": "a"}) is False
+
+    def test_configured_metadata_is_registered(self):
+        mock_resp = MagicMock(status_code=204)
+        with patch("eureka_transport.requests.post", return_value=mock_resp) as mock_post:
+            register_instance({**SERVICE_DATA, "metadata": {"zone": "a"}}, MetricsStore())
+        assert "<metadata><zone>a</zone></metadata>" in mock_post.call_args[1]["data"]
+
+
+class TestEurekaLifecycle:
+    def test_emits_lifecycle_events(self):
+        store = MetricsStore()
+        stop_event = threading.Event()
+        events = []
+
+        def heartbeat(*args, **kwargs):
+            stop_event.set()
+            return True
+
+        with patch("eureka_client_lib.register_instance", return_value=True), \
+             patch("eureka_client_lib.send_heartbeat", side_effect=heartbeat), \
+             patch("eureka_client_lib.deregister_instance"):
+            eureka_lifecycle(SERVICE_DATA, store, stop_event, on_event=lambda t, d: events.append((t, d)))
+
+        assert [t for t, _ in events] == ["registered", "heartbeat_ok", "deregistered", "stopped"]
+        assert "latency_ms" in events[1][1]
+
+    def test_listener_errors_do_not_stop_lifecycle(self):
+        store = MetricsStore()
+        stop_event = threading.Event()
+
+        def heartbeat(*args, **kwargs):
+            stop_event.set()
+            return True
+
+        def broken_listener(event_type, data):
+            raise RuntimeError("kaputt")
+
+        with patch("eureka_client_lib.register_instance", return_value=True), \
+             patch("eureka_client_lib.send_heartbeat", side_effect=heartbeat) as mock_hb, \
+             patch("eureka_client_lib.deregister_instance") as mock_dereg:
+            eureka_lifecycle(SERVICE_DATA, store, stop_event, on_event=broken_listener)
+
+        assert mock_hb.call_count == 1
+        assert mock_dereg.call_count == 1
@@ -0,0 +1,133 @@
+import gzip
+import json
+
+import pytest
+
+import eureka_client_lib
+import eureka_codec
+from discovery import DiscoveryError, fetch_registry, parse_registry_json
+from eureka_client_lib import MetricsStore, build_instance_dict, register_instance, update_status
+from fake_eureka_server import FakeEurekaServer
+
+SERVICE = {
+    "serviceName": "orders",
+    "hostName": "h1",
+    "httpPort": 8080,
+    "healthEndpointPath": "/health",
+    "infoEndpointPath": "/info",
+}
+
+
+@pytest.fixture
+def fake_server(monkeypatch):
+    server = FakeEurekaServer()
+    server.start()
+    monkeypatch.setattr(eureka_client_lib, "EUREKA_SERVER_URL", server.base_url)
+    yield server
+    server.stop()
+
+
+def services(count):
+    return [{**SERVICE, "hostName": f"h{n}", "httpPort": 8080 + n} for n in range(count)]
+
+
+class TestCodec:
+    def test_instance_dict(self):
+        instance = build_instance_dict(SERVICE, "10.0.0.1")["instance"]
+        assert instance["app"] == "ORDERS"
+        assert instance["ipAddr"] == "10.0.0.1"
+        assert instance["port"] == {"$": 8080, "@enabled": "true"}
+        assert instance["securePort"]["@enabled"] == "false"
+        assert instance["dataCenterInfo"]["@class"].endswith("DataCenterInfo")
+
+    def test_dumps_loads_roundtrip(self):
+        document = {"a": [1, 2], "b": {"$": "ü"}}
+        assert eureka_codec.loads(eureka_codec.dumps(document)) == document
+
+    def test_compress_request_threshold(self):
+        small, headers = eureka_codec.compress_request("x" * 10, {"Content-Type": "application/xml"})
+        assert small == "x" * 10
+        assert "Content-Encoding" not in headers
+
+        body = "y" * eureka_codec.GZIP_MIN_SIZE
+        compressed, headers = eureka_codec.compress_request(body, {"Content-Type": "application/xml"})
+        assert headers["Content-Encoding"] == "gzip"
+        assert isinstance(compressed, bytes)
+        assert gzip.decompress(compressed).decode() == body
+        assert eureka_codec.decode_content(compressed, {"content-encoding": "GZIP"}) == body.encode()
+
+    def test_json_detection(self):
+        assert eureka_codec.is_json_response(b"<applications/>", {"Content-Type": "application/json"})
+        assert not eureka_codec.is_json_response("{}", {"content-type": "application/xml"})
+        assert eureka_codec.is_json_response(b'  {"a": 1}', {})
+
+
+class TestJsonWireFormat:
+    def test_json_registration_and_fetch(self, fake_server, monkeypatch):
+        monkeypatch.setattr(eureka_client_lib, "EUREKA_WIRE_FORMAT", eureka_codec.FORMAT_JSON)
+        store = MetricsStore()
+        registered = services(3)
+        for service in registered:
+            assert register_instance(service, store)
+        update_status(registered[2], "OUT_OF_SERVICE")
+
+        json_view = fetch_registry(wire_format=eureka_codec.FORMAT_JSON)
+        xml_view = fetch_registry(wire_format=eureka_codec.FORMAT_XML)
+        assert json_view.applications == xml_view.applications
+        assert {instance.host_name for instance in json_view.instances("orders")} == {"h0", "h1"}
+        (first,) = [instance for instance in json_view.instances("orders") if instance.host_name == "h0"]
+        assert first.port == 8080
+        assert not first.secure
+
+    def test_gzip_registration(self, fake_server, monkeypatch):
+        monkeypatch.setattr(eureka_client_lib, "EUREKA_GZIP", True)
+        assert register_instance(SERVICE, MetricsStore())
+        assert len(fetch_registry()) == 1
+
+    def test_gzip_response(self, fake_server):
+        register_instance(SERVICE, MetricsStore())
+        response = eureka_client_lib.default_transport.request(
+            "GET", eureka_client_lib.EUREKA_SERVER_URL,
+            headers={"Accept": "application/json", "Accept-Encoding": "gzip"},
+        )
+        assert response.status_code == 200
+        assert response.headers.get("Content-Encoding", "").lower() == "gzip"
+
+
+class TestParseRegistryJson:
+    def test_single_objects_and_metadata_class(self):
+        document = {
+            "applications": {
+                "versions__delta": "7",
+                "apps__hashcode": "UP_1_",
+                "application": {
+                    "name": "billing",
+                    "instance": {
+                        "instanceId": "b1:billing:9000",
+                        "app": "BILLING",
+                        "hostName": "b1",
+                        "ipAddr": "10.0.0.9",
+                        "status": "UP",
+                        "port": {"$": "9000", "@enabled": "true"},
+                        "securePort": {"$": 9443, "@enabled": "true"},
+                        "vipAddress": "billing",
+                        "dataCenterInfo": {"@class": "x", "name": "MyOwn"},
+                        "metadata": {"@class": "java.util.Collections$EmptyMap", "zone": "b"},
+                    },
+                },
+            }
+        }
+        view = parse_registry_json(json.dumps(document))
+        (billing,) = view.instances("billing")
+        assert billing.port == 9000
+        assert billing.secure
+        assert billing.zone == "b"
+        assert billing.metadata == {"zone": "b"}
+        assert view.version == 7
+        assert view.hashcode == "UP_1_"
+
+    def test_invalid_json(self):
+        with pytest.raises(DiscoveryError):
+            parse_registry_json("{not json")
+        with pytest.raises(DiscoveryError):
+            parse_registry_json("[]")
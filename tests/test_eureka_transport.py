@@ -0,0 +1,205 @@
+import asyncio
+import socket
+import sys
+
+import pytest
+
+import eureka_client_lib
+from eureka_client_lib import (
+    MetricsStore,
+    async_deregister_instance,
+    async_eureka_lifecycle,
+    async_register_instance,
+    async_send_heartbeat,
+    async_update_metadata_batch,
+    async_update_status_batch,
+    deregister_instance,
+    register_instance,
+    send_heartbeat,
+)
+from eureka_transport import (
+    AsyncHTTPTransport,
+    RequestsTransport,
+    TransportConnectionError,
+    _read_response,
+    create_async_transport,
+)
+from fake_eureka_server import FakeEurekaServer
+
+SERVICE_DATA = {
+    "serviceName": "testservice",
+    "hostName": "localhost",
+    "httpPort": 8080,
+    "infoEndpointPath": "/actuator/info",
+    "healthEndpointPath": "/actuator/health",
+    "leaseInfo": {"renewalIntervalInSecs": 0.05, "durationInSecs": 90},
+}
+
+INSTANCE_KEY = ("TESTSERVICE", "localhost:TESTSERVICE:8080")
+
+
+@pytest.fixture
+def fake_server(monkeypatch):
+    server = FakeEurekaServer()
+    server.start()
+    monkeypatch.setattr(eureka_client_lib, "EUREKA_SERVER_URL", server.base_url)
+    yield server
+    server.stop()
+
+
+def _closed_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class TestRequestsTransport:
+    def test_sync_wrappers_against_fake_server(self, fake_server):
+        store = MetricsStore()
+        transport = RequestsTransport()
+        assert register_instance(SERVICE_DATA, store, transport=transport)
+        assert INSTANCE_KEY in fake_server.instances
+        assert send_heartbeat(SERVICE_DATA, store, transport=transport)
+        assert deregister_instance(SERVICE_DATA, store, transport=transport)
+        assert fake_server.instances == set()
+        assert store.get_metrics_data()["service_registered_status"]["TESTSERVICE"] == 0
+
+    def test_connection_error_is_wrapped(self):
+        with pytest.raises(TransportConnectionError):
+            RequestsTransport(timeout=1).request("PUT", f"http://127.0.0.1:{_closed_port()}/eureka/apps/X/y")
+
+
+class TestAsyncHTTPTransport:
+    def test_keep_alive_reuses_connection(self, fake_server):
+        async def run():
+            transport = AsyncHTTPTransport(max_connections_per_host=4)
+            for _ in range(20):
+                response = await transport.request("PUT", f"{fake_server.base_url}UNKNOWN/x")
+                assert response.status_code == 404
+            opened = transport.connections_opened
+            await transport.close()
+            return opened
+
+        assert asyncio.run(run()) == 1
+        assert fake_server.connections_accepted == 1
+
+    def test_concurrent_requests_share_limited_connections(self, fake_server):
+        async def run():
+            transport = AsyncHTTPTransport(max_connections_per_host=2)
+            responses = await asyncio.gather(
+                *(transport.request("PUT", f"{fake_server.base_url}UNKNOWN/{i}") for i in range(50))
+            )
+            await transport.close()
+            return responses
+
+        assert all(r.status_code == 404 for r in asyncio.run(run()))
+        assert fake_server.connections_accepted <= 2
+
+    def test_connection_refused_raises_transport_error(self):
+        async def run():
+            transport = AsyncHTTPTransport(timeout=1)
+            try:
+                await transport.request("PUT", f"http://127.0.0.1:{_closed_port()}/eureka/apps/X/y")
+            finally:
+                await transport.close()
+
+        with pytest.raises(TransportConnectionError):
+            asyncio.run(run())
+
+    def test_reads_chunked_body(self):
+        async def run():
+            reader = asyncio.StreamReader()
+            reader.feed_data(
+                b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+                b"5\r\nhello\r\n6\r\n world\r\n0\r\n\r\n"
+            )
+            reader.feed_eof()
+            return await _read_response(reader, "GET")
+
+        status, headers, body, keep_alive = asyncio.run(run())
+        assert status == 200
+        assert body == b"hello world"
+        assert keep_alive
+
+    def test_http2_falls_back_without_h2(self, monkeypatch):
+        monkeypatch.setitem(sys.modules, "h2", None)
+        assert isinstance(create_async_transport(http2=True), AsyncHTTPTransport)
+
+
+class TestAsyncLifecycle:
+    def test_register_heartbeat_deregister(self, fake_server):
+        async def run():
+            store = MetricsStore()
+            transport = AsyncHTTPTransport()
+            assert await async_register_instance(SERVICE_DATA, store, transport)
+            assert await async_send_heartbeat(SERVICE_DATA, store, transport)
+            assert await async_deregister_instance(SERVICE_DATA, store, transport)
+            await transport.close()
+            return store
+
+        store = asyncio.run(run())
+        assert store.get_metrics_data()["successful_registrations_total"] == 1
+        assert fake_server.instances == set()
+
+    def test_heartbeat_404_reregisters(self, fake_server):
+        async def run():
+            transport = AsyncHTTPTransport()
+            result = await async_send_heartbeat(SERVICE_DATA, MetricsStore(), transport)
+            await transport.close()
+            return result
+
+        assert asyncio.run(run())
+        assert INSTANCE_KEY in fake_server.instances
+        assert fake_server.request_counts == {"PUT": 2, "POST": 1}
+
+    def test_lifecycle_emits_events_and_deregisters(self, fake_server):
+        events = []
+
+        async def run():
+            stop_event = asyncio.Event()
+            transport = AsyncHTTPTransport()
+
+            def on_event(event_type, data):
+                events.append(event_type)
+                if event_type == "heartbeat_ok":
+                    stop_event.set()
+
+            await async_eureka_lifecycle(SERVICE_DATA, MetricsStore(), stop_event, transport, on_event=on_event)
+            await transport.close()
+
+        asyncio.run(run())
+        assert events == ["registered", "heartbeat_ok", "deregistered", "stopped"]
+        assert fake_server.instances == set()
+
+
+class TestBatchUpdates:
+    def test_status_and_metadata_for_many_instances(self, fake_server):
+        services = [{**SERVICE_DATA, "serviceName": f"svc{i}"} for i in range(20)]
+
+        async def run():
+            transport = AsyncHTTPTransport(max_connections_per_host=4)
+            store = MetricsStore()
+            for service in services:
+                await async_register_instance(service, store, transport)
+            status_results = await async_update_status_batch(services, "OUT_OF_SERVICE", transport, max_concurrency=8)
+            metadata_results = await async_update_metadata_batch(services, {"release": "42"}, transport)
+            opened = transport.connections_opened
+            await transport.close()
+            return status_results, metadata_results, opened
+
+        status_results, metadata_results, opened = asyncio.run(run())
+        assert len(status_results) == 20 and all(status_results.values())
+        assert all(metadata_results.values())
+        assert set(fake_server.status_overrides.values()) == {"OUT_OF_SERVICE"}
+        assert all(m == {"release": "42"} for m in fake_server.metadata.values())
+        assert opened <= 4
+        assert fake_server.request_counts["POST"] == 20
+
+    def test_unknown_instances_are_reported(self, fake_server):
+        async def run():
+            transport = AsyncHTTPTransport()
+            results = await async_update_status_batch([SERVICE_DATA], "DOWN", transport)
+            await transport.close()
+            return results
+
+        assert asyncio.run(run()) == {"localhost:TESTSERVICE:8080": False}
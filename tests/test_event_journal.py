@@ -0,0 +1,118 @@
+import threading
+import time
+
+import pytest
+
+import eureka_client_lib
+from eureka_client_lib import MetricsStore, eureka_lifecycle, register_instance, send_heartbeat
+from event_journal import EventJournal, JournalRegistry
+from fake_eureka_server import FakeEurekaServer
+
+SERVICE = {"serviceName": "journaled", "hostName": "localhost", "httpPort": 8123,
+           "healthEndpointPath": "/h", "infoEndpointPath": "/i"}
+
+
+@pytest.fixture
+def fake_server(monkeypatch):
+    server = FakeEurekaServer()
+    server.start()
+    monkeypatch.setattr(eureka_client_lib, "EUREKA_SERVER_URL", server.base_url)
+    yield server
+    server.stop()
+
+
+class TestEventJournal:
+    def test_record_and_entry_fields(self):
+        journal = EventJournal(8)
+        journal.record("registered", {"attempt": 2}, timestamp=100.0)
+        journal.record("heartbeat_ok", {"latency_ms": 12.3456}, timestamp=101.0)
+        journal.record("heartbeat_backoff", {"attempt": 1, "retry_in": 2}, timestamp=102.0)
+        assert not journal.record("unknown_event")
+        items, cursor = journal.query()
+        assert cursor is None
+        assert items == [
+            {"seq": 2, "time": 102.0, "event": "heartbeat_backoff", "retry_in": 2.0, "attempt": 1},
+            {"seq": 1, "time": 101.0, "event": "heartbeat_ok", "latency_ms": 12.346},
+            {"seq": 0, "time": 100.0, "event": "registered", "attempt": 2},
+        ]
+
+    def test_ring_overwrites_oldest(self):
+        journal = EventJournal(4)
+        for n in range(10):
+            journal.record("heartbeat_ok", {"latency_ms": n}, timestamp=float(n))
+        assert len(journal) == 4 and journal.total == 10
+        items, _ = journal.query()
+        assert [item["seq"] for item in items] == [9, 8, 7, 6]
+
+    def test_paging_with_cursor(self):
+        journal = EventJournal(100)
+        for n in range(25):
+            journal.record("heartbeat_ok" if n % 5 else "heartbeat_failed", {"latency_ms": n}, timestamp=float(n))
+        seen = []
+        cursor = None
+        while True:
+            items, cursor = journal.query(limit=10, before=cursor)
+            seen.extend(item["seq"] for item in items)
+            if cursor is None:
+                break
+        assert seen == list(range(24, -1, -1))
+
+    def test_filters(self):
+        journal = EventJournal(100)
+        for n in range(20):
+            journal.record("heartbeat_ok" if n % 5 else "heartbeat_failed", {"latency_ms": n * 10}, timestamp=float(n))
+        journal.record("stopped", timestamp=20.0)
+        failed, _ = journal.query(types={"heartbeat_failed"})
+        assert [item["seq"] for item in failed] == [15, 10, 5, 0]
+        recent, _ = journal.query(since=17.0)
+        assert [item["seq"] for item in recent] == [20, 19, 18, 17]
+        slow, _ = journal.query(min_latency_ms=170)
+        assert [item["latency_ms"] for item in slow] == [190.0, 180.0, 170.0]
+
+    def test_invalid_capacity(self):
+        with pytest.raises(ValueError):
+            EventJournal(0)
+
+
+class TestJournalRegistry:
+    def test_listener_creates_journal_per_service(self):
+        journals = JournalRegistry(capacity=16)
+        listener = journals.listener("ONE")
+        listener("registered", {"attempt": 1})
+        listener("not_journaled", {})
+        assert journals.get("TWO") is None
+        journal = journals.get("ONE")
+        assert journal is not None and journal.total == 1
+        journals.remove("ONE")
+        assert journals.get("ONE") is None
+
+
+class TestLifecycleEvents:
+    def test_reregistration_after_404(self, fake_server):
+        journals = JournalRegistry(capacity=16)
+        store = MetricsStore()
+        assert register_instance(SERVICE, store)
+        fake_server.instances.clear()
+        assert send_heartbeat(SERVICE, store, on_event=journals.listener("JOURNALED"))
+        items, _ = journals.journal("JOURNALED").query()
+        assert [item["event"] for item in items] == ["reregistered"]
+        assert items[0]["attempt"] == 1
+
+    def test_lifecycle_writes_journal(self, fake_server):
+        journals = JournalRegistry(capacity=64)
+        stop_event = threading.Event()
+        data = {**SERVICE, "leaseInfo": {"renewalIntervalInSecs": 0.05}}
+        thread = threading.Thread(target=eureka_lifecycle, args=(data, MetricsStore(), stop_event),
+                                  kwargs={"on_event": journals.listener("JOURNALED")})
+        thread.start()
+        time.sleep(0.3)
+        stop_event.set()
+        thread.join(timeout=5)
+
+        journal = journals.get("JOURNALED")
+        assert journal is not None
+        events = [item["event"] for item in reversed(journal.query(limit=1000)[0])]
+        assert events[0] == "registered"
+        assert events[-2:] == ["deregistered", "stopped"]
+        heartbeats, _ = journal.query(types={"heartbeat_ok"})
+        assert len(heartbeats) >= 2 and all("latency_ms" in item for item in heartbeats)
@@ -0,0 +1,209 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import eureka_client_lib
+from eureka_client_lib import MetricsStore, register_instance, update_status
+from eureka_transport import AsyncHTTPTransport, TransportResponse
+from fake_eureka_server import FakeEurekaServer
+from health_probe import STATUS_DOWN, STATUS_UP, HealthMonitor, HealthProber, evaluate_health
+
+
+class HealthBackend:
+    """Lokaler Health-Endpunkt mit umschaltbarer Antwort."""
+
+    def __init__(self):
+        backend = self
+        self.status_code = 200
+        self.body = '{"status":"UP"}'
+        self.delay = 0.0
+        self.requests = 0
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                backend.requests += 1
+                if backend.delay:
+                    threading.Event().wait(backend.delay)
+                payload = backend.body.encode()
+                self.send_response(backend.status_code)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def backend():
+    b = HealthBackend()
+    yield b
+    b.stop()
+
+
+@pytest.fixture
+def fake_server(monkeypatch):
+    server = FakeEurekaServer()
+    server.start()
+    monkeypatch.setattr(eureka_client_lib, "EUREKA_SERVER_URL", server.base_url)
+    yield server
+    server.stop()
+
+
+def service_for(backend):
+    return {
+        "serviceName": "probed",
+        "hostName": "127.0.0.1",
+        "httpPort": backend.port,
+        "healthEndpointPath": "/actuator/health",
+        "infoEndpointPath": "/actuator/info",
+    }
+
+
+INSTANCE = "PROBED"
+
+
+class TestEvaluateHealth:
+    def test_2xx_without_json_is_up(self):
+        assert evaluate_health(TransportResponse(200, "ok"))[0] == STATUS_UP
+
+    def test_actuator_down_is_down(self):
+        assert evaluate_health(TransportResponse(200, '{"status":"DOWN"}'))[0] == STATUS_DOWN
+
+    def test_5xx_is_down(self):
+        assert evaluate_health(TransportResponse(503, '{"status":"UP"}'))[0] == STATUS_DOWN
+
+
+class TestHealthProber:
+    def test_results_are_cached(self, backend):
+        async def run():
+            prober = HealthProber(AsyncHTTPTransport(), cache_ttl=60)
+            url = f"http://127.0.0.1:{backend.port}/actuator/health"
+            first = await prober.probe(url)
+            second = await prober.probe(url)
+            await prober.transport.close()
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert first.status == STATUS_UP
+        assert second is first
+        assert backend.requests == 1
+
+    def test_concurrent_probes_are_coalesced(self, backend):
+        backend.delay = 0.1
+
+        async def run():
+            prober = HealthProber(AsyncHTTPTransport(), cache_ttl=0)
+            url = f"http://127.0.0.1:{backend.port}/actuator/health"
+            results = await asyncio.gather(*(prober.probe(url) for _ in range(10)))
+            await prober.transport.close()
+            return results
+
+        assert all(r.status == STATUS_UP for r in asyncio.run(run()))
+        assert backend.requests == 1
+
+    def test_timeout_counts_as_down(self, backend):
+        backend.delay = 0.5
+
+        async def run():
+            prober = HealthProber(AsyncHTTPTransport(), timeout=0.05)
+            result = await prober.probe(f"http://127.0.0.1:{backend.port}/actuator/health")
+            await prober.transport.close()
+            return result
+
+        result = asyncio.run(run())
+        assert result.status == STATUS_DOWN
+        assert "Timeout" in result.detail
+
+
+class TestUpdateStatus:
+    def test_down_sets_override_and_up_removes_it(self, fake_server, backend):
+        service = service_for(backend)
+        register_instance(service, MetricsStore())
+        key = (INSTANCE, eureka_client_lib.get_instance_id(service))
+
+        assert update_status(service, STATUS_DOWN)
+        assert fake_server.status_overrides[key] == STATUS_DOWN
+        assert update_status(service, STATUS_UP)
+        assert key not in fake_server.status_overrides
+
+    def test_unknown_instance_fails(self, fake_server, backend):
+        assert not update_status(service_for(backend), STATUS_DOWN)
+
+
+class TestHealthMonitor:
+    def test_reports_only_status_changes(self, fake_server, backend):
+        service = service_for(backend)
+        register_instance(service, MetricsStore())
+        key = (INSTANCE, eureka_client_lib.get_instance_id(service))
+        changes = []
+
+        async def run():
+            transport = AsyncHTTPTransport()
+            monitor = HealthMonitor(
+                [(service, None)], transport, probe_interval=10,
+                prober=HealthProber(AsyncHTTPTransport(), cache_ttl=0),
+                on_change=lambda data, status: changes.append(status),
+            )
+            await monitor.probe_once()
+            assert key not in fake_server.status_overrides
+
+            backend.body = '{"status":"DOWN"}'
+            await monitor.probe_once()
+            assert fake_server.status_overrides[key] == STATUS_DOWN
+            await monitor.probe_once()
+
+            backend.body = '{"status":"UP"}'
+            await monitor.probe_once()
+            assert key not in fake_server.status_overrides
+            await transport.close()
+
+        asyncio.run(run())
+        assert changes == [STATUS_DOWN, STATUS_UP]
+        # Kein erneuter Registrierungs-POST durch die Statuswechsel
+        assert fake_server.request_counts["POST"] == 1
+
+    def test_failed_report_is_retried(self, fake_server, backend):
+        service = service_for(backend)
+        backend.status_code = 503
+
+        async def run():
+            transport = AsyncHTTPTransport()
+            monitor = HealthMonitor([(service, None)], transport, prober=HealthProber(AsyncHTTPTransport(), cache_ttl=0))
+            await monitor.probe_once()
+            assert monitor.reported_status[eureka_client_lib.get_instance_id(service)] == STATUS_UP
+
+            register_instance(service, MetricsStore())
+            await monitor.probe_once()
+            await transport.close()
+            return monitor
+
+        monitor = asyncio.run(run())
+        assert monitor.reported_status[eureka_client_lib.get_instance_id(service)] == STATUS_DOWN
+
+    def test_background_thread_start_stop(self, fake_server, backend):
+        service = service_for(backend)
+        register_instance(service, MetricsStore())
+        backend.status_code = 500
+        monitor = HealthMonitor([(service, None)], AsyncHTTPTransport(), probe_interval=0.05)
+        monitor.start()
+        try:
+            for _ in range(100):
+                if fake_server.status_overrides:
+                    break
+                threading.Event().wait(0.02)
+        finally:
+            monitor.stop()
+        assert list(fake_server.status_overrides.values()) == [STATUS_DOWN]
+        assert monitor._thread is not None and not monitor._thread.is_alive()
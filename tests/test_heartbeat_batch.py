@@ -0,0 +1,182 @@
+import asyncio
+import json
+
+import pytest
+
+import eureka_client_lib
+from eureka_client_lib import (
+    MetricsStore,
+    _heartbeat_batch_body,
+    _peer_replication_url,
+    async_eureka_lifecycle,
+    async_send_heartbeat_batch,
+    register_instance,
+    send_heartbeat_batch,
+)
+from eureka_transport import AsyncHTTPTransport
+from fake_eureka_server import FakeEurekaServer
+from heartbeat_batch import HeartbeatBatcher
+
+
+def service(n):
+    return {"serviceName": f"batched{n}", "hostName": "localhost", "httpPort": 8000 + n,
+            "healthEndpointPath": "/h", "infoEndpointPath": "/i"}
+
+
+@pytest.fixture
+def fake_server(monkeypatch):
+    server = FakeEurekaServer()
+    server.start()
+    monkeypatch.setattr(eureka_client_lib, "EUREKA_SERVER_URL", server.base_url)
+    yield server
+    server.stop()
+
+
+def register_all(count):
+    services = [service(n) for n in range(count)]
+    store = MetricsStore()
+    for data in services:
+        assert register_instance(data, store)
+    return services, store
+
+
+async def with_transport(coro_factory):
+    transport = AsyncHTTPTransport()
+    try:
+        return await coro_factory(transport)
+    finally:
+        await transport.close()
+
+
+class TestBatchRequest:
+    def test_url_and_body(self, monkeypatch):
+        monkeypatch.setattr(eureka_client_lib, "EUREKA_SERVER_URL", "http://gmk:8761/eureka/apps/")
+        assert _peer_replication_url() == "http://gmk:8761/eureka/peerreplication/batch"
+        body = json.loads(_heartbeat_batch_body([service(1)]))
+        assert body == {"replicationList": [{"appName": "BATCHED1", "id": "localhost:BATCHED1:8001", "action": "Heartbeat"}]}
+
+
+class TestSendHeartbeatBatch:
+    def test_single_request_for_all(self, fake_server):
+        services, store = register_all(5)
+        puts = fake_server.request_counts.get("PUT", 0)
+        results = send_heartbeat_batch(services, store)
+        assert all(results.values()) and len(results) == 5
+        assert fake_server.batched_heartbeats == 5
+        assert fake_server.request_counts.get("PUT", 0) == puts
+
+    def test_partial_failure_falls_back_to_reregistration(self, fake_server):
+        services, store = register_all(3)
+        fake_server.instances.discard(("BATCHED1", "localhost:BATCHED1:8001"))
+        results = send_heartbeat_batch(services, store)
+        assert all(results.values())
+        assert ("BATCHED1", "localhost:BATCHED1:8001") in fake_server.instances
+        # Nur die fehlende Instanz wurde einzeln nachgesendet (404 + Wiederholung nach Registrierung)
+        assert fake_server.request_counts["PUT"] == 2
+
+    def test_registry_without_batch_endpoint(self, fake_server):
+        fake_server.batch_enabled = False
+        services, store = register_all(3)
+        assert all(send_heartbeat_batch(services, store).values())
+        assert fake_server.request_counts["PUT"] == 3
+
+    def test_async_variant(self, fake_server):
+        services, store = register_all(4)
+        fake_server.instances.discard(("BATCHED0", "localhost:BATCHED0:8000"))
+        results = asyncio.run(with_transport(lambda t: async_send_heartbeat_batch(services, store, t)))
+        assert list(results) == [f"localhost:BATCHED{n}:{8000 + n}" for n in range(4)]
+        assert all(results.values())
+        assert fake_server.batched_heartbeats == 4
+
+
+class TestHeartbeatBatcher:
+    def test_concurrent_heartbeats_are_coalesced(self, fake_server):
+        services, store = register_all(20)
+
+        async def run(transport):
+            batcher = HeartbeatBatcher(transport, store, max_batch_size=8, linger=0.05)
+            results = await asyncio.gather(*(batcher.heartbeat(data) for data in services))
+            return batcher, results
+
+        batcher, results = asyncio.run(with_transport(run))
+        assert all(results)
+        assert batcher.requests_sent == 3  # 8 + 8 + 4
+        assert batcher.batched_heartbeats == 20
+        assert fake_server.request_counts.get("PUT", 0) == 0
+
+    def test_switches_to_single_puts_when_unsupported(self, fake_server):
+        fake_server.batch_enabled = False
+        services, store = register_all(3)
+
+        async def run(transport):
+            batcher = HeartbeatBatcher(transport, store, linger=0.01)
+            first = await asyncio.gather(*(batcher.heartbeat(data) for data in services))
+            second = await batcher.heartbeat(services[0])
+            return batcher, first, second
+
+        batcher, first, second = asyncio.run(with_transport(run))
+        assert all(first) and second
+        assert batcher.supported is False
+        assert fake_server.request_counts["PUT"] == 4
+
+    def test_invalid_batch_size(self):
+        with pytest.raises(ValueError):
+            HeartbeatBatcher(AsyncHTTPTransport(), MetricsStore(), max_batch_size=0)
+
+    def test_lifecycles_share_batches(self, fake_server):
+        services = [{**service(n), "leaseInfo": {"renewalIntervalInSecs": 0.05}} for n in range(10)]
+        store = MetricsStore()
+
+        async def run(transport):
+            stop = asyncio.Event()
+            batcher = HeartbeatBatcher(transport, store, linger=0.02)
+            tasks = [asyncio.ensure_future(async_eureka_lifecycle(data, store, stop, transport, heartbeat=batcher.heartbeat))
+                     for data in services]
+            await asyncio.sleep(0.3)
+            stop.set()
+            await asyncio.gather(*tasks)
+            return batcher
+
+        batcher = asyncio.run(with_transport(run))
+        assert batcher.batched_heartbeats >= 20
+        assert batcher.requests_sent < batcher.batched_heartbeats / 3
+        assert fake_server.request_counts.get("PUT", 0) == 0
+
+    @pytest.mark.parametrize("batch_enabled", [True, False])
+    def test_fallback_reports_events(self, fake_server, batch_enabled):
+        fake_server.batch_enabled = batch_enabled
+        services, store = register_all(2)
+        fake_server.instances.discard(("BATCHED0", "localhost:BATCHED0:8000"))
+        events = {0: [], 1: []}
+
+        async def run(transport):
+            batcher = HeartbeatBatcher(transport, store, linger=0.01)
+            if not batch_enabled:
+                batcher.supported = False
+            return await asyncio.gather(*(batcher.heartbeat(data, None, lambda event, _, n=n: events[n].append(event))
+                                          for n, data in enumerate(services)))
+
+        assert all(asyncio.run(with_transport(run)))
+        assert events[0] == ["reregistered"]
+        assert events[1] == []
+
+    def test_lifecycle_events_reach_batcher_fallback(self, fake_server):
+        data = {**service(0), "leaseInfo": {"renewalIntervalInSecs": 0.05}}
+        store = MetricsStore()
+        events = []
+
+        async def run(transport):
+            stop = asyncio.Event()
+            batcher = HeartbeatBatcher(transport, store, linger=0.01)
+            task = asyncio.ensure_future(async_eureka_lifecycle(data, store, stop, transport, heartbeat=batcher.heartbeat,
+                                                                on_event=lambda event, _: events.append(event)))
+            while "heartbeat_ok" not in events:
+                await asyncio.sleep(0.01)
+            fake_server.instances.clear()
+            while "reregistered" not in events:
+                await asyncio.sleep(0.01)
+            stop.set()
+            await task
+
+        asyncio.run(asyncio.wait_for(with_transport(run), 5))
+        assert events[0] == "registered" and "reregistered" in events
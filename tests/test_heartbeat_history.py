@@ -0,0 +1,127 @@
+import pytest
+
+from heartbeat_history import HeartbeatHistory, HistoryRegistry, _histogram_percentile
+
+NOW = 1_800_000_000.0  # Beginn eines Buckets bei 60 s Bucket-Länge
+
+
+class TestHistogramPercentile:
+    def test_interpolates_within_bin(self):
+        # 100 Werte in der Klasse 10..25 ms
+        histogram = [0, 0, 100] + [0] * 9
+        assert _histogram_percentile(histogram, 95, 30.0) == pytest.approx(10 + 15 * 0.95)
+
+    def test_capped_by_max_and_open_bin(self):
+        assert _histogram_percentile([0, 0, 100] + [0] * 9, 95, 12.0) == 12.0
+        assert _histogram_percentile([0] * 11 + [5], 95, 42000.0) == 42000.0
+        assert _histogram_percentile([0] * 12, 95, 0.0) is None
+
+
+class TestHeartbeatHistory:
+    def test_rollup_success_ratio_and_latency(self):
+        history = HeartbeatHistory(bucket_seconds=60, buckets=10)
+        for n in range(19):
+            history.record(True, 20.0, now=NOW + n)
+        history.record(False, 4000.0, now=NOW + 30)
+        stats = history.rollup(now=NOW + 59)
+        assert stats["ok"] == 19 and stats["failed"] == 1
+        assert stats["success_ratio"] == 0.95
+        assert stats["max_ms"] == 4000.0
+        assert 10 < stats["p95_ms"] <= 25
+        assert stats["avg_ms"] == pytest.approx((19 * 20 + 4000) / 20)
+
+    def test_window_limits_rollup(self):
+        history = HeartbeatHistory(bucket_seconds=60, buckets=10)
+        history.record(False, 100.0, now=NOW)
+        history.record(True, 10.0, now=NOW + 300)
+        assert history.rollup(window=60, now=NOW + 300)["failed"] == 0
+        assert history.rollup(window=600, now=NOW + 300)["failed"] == 1
+
+    def test_ring_reuses_buckets_after_full_cycle(self):
+        history = HeartbeatHistory(bucket_seconds=60, buckets=10)
+        history.record(False, 100.0, now=NOW)
+        # Gleicher Slot, eine Runde später: der alte Bucket wird geleert
+        history.record(True, 10.0, now=NOW + 600)
+        stats = history.rollup(now=NOW + 600)
+        assert stats["ok"] == 1 and stats["failed"] == 0
+        assert stats["max_ms"] == 10.0
+
+    def test_gap_clears_skipped_buckets(self):
+        history = HeartbeatHistory(bucket_seconds=60, buckets=10)
+        history.record(False, 100.0, now=NOW)
+        history.record(True, 10.0, now=NOW + 300)
+        assert history.rollup(now=NOW + 300)["failed"] == 1
+        # Sprung über den Ring hinweg: der alte Abschnitt fällt heraus, der neuere bleibt
+        history.record(True, 10.0, now=NOW + 660)
+        stats = history.rollup(now=NOW + 660)
+        assert stats["ok"] == 2 and stats["failed"] == 0
+
+    def test_late_record_within_and_outside_history(self):
+        history = HeartbeatHistory(bucket_seconds=60, buckets=10)
+        history.record(True, 10.0, now=NOW + 600)
+        history.record(False, 10.0, now=NOW)         # zu alt, nicht mehr im Ring
+        history.record(False, 10.0, now=NOW + 480)   # älter, aber noch im Ring
+        stats = history.rollup(now=NOW + 600)
+        assert stats["ok"] == 1 and stats["failed"] == 1
+
+    def test_overview_totals_match_rollup(self):
+        history = HeartbeatHistory(bucket_seconds=60, buckets=100)
+        for minute in range(150):
+            history.record(minute % 7 != 0, float(5 + minute % 90), now=NOW + minute * 60)
+        now = NOW + 149 * 60
+        for window in (None, 3600, 1000):
+            summary, series = history.overview(window, points=7, now=now)
+            assert summary == history.rollup(window, now=now)
+            assert sum(point["ok"] + point["failed"] for point in series) == summary["ok"] + summary["failed"]
+
+    def test_empty_window(self):
+        stats = HeartbeatHistory(buckets=10).rollup(now=NOW)
+        assert stats["success_ratio"] is None and stats["p95_ms"] is None and stats["avg_ms"] is None
+
+    def test_series_is_downsampled_and_aligned_to_now(self):
+        history = HeartbeatHistory(bucket_seconds=60, buckets=1440)
+        for minute in range(1440):
+            history.record(minute % 60 != 0, 10.0 + minute % 30, now=NOW + minute * 60)
+        now = NOW + 1439 * 60
+        series = history.series(points=24, now=now)
+        assert len(series) == 24
+        assert all(point["ok"] + point["failed"] == 60 for point in series)
+        assert all(point["failed"] == 1 for point in series)
+        assert series[-1]["t"] == NOW + 23 * 3600
+        assert series[0]["t"] == NOW
+
+    def test_series_with_more_points_than_buckets(self):
+        history = HeartbeatHistory(bucket_seconds=60, buckets=10)
+        history.record(True, 5.0, now=NOW)
+        series = history.series(points=96, now=NOW)
+        assert len(series) == 10
+        assert series[-1]["ok"] == 1 and series[0]["ok"] == 0
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            HeartbeatHistory(bucket_seconds=0)
+        with pytest.raises(ValueError):
+            HeartbeatHistory().series(points=0)
+
+    def test_memory_is_fixed(self):
+        history = HeartbeatHistory()
+        sizes = [len(history._ok), len(history._histogram)]
+        for n in range(5000):
+            history.record(n % 7 != 0, float(n % 300), now=NOW + n * 37)
+        assert [len(history._ok), len(history._histogram)] == sizes
+
+
+class TestHistoryRegistry:
+    def test_feeds_from_lifecycle_events(self):
+        registry = HistoryRegistry(bucket_seconds=60, buckets=10)
+        listener = registry.listener("ONE")
+        listener("heartbeat_ok", {"latency_ms": 12.0})
+        listener("heartbeat_failed", {"latency_ms": 3000.0})
+        listener("registered", {"attempt": 1})
+        assert registry.names() == ["ONE"]
+        history = registry.get("ONE")
+        assert history is not None
+        stats = history.rollup()
+        assert stats["ok"] == 1 and stats["failed"] == 1
+        registry.remove("ONE")
+        assert registry.get("ONE") is None
@@ -0,0 +1,147 @@
+import asyncio
+import time
+
+import pytest
+
+import eureka_client_lib
+import load_generator
+from eureka_transport import AsyncHTTPTransport, TransportResponse
+from fake_eureka_server import FakeEurekaServer
+from load_generator import (
+    OP_FETCH,
+    OP_HEARTBEAT,
+    OP_REGISTER,
+    LoadGenerator,
+    LoadResult,
+    parse_mix,
+    run_load_test,
+    schedule,
+    summarize,
+    synthesize_instances,
+)
+
+
+@pytest.fixture
+def fake_server(monkeypatch):
+    server = FakeEurekaServer()
+    server.start()
+    monkeypatch.setattr(eureka_client_lib, "EUREKA_SERVER_URL", server.base_url)
+    yield server
+    server.stop()
+
+
+class StallingTransport:
+    """Antwortet nach `stall` Sekunden und blockiert dabei den Event-Loop (wie eine GC-Pause)."""
+    def __init__(self, stall):
+        self.stall = stall
+
+    async def request(self, method, url, data=None, headers=None):
+        time.sleep(self.stall)
+        return TransportResponse(200, "", {})
+
+    async def close(self):
+        pass
+
+
+class TestParseMix:
+    def test_normalizes_weights(self):
+        assert parse_mix("heartbeat=3,fetch=1") == {OP_HEARTBEAT: 0.75, OP_FETCH: 0.25}
+        assert parse_mix("register=1,fetch=0") == {OP_REGISTER: 1.0}
+
+    @pytest.mark.parametrize("spec", ["heartbeat", "delete=1", "fetch=0", "heartbeat=-1,fetch=2"])
+    def test_invalid(self, spec):
+        with pytest.raises(ValueError):
+            parse_mix(spec)
+
+
+class TestSchedule:
+    def test_fixed_rate(self):
+        arrivals = list(schedule(100, 1.0, {OP_HEARTBEAT: 1.0}))
+        assert len(arrivals) == 100
+        assert arrivals[1][0] == pytest.approx(0.01)
+        assert {op for _, op in arrivals} == {OP_HEARTBEAT}
+
+    def test_poisson_keeps_mean_rate_and_is_reproducible(self):
+        mix = parse_mix("heartbeat=9,fetch=1")
+        arrivals = list(schedule(1000, 10.0, mix, poisson=True, seed=7))
+        assert 9500 < len(arrivals) < 10500
+        assert 0.08 < sum(1 for _, op in arrivals if op == OP_FETCH) / len(arrivals) < 0.12
+        assert arrivals == list(schedule(1000, 10.0, mix, poisson=True, seed=7))
+
+    def test_invalid_rate(self):
+        with pytest.raises(ValueError):
+            list(schedule(0, 1.0, {OP_FETCH: 1.0}))
+
+
+class TestSynthesizeInstances:
+    def test_spreads_instances_over_apps(self):
+        instances = synthesize_instances(25, apps=4)
+        assert len(instances) == 25
+        assert len({eureka_client_lib.get_instance_id(data) for data in instances}) == 25
+        per_app = {}
+        for data in instances:
+            per_app[data["serviceName"]] = per_app.get(data["serviceName"], 0) + 1
+        assert sorted(per_app.values()) == [6, 6, 6, 7]
+
+    def test_fewer_instances_than_apps(self):
+        assert len(synthesize_instances(2, apps=10)) == 2
+
+
+class TestLoadGenerator:
+    def test_drives_operations_against_server(self, fake_server):
+        async def run():
+            transport = AsyncHTTPTransport(max_connections_per_host=8)
+            try:
+                generator = LoadGenerator(synthesize_instances(20, apps=2), transport)
+                assert await generator.register_all() == 0
+                return await generator.run(200, 0.5, parse_mix("heartbeat=8,fetch=1,register=1"))
+            finally:
+                await transport.close()
+
+        results = asyncio.run(run())
+        assert len(results) == 100
+        assert all(result.ok for result in results)
+        assert len(fake_server.instances) == 20
+        counts = fake_server.request_counts
+        assert counts["PUT"] + counts["GET"] + counts["POST"] == 100 + 20
+
+    def test_latency_includes_stalls(self):
+        # Jeder Request blockiert den Generator; die Service-Zeit bleibt bei 20 ms, die korrigierte Latenz wächst
+        generator = LoadGenerator(synthesize_instances(1, apps=1), StallingTransport(0.02))
+        results = asyncio.run(generator.run(200, 0.25, {OP_FETCH: 1.0}))
+        summary = summarize(results, 0.25)[OP_FETCH]
+        assert summary["service_p99_ms"] < 40
+        assert summary["p99_ms"] > 3 * summary["service_p99_ms"]
+        assert summary["max_lag_ms"] > 100
+
+
+class TestSummarize:
+    def test_error_rates_and_percentiles(self):
+        results = [LoadResult(OP_HEARTBEAT, 200, float(ms), float(ms), 0.0) for ms in range(1, 100)]
+        results += [LoadResult(OP_HEARTBEAT, 404, 100.0, 100.0, 0.0), LoadResult(OP_REGISTER, 204, 5.0, 1.0, 4.0)]
+        summary = summarize(results, 10.0)
+        heartbeat = summary[OP_HEARTBEAT]
+        assert heartbeat["count"] == 100 and heartbeat["errors"] == 1
+        assert heartbeat["error_rate"] == 0.01
+        assert heartbeat["statuses"] == {"200": 99, "404": 1}
+        assert heartbeat["p50_ms"] == 50 and heartbeat["p99_ms"] == 99 and heartbeat["max_ms"] == 100
+        assert heartbeat["rate"] == 10.0
+        assert summary[OP_REGISTER]["errors"] == 0 and summary[OP_REGISTER]["max_lag_ms"] == 4.0
+
+
+class TestRunLoadTest:
+    def test_local_stand_in(self):
+        report = asyncio.run(run_load_test(50, 200, 0.5, parse_mix("heartbeat=9,fetch=1"), apps=5))
+        assert report["failed_registrations"] == 0
+        operations = report["operations"]
+        assert operations[OP_HEARTBEAT]["count"] + operations[OP_FETCH]["count"] == 100
+        assert all(stats["errors"] == 0 for stats in operations.values())
+        assert eureka_client_lib.EUREKA_SERVER_URL != report["target"]
+        assert 0 < report["achieved_rate"] <= 200 * 1.05
+
+    def test_achieved_rate_reflects_saturation(self, monkeypatch):
+        # Jeder Request blockiert 10 ms: mehr als ~100/s sind nicht erreichbar, geplant sind 400/s
+        monkeypatch.setattr(load_generator, "AsyncHTTPTransport", lambda **kwargs: StallingTransport(0.01))
+        report = asyncio.run(run_load_test(1, 400, 0.25, {OP_FETCH: 1.0}, apps=1))
+        assert report["operations"][OP_FETCH]["count"] == 100
+        assert report["achieved_rate"] < 150
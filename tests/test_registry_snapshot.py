@@ -0,0 +1,136 @@
+import time
+
+import pytest
+
+import eureka_client_lib
+from discovery import DiscoveredInstance, DiscoveryClient, RegistryView
+from eureka_client_lib import MetricsStore, register_instance
+from fake_eureka_server import FakeEurekaServer
+from registry_snapshot import SnapshotError, decode_snapshot, encode_snapshot, load_snapshot, save_snapshot
+
+
+def make_view(apps=3, per_app=4):
+    applications = {
+        f"APP{a}": [
+            DiscoveredInstance(f"h{i}:APP{a}:80", f"APP{a}", f"h{i}", f"10.0.{a}.{i}", 8080 + i, 8443, i % 2 == 0,
+                               "UP" if i else "DOWN", "zone-a", f"app{a}", {"zone": "zone-a", "release": str(i)})
+            for i in range(per_app)
+        ]
+        for a in range(apps)
+    }
+    return RegistryView(applications, version=7)
+
+
+class TestSnapshotFormat:
+    def test_roundtrip(self):
+        view = make_view()
+        restored, saved_at = decode_snapshot(encode_snapshot(view, saved_at=123.0))
+        assert saved_at == 123.0
+        assert restored.version == 7
+        assert restored.hashcode == view.hashcode == "DOWN_3_UP_9_"
+        assert restored.applications == view.applications
+
+    def test_negative_version(self):
+        restored, _ = decode_snapshot(encode_snapshot(RegistryView({}, -1)))
+        assert restored.version == -1
+
+    def test_strings_are_stored_once(self):
+        small = len(encode_snapshot(make_view(apps=1, per_app=1)))
+        large = len(encode_snapshot(make_view(apps=1, per_app=100)))
+        # Wiederholte Werte (Status, Zone, App) kosten nur Indizes
+        assert large - small < 100 * 90
+
+    def test_corruption_is_detected(self):
+        data = bytearray(encode_snapshot(make_view()))
+        data[-1] ^= 0xFF
+        with pytest.raises(SnapshotError):
+            decode_snapshot(bytes(data))
+
+    def test_unknown_magic(self):
+        with pytest.raises(SnapshotError):
+            decode_snapshot(b"XXXX" + encode_snapshot(make_view())[4:])
+
+    def test_load_missing_or_broken_file(self, tmp_path):
+        assert load_snapshot(str(tmp_path / "missing.bin")) is None
+        broken = tmp_path / "broken.bin"
+        broken.write_bytes(b"EKRS\x01")
+        assert load_snapshot(str(broken)) is None
+
+    def test_large_snapshot_loads_quickly(self, tmp_path):
+        path = str(tmp_path / "registry.bin")
+        save_snapshot(make_view(apps=100, per_app=100), path)
+        start = time.perf_counter()
+        view = load_snapshot(path)
+        elapsed = time.perf_counter() - start
+        assert view is not None and len(view) == 10000
+        assert elapsed < 1.0
+
+
+class TestWarmStart:
+    def test_warm_start_then_reconcile(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "registry.bin")
+        save_snapshot(make_view(apps=1, per_app=2), path)
+
+        server = FakeEurekaServer()
+        server.start()
+        monkeypatch.setattr(eureka_client_lib, "EUREKA_SERVER_URL", server.base_url)
+        try:
+            register_instance({"serviceName": "app0", "hostName": "localhost", "httpPort": 9999,
+                               "healthEndpointPath": "/h", "infoEndpointPath": "/i"}, MetricsStore())
+            client = DiscoveryClient(snapshot_path=path)
+            client.start(interval=60)
+            # Sofort nutzbar aus dem Snapshot (Instanz h1 ist UP)
+            try:
+                for _ in range(100):
+                    if client.view.instances("APP0")[0].port == 9999:
+                        break
+                    time.sleep(0.02)
+            finally:
+                client.stop()
+        finally:
+            server.stop()
+
+        assert [i.port for i in client.view.instances("APP0")] == [9999]
+        persisted = load_snapshot(path)
+        assert persisted is not None and [i.port for i in persisted.instances("APP0")] == [9999]
+
+    def test_replaced_instance_with_same_status_counts_is_saved(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "registry.bin")
+        server = FakeEurekaServer()
+        server.start()
+        monkeypatch.setattr(eureka_client_lib, "EUREKA_SERVER_URL", server.base_url)
+        saves = []
+        monkeypatch.setattr("registry_snapshot.save_snapshot", lambda view, target: saves.append(view))
+        try:
+            client = DiscoveryClient(snapshot_path=path)
+            register_instance({"serviceName": "app0", "hostName": "old", "httpPort": 9001,
+                               "healthEndpointPath": "/h", "infoEndpointPath": "/i"}, MetricsStore())
+            first = client.refresh()
+            client.refresh()
+            server.instances.clear()
+            register_instance({"serviceName": "app0", "hostName": "new", "httpPort": 9002,
+                               "healthEndpointPath": "/h", "infoEndpointPath": "/i"}, MetricsStore())
+            second = client.refresh()
+        finally:
+            server.stop()
+
+        # Gleicher Hashcode (UP_1_) und gleiche Version, trotzdem neu gespeichert
+        assert (first.version, first.hashcode) == (second.version, second.hashcode)
+        assert [[i.port for i in view.instances("APP0")] for view in saves] == [[9001], [9002]]
+
+    def test_digest_ignores_order(self):
+        view = make_view()
+        reordered = RegistryView({app: list(reversed(items)) for app, items in reversed(list(view.applications.items()))})
+        assert view.digest() == reordered.digest()
+        assert view.digest() != make_view(per_app=3).digest()
+
+    def test_unencodable_view_does_not_abort_refresh(self, tmp_path):
+        client = DiscoveryClient(snapshot_path=str(tmp_path / "registry.bin"))
+        view = make_view(apps=1, per_app=1)
+        broken = RegistryView({"APP0": [view.instances("APP0", only_up=False)[0]._replace(port=70000)]})
+        client._save_snapshot(broken, broken.digest())
+        assert client._snapshot_digest is None
+        assert load_snapshot(str(tmp_path / "registry.bin")) is None
+
+    def test_warm_start_without_snapshot(self, tmp_path):
+        assert DiscoveryClient(snapshot_path=str(tmp_path / "none.bin")).warm_start() is False
@@ -0,0 +1,181 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import eureka_client_lib
+from discovery import DiscoveredInstance, DiscoveryClient, RegistryView
+from eureka_client_lib import MetricsStore, register_instance
+from fake_eureka_server import FakeEurekaServer
+from registry_watch import RegistryWatcher
+
+
+def instance(n, app="APP", status="UP", vip="app", port=80):
+    return DiscoveredInstance(f"host{n}:{app}:80", app, f"host{n}", f"10.0.0.{n}", port, 443, False, status, "a", vip, {})
+
+
+def view(*instances, version=0):
+    applications = {}
+    for item in instances:
+        applications.setdefault(item.app, []).append(item)
+    return RegistryView(applications, version)
+
+
+def ids(instances):
+    return [i.instance_id for i in instances]
+
+
+@pytest.fixture
+def fake_server(monkeypatch):
+    server = FakeEurekaServer()
+    server.start()
+    monkeypatch.setattr(eureka_client_lib, "EUREKA_SERVER_URL", server.base_url)
+    yield server
+    server.stop()
+
+
+class TestRegistryWatcher:
+    def test_initial_state_and_diffs(self):
+        watcher = RegistryWatcher()
+        watcher.publish(view(instance(1), instance(2), version=1))
+        subscription = watcher.watch(app="app")
+        first = subscription.take(timeout=1)
+        assert first is not None and ids(first.added) == ["host1:APP:80", "host2:APP:80"]
+
+        moved = instance(2, port=8080)
+        watcher.publish(view(instance(1), moved, instance(3), version=2))
+        diff = subscription.take(timeout=1)
+        assert diff is not None
+        assert ids(diff.added) == ["host3:APP:80"] and diff.removed == ()
+        assert diff.changed == ((instance(2), moved),)
+        assert diff.version == 2 and diff.updates == 1
+
+    def test_down_instance_counts_as_removed(self):
+        watcher = RegistryWatcher()
+        subscription = watcher.watch(app="APP")
+        watcher.publish(view(instance(1)))
+        assert subscription.take(timeout=1) is not None
+        watcher.publish(view(instance(1, status="DOWN")))
+        diff = subscription.take(timeout=1)
+        assert diff is not None and ids(diff.removed) == ["host1:APP:80"]
+
+    def test_unchanged_and_unrelated_updates_are_silent(self):
+        watcher = RegistryWatcher()
+        subscription = watcher.watch(app="APP")
+        watcher.publish(view(instance(1)))
+        assert subscription.take(timeout=1) is not None
+        watcher.publish(view(instance(1), instance(5, app="OTHER")))
+        assert subscription.take(timeout=0.05) is None
+
+    def test_coalesces_for_slow_subscriber(self):
+        watcher = RegistryWatcher()
+        subscription = watcher.watch(app="APP")
+        watcher.publish(view(instance(1), instance(2)))
+        watcher.publish(view(instance(1), instance(3)))  # 2 kam und ging wieder
+        watcher.publish(view(instance(1, port=81), instance(3)))
+        diff = subscription.take(timeout=1)
+        assert diff is not None
+        assert ids(diff.added) == ["host1:APP:80", "host3:APP:80"]
+        assert diff.added[0].port == 81
+        assert diff.removed == () and diff.changed == ()
+        assert diff.updates == 3 and subscription.coalesced == 2
+
+    def test_removal_cancels_pending_addition(self):
+        watcher = RegistryWatcher()
+        watcher.publish(view(instance(1)))
+        subscription = watcher.watch(app="APP")
+        watcher.publish(view())
+        assert subscription.take(timeout=0.05) is None
+
+    def test_older_view_is_ignored(self):
+        watcher = RegistryWatcher()
+        subscription = watcher.watch(app="APP")
+        watcher.publish(view(instance(1), instance(2), version=5))
+        assert subscription.take(timeout=1) is not None
+        watcher.publish(view(instance(1), version=4))
+        assert subscription.take(timeout=0.05) is None
+
+    def test_watch_by_vip(self):
+        watcher = RegistryWatcher()
+        subscription = watcher.watch(vip="orders")
+        watcher.publish(view(instance(1, app="ORDERS", vip="orders"), instance(2, app="OTHER", vip="other")))
+        diff = subscription.take(timeout=1)
+        assert diff is not None and diff.key == "vip:orders" and ids(diff.added) == ["host1:ORDERS:80"]
+
+    def test_close_stops_delivery(self):
+        watcher = RegistryWatcher()
+        subscription = watcher.watch(app="APP")
+        subscription.close()
+        watcher.publish(view(instance(1)))
+        assert subscription.take(timeout=0.05) is None
+        assert watcher._subscriptions == {}
+
+    def test_requires_exactly_one_key(self):
+        with pytest.raises(ValueError):
+            RegistryWatcher().watch()
+        with pytest.raises(ValueError):
+            RegistryWatcher().watch(app="APP", vip="app")
+
+    def test_callback_subscriber(self):
+        watcher = RegistryWatcher()
+        received = []
+        done = threading.Event()
+
+        def callback(diff):
+            received.append(diff)
+            if sum(len(d.added) for d in received) >= 3:
+                done.set()
+
+        subscription = watcher.subscribe(callback, app="APP")
+        for n in range(1, 4):
+            watcher.publish(view(*[instance(k) for k in range(1, n + 1)]))
+        assert done.wait(timeout=2)
+        assert sorted(i.instance_id for d in received for i in d.added) == ["host1:APP:80", "host2:APP:80", "host3:APP:80"]
+        subscription.close()
+
+    def test_failing_callback_keeps_subscription(self):
+        watcher = RegistryWatcher()
+        calls = []
+        done = threading.Event()
+
+        def callback(diff):
+            calls.append(diff)
+            if len(calls) == 2:
+                done.set()
+            raise RuntimeError("kaputt")
+
+        subscription = watcher.subscribe(callback, app="APP")
+        watcher.publish(view(instance(1)))
+        time.sleep(0.05)
+        watcher.publish(view(instance(1), instance(2)))
+        assert done.wait(timeout=2)
+        subscription.close()
+
+    def test_async_iterator(self):
+        async def run():
+            watcher = RegistryWatcher()
+            subscription = watcher.watch_async(app="APP")
+            loop = asyncio.get_running_loop()
+            loop.run_in_executor(None, watcher.publish, view(instance(1)))
+            diffs = []
+            async for diff in subscription:
+                diffs.append(diff)
+                subscription.close()
+            return diffs
+
+        diffs = asyncio.run(run())
+        assert len(diffs) == 1 and ids(diffs[0].added) == ["host1:APP:80"]
+
+
+class TestDiscoveryIntegration:
+    def test_refresh_publishes_to_watcher(self, fake_server):
+        client = DiscoveryClient()
+        watcher = RegistryWatcher(client)
+        subscription = watcher.watch(app="watched")
+        service = {"serviceName": "watched", "hostName": "localhost", "httpPort": 8123,
+                   "healthEndpointPath": "/h", "infoEndpointPath": "/i"}
+        assert register_instance(service, MetricsStore())
+        client.refresh()
+        diff = subscription.take(timeout=1)
+        assert diff is not None and [i.app for i in diff.added] == ["WATCHED"]
@@ -0,0 +1,107 @@
+import gc
+import threading
+import time
+import urllib.request
+from http.server import HTTPServer
+
+import pytest
+
+import eureka_client_lib
+from eureka_client_lib import MetricsStore, eureka_lifecycle
+from fake_eureka_server import FakeEurekaServer
+from metrics_exporter import create_metrics_handler
+from runtime_metrics import GCPauseTracker, RuntimeMetrics, read_rss_bytes
+
+
+def scrape(metrics_store, runtime_metrics=None):
+    server = HTTPServer(("127.0.0.1", 0), create_metrics_handler(metrics_store, {}, runtime_metrics))
+    thread = threading.Thread(target=server.handle_request)
+    thread.start()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics") as response:
+            return response.read().decode()
+    finally:
+        thread.join()
+        server.server_close()
+
+
+class TestRuntimeMetrics:
+    def test_collect(self):
+        stop = threading.Event()
+        worker = threading.Thread(target=stop.wait, name="eureka-DEMO")
+        worker.start()
+        try:
+            data = RuntimeMetrics(configured_lifecycles=2).collect()
+        finally:
+            stop.set()
+            worker.join()
+        assert data["threads"] >= 2
+        assert data["lifecycle_threads"] == 1
+        assert data["configured_lifecycles"] == 2
+        if read_rss_bytes() is not None:
+            assert data["rss_bytes"] > 1024 * 1024
+            assert data["open_fds"] > 0
+
+    def test_gc_pauses_are_tracked(self):
+        tracker = GCPauseTracker()
+        tracker.install()
+        try:
+            gc.collect()
+        finally:
+            tracker.uninstall()
+        assert tracker.collections[2] >= 1
+        assert tracker.pause_seconds[2] > 0
+        assert tracker.max_pause_seconds > 0
+
+    def test_background_tick(self):
+        metrics = RuntimeMetrics(interval=0.01)
+        metrics.start()
+        try:
+            first = metrics.snapshot()["collected_at"]
+            time.sleep(0.05)
+            assert metrics.snapshot()["collected_at"] > first
+        finally:
+            metrics.stop()
+        assert metrics.gc_pauses._callback not in gc.callbacks
+
+
+class TestExporter:
+    def test_runtime_gauges_in_prometheus_output(self):
+        output = scrape(MetricsStore(), RuntimeMetrics(configured_lifecycles=3))
+        assert "python_eureka_configured_lifecycles 3" in output
+        assert "# TYPE python_eureka_threads gauge" in output
+        assert 'python_eureka_gc_collections_total{generation="0"}' in output
+
+    def test_without_runtime_metrics(self):
+        store = MetricsStore()
+        store.observe_heartbeat_lag("FOO", 0.25)
+        store.observe_heartbeat_lag("FOO", 0.75)
+        output = scrape(store)
+        assert "python_eureka_threads" not in output
+        assert "python_eureka_heartbeat_lag_seconds_sum 1.000000" in output
+        assert "python_eureka_heartbeat_lag_seconds_count 2" in output
+        assert 'python_eureka_heartbeat_last_lag_seconds{service_name="FOO"} 0.750000' in output
+
+
+class TestHeartbeatLag:
+    @pytest.fixture
+    def fake_server(self, monkeypatch):
+        server = FakeEurekaServer()
+        server.start()
+        monkeypatch.setattr(eureka_client_lib, "EUREKA_SERVER_URL", server.base_url)
+        yield server
+        server.stop()
+
+    def test_lifecycle_reports_schedule_lag(self, fake_server):
+        store = MetricsStore()
+        stop = threading.Event()
+        service = {"serviceName": "lagging", "hostName": "localhost", "httpPort": 8080,
+                   "healthEndpointPath": "/h", "infoEndpointPath": "/i", "leaseInfo": {"renewalIntervalInSecs": 0.01}}
+        thread = threading.Thread(target=eureka_lifecycle, args=(service, store, stop))
+        thread.start()
+        time.sleep(0.2)
+        stop.set()
+        thread.join()
+        data = store.get_metrics_data()
+        assert data["heartbeat_lag_count"] >= 2
+        assert 0 <= data["heartbeat_lag_seconds"]["LAGGING"] < 1
@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+from fastapi.responses import PlainTextResponse
+
+import sampling_profiler
+import webserver
+from sampling_profiler import SamplingProfiler, thread_cpu_seconds
+
+
+def busy_loop(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+@pytest.fixture
+def worker_threads():
+    stop = threading.Event()
+    threads = [
+        threading.Thread(target=busy_loop, args=(stop,), name="eureka-BUSY", daemon=True),
+        threading.Thread(target=stop.wait, name="eureka-IDLE", daemon=True),
+        threading.Thread(target=stop.wait, name="other-worker", daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+    yield threads
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+
+class TestSamplingProfiler:
+    def test_collapsed_stacks_per_thread(self, worker_threads):
+        report = SamplingProfiler(interval=0.005).run(0.3)
+        assert report.samples > 10
+        roots = {stack.split(";", 1)[0] for stack in report.stacks}
+        assert roots == {"eureka-BUSY", "eureka-IDLE"}
+        busy = [stack for stack in report.stacks if stack.startswith("eureka-BUSY;")]
+        assert any(stack.endswith("test_sampling_profiler.py:busy_loop") for stack in busy)
+
+        for line in report.collapsed().splitlines():
+            stack, count = line.rsplit(" ", 1)
+            assert ";" in stack and int(count) > 0
+
+    def test_cpu_time_by_thread_name(self, worker_threads):
+        report = SamplingProfiler(interval=0.01).run(0.3)
+        if thread_cpu_seconds(threading.get_native_id()) is None:
+            pytest.skip("Keine CPU-Zeit pro Thread auf dieser Plattform")
+        assert report.threads["eureka-BUSY"]["cpu_seconds"] > report.threads["eureka-IDLE"]["cpu_seconds"]
+        assert report.threads["eureka-BUSY"]["cpu_percent"] > 10
+
+    def test_cpu_time_is_not_read_per_sample(self, worker_threads, monkeypatch):
+        reads = []
+        monkeypatch.setattr(sampling_profiler, "thread_cpu_seconds", lambda native_id: reads.append(native_id) or 0.0)
+        report = SamplingProfiler(interval=0.005, cpu_every=10).run(0.2)
+        assert report.samples > 20
+        # Je Thread am Anfang, am Ende und alle 10 Samples, nicht bei jedem Sample
+        assert len(reads) == 2 * (2 + (report.samples - 1) // 10)
+
+    def test_cpu_time_of_thread_ending_during_profile(self):
+        if thread_cpu_seconds(threading.get_native_id()) is None:
+            pytest.skip("Keine CPU-Zeit pro Thread auf dieser Plattform")
+
+        def spin(seconds):
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                sum(range(1000))
+
+        short = threading.Thread(target=spin, args=(0.3,), name="eureka-SHORT", daemon=True)
+        short.start()
+        report = SamplingProfiler(interval=0.005).run(0.6)
+        short.join()
+        assert report.threads["eureka-SHORT"]["cpu_seconds"] > 0.15
+
+    def test_empty_prefix_samples_all_but_itself(self, worker_threads):
+        report = SamplingProfiler(interval=0.01, thread_prefix="").run(0.05)
+        assert "other-worker" in report.threads
+        assert "MainThread" not in report.threads  # der abtastende Thread selbst
+
+
+class TestProfileEndpoint:
+    def test_json_report(self, worker_threads):
+        result = asyncio.run(webserver.profile_threads(seconds=0.1, interval_ms=5, prefix="eureka-", format="json"))
+        assert isinstance(result, dict)
+        assert set(result["threads"]) == {"eureka-BUSY", "eureka-IDLE"}
+        assert result["samples"] > 0
+
+    def test_collapsed_download(self, worker_threads):
+        response = asyncio.run(webserver.profile_threads(seconds=0.05, interval_ms=5, prefix="eureka-", format="collapsed"))
+        assert isinstance(response, PlainTextResponse)
+        assert response.headers["content-disposition"].startswith("attachment")
+        assert bytes(response.body).decode().startswith("eureka-")
+
+    def test_only_one_profile_at_a_time(self):
+        with webserver.profile_lock:
+            with pytest.raises(HTTPException) as exc:
+                asyncio.run(webserver.profile_threads(seconds=0.05, interval_ms=5, prefix="eureka-", format="json"))
+        assert exc.value.status_code == 409
@@ -0,0 +1,77 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from service_config import ConfigError, load_services, parse_services
+from startup_budget import module_imports, module_ms, parse_importtime
+
+SERVICE = {
+    "serviceName": "serviceone",
+    "hostName": "gmk.lan",
+    "httpPort": 8080,
+    "infoEndpointPath": "/actuator/info",
+    "healthEndpointPath": "/actuator/health",
+}
+
+
+class TestParseServices:
+    def test_adds_default_lease_info(self):
+        services = parse_services(json.dumps([SERVICE]).encode())
+        assert services[0]["leaseInfo"] == {"renewalIntervalInSecs": 30, "durationInSecs": 90}
+
+    def test_keeps_existing_lease_info(self):
+        lease = {"renewalIntervalInSecs": 5, "durationInSecs": 15}
+        services = parse_services(json.dumps([{**SERVICE, "leaseInfo": lease}]).encode())
+        assert services[0]["leaseInfo"] == lease
+
+    def test_missing_fields(self):
+        with pytest.raises(ConfigError, match="hostName"):
+            parse_services(json.dumps([{"serviceName": "x", "httpPort": 1}]).encode())
+
+    def test_invalid_json(self):
+        with pytest.raises(ConfigError, match="Ungültiges JSON"):
+            parse_services(b"[{")
+
+    def test_not_a_list(self):
+        with pytest.raises(ConfigError):
+            parse_services(json.dumps(SERVICE).encode())
+
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(ConfigError, match="nicht gefunden"):
+            load_services(str(tmp_path / "fehlt.json"))
+
+
+class TestLeanImport:
+    def test_client_import_is_lean(self, tmp_path):
+        """Der Import von client.py lädt weder requests noch legt er das Logverzeichnis an."""
+        code = (
+            "import sys, os; sys.path.insert(0, sys.argv[1]); import client; "
+            "assert 'requests' not in sys.modules, 'requests importiert'; "
+            "assert not os.path.exists('logs'), 'logs angelegt'"
+        )
+        repo = str(__import__("pathlib").Path(__file__).resolve().parents[1])
+        result = subprocess.run([sys.executable, "-c", code, repo], cwd=tmp_path, capture_output=True, text=True)
+        assert result.returncode == 0, result.stderr
+
+
+IMPORTTIME_OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       100 |        100 |   encodings
+import time:       200 |        300 | site
+import time:        50 |         50 |     json.decoder
+import time:        70 |        120 |   json
+import time:       500 |        620 | client
+"""
+
+
+class TestStartupBudget:
+    def test_parse_importtime(self):
+        timings = parse_importtime(IMPORTTIME_OUTPUT)
+        assert [t.module for t in timings] == ["encodings", "site", "json.decoder", "json", "client"]
+        assert [t.depth for t in timings] == [1, 0, 2, 1, 0]
+
+    def test_module_imports_exclude_interpreter_start(self):
+        timings = parse_importtime(IMPORTTIME_OUTPUT)
+        assert [t.module for t in module_imports(timings, "client")] == ["json.decoder", "json", "client"]
+        assert module_ms(timings, "client") == pytest.approx(0.62)
@@ -0,0 +1,80 @@
+import pytest
+
+from eureka_client_lib import build_instance_xml, build_registration_payload, get_instance_id
+from service_instances import InstanceView, expand_instances, lifecycle_name, parse_ports
+
+BASE = {
+    "serviceName": "loadtest",
+    "hostName": "gmk.lan",
+    "httpPort": 8080,
+    "securePort": 8443,
+    "infoEndpointPath": "/actuator/info",
+    "healthEndpointPath": "/actuator/health",
+    "dataCenterInfoName": "MyOwn",
+}
+
+
+class TestParsePorts:
+    def test_single_port(self):
+        assert list(parse_ports(8080)) == [8080]
+        assert list(parse_ports("8080")) == [8080]
+
+    def test_range_is_lazy(self):
+        ports = parse_ports("8080-18079")
+        assert isinstance(ports, range)
+        assert len(ports) == 10000
+
+    def test_mixed_list(self):
+        assert list(parse_ports([8080, "9000-9002"])) == [8080, 9000, 9001, 9002]
+
+    def test_invalid_range(self):
+        with pytest.raises(ValueError):
+            parse_ports("9000-8000")
+
+
+class TestExpandInstances:
+    def test_without_replicas_yields_config_unchanged(self):
+        assert list(expand_instances(BASE)) == [BASE]
+        assert lifecycle_name(BASE) == "eureka-LOADTEST"
+
+    def test_port_range_and_hosts(self):
+        config = {**BASE, "replicas": {"ports": "8080-8082", "hostNames": ["a.lan", "b.lan"]}}
+        instances = list(expand_instances(config))
+        assert len(instances) == 6
+        ids = [get_instance_id(instance) for instance in instances]
+        assert len(set(ids)) == 6
+        assert ids[0] == "a.lan:LOADTEST:8080"
+        assert ids[-1] == "b.lan:LOADTEST:8082"
+        assert lifecycle_name(instances[1]) == "eureka-LOADTEST#1"
+
+    def test_instances_share_base_config(self):
+        config = {**BASE, "replicas": {"ports": "8080-8081"}}
+        first, second = expand_instances(config)
+        assert isinstance(first, InstanceView) and isinstance(second, InstanceView)
+        assert first["healthEndpointPath"] == "/actuator/health"
+        assert first.maps[1] is config and second.maps[1] is config
+        assert first.payload_template is second.payload_template
+
+    def test_ssl_shifts_secure_port(self):
+        config = {**BASE, "sslPreferred": True, "replicas": {"ports": "8080-8081"}}
+        instances = list(expand_instances(config))
+        assert [instance["securePort"] for instance in instances] == [8443, 8444]
+
+    def test_secure_port_offset_from_lowest_port(self):
+        config = {**BASE, "sslPreferred": True, "replicas": {"ports": [9000, "8080-8081"]}}
+        instances = list(expand_instances(config))
+        assert [instance["httpPort"] for instance in instances] == [9000, 8080, 8081]
+        assert [instance["securePort"] for instance in instances] == [9363, 8443, 8444]
+
+    def test_explicit_instance_id_gets_suffix(self):
+        config = {**BASE, "instanceId": "custom", "replicas": {"ports": "8080-8081"}}
+        assert [get_instance_id(i) for i in expand_instances(config)] == ["custom-0", "custom-1"]
+
+
+class TestPayloadTemplate:
+    @pytest.mark.parametrize("ssl", [False, True])
+    def test_template_matches_element_tree(self, ssl):
+        config = {**BASE, "sslPreferred": ssl, "replicas": {"ports": "8080-8082", "hostNames": ["a&b.lan"]}}
+        for instance in expand_instances(config):
+            expected = build_instance_xml(dict(instance), "10.0.0.1")
+            assert build_registration_payload(instance, "10.0.0.1") == expected
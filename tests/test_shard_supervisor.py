@@ -0,0 +1,147 @@
+import queue
+import threading
+import time
+
+import eureka_client_lib
+import shard_supervisor
+from fake_eureka_server import FakeEurekaServer
+from shard_supervisor import AggregatedMetricsStore, HashRing, ShardSupervisor, shard_services, worker_main
+
+SNAPSHOT = {
+    "successful_registrations_total": 2,
+    "registration_errors_total": 1,
+    "service_registered_status": {"FOO": 1},
+}
+
+
+def crashing_worker(worker_key, services, metrics_queue, stop_event, report_interval, **settings):
+    """Meldet einen Snapshot und beendet sich sofort mit Fehlercode."""
+    metrics_queue.put((worker_key, SNAPSHOT))
+    raise SystemExit(3)
+
+
+class TestHashRing:
+    def test_deterministic(self):
+        assert HashRing(4).node_for("SERVICEONE") == HashRing(4).node_for("SERVICEONE")
+
+    def test_all_nodes_used(self):
+        ring = HashRing(4)
+        nodes = {ring.node_for(f"SERVICE{i}") for i in range(1000)}
+        assert nodes == {0, 1, 2, 3}
+
+    def test_adding_worker_moves_few_services(self):
+        names = [f"SERVICE{i}" for i in range(2000)]
+        before, after = HashRing(4), HashRing(5)
+        moved = sum(before.node_for(n) != after.node_for(n) for n in names)
+        # Idealerweise wandert 1/5 der Services, niemals ein Großteil
+        assert moved < len(names) * 0.35
+
+    def test_shard_services_partitions_all(self):
+        services = [{"serviceName": f"svc{i}"} for i in range(50)]
+        shards = shard_services(services, 3)
+        assert sum(len(shard) for shard in shards) == 50
+
+
+class TestAggregatedMetricsStore:
+    def test_sums_worker_snapshots(self):
+        store = AggregatedMetricsStore()
+        store.update_worker((0, 0), SNAPSHOT)
+        store.update_worker((1, 0), {**SNAPSHOT, "service_registered_status": {"BAR": 1}})
+        data = store.get_metrics_data()
+        assert data["successful_registrations_total"] == 4
+        assert data["registration_errors_total"] == 2
+        assert data["service_registered_status"] == {"FOO": 1, "BAR": 1}
+
+    def test_heartbeat_lag_is_merged(self):
+        store = AggregatedMetricsStore()
+        lag = {"heartbeat_lag_seconds": {"FOO": 0.5}, "heartbeat_lag_seconds_sum": 1.5, "heartbeat_lag_count": 3}
+        store.update_worker((0, 0), {**SNAPSHOT, **lag})
+        store.update_worker((1, 0), SNAPSHOT)  # Snapshot ohne Lag-Felder (ältere Worker)
+        store.retire_worker((0, 0))
+        store.update_worker((0, 1), {**SNAPSHOT, **lag})
+        data = store.get_metrics_data()
+        assert data["heartbeat_lag_seconds"] == {"FOO": 0.5}
+        assert data["heartbeat_lag_seconds_sum"] == 3.0
+        assert data["heartbeat_lag_count"] == 6
+
+    def test_counters_survive_worker_restart(self):
+        store = AggregatedMetricsStore()
+        store.update_worker((0, 0), SNAPSHOT)
+        store.retire_worker((0, 0))
+        data = store.get_metrics_data()
+        assert data["successful_registrations_total"] == 2
+        assert data["service_registered_status"]["FOO"] == 0
+
+        store.update_worker((0, 1), {**SNAPSHOT, "successful_registrations_total": 1})
+        assert store.get_metrics_data()["successful_registrations_total"] == 3
+
+    def test_late_snapshot_of_retired_worker_is_ignored(self):
+        store = AggregatedMetricsStore()
+        store.update_worker((0, 0), SNAPSHOT)
+        store.retire_worker((0, 0))
+        store.update_worker((0, 0), SNAPSHOT)
+        assert store.get_metrics_data()["successful_registrations_total"] == 2
+
+
+class TestShardSupervisor:
+    def test_restarts_crashed_workers(self):
+        services = [{"serviceName": "serviceone"}]
+        supervisor = ShardSupervisor(services, 1, worker_target=crashing_worker, max_restart_backoff=0.2)
+        supervisor.start()
+        try:
+            deadline = time.monotonic() + 20
+            while supervisor.restart_counts[0] < 2 and time.monotonic() < deadline:
+                time.sleep(0.1)
+        finally:
+            supervisor.stop(timeout=5)
+        assert supervisor.restart_counts[0] >= 2
+        # Jeder Worker-Lauf meldet 2 erfolgreiche Registrierungen, nichts geht verloren
+        assert supervisor.metrics_store.get_metrics_data()["successful_registrations_total"] >= 4
+
+
+class TestWorkerMain:
+    def test_health_probes_and_drain_in_worker(self, tmp_path, monkeypatch):
+        server = FakeEurekaServer()
+        server.start()
+        monkeypatch.setattr(eureka_client_lib, "EUREKA_SERVER_URL", server.base_url)
+        monkeypatch.setattr(shard_supervisor, "LOG_DIR", str(tmp_path))
+        monkeypatch.setattr(shard_supervisor.signal, "signal", lambda signum, handler: None)
+        monitors = []
+
+        class RecordingMonitor:
+            def __init__(self, instances, transport, interval):
+                self.instances = instances
+                self.interval = interval
+                self.stopped = False
+                monitors.append(self)
+
+            def start(self):
+                pass
+
+            def stop(self):
+                self.stopped = True
+
+        monkeypatch.setattr(shard_supervisor, "HealthMonitor", RecordingMonitor)
+        drains = []
+        real_drain = shard_supervisor.drain_threads
+        monkeypatch.setattr(shard_supervisor, "drain_threads", lambda *args: drains.append(args) or real_drain(*args))
+        service = {"serviceName": "workersvc", "hostName": "localhost", "httpPort": 8123,
+                   "healthEndpointPath": "/h", "infoEndpointPath": "/i", "leaseInfo": {"renewalIntervalInSecs": 0.05}}
+        stop = threading.Event()
+        metrics = queue.Queue()
+
+        def stop_when_registered():
+            deadline = time.monotonic() + 5
+            while not server.instances and time.monotonic() < deadline:
+                time.sleep(0.01)
+            stop.set()
+
+        threading.Thread(target=stop_when_registered, daemon=True).start()
+        try:
+            worker_main(("w", 0), [service], metrics, stop, 0.05, health_interval=2.0, drain_timeout=5.0)
+        finally:
+            server.stop()
+
+        assert len(monitors) == 1 and monitors[0].interval == 2.0 and monitors[0].stopped
+        assert len(drains) == 1
+        assert server.instances == set() and server.request_counts["DELETE"] == 1
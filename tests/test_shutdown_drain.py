@@ -0,0 +1,185 @@
+import asyncio
+import socket
+import threading
+import time
+
+import pytest
+
+import eureka_client_lib
+from eureka_client_lib import MetricsStore, async_eureka_lifecycle, eureka_lifecycle, register_instance
+from eureka_transport import AsyncHTTPTransport
+from fake_eureka_server import FakeEurekaServer
+from shutdown_drain import DrainReport, RegistrationTracker, async_drain, async_drain_tasks, drain_threads
+
+
+def service(n):
+    return {"serviceName": f"drain{n}", "hostName": "localhost", "httpPort": 8000 + n,
+            "healthEndpointPath": "/h", "infoEndpointPath": "/i",
+            "leaseInfo": {"renewalIntervalInSecs": 0.05}}
+
+
+@pytest.fixture
+def fake_server(monkeypatch):
+    server = FakeEurekaServer()
+    server.start()
+    monkeypatch.setattr(eureka_client_lib, "EUREKA_SERVER_URL", server.base_url)
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def silent_server(monkeypatch):
+    # Nimmt Verbindungen an (Backlog), antwortet aber nie
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(128)
+    monkeypatch.setattr(eureka_client_lib, "EUREKA_SERVER_URL", f"http://127.0.0.1:{sock.getsockname()[1]}/eureka/apps/")
+    yield sock
+    sock.close()
+
+
+def run_drain(instances, store, timeout):
+    async def run():
+        transport = AsyncHTTPTransport()
+        try:
+            return await async_drain(instances, store, transport, time.monotonic() + timeout)
+        finally:
+            await transport.close()
+    return asyncio.run(run())
+
+
+class TestDrainReport:
+    def test_complete_and_summary(self):
+        report = DrainReport(["a"], [], [], [], 0.5)
+        assert report.complete
+        assert "1 deregistriert" in report.summary()
+        report = report._replace(timed_out=["b"], running=["t1"])
+        assert not report.complete
+        summary = report.summary()
+        assert "Nicht rechtzeitig deregistriert: b" in summary
+        assert "Noch laufende Lifecycles: t1" in summary
+
+
+class TestRegistrationTracker:
+    def test_tracks_registered_until_deregistered(self):
+        tracker = RegistrationTracker()
+        forwarded = []
+        first = tracker.listener(service(1), forward=lambda event, data: forwarded.append(event))
+        second = tracker.listener(service(2))
+        first("registered", {})
+        second("registered", {})
+        second("stopped", {"deregistered": True})
+        first("stopped", {"deregistered": False})
+        assert tracker.instances() == [service(1)]
+        assert forwarded == ["registered", "stopped"]
+
+    def test_registrations_after_drain_start_are_late(self):
+        tracker = RegistrationTracker()
+        first = tracker.listener(service(1))
+        second = tracker.listener(service(2))
+        first("registered", {})
+        assert tracker.begin_drain() == [service(1)]
+        second("registered", {})
+        first("reregistered", {"attempt": 1})
+        assert tracker.late_instances() == [service(2), service(1)]
+        assert tracker.late_instances() == []
+
+
+class TestAsyncDrain:
+    def test_deregisters_each_instance_once(self, fake_server):
+        store = MetricsStore()
+        services = [service(n) for n in range(20)]
+        for data in services:
+            assert register_instance(data, store)
+        # Replikas mit derselben Instanz-ID dürfen nur einmal gelöscht werden
+        report = run_drain(services + services[:5], store, timeout=5)
+        assert report.complete
+        assert len(report.deregistered) == 20
+        assert fake_server.instances == set()
+        assert fake_server.request_counts["DELETE"] == 20
+
+    def test_reports_failures(self, fake_server):
+        report = run_drain([service(1)], MetricsStore(), timeout=5)
+        assert report.failed == ["localhost:DRAIN1:8001"]
+        assert not report.complete
+
+    def test_reports_timed_out(self, silent_server):
+        started = time.monotonic()
+        report = run_drain([service(n) for n in range(3)], MetricsStore(), timeout=0.3)
+        assert time.monotonic() - started < 2
+        assert len(report.timed_out) == 3
+        assert report.deregistered == []
+
+
+class TestDrainThreads:
+    def test_stops_threads_and_deregisters(self, fake_server):
+        store = MetricsStore()
+        tracker = RegistrationTracker()
+        stop_event = threading.Event()
+        threads = []
+        for n in range(10):
+            data = service(n)
+            thread = threading.Thread(target=eureka_lifecycle, args=(data, store, stop_event),
+                                      kwargs={"on_event": tracker.listener(data), "deregister_on_stop": False})
+            thread.start()
+            threads.append(thread)
+        deadline = time.monotonic() + 5
+        while len(tracker.instances()) < 10 and time.monotonic() < deadline:
+            time.sleep(0.02)
+
+        report = drain_threads([stop_event], threads, tracker, store, timeout=5)
+        assert report.complete
+        assert len(report.deregistered) == 10
+        assert fake_server.instances == set()
+        assert fake_server.request_counts["DELETE"] == 10
+        assert not any(thread.is_alive() for thread in threads)
+
+    def test_deregisters_late_registration(self, fake_server):
+        # Ein Lifecycle, dessen Registrierung erst nach dem ersten Drain-Durchlauf durchkommt
+        store = MetricsStore()
+        tracker = RegistrationTracker()
+        stop_event = threading.Event()
+        data = service(1)
+        on_event = tracker.listener(data)
+
+        def slow_registration():
+            stop_event.wait()
+            time.sleep(0.6)
+            if register_instance(data, store):
+                on_event("registered", {})
+
+        thread = threading.Thread(target=slow_registration)
+        thread.start()
+        report = drain_threads([stop_event], [thread], tracker, store, timeout=2)
+        assert report.deregistered == ["localhost:DRAIN1:8001"]
+        assert report.complete
+        assert fake_server.instances == set()
+
+
+class TestAsyncDrainTasks:
+    def test_drains_lifecycle_tasks(self, fake_server):
+        store = MetricsStore()
+        tracker = RegistrationTracker()
+
+        async def run():
+            stop = asyncio.Event()
+            transport = AsyncHTTPTransport()
+            try:
+                tasks = {}
+                for n in range(10):
+                    data = service(n)
+                    lifecycle = async_eureka_lifecycle(data, store, stop, transport,
+                                                       on_event=tracker.listener(data), deregister_on_stop=False)
+                    tasks[asyncio.ensure_future(lifecycle)] = f"task{n}"
+                while len(tracker.instances()) < 10:
+                    await asyncio.sleep(0.02)
+                stop.set()
+                return await async_drain_tasks(tasks, tracker, store, transport, timeout=5)
+            finally:
+                await transport.close()
+
+        report = asyncio.run(run())
+        assert report.complete
+        assert len(report.deregistered) == 10
+        assert fake_server.instances == set()
+        assert fake_server.request_counts["DELETE"] == 10
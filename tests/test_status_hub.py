@@ -0,0 +1,73 @@
+import asyncio
+
+from status_hub import StatusHub, format_sse
+
+
+def test_format_sse():
+    assert format_sse("status", {"a": 1}) == 'event: status\ndata: {"a": 1}\n\n'
+
+
+class TestStatusHub:
+    def test_unknown_client_is_stopped(self):
+        hub = StatusHub()
+        assert hub.status("FOO") == {"status": "stopped", "running": False}
+        assert hub.is_running("FOO") is False
+
+    def test_publish_updates_status(self):
+        hub = StatusHub()
+        hub.publish("FOO", "started")
+        assert hub.status("FOO") == {"status": "starting", "running": True}
+        hub.publish("FOO", "registered")
+        assert hub.status("FOO") == {"status": "up", "running": True}
+        hub.publish("FOO", "stopped")
+        assert hub.is_running("FOO") is False
+
+    def test_unknown_event_is_ignored(self):
+        hub = StatusHub()
+        hub.publish("FOO", "registered")
+        hub.publish("FOO", "deregistered")
+        assert hub.status("FOO")["status"] == "up"
+
+    def test_only_changes_are_delivered(self):
+        async def scenario():
+            hub = StatusHub()
+            hub.attach(asyncio.get_running_loop())
+            subscription = hub.subscribe()
+            hub.publish("FOO", "registered")
+            hub.publish("FOO", "heartbeat_ok")  # gleicher Status, keine Nachricht
+            hub.publish("FOO", "heartbeat_failed")
+            await asyncio.sleep(0)
+            messages = []
+            while not subscription.queue.empty():
+                messages.append(subscription.queue.get_nowait())
+            return messages
+
+        messages = asyncio.run(scenario())
+        assert [payload["status"] for _, payload in messages] == ["up", "heartbeat_failed"]
+        assert messages[0][1]["seq"] < messages[1][1]["seq"]
+
+    def test_overflow_marks_subscription(self):
+        async def scenario():
+            hub = StatusHub(queue_size=1)
+            hub.attach(asyncio.get_running_loop())
+            subscription = hub.subscribe()
+            hub.publish("A", "registered")
+            hub.publish("B", "registered")
+            await asyncio.sleep(0)
+            return subscription
+
+        subscription = asyncio.run(scenario())
+        assert subscription.overflowed is True
+        assert subscription.queue.qsize() == 1
+
+    def test_deleted_client_resets_state(self):
+        hub = StatusHub()
+        hub.publish("FOO", "registered")
+        hub.publish_deleted("FOO")
+        assert hub.status("FOO")["status"] == "stopped"
+
+    def test_publish_without_loop_does_not_fail(self):
+        hub = StatusHub()
+        hub.subscribe()
+        hub.publish("FOO", "registered")
+        hub.publish_added({"serviceName": "FOO"})
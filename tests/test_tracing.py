@@ -0,0 +1,170 @@
+import asyncio
+import json
+import random
+import threading
+
+import pytest
+
+import eureka_client_lib
+from eureka_client_lib import MetricsStore, async_eureka_lifecycle, register_instance, send_heartbeat
+from eureka_transport import AsyncHTTPTransport
+from fake_eureka_server import FakeEurekaServer
+from tracing import NOOP_SPAN, STATUS_ERROR, Span, Tracer, tracer
+
+SERVICE = {"serviceName": "traced", "hostName": "localhost", "httpPort": 8080,
+           "healthEndpointPath": "/h", "infoEndpointPath": "/i"}
+
+
+@pytest.fixture
+def enabled_tracer():
+    tracer.configure(1.0, capacity=1000)
+    yield tracer
+    tracer.configure(0.0)
+    tracer.exporter.clear()
+
+
+@pytest.fixture
+def fake_server(monkeypatch):
+    server = FakeEurekaServer()
+    server.start()
+    monkeypatch.setattr(eureka_client_lib, "EUREKA_SERVER_URL", server.base_url)
+    yield server
+    server.stop()
+
+
+def by_name(spans):
+    result = {}
+    for span in spans:
+        result.setdefault(span.name, []).append(span)
+    return result
+
+
+class TestTracer:
+    def test_disabled_returns_noop(self):
+        local = Tracer()
+        with local.span("x") as span:
+            assert span is NOOP_SPAN
+        assert local.exporter.spans() == []
+
+    def test_children_share_trace_and_parent(self):
+        local = Tracer(sample_rate=1.0)
+        with local.span("root", service="A") as root:
+            with local.span("child") as child:
+                pass
+        assert isinstance(root, Span) and isinstance(child, Span)
+        assert child.trace_id == root.trace_id
+        assert child.parent_id == root.span_id
+        assert root.parent_id is None
+        assert child.track == "A"
+        assert [s.name for s in local.exporter.spans()] == ["child", "root"]
+
+    def test_head_sampling_applies_to_whole_trace(self, monkeypatch):
+        local = Tracer(sample_rate=0.5)
+        rolls = iter([0.9, 0.1])
+        monkeypatch.setattr("tracing.random.random", lambda: next(rolls))
+        with local.span("dropped"):
+            with local.span("child_of_dropped"):
+                pass
+        with local.span("kept"):
+            with local.span("child_of_kept"):
+                pass
+        assert [s.name for s in local.exporter.spans()] == ["child_of_kept", "kept"]
+
+    def test_sampling_rate_is_roughly_respected(self):
+        local = Tracer(sample_rate=0.1)
+        random.seed(7)
+        for _ in range(2000):
+            with local.span("op"):
+                pass
+        assert 120 < len(local.exporter.spans()) < 280
+
+    def test_ring_buffer_keeps_latest(self):
+        local = Tracer(sample_rate=1.0, capacity=3)
+        for n in range(5):
+            with local.span(f"op{n}"):
+                pass
+        assert [s.name for s in local.exporter.spans()] == ["op2", "op3", "op4"]
+        assert local.exporter.exported_total == 5
+
+    def test_exception_marks_error(self):
+        local = Tracer(sample_rate=1.0)
+        with pytest.raises(RuntimeError):
+            with local.span("fails"):
+                raise RuntimeError("kaputt")
+        (span,) = local.exporter.spans()
+        assert span.status == STATUS_ERROR
+        assert span.attributes["error"] == "RuntimeError: kaputt"
+
+    def test_invalid_sample_rate(self):
+        with pytest.raises(ValueError):
+            Tracer().configure(1.5)
+
+    def test_threads_have_separate_contexts(self):
+        local = Tracer(sample_rate=1.0)
+
+        def work(name):
+            with local.span("root", service=name):
+                with local.span("child"):
+                    pass
+
+        threads = [threading.Thread(target=work, args=(f"S{n}",)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        spans = local.exporter.spans()
+        roots = {s.span_id: s for s in spans if s.name == "root"}
+        for child in (s for s in spans if s.name == "child"):
+            assert child.parent_id is not None
+            assert roots[child.parent_id].track == child.track
+
+
+class TestLifecycleSpans:
+    def test_register_spans(self, enabled_tracer, fake_server):
+        assert register_instance(SERVICE, MetricsStore())
+        spans = by_name(enabled_tracer.exporter.spans())
+        (register,) = spans["register"]
+        for name in ("dns_lookup", "build_payload", "http"):
+            assert spans[name][0].parent_id == register.span_id
+        assert spans["http"][0].attributes == {"method": "POST", "status_code": 204}
+
+    def test_heartbeat_404_reregistration(self, enabled_tracer, fake_server):
+        assert send_heartbeat(SERVICE, MetricsStore())
+        spans = by_name(enabled_tracer.exporter.spans())
+        (heartbeat,) = spans["heartbeat"]
+        (reregister,) = spans["reregister"]
+        assert reregister.parent_id == heartbeat.span_id
+        assert spans["register"][0].parent_id == reregister.span_id
+        assert heartbeat.attributes["attempts"] == 2
+        assert {s.trace_id for s in enabled_tracer.exporter.spans()} == {heartbeat.trace_id}
+
+    def test_heartbeat_retries_with_backoff(self, enabled_tracer, monkeypatch):
+        monkeypatch.setattr(eureka_client_lib, "EUREKA_SERVER_URL", "http://127.0.0.1:1/eureka/apps/")
+        monkeypatch.setattr(eureka_client_lib.time, "sleep", lambda seconds: None)
+        assert not send_heartbeat(SERVICE, MetricsStore(), max_retries=2)
+        spans = by_name(enabled_tracer.exporter.spans())
+        assert spans["heartbeat"][0].status == STATUS_ERROR
+        assert [s.attributes["seconds"] for s in spans["backoff"]] == [2, 4]
+        assert all(s.status == STATUS_ERROR for s in spans["http"])
+
+    def test_async_lifecycle_chrome_trace(self, enabled_tracer, fake_server, tmp_path):
+        async def run():
+            stop = asyncio.Event()
+            transport = AsyncHTTPTransport()
+            data = {**SERVICE, "leaseInfo": {"renewalIntervalInSecs": 0.01}}
+            task = asyncio.ensure_future(async_eureka_lifecycle(data, MetricsStore(), stop, transport))
+            await asyncio.sleep(0.1)
+            stop.set()
+            await task
+            await transport.close()
+
+        asyncio.run(run())
+        path = tmp_path / "trace.json"
+        count = enabled_tracer.exporter.write_chrome_trace(str(path))
+        trace = json.loads(path.read_text())
+        events = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+        assert count == len(events) > 0
+        names = {e["name"] for e in events}
+        assert {"registration_attempt", "register", "heartbeat", "deregister", "http"} <= names
+        (track,) = [e for e in trace["traceEvents"] if e["ph"] == "M"]
+        assert track["args"]["name"] == "TRACED"
@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+
+import eureka_client_lib
+from eureka_client_lib import MetricsStore, deregister_instance, post_heartbeat_batch, register_instance, send_heartbeat
+from eureka_transport import AsyncHTTPTransport, RequestsTransport
+from fake_eureka_server import FakeEurekaServer
+from traffic_replay import percentile, replay, summarize
+from traffic_trace import RecordingTransport, TraceWriter, classify, load_trace
+
+SERVICE = {"serviceName": "tracedservice", "hostName": "localhost", "httpPort": 8080,
+           "healthEndpointPath": "/h", "infoEndpointPath": "/i"}
+
+
+@pytest.fixture
+def fake_server(monkeypatch):
+    server = FakeEurekaServer()
+    server.start()
+    monkeypatch.setattr(eureka_client_lib, "EUREKA_SERVER_URL", server.base_url)
+    yield server
+    server.stop()
+
+
+def replay_on_fresh_server(records):
+    target = FakeEurekaServer()
+    target.start()
+    try:
+        async def run():
+            transport = AsyncHTTPTransport()
+            try:
+                return await replay(records, target.base_url, transport, speed=10)
+            finally:
+                await transport.close()
+
+        return summarize(asyncio.run(run())), target
+    finally:
+        target.stop()
+
+
+def record_lifecycle(path, heartbeats=3):
+    writer = TraceWriter(path)
+    transport = RecordingTransport(RequestsTransport(), writer)
+    store = MetricsStore()
+    assert register_instance(SERVICE, store, transport=transport)
+    for _ in range(heartbeats):
+        send_heartbeat(SERVICE, store, transport=transport)
+    assert deregister_instance(SERVICE, store, transport=transport)
+    writer.close()
+    return writer
+
+
+class TestClassify:
+    @pytest.mark.parametrize("method,url,op", [
+        ("POST", "APP", "register"),
+        ("PUT", "APP/host:APP:80", "heartbeat"),
+        ("DELETE", "APP/host:APP:80", "deregister"),
+        ("PUT", "APP/host:APP:80/status?value=DOWN", "status"),
+        ("PUT", "APP/host:APP:80/metadata?k=v", "metadata"),
+        ("GET", "", "fetch"),
+        ("PATCH", "APP", "other"),
+        ("POST", "../peerreplication/batch", "heartbeat_batch"),
+        ("GET", "http://other:8761/x", "fetch"),
+        ("PUT", "../../x/y/z", "other"),
+    ])
+    def test_operations(self, method, url, op):
+        assert classify(method, url) == op
+
+
+class TestRecording:
+    def test_records_lifecycle(self, fake_server, tmp_path):
+        path = str(tmp_path / "trace.ndjson")
+        writer = record_lifecycle(path)
+        records = load_trace(path)
+        assert writer.records_written == 5
+        assert [r.op for r in records] == ["register", "heartbeat", "heartbeat", "heartbeat", "deregister"]
+        assert all(r.status in (200, 204) for r in records)
+        assert records[0].url == "TRACEDSERVICE"
+        assert isinstance(records[0].body, str) and records[0].tx == len(records[0].body.encode("utf-8"))
+        assert records[1].body is None
+        assert records == sorted(records, key=lambda r: r.t)
+
+    def test_urls_outside_the_apps_base(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(eureka_client_lib, "EUREKA_SERVER_URL", "http://eureka:8761/eureka/apps/")
+        writer = TraceWriter(str(tmp_path / "trace.ndjson"))
+        assert writer.relative_url("http://eureka:8761/eureka/apps/APP") == "APP"
+        assert writer.relative_url("http://eureka:8761/eureka/peerreplication/batch") == "../peerreplication/batch"
+        assert writer.relative_url("http://eureka:8761/health") == "../../health"
+        assert writer.relative_url("http://other:8761/eureka/apps/") == "http://other:8761/eureka/apps/"
+        writer.close()
+
+    def test_connection_errors_are_recorded(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(eureka_client_lib, "EUREKA_SERVER_URL", "http://127.0.0.1:1/eureka/apps/")
+        path = str(tmp_path / "trace.ndjson")
+        writer = TraceWriter(path)
+        transport = RecordingTransport(RequestsTransport(timeout=1), writer)
+        assert not deregister_instance(SERVICE, MetricsStore(), transport=transport)
+        writer.close()
+        (record,) = load_trace(path)
+        assert record.op == "deregister" and record.status == 0
+
+
+class TestReplay:
+    def test_percentile(self):
+        assert percentile([], 99) == 0.0
+        assert percentile([3.0, 1.0, 2.0, 4.0], 50) == 2.0
+        assert percentile(list(range(1, 101)), 99) == 99
+
+    def test_replay_against_fresh_server(self, fake_server, tmp_path):
+        path = str(tmp_path / "trace.ndjson")
+        record_lifecycle(path)
+        records = load_trace(path)
+
+        summary, target = replay_on_fresh_server(records)
+        assert summary["heartbeat"]["count"] == 3
+        assert all(stats["status_mismatches"] == 0 for stats in summary.values())
+        assert all(stats["errors"] == 0 for stats in summary.values())
+        assert target.request_counts["PUT"] == 3
+
+    def test_replays_gzipped_json_registration(self, fake_server, tmp_path, monkeypatch):
+        monkeypatch.setattr(eureka_client_lib, "EUREKA_WIRE_FORMAT", "json")
+        monkeypatch.setattr(eureka_client_lib, "EUREKA_GZIP", True)
+        path = str(tmp_path / "trace.ndjson")
+        record_lifecycle(path, heartbeats=1)
+        register = load_trace(path)[0]
+        assert isinstance(register.body, bytes) and register.tx == len(register.body)
+        assert register.headers is not None and register.headers["Content-Encoding"] == "gzip"
+        assert register.headers["Content-Type"] == "application/json"
+
+        summary, target = replay_on_fresh_server([register])
+        assert summary["register"]["status_mismatches"] == 0 and summary["register"]["errors"] == 0
+        assert len(target.instances) == 1
+
+    def test_replays_heartbeat_batch(self, fake_server, tmp_path):
+        path = str(tmp_path / "trace.ndjson")
+        writer = TraceWriter(path)
+        transport = RecordingTransport(RequestsTransport(), writer)
+        assert register_instance(SERVICE, MetricsStore(), transport=transport)
+        assert post_heartbeat_batch([SERVICE], transport=transport) == (200, [200])
+        writer.close()
+        batch = load_trace(path)[1]
+        assert batch.op == "heartbeat_batch" and batch.url == "../peerreplication/batch"
+        assert batch.body is not None
+
+        summary, target = replay_on_fresh_server(load_trace(path))
+        assert summary["heartbeat_batch"]["status_mismatches"] == 0 and summary["heartbeat_batch"]["errors"] == 0
+        assert target.batched_heartbeats == 1
+
+    def test_invalid_speed(self):
+        with pytest.raises(ValueError):
+            asyncio.run(replay([], "http://localhost/", AsyncHTTPTransport(), speed=0))
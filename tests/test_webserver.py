@@ -0,0 +1,322 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+import eureka_client_lib
+import webserver
+from client_registry import ClientRegistry
+from event_journal import JournalRegistry
+from heartbeat_history import HistoryRegistry
+from eureka_client_lib import INSTANCE_STATUSES, MetricsStore, register_instance
+from fake_eureka_server import FakeEurekaServer
+from status_hub import EVENT_STATUS
+from models import BatchMetadataUpdate, BatchStatusUpdate, ClientConfig, MetadataUpdate, StatusUpdate
+from webserver import decode_cursor, encode_cursor, list_clients_page, parse_bulk_payload
+
+CLIENT = {
+    "serviceName": "serviceone",
+    "healthEndpointPath": "/actuator/health",
+    "infoEndpointPath": "/actuator/info",
+    "httpPort": 8080,
+    "securePort": 8443,
+    "hostName": "gmk.lan",
+    "dataCenterInfoName": "MyOwn",
+}
+
+
+def make_client(name, **overrides):
+    return {**CLIENT, "serviceName": name, **overrides}
+
+
+@pytest.fixture
+def isolated_clients(monkeypatch, tmp_path):
+    """Isoliert die In-Memory-Registry und die services.json des Webservers."""
+    monkeypatch.setattr(webserver, "clients", ClientRegistry())
+    monkeypatch.setattr(webserver, "CONFIG_FILE", str(tmp_path / "services.json"))
+    return webserver.clients
+
+
+class TestParseBulkPayload:
+    def test_json_array(self):
+        raw = json.dumps([make_client("a"), make_client("b")]).encode()
+        configs, errors = parse_bulk_payload(raw, "application/json")
+        assert [c.serviceName for c in configs] == ["a", "b"]
+        assert errors == []
+
+    def test_ndjson_skips_blank_lines(self):
+        raw = (json.dumps(make_client("a")) + "\n\n" + json.dumps(make_client("b")) + "\n").encode()
+        configs, errors = parse_bulk_payload(raw, "application/x-ndjson")
+        assert len(configs) == 2
+        assert errors == []
+
+    def test_ndjson_reports_invalid_lines(self):
+        raw = (json.dumps(make_client("a")) + "\n{kaputt\n" + json.dumps({"serviceName": "b"}) + "\n").encode()
+        configs, errors = parse_bulk_payload(raw, "application/x-ndjson")
+        assert [c.serviceName for c in configs] == ["a"]
+        assert [err["index"] for err in errors] == [1, 2]
+        assert "httpPort" in errors[1]["error"]
+
+    def test_duplicates_in_payload(self):
+        raw = json.dumps([make_client("a"), make_client("A")]).encode()
+        configs, errors = parse_bulk_payload(raw, "application/json")
+        assert len(configs) == 1
+        assert errors[0]["index"] == 1
+
+    def test_json_object_is_rejected(self):
+        with pytest.raises(ValueError):
+            parse_bulk_payload(json.dumps(make_client("a")).encode(), "application/json")
+
+    def test_too_many_items(self, monkeypatch):
+        monkeypatch.setattr(webserver, "BULK_MAX_ITEMS", 1)
+        with pytest.raises(ValueError):
+            parse_bulk_payload(json.dumps([make_client("a"), make_client("b")]).encode(), "application/json")
+
+
+class TestListClientsPage:
+    def test_cursor_paging_visits_all_clients_once(self, isolated_clients):
+        for i in range(25):
+            isolated_clients[f"SVC{i:02d}"] = make_client(f"svc{i:02d}")
+
+        seen = []
+        cursor = None
+        while True:
+            page = list_clients_page(limit=10, cursor=cursor)
+            seen.extend(item["serviceName"] for item in page["items"])
+            cursor = page["nextCursor"]
+            if cursor is None:
+                break
+        assert seen == sorted(isolated_clients)
+
+    def test_exact_page_has_no_next_cursor(self, isolated_clients):
+        for name in ("A", "B"):
+            isolated_clients[name] = make_client(name)
+        page = list_clients_page(limit=2)
+        assert len(page["items"]) == 2
+        assert page["nextCursor"] is None
+
+    def test_cursor_survives_deletion(self, isolated_clients):
+        for name in ("A", "B", "C"):
+            isolated_clients[name] = make_client(name)
+        page = list_clients_page(limit=1)
+        del isolated_clients["A"]
+        next_page = list_clients_page(limit=1, cursor=page["nextCursor"])
+        assert next_page["items"][0]["serviceName"] == "B"
+
+    def test_filters(self, isolated_clients):
+        isolated_clients["ORDERS"] = make_client("orders", hostName="a.lan")
+        isolated_clients["BILLING"] = make_client("billing", hostName="b.lan")
+        assert [i["serviceName"] for i in list_clients_page(q="ord")["items"]] == ["ORDERS"]
+        assert [i["serviceName"] for i in list_clients_page(hostName="b.lan")["items"]] == ["BILLING"]
+        assert list_clients_page(running=True)["items"] == []
+
+    def test_invalid_cursor(self):
+        with pytest.raises(HTTPException):
+            decode_cursor("%%%")
+
+    def test_cursor_roundtrip(self):
+        assert decode_cursor(encode_cursor("SERVICE-ÄÖ")) == "SERVICE-ÄÖ"
+
+
+class TestStatusUpdates:
+    @pytest.fixture
+    def running_clients(self, isolated_clients, monkeypatch):
+        server = FakeEurekaServer()
+        server.start()
+        monkeypatch.setattr(eureka_client_lib, "EUREKA_SERVER_URL", server.base_url)
+        monkeypatch.setattr(webserver, "eureka_transport", None)
+        monkeypatch.setattr(webserver, "is_running", lambda name: name in isolated_clients)
+        for name in ("ONE", "TWO"):
+            isolated_clients[name] = make_client(name.lower())
+            register_instance(isolated_clients[name], MetricsStore())
+        yield server
+        server.stop()
+
+    def _run(self, coro):
+        async def run():
+            try:
+                return await coro
+            finally:
+                await webserver.get_eureka_transport().close()
+        return asyncio.run(run())
+
+    def test_batch_out_of_service_for_all_running(self, running_clients):
+        result = self._run(webserver.update_clients_status(BatchStatusUpdate(status="OUT_OF_SERVICE")))
+        assert result["results"] == {"ONE": True, "TWO": True}
+        assert set(running_clients.status_overrides.values()) == {"OUT_OF_SERVICE"}
+        assert webserver.clients.status_overrides() == {"ONE": "OUT_OF_SERVICE", "TWO": "OUT_OF_SERVICE"}
+        assert running_clients.request_counts["POST"] == 2
+
+    def test_batch_results_keyed_by_name(self, running_clients):
+        update = BatchMetadataUpdate(metadata={"release": "8"}, names=["two", "one", "TWO"])
+        result = self._run(webserver.update_clients_metadata(update))
+        assert result["results"] == {"TWO": True, "ONE": True}
+        assert running_clients.request_counts["PUT"] == 2
+
+    def test_up_clears_override(self, running_clients):
+        self._run(webserver.update_client_status("one", StatusUpdate(status="OUT_OF_SERVICE")))
+        self._run(webserver.update_client_status("one", StatusUpdate(status="UP")))
+        assert running_clients.status_overrides == {}
+        assert webserver.clients.status_overrides() == {}
+
+    def test_metadata_update(self, running_clients):
+        self._run(webserver.update_client_metadata("two", MetadataUpdate(metadata={"release": "7"})))
+        assert list(running_clients.metadata.values()) == [{"release": "7"}]
+
+    def test_unknown_client_in_batch(self, running_clients):
+        with pytest.raises(HTTPException) as exc:
+            self._run(webserver.update_clients_status(BatchStatusUpdate(status="DOWN", names=["one", "nope"])))
+        assert exc.value.status_code == 404
+
+    def test_rejected_status_returns_502(self, running_clients):
+        running_clients.instances.clear()
+        with pytest.raises(HTTPException) as exc:
+            self._run(webserver.update_client_status("one", StatusUpdate(status="DOWN")))
+        assert exc.value.status_code == 502
+        assert webserver.clients.status_overrides() == {}
+
+
+class TestConcurrentClientApi:
+    def test_parallel_adds_are_all_saved(self, isolated_clients):
+        def worker(offset):
+            for n in range(offset, offset + 25):
+                webserver.add_client(ClientConfig.model_validate(make_client(f"svc{n:03d}")))
+
+        threads = [threading.Thread(target=worker, args=(i * 25,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        with open(webserver.CONFIG_FILE) as f:
+            saved = json.load(f)
+        assert len(isolated_clients) == 100
+        assert sorted(c["serviceName"] for c in saved) == [f"svc{n:03d}" for n in range(100)]
+
+    def test_parallel_starts_create_one_thread(self, isolated_clients, monkeypatch, tmp_path):
+        started = []
+        release = threading.Event()
+
+        def fake_lifecycle(service_data, metrics_store, stop_event, service_logger, on_event=None):
+            started.append(service_data["serviceName"])
+            release.wait(5)
+
+        monkeypatch.setattr(webserver, "eureka_lifecycle", fake_lifecycle)
+        monkeypatch.setattr(webserver, "LOG_DIR", str(tmp_path))
+        isolated_clients["RACE"] = make_client("race")
+        barrier = threading.Barrier(8)
+        outcomes = []
+
+        def worker():
+            barrier.wait()
+            try:
+                webserver.start_client("race")
+                outcomes.append(200)
+            except HTTPException as e:
+                outcomes.append(e.status_code)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        try:
+            assert sorted(outcomes) == [200] + [400] * 7
+            with pytest.raises(HTTPException) as exc:
+                webserver.delete_client("race")
+            assert exc.value.status_code == 400
+        finally:
+            release.set()
+            client_thread = isolated_clients.thread("RACE")
+            assert client_thread is not None
+            client_thread.join()
+        assert started == ["race"]
+        webserver.delete_client("race")
+        assert "RACE" not in isolated_clients
+
+
+class TestEventJournalApi:
+    @pytest.fixture
+    def journals(self, isolated_clients, monkeypatch):
+        journals = JournalRegistry(capacity=32)
+        monkeypatch.setattr(webserver, "journals", journals)
+        isolated_clients["ONE"] = make_client("one")
+        isolated_clients["IDLE"] = make_client("idle")
+        on_event = journals.listener("ONE")
+        on_event("registered", {"attempt": 1})
+        for n in range(5):
+            on_event("heartbeat_ok", {"latency_ms": 10 + n})
+        on_event("heartbeat_failed", {"latency_ms": 500})
+        return journals
+
+    def test_newest_first_with_paging(self, journals):
+        page = webserver.client_event_journal("one", limit=4)
+        assert [item["seq"] for item in page["items"]] == [6, 5, 4, 3]
+        assert page["total"] == 7 and page["capacity"] == 32
+        rest = webserver.client_event_journal("one", cursor=page["nextCursor"], limit=4)
+        assert [item["seq"] for item in rest["items"]] == [2, 1, 0]
+        assert rest["nextCursor"] is None
+
+    def test_type_filter_accepts_comma_lists(self, journals):
+        page = webserver.client_event_journal("one", type=["registered,heartbeat_failed"])
+        assert [item["event"] for item in page["items"]] == ["heartbeat_failed", "registered"]
+        slow = webserver.client_event_journal("one", min_latency_ms=13)
+        assert [item["latency_ms"] for item in slow["items"]] == [500.0, 14.0, 13.0]
+
+    def test_unknown_type(self, journals):
+        with pytest.raises(HTTPException) as exc:
+            webserver.client_event_journal("one", type=["heartbeat_ok", "exploded"])
+        assert exc.value.status_code == 400
+
+    def test_client_without_events_and_unknown_client(self, journals):
+        assert webserver.client_event_journal("idle")["items"] == []
+        with pytest.raises(HTTPException) as exc:
+            webserver.client_event_journal("nope")
+        assert exc.value.status_code == 404
+
+    def test_status_override_is_journaled(self, journals):
+        webserver._apply_status("ONE", "OUT_OF_SERVICE")
+        assert webserver.client_event_journal("one", limit=1)["items"][0]["event"] == "status_out_of_service"
+
+    @pytest.mark.parametrize("status", INSTANCE_STATUSES)
+    def test_every_status_override_is_known(self, journals, status):
+        event = f"status_{status.lower()}"
+        assert event in EVENT_STATUS
+        webserver._apply_status("ONE", status)
+        assert webserver.client_event_journal("one", limit=1)["items"][0]["event"] == event
+
+
+class TestHeartbeatHistoryApi:
+    @pytest.fixture
+    def history(self, isolated_clients, monkeypatch):
+        registry = HistoryRegistry(bucket_seconds=60, buckets=60)
+        monkeypatch.setattr(webserver, "heartbeat_history", registry)
+        isolated_clients["ONE"] = make_client("one")
+        isolated_clients["IDLE"] = make_client("idle")
+        on_event = registry.listener("ONE")
+        for n in range(9):
+            on_event("heartbeat_ok", {"latency_ms": 20.0 + n})
+        on_event("heartbeat_failed", {"latency_ms": 2000.0})
+        return registry
+
+    def test_client_history(self, history):
+        result = webserver.client_heartbeat_history("one", points=12)
+        assert result["bucketSeconds"] == 60
+        assert result["summary"]["success_ratio"] == 0.9
+        assert len(result["series"]) == 12
+        assert result["series"][-1]["ok"] == 9
+
+    def test_client_without_heartbeats_and_unknown_client(self, history):
+        assert webserver.client_heartbeat_history("idle") == {"bucketSeconds": 60, "summary": None, "series": []}
+        with pytest.raises(HTTPException) as exc:
+            webserver.client_heartbeat_history("nope")
+        assert exc.value.status_code == 404
+
+    def test_overview_for_sparklines(self, history):
+        overview = webserver.heartbeat_overview(points=6)
+        assert list(overview["clients"]) == ["ONE"]
+        stats = overview["clients"]["ONE"]
+        assert stats["ok"] == 9 and stats["failed"] == 1
+        assert len(stats["p95_series"]) == 6 and stats["p95_series"][-1] is not None
+        assert stats["success_series"][-1] == 0.9
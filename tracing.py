@@ -0,0 +1,186 @@
+# tracing.py
+"""
+Leichtgewichtiges Tracing für die Lifecycle-Operationen (Registrierung, Heartbeat, Deregistrierung).
+
+Die Sampling-Entscheidung fällt einmal pro Trace an der Wurzel-Span (head-based); alle Kind-Spans
+übernehmen sie. Abgeschlossene Spans landen in einem Ringpuffer fester Größe und können im
+Chrome-Trace-Format (JSON) exportiert werden, das chrome://tracing, https://ui.perfetto.dev und
+speedscope laden. Ist Tracing aus (sample_rate 0, Standard), liefert span() ein geteiltes No-op-Objekt.
+
+    from tracing import configure_tracing, tracer
+
+    configure_tracing(sample_rate=0.1)
+    with tracer.span("register", service="ORDERS") as span:
+        span.set_attribute("status_code", 204)
+    tracer.exporter.write_chrome_trace("trace.json")
+"""
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional, Union
+
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+
+class _NoopSpan:
+    """Span ohne Wirkung für nicht gesampelte Traces bzw. abgeschaltetes Tracing."""
+    __slots__ = ()
+    sampled = False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_status(self, status: str) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        pass
+
+NOOP_SPAN = _NoopSpan()
+
+# Aktuelle Span des Threads bzw. der asyncio-Task; _UNSAMPLED markiert einen verworfenen Trace
+_UNSAMPLED = _NoopSpan()
+_current: ContextVar[Optional[Union["Span", _NoopSpan]]] = ContextVar("eureka_current_span", default=None)
+
+class _UnsampledRoot(_NoopSpan):
+    """Wurzel eines verworfenen Traces: sorgt dafür, dass Kind-Spans nicht erneut würfeln."""
+    __slots__ = ("_token",)
+
+    def __enter__(self) -> "_UnsampledRoot":
+        self._token = _current.set(_UNSAMPLED)
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        _current.reset(self._token)
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "track", "attributes", "status",
+                 "start_ns", "duration_ns", "_perf_start", "_token", "_tracer")
+    sampled = True
+
+    def __init__(self, tracer: "Tracer", name: str, trace_id: str, parent: Optional["Span"], attributes: Dict[str, Any]) -> None:
+        self._tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent.span_id if parent is not None else None
+        # Spur in der Darstellung: pro Service (Wurzel-Attribut), sonst pro Thread
+        self.track = parent.track if parent is not None else str(attributes.get("service") or threading.current_thread().name)
+        self.attributes = attributes
+        self.status = STATUS_OK
+        self.start_ns = 0
+        self.duration_ns = 0
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_status(self, status: str) -> None:
+        self.status = status
+
+    def __enter__(self) -> "Span":
+        self.start_ns = time.time_ns()
+        self._perf_start = time.perf_counter_ns()
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.duration_ns = time.perf_counter_ns() - self._perf_start
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.status = STATUS_ERROR
+            self.attributes["error"] = f"{exc_type.__name__}: {exc}"
+        self._tracer.exporter.export(self)
+
+class RingBufferExporter:
+    """Hält die letzten `capacity` abgeschlossenen Spans im Speicher."""
+    def __init__(self, capacity: int = 10000) -> None:
+        self._spans: Deque[Span] = deque(maxlen=capacity)
+        self.exported_total = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._spans.maxlen or 0
+
+    def export(self, span: Span) -> None:
+        # deque.append mit maxlen ist atomar; der Zähler ist nur eine Statistik
+        self._spans.append(span)
+        self.exported_total += 1
+
+    def spans(self) -> List[Span]:
+        return list(self._spans)
+
+    def clear(self) -> None:
+        self._spans.clear()
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Spans als Chrome-Trace-Events ("X" = vollständiges Event, Zeiten in Mikrosekunden)."""
+        pid = os.getpid()
+        tracks: Dict[str, int] = {}
+        events: List[Dict[str, Any]] = []
+        for span in self.spans():
+            tid = tracks.setdefault(span.track, len(tracks) + 1)
+            events.append({
+                "name": span.name,
+                "cat": "eureka",
+                "ph": "X",
+                "ts": span.start_ns / 1000,
+                "dur": span.duration_ns / 1000,
+                "pid": pid,
+                "tid": tid,
+                "args": {
+                    **span.attributes,
+                    "trace_id": span.trace_id,
+                    "span_id": span.span_id,
+                    "parent_id": span.parent_id,
+                    "status": span.status,
+                },
+            })
+        for track, tid in tracks.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": track}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: str) -> int:
+        """Schreibt den Pufferinhalt als Chrome-Trace-Datei; liefert die Anzahl Spans."""
+        trace = self.chrome_trace()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(trace, f, default=str)
+        return sum(1 for event in trace["traceEvents"] if event["ph"] == "X")
+
+class Tracer:
+    def __init__(self, sample_rate: float = 0.0, capacity: int = 10000) -> None:
+        self.sample_rate = sample_rate
+        self.exporter = RingBufferExporter(capacity)
+
+    def configure(self, sample_rate: float, capacity: Optional[int] = None) -> None:
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate muss zwischen 0 und 1 liegen")
+        self.sample_rate = sample_rate
+        if capacity is not None and capacity != self.exporter.capacity:
+            self.exporter = RingBufferExporter(capacity)
+
+    def span(self, name: str, **attributes: Any) -> Union[Span, _NoopSpan]:
+        """Kind-Span der aktuellen Span oder, ohne aktuelle Span, Wurzel eines neuen Traces."""
+        if self.sample_rate <= 0.0:
+            return NOOP_SPAN
+        parent = _current.get()
+        if parent is None:
+            if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+                return _UnsampledRoot()
+            return Span(self, name, f"{random.getrandbits(128):032x}", None, attributes)
+        if isinstance(parent, Span):
+            return Span(self, name, parent.trace_id, parent, attributes)
+        return NOOP_SPAN
+
+# Prozessweiter Tracer der Bibliothek; configure_tracing ändert ihn an Ort und Stelle
+tracer = Tracer()
+
+def configure_tracing(sample_rate: float, capacity: Optional[int] = None) -> Tracer:
+    tracer.configure(sample_rate, capacity)
+    return tracer
@@ -0,0 +1,123 @@
+# traffic_replay.py
+"""
+Spielt einen mit traffic_trace aufgezeichneten Trace mit 1x oder Nx Geschwindigkeit erneut ab,
+standardmäßig gegen einen lokalen Fake-Eureka. Requests werden zum aufgezeichneten Zeitpunkt
+gestartet, unabhängig davon, wann vorherige Antworten eintreffen.
+
+    python traffic_replay.py trace.ndjson --speed 10
+    python traffic_replay.py trace.ndjson --target http://localhost:8761/eureka/apps/ --json > run.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import sys
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+from urllib.parse import urljoin
+
+from eureka_transport import AsyncHTTPTransport, AsyncTransport
+from traffic_trace import TraceRecord, load_trace
+
+class ReplayResult(NamedTuple):
+    record: TraceRecord
+    status: int
+    ms: float
+    lag_ms: float
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Perzentil nach Nearest-Rank; 0.0 für leere Listen."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = min(len(ordered), max(1, math.ceil(q / 100 * len(ordered))))
+    return ordered[rank - 1]
+
+async def _send(record: TraceRecord, base_url: str, transport: AsyncTransport, due: float) -> ReplayResult:
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    headers = record.headers
+    if headers is None and record.body is not None:
+        # Traces ohne Header stammen aus der Zeit vor JSON/gzip und enthalten immer XML
+        headers = {"Content-Type": "application/xml", "Accept": "application/xml"}
+    try:
+        # Relative URLs (auch "../peerreplication/batch") gegen die Ziel-Basis, absolute unverändert
+        response = await transport.request(record.method, urljoin(base_url, record.url), data=record.body, headers=headers)
+        status = response.status_code
+    except Exception:
+        status = 0
+    return ReplayResult(record, status, (loop.time() - started) * 1000, (started - due) * 1000)
+
+async def replay(records: Sequence[TraceRecord], base_url: str, transport: AsyncTransport, speed: float = 1.0) -> List[ReplayResult]:
+    """Startet jeden Request zum Zeitpunkt t / speed nach Beginn (offene Schleife)."""
+    if speed <= 0:
+        raise ValueError("speed muss größer als 0 sein")
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    tasks: List["asyncio.Task[ReplayResult]"] = []
+    for record in records:
+        due = start + record.t / speed
+        delay = due - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(_send(record, base_url, transport, due)))
+    return list(await asyncio.gather(*tasks))
+
+def summarize(results: Sequence[ReplayResult]) -> Dict[str, Dict[str, Any]]:
+    """Kennzahlen pro Operation, jeweils im Vergleich zur Aufzeichnung."""
+    by_op: Dict[str, List[ReplayResult]] = {}
+    for result in results:
+        by_op.setdefault(result.record.op, []).append(result)
+    summary: Dict[str, Dict[str, Any]] = {}
+    for op, op_results in sorted(by_op.items()):
+        latencies = [r.ms for r in op_results]
+        recorded = [r.record.ms for r in op_results]
+        summary[op] = {
+            "count": len(op_results),
+            "errors": sum(1 for r in op_results if r.status == 0 or r.status >= 500),
+            "status_mismatches": sum(1 for r in op_results if r.status != r.record.status),
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+            "recorded_p50_ms": round(percentile(recorded, 50), 3),
+            "recorded_p95_ms": round(percentile(recorded, 95), 3),
+            "max_lag_ms": round(max(r.lag_ms for r in op_results), 3),
+        }
+    return summary
+
+async def _run(trace_path: str, speed: float, target: Optional[str], connections: int) -> Dict[str, Dict[str, Any]]:
+    records = load_trace(trace_path)
+    server = None
+    if target is None:
+        from fake_eureka_server import FakeEurekaServer
+        server = FakeEurekaServer()
+        await server.start_async()
+        target = server.base_url
+    transport = AsyncHTTPTransport(max_connections_per_host=connections)
+    try:
+        return summarize(await replay(records, target, transport, speed))
+    finally:
+        await transport.close()
+        if server is not None:
+            await server.stop_async()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Eureka-Trace erneut abspielen")
+    parser.add_argument("trace")
+    parser.add_argument("--speed", type=float, default=1.0, help="Zeitraffer-Faktor (1 = Echtzeit)")
+    parser.add_argument("--target", help="Eureka-Basis-URL (Standard: lokaler Fake-Eureka)")
+    parser.add_argument("--connections", type=int, default=8)
+    parser.add_argument("--json", action="store_true", help="Zusammenfassung als JSON ausgeben")
+    args = parser.parse_args(argv)
+
+    summary = asyncio.run(_run(args.trace, args.speed, args.target, args.connections))
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return 0
+    print(f"{'op':<12}{'count':>7}{'errors':>8}{'mismatch':>10}{'p50':>9}{'p95':>9}{'p99':>9}{'rec p95':>9}")
+    for op, stats in summary.items():
+        print(f"{op:<12}{stats['count']:>7}{stats['errors']:>8}{stats['status_mismatches']:>10}"
+              f"{stats['p50_ms']:>9.2f}{stats['p95_ms']:>9.2f}{stats['p99_ms']:>9.2f}{stats['recorded_p95_ms']:>9.2f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
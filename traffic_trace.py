@@ -0,0 +1,168 @@
+# traffic_trace.py
+"""
+Zeichnet die Eureka-Requests der Bibliothek als kompaktes NDJSON auf, eine Zeile pro Request:
+
+    {"t":12.503,"op":"heartbeat","m":"PUT","u":"SERVICEONE/gmk.local:SERVICEONE:8080","tx":0,"rx":0,"s":200,"ms":3.1}
+
+t = Sekunden seit Aufzeichnungsbeginn, u = URL relativ zu EUREKA_SERVER_URL (Pfade außerhalb davon,
+etwa "../peerreplication/batch", mit "../"; fremde Server absolut), tx/rx = Bytes,
+s = HTTP-Status (0 bei Verbindungsfehler), ms = Dauer. Registrierungen und Heartbeat-Batches
+enthalten zusätzlich den Payload, damit sie wiedergegeben werden können: Text als "b", binäre Bodies (gzip) base64-kodiert
+als "b64". Gesetzte Request-Header (Content-Type, Content-Encoding, Accept) stehen in "h".
+"""
+import base64
+import json
+import threading
+import time
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, TextIO
+from urllib.parse import urlsplit
+
+import eureka_client_lib
+from eureka_transport import AsyncTransport, Body, Transport, TransportResponse
+
+class TraceRecord(NamedTuple):
+    t: float
+    op: str
+    method: str
+    url: str
+    tx: int
+    rx: int
+    status: int
+    ms: float
+    body: Body = None
+    headers: Optional[Dict[str, str]] = None
+
+def classify(method: str, relative_url: str) -> str:
+    """Ordnet einen Request einer Lifecycle-Operation zu."""
+    path = relative_url.split("?", 1)[0].strip("/")
+    if path.endswith("peerreplication/batch"):
+        return "heartbeat_batch"
+    if method == "GET":
+        return "fetch"
+    if path.startswith("..") or "://" in path:
+        return "other"
+    depth = len(path.split("/")) if path else 0
+    if depth == 1 and method == "POST":
+        return "register"
+    if depth == 2:
+        return {"PUT": "heartbeat", "DELETE": "deregister"}.get(method, "other")
+    if depth == 3:
+        return path.rsplit("/", 1)[1]  # status, metadata
+    return "other"
+
+def _body_size(data: Body) -> int:
+    if data is None:
+        return 0
+    return len(data.encode("utf-8")) if isinstance(data, str) else len(data)
+
+class TraceWriter:
+    """Thread-sicherer, gepufferter NDJSON-Writer für Trace-Records."""
+    def __init__(self, path: str, include_bodies: bool = True) -> None:
+        self.path = path
+        self.include_bodies = include_bodies
+        self._file: TextIO = open(path, "a", encoding="utf-8", buffering=64 * 1024)
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self.records_written = 0
+
+    def relative_url(self, url: str) -> str:
+        """URL relativ zu EUREKA_SERVER_URL, so dass urljoin(Basis, Ergebnis) wieder die URL ergibt."""
+        base = eureka_client_lib.EUREKA_SERVER_URL
+        if url.startswith(base):
+            return url[len(base):]
+        parts = urlsplit(base)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        if not url.startswith(origin + "/"):
+            return url
+        target = url[len(origin):]
+        directory = parts.path[:parts.path.rfind("/") + 1]
+        up = ""
+        while not target.startswith(directory):
+            directory = directory[:directory.rstrip("/").rfind("/") + 1]
+            up += "../"
+        return up + target[len(directory):]
+
+    def write(self, method: str, url: str, data: Body, started: float, response: Optional[TransportResponse], headers: Optional[Dict[str, str]] = None) -> None:
+        relative = self.relative_url(url)
+        op = classify(method, relative)
+        entry: Dict[str, Any] = {
+            "t": round(started - self._start, 4),
+            "op": op,
+            "m": method,
+            "u": relative,
+            "tx": _body_size(data),
+            "rx": len(response.content or response.text.encode("utf-8")) if response is not None else 0,
+            "s": response.status_code if response is not None else 0,
+            "ms": round((time.monotonic() - started) * 1000, 3),
+        }
+        if headers:
+            entry["h"] = dict(headers)
+        if self.include_bodies and op in ("register", "heartbeat_batch") and data is not None:
+            if isinstance(data, str):
+                entry["b"] = data
+            else:
+                entry["b64"] = base64.b64encode(data).decode("ascii")
+        line = json.dumps(entry, separators=(",", ":"), ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self.records_written += 1
+
+    def flush(self) -> None:
+        with self._lock:
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+class RecordingTransport:
+    """Transport-Wrapper, der jeden Request samt Dauer, Größe und Status aufzeichnet."""
+    def __init__(self, inner: Transport, writer: TraceWriter) -> None:
+        self.inner = inner
+        self.writer = writer
+
+    def request(self, method: str, url: str, data: Body = None, headers: Optional[Dict[str, str]] = None) -> TransportResponse:
+        started = time.monotonic()
+        response: Optional[TransportResponse] = None
+        try:
+            response = self.inner.request(method, url, data=data, headers=headers)
+            return response
+        finally:
+            self.writer.write(method, url, data, started, response, headers)
+
+class AsyncRecordingTransport:
+    """Asynchrone Variante von RecordingTransport."""
+    def __init__(self, inner: AsyncTransport, writer: TraceWriter) -> None:
+        self.inner = inner
+        self.writer = writer
+
+    async def request(self, method: str, url: str, data: Body = None, headers: Optional[Dict[str, str]] = None) -> TransportResponse:
+        started = time.monotonic()
+        response: Optional[TransportResponse] = None
+        try:
+            response = await self.inner.request(method, url, data=data, headers=headers)
+            return response
+        finally:
+            self.writer.write(method, url, data, started, response, headers)
+
+    async def close(self) -> None:
+        await self.inner.close()
+
+def enable_recording(path: str, include_bodies: bool = True) -> TraceWriter:
+    """Zeichnet ab sofort alle Requests des synchronen Standard-Transports auf."""
+    writer = TraceWriter(path, include_bodies)
+    eureka_client_lib.set_default_transport(RecordingTransport(eureka_client_lib.default_transport, writer))
+    return writer
+
+def read_trace(path: str) -> Iterator[TraceRecord]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            body: Body = base64.b64decode(entry["b64"]) if "b64" in entry else entry.get("b")
+            yield TraceRecord(entry["t"], entry["op"], entry["m"], entry["u"], entry["tx"], entry["rx"], entry["s"], entry["ms"], body, entry.get("h"))
+
+def load_trace(path: str) -> List[TraceRecord]:
+    """Lädt einen Trace, sortiert nach Startzeitpunkt."""
+    return sorted(read_trace(path), key=lambda record: record.t)
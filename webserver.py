@@ -1,16 +1,36 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
-from models import ClientConfig
+from pydantic import ValidationError
+from models import BatchMetadataUpdate, BatchStatusUpdate, ClientConfig, MetadataUpdate, StatusUpdate
 import threading
+import asyncio
 import os
 import json
 import logging
 import time
-from typing import Dict, List, Any
-
-from eureka_client_lib import eureka_lifecycle, MetricsStore
+import base64
+import bisect
+from typing import Annotated, Dict, Iterator, List, Any, Mapping, Optional, Tuple
+
+from client_registry import ClientRegistry
+from eureka_client_lib import (
+    eureka_lifecycle,
+    MetricsStore,
+    async_update_metadata,
+    async_update_metadata_batch,
+    async_update_status,
+    async_update_status_batch,
+    get_instance_id,
+)
+from eureka_transport import AsyncHTTPTransport
+from event_journal import EVENT_TYPES, JournalRegistry
+from heartbeat_history import HistoryRegistry
+from sampling_profiler import SamplingProfiler
+from tracing import configure_tracing, tracer
+from status_hub import StatusHub, format_sse
+from service_config import LOG_DIR, ConfigError, ensure_log_dir, load_services
 
 # Logger für den Webserver
 logger = logging.getLogger(__name__)
@@ -20,81 +40,196 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 async def lifespan(app: FastAPI):
     # Startup-Logik
     logger.info("Server startet...")
+    load_state()
+    status_hub.attach(asyncio.get_running_loop())
 
     yield  # hier läuft die App
 
     # Shutdown-Logik
     logger.info("Server wird heruntergefahren. Stoppe alle Clients...")
-    for name, event in stop_events.items():
+    runtime = clients.runtime()
+    for name, _, event in runtime:
         logger.info(f"Stoppe Client {name}")
         event.set()
-    for name, thread in client_threads.items():
+    for name, thread, _ in runtime:
         if thread.is_alive():
             logger.info(f"Warte auf Thread von {name}")
             thread.join(timeout=5)
+    status_hub.attach(None)
+    if eureka_transport is not None:
+        await eureka_transport.close()
     logger.info("Alle Clients gestoppt.")
 
 app = FastAPI(lifespan=lifespan)
 metrics_store = MetricsStore()
+status_hub = StatusHub()
+# Letzte Lifecycle-Events pro Client, z.B. EVENT_JOURNAL_SIZE=4096 (Standard: 1024 pro Client)
+journals = JournalRegistry(int(os.getenv("EVENT_JOURNAL_SIZE", "1024")))
+# Heartbeat-Verlauf pro Client für Erfolgsquote und p95 (Standard: 1440 Buckets à 60 s = 24 h)
+heartbeat_history = HistoryRegistry(int(os.getenv("HEARTBEAT_HISTORY_BUCKET_SECS", "60")), int(os.getenv("HEARTBEAT_HISTORY_BUCKETS", "1440")))
+
+SSE_KEEPALIVE_SECS = 15
 
 # Static files (HTML, JS, CSS)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-LOG_DIR = "logs"
-if not os.path.exists(LOG_DIR):
-    os.makedirs(LOG_DIR)
-    logger.info(f"Logverzeichnis '{LOG_DIR}' wurde erstellt.")
-else:
-    logger.info(f"Logverzeichnis '{LOG_DIR}' ist vorhanden.")
+# In-memory registry: sperrfreie Leser, Schreiber über Sperren (siehe client_registry.py)
+clients = ClientRegistry()
+
+# Serialisiert das Schreiben von services.json; zuletzt gespeicherter Snapshot pro Datei
+save_lock = threading.Lock()
+saved_snapshot: Tuple[str, Optional[Mapping[str, Dict[str, Any]]]] = ("", None)
+
+# Gemeinsamer asynchroner Transport für Status- und Metadaten-Updates
+eureka_transport: Optional[AsyncHTTPTransport] = None
 
-# In-memory registry
-clients: Dict[str, Dict[str, Any]] = {}
-client_threads: Dict[str, threading.Thread] = {}
-stop_events: Dict[str, threading.Event] = {}
+def get_eureka_transport() -> AsyncHTTPTransport:
+    global eureka_transport
+    if eureka_transport is None:
+        eureka_transport = AsyncHTTPTransport(max_connections_per_host=8)
+    return eureka_transport
+
+# Tracing der Lifecycle-Operationen, z.B. TRACE_SAMPLE_RATE=0.1 (Standard: aus)
+configure_tracing(float(os.getenv("TRACE_SAMPLE_RATE", "0")), int(os.getenv("TRACE_BUFFER_SIZE", "10000")))
+
+# Es läuft höchstens ein Profiler gleichzeitig
+profile_lock = threading.Lock()
 
 EUREKA_SERVERS_FILE = "eureka_server.json"
 EUREKA_SERVER_URLS: List[str] = []
 
-# Lade Liste von Eureka-Servern
-if os.path.exists(EUREKA_SERVERS_FILE):
-    try:
-        with open(EUREKA_SERVERS_FILE, "r") as f:
-            config = json.load(f)
-            EUREKA_SERVER_URLS = config.get("servers", [])
-            logger.info(f"{len(EUREKA_SERVER_URLS)} Eureka-Server geladen.")
-    except Exception as e:
-        logger.error(f"Fehler beim Laden von {EUREKA_SERVERS_FILE}: {e}")
-else:
-    logger.warning(f"{EUREKA_SERVERS_FILE} nicht gefunden. Bitte erstellen mit 'servers' Liste.")
+CONFIG_FILE = "services.json"
 
+def load_state() -> None:
+    """
+    Legt das Logverzeichnis an und lädt Eureka-Server und Clients.
+    Läuft beim Start der App (lifespan), nicht beim Import des Moduls.
+    """
+    global EUREKA_SERVER_URLS
 
-CONFIG_FILE = "services.json"
+    if ensure_log_dir():
+        logger.info(f"Logverzeichnis '{LOG_DIR}' wurde erstellt.")
+    else:
+        logger.info(f"Logverzeichnis '{LOG_DIR}' ist vorhanden.")
 
-# Load clients from services.json if it exists
-if os.path.exists(CONFIG_FILE):
-    try:
-        with open(CONFIG_FILE, "r") as f:
-            loaded_clients = json.load(f)
-            for client in loaded_clients:
-                name = client["serviceName"].upper()
-                # Add default leaseInfo if missing
-                if "leaseInfo" not in client:
-                    client["leaseInfo"] = {
-                        "renewalIntervalInSecs": 30,
-                        "durationInSecs": 90
-                    }
-                clients[name] = client
+    # Lade Liste von Eureka-Servern
+    if os.path.exists(EUREKA_SERVERS_FILE):
+        try:
+            with open(EUREKA_SERVERS_FILE, "r") as f:
+                config = json.load(f)
+                EUREKA_SERVER_URLS = config.get("servers", [])
+                logger.info(f"{len(EUREKA_SERVER_URLS)} Eureka-Server geladen.")
+        except Exception as e:
+            logger.error(f"Fehler beim Laden von {EUREKA_SERVERS_FILE}: {e}")
+    else:
+        logger.warning(f"{EUREKA_SERVERS_FILE} nicht gefunden. Bitte erstellen mit 'servers' Liste.")
+
+    # Load clients from services.json if it exists (inkl. leaseInfo-Standardwerte)
+    if os.path.exists(CONFIG_FILE):
+        try:
+            loaded = {client["serviceName"].upper(): client for client in load_services(CONFIG_FILE)}
+            clients.put_many(loaded, replace=True)
+            for name in loaded:
                 metrics_store.set_service_registered_status(name, 0)
-        logger.info(f"{len(clients)} Clients aus {CONFIG_FILE} geladen.")
-    except Exception as e:
-        logger.error(f"Fehler beim Laden von {CONFIG_FILE}: {e}")
+            logger.info(f"{len(clients)} Clients aus {CONFIG_FILE} geladen.")
+        except ConfigError as e:
+            logger.error(f"Fehler beim Laden von {CONFIG_FILE}: {e}")
 
 def save_clients_to_file() -> None:
+    """
+    Schreibt den aktuellen Snapshot nach services.json (über eine temporäre Datei, damit die Datei
+    nie halb geschrieben ist). Warten mehrere Threads gleichzeitig, schreibt der erste den neuesten
+    Stand und die übrigen kehren ohne erneutes Schreiben zurück.
+    """
+    global saved_snapshot
+    with save_lock:
+        snapshot = clients.snapshot()
+        if saved_snapshot[0] == CONFIG_FILE and saved_snapshot[1] is snapshot:
+            return
+        try:
+            tmp_path = f"{CONFIG_FILE}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(list(snapshot.values()), f, indent=2)
+            os.replace(tmp_path, CONFIG_FILE)
+            saved_snapshot = (CONFIG_FILE, snapshot)
+        except Exception as e:
+            logger.error(f"Fehler beim Speichern von Clients: {e}")
+
+def is_running(name: str) -> bool:
+    return clients.is_running(name)
+
+# --- Bulk-Import/Export ---
+BULK_MAX_ITEMS = 10000
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+def _format_validation_error(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in err['loc']) or '<root>'}: {err['msg']}"
+        for err in e.errors()
+    )
+
+def parse_bulk_payload(raw: bytes, content_type: str) -> Tuple[List[ClientConfig], List[Dict[str, Any]]]:
+    """
+    Parst einen Bulk-Import als NDJSON (eine ClientConfig pro Zeile) oder als JSON-Array.
+    Liefert die gültigen Konfigurationen und eine Fehlerliste mit Index der fehlerhaften Einträge.
+    """
+    items: List[Tuple[int, Any]] = []
+    errors: List[Dict[str, Any]] = []
+
+    if any(media_type in content_type for media_type in NDJSON_MEDIA_TYPES):
+        for index, line in enumerate(raw.decode("utf-8").splitlines()):
+            if not line.strip():
+                continue
+            try:
+                items.append((index, json.loads(line)))
+            except json.JSONDecodeError as e:
+                errors.append({"index": index, "error": f"Ungültiges JSON: {e.msg}"})
+    else:
+        try:
+            data = json.loads(raw)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Ungültiges JSON: {e.msg}") from e
+        if not isinstance(data, list):
+            raise ValueError("Erwartet wird ein JSON-Array oder NDJSON.")
+        items = list(enumerate(data))
+
+    if len(items) + len(errors) > BULK_MAX_ITEMS:
+        raise ValueError(f"Maximal {BULK_MAX_ITEMS} Einträge pro Bulk-Import erlaubt.")
+
+    configs: List[ClientConfig] = []
+    seen: Dict[str, int] = {}
+    for index, item in items:
+        try:
+            config = ClientConfig.model_validate(item)
+        except ValidationError as e:
+            errors.append({"index": index, "error": _format_validation_error(e)})
+            continue
+        name = config.serviceName.upper()
+        if name in seen:
+            errors.append({"index": index, "error": f"Doppelter Service {name} (bereits in Eintrag {seen[name]})"})
+            continue
+        seen[name] = index
+        configs.append(config)
+
+    errors.sort(key=lambda err: err["index"])
+    return configs, errors
+
+def encode_cursor(name: str) -> str:
+    return base64.urlsafe_b64encode(name.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str) -> str:
     try:
-        with open(CONFIG_FILE, "w") as f:
-            json.dump(list(clients.values()), f, indent=2)
-    except Exception as e:
-        logger.error(f"Fehler beim Speichern von Clients: {e}")
+        return base64.b64decode(cursor.encode("ascii"), altchars=b"-_", validate=True).decode("utf-8")
+    except (ValueError, UnicodeError) as e:
+        raise HTTPException(status_code=400, detail="Ungültiger Cursor") from e
+
+def _client_summary(name: str, config: Mapping[str, Any]) -> Dict[str, Any]:
+    return {
+        "serviceName": name,
+        "hostName": config.get("hostName"),
+        "httpPort": config.get("httpPort"),
+        **status_hub.status(name),
+    }
 
 @app.get("/")
 def serve_index():
@@ -102,86 +237,245 @@ def serve_index():
 
 @app.get("/clients")
 def list_clients():
+    # Status kommt aus dem StatusHub (Lifecycle-Events), nicht aus is_alive() pro Thread
     return [
         {
             "serviceName": name,
-            "running": client_threads[name].is_alive() if name in client_threads else False
+            **status_hub.status(name),
         }
-        for name in clients
+        for name in clients.snapshot()
     ]
 
+@app.get("/clients/events")
+async def client_events(request: Request):
+    """
+    Server-Sent-Events-Kanal: zuerst ein Snapshot aller Clients, danach nur noch
+    Änderungen (status, added, deleted). Nach einem Überlauf wird 'resync' gesendet
+    und der Stream beendet; der Browser verbindet sich neu und erhält einen frischen Snapshot.
+    """
+    subscription = status_hub.subscribe()
+
+    async def event_streamer():
+        try:
+            yield format_sse("snapshot", [_client_summary(name, config) for name, config in clients.snapshot().items()])
+            while not await request.is_disconnected():
+                try:
+                    kind, payload = await asyncio.wait_for(subscription.queue.get(), timeout=SSE_KEEPALIVE_SECS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(kind, payload)
+                if subscription.overflowed and subscription.queue.empty():
+                    yield format_sse("resync", {})
+                    break
+        finally:
+            status_hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_streamer(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/clients/page")
+def list_clients_page(
+    limit: Annotated[int, Query(ge=1, le=1000)] = 100,
+    cursor: Optional[str] = None,
+    q: Optional[str] = None,
+    hostName: Optional[str] = None,
+    running: Optional[bool] = None,
+):
+    """
+    Paginierte, filterbare Client-Liste. Die Sortierung erfolgt nach Service-Namen,
+    der Cursor zeigt auf den letzten gelieferten Namen und bleibt bei Änderungen stabil.
+    """
+    snapshot = clients.snapshot()
+    names = sorted(snapshot)
+    start = bisect.bisect_right(names, decode_cursor(cursor)) if cursor else 0
+    needle = q.upper() if q else None
+
+    items: List[Dict[str, Any]] = []
+    next_cursor = None
+    for name in names[start:]:
+        config = snapshot[name]
+        if needle and needle not in name:
+            continue
+        if hostName is not None and config.get("hostName") != hostName:
+            continue
+        if running is not None and status_hub.is_running(name) != running:
+            continue
+        if len(items) == limit:
+            next_cursor = encode_cursor(items[-1]["serviceName"])
+            break
+        items.append(_client_summary(name, config))
+
+    return {"items": items, "nextCursor": next_cursor}
+
+@app.get("/clients/heartbeats")
+def heartbeat_overview(
+    window: Annotated[Optional[float], Query(gt=0)] = None,
+    points: Annotated[int, Query(ge=1, le=1440)] = 48,
+):
+    """
+    Erfolgsquote und p95 der Heartbeats aller Clients über das Fenster (Sekunden, Standard: 24 h),
+    dazu p95 und Erfolgsquote als kurze Reihen für Sparklines in der Web-UI.
+    """
+    result: Dict[str, Any] = {}
+    for name in clients.snapshot():
+        history = heartbeat_history.get(name)
+        if history is None:
+            continue
+        summary, series = history.overview(window, points)
+        result[name] = {
+            **summary,
+            "p95_series": [point["p95_ms"] for point in series],
+            "success_series": [point["success_ratio"] for point in series],
+        }
+    return {"bucketSeconds": heartbeat_history.bucket_seconds, "clients": result}
+
+@app.get("/clients/export")
+def export_clients(format: Annotated[str, Query(pattern="^(ndjson|json)$")] = "ndjson"):
+    # Snapshot, damit parallele Änderungen den Stream nicht beeinflussen
+    snapshot = list(clients.snapshot().values())
+
+    def ndjson_streamer() -> Iterator[str]:
+        for config in snapshot:
+            yield json.dumps(config) + "\n"
+
+    def json_streamer() -> Iterator[str]:
+        yield "["
+        for index, config in enumerate(snapshot):
+            yield ("," if index else "") + json.dumps(config)
+        yield "]"
+
+    if format == "json":
+        return StreamingResponse(json_streamer(), media_type="application/json")
+    return StreamingResponse(ndjson_streamer(), media_type="application/x-ndjson")
+
+@app.post("/clients/bulk")
+async def import_clients(
+    request: Request,
+    on_conflict: Annotated[str, Query(pattern="^(skip|replace)$")] = "skip",
+    atomic: bool = False,
+):
+    """
+    Importiert viele Clients in einem Request (NDJSON oder JSON-Array).
+    Bestehende Clients werden je nach on_conflict übersprungen oder ersetzt,
+    laufende Clients werden nie ersetzt. Mit atomic=true wird bei Fehlern nichts übernommen.
+    """
+    raw = await request.body()
+    try:
+        configs, errors = parse_bulk_payload(raw, request.headers.get("content-type", ""))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    if atomic and errors:
+        raise HTTPException(status_code=422, detail={"errors": errors})
+
+    # Ein Schreibvorgang für den ganzen Import; laufende Clients werden nie ersetzt
+    dumped = {config.serviceName.upper(): config.model_dump() for config in configs}
+    added, replaced, skipped = clients.put_many(dumped, replace=on_conflict == "replace")
+    for name in added + replaced:
+        metrics_store.set_service_registered_status(name, 0)
+        status_hub.publish_added(_client_summary(name, dumped[name]))
+
+    if added or replaced:
+        save_clients_to_file()
+    logger.info(f"Bulk-Import: {len(added)} hinzugefügt, {len(replaced)} ersetzt, {len(skipped)} übersprungen, {len(errors)} Fehler.")
+
+    return {"added": added, "replaced": replaced, "skipped": skipped, "errors": errors}
+
 @app.post("/clients")
 def add_client(config: ClientConfig):
     name = config.serviceName.upper()
-    if name in clients:
+    client = config.model_dump()
+    if not clients.add(name, client):
         raise HTTPException(status_code=400, detail="Client already exists")
-    clients[name] = config.dict()
     metrics_store.set_service_registered_status(name, 0)
     save_clients_to_file()
+    status_hub.publish_added(_client_summary(name, client))
     return {"message": f"Client {name} added."}
 
 @app.delete("/clients/{name}")
 def delete_client(name: str):
     name = name.upper()
-    if name in client_threads and client_threads[name].is_alive():
+    removed = clients.remove_stopped(name)
+    if removed is False:
         raise HTTPException(status_code=400, detail="Client is running. Stop it first.")
-    if name in clients:
-        clients.pop(name)
-        save_clients_to_file()
-        return {"message": f"Client {name} deleted."}
-    else:
+    if removed is None:
         raise HTTPException(status_code=404, detail="Client not found")
+    save_clients_to_file()
+    journals.remove(name)
+    heartbeat_history.remove(name)
+    status_hub.publish_deleted(name)
+    return {"message": f"Client {name} deleted."}
+
+def _run_client(name: str, service_data: Dict[str, Any], stop_event: threading.Event) -> None:
+    log_path = f"{LOG_DIR}/{name}.log"
+
+    service_logger = logging.getLogger(name)
+    service_logger.setLevel(logging.INFO)
+    service_logger.propagate = False
+
+    # Nur Handler hinzufügen, wenn noch keiner vorhanden ist
+    if not service_logger.handlers:
+        handler = logging.FileHandler(log_path)
+        formatter = logging.Formatter('%(asctime)s - %(message)s')
+        handler.setFormatter(formatter)
+        service_logger.addHandler(handler)
+
+    def on_event(event_type: str, data: Dict[str, Any]) -> None:
+        journals.record(name, event_type, data)
+        heartbeat_history.record_event(name, event_type, data)
+        # Ein gesetzter Status-Override bleibt sichtbar, auch wenn Heartbeats weiterlaufen
+        if event_type in ("registered", "heartbeat_ok") and clients.status_override(name) is not None:
+            return
+        status_hub.publish(name, event_type, data)
+
+    try:
+        service_logger.info("Starte Eureka-Client...")
+        eureka_lifecycle(service_data, metrics_store, stop_event, service_logger, on_event=on_event)
+    except Exception as e:
+        service_logger.exception(f"Fehler im eureka_lifecycle: {e}")
+        logger.error(f"Client {name} fehlgeschlagen: {e}")
+    finally:
+        status_hub.publish(name, "stopped")
 
 @app.post("/clients/{name}/start")
 def start_client(name: str):
     name = name.upper()
-    if name not in clients:
-        raise HTTPException(status_code=404, detail="Client not found")
-    if name in client_threads and client_threads[name].is_alive():
-        raise HTTPException(status_code=400, detail="Client already running")
-
-    stop_event = threading.Event()
-    stop_events[name] = stop_event
-
-    def run():
-        service_data = clients[name]
-        log_path = f"logs/{name}.log"
-
-        service_logger = logging.getLogger(name)
-        service_logger.setLevel(logging.INFO)
-        service_logger.propagate = False
-
-        # Nur Handler hinzufügen, wenn noch keiner vorhanden ist
-        if not service_logger.handlers:
-            handler = logging.FileHandler(log_path)
-            formatter = logging.Formatter('%(asctime)s - %(message)s')
-            handler.setFormatter(formatter)
-            service_logger.addHandler(handler)
-
-        try:
-            service_logger.info("Starte Eureka-Client...")
-            eureka_lifecycle(service_data, metrics_store, stop_event, service_logger)
-        except Exception as e:
-            service_logger.exception(f"Fehler im eureka_lifecycle: {e}")
-            logger.error(f"Client {name} fehlgeschlagen: {e}")
-
-    thread = threading.Thread(target=run, daemon=False, name=f"eureka-{name}")
-    client_threads[name] = thread
-    thread.start()
+    # Prüfen und Starten unter der Sperre des Clients: parallele Starts erzeugen keinen zweiten Thread
+    with clients.client_lock(name):
+        service_data = clients.get(name)
+        if service_data is None:
+            raise HTTPException(status_code=404, detail="Client not found")
+        if is_running(name):
+            raise HTTPException(status_code=400, detail="Client already running")
+
+        stop_event = threading.Event()
+        # Eine Neu-Registrierung startet mit Status UP
+        clients.set_status_override(name, None)
+        thread = threading.Thread(target=_run_client, args=(name, service_data, stop_event), daemon=False, name=f"eureka-{name}")
+        clients.attach(name, thread, stop_event)
+        journals.record(name, "started")
+        status_hub.publish(name, "started")
+        thread.start()
     return {"message": f"Client {name} gestartet."}
 
 @app.post("/clients/{name}/stop")
 def stop_client(name: str):
     name = name.upper()
-    if name not in client_threads or not client_threads[name].is_alive():
-        raise HTTPException(status_code=400, detail="Client not running")
+    with clients.client_lock(name):
+        thread = clients.thread(name)
+        stop_event = clients.stop_event(name)
+        if thread is None or stop_event is None or not thread.is_alive():
+            raise HTTPException(status_code=400, detail="Client not running")
 
-    # Signal thread to stop
-    logger.info(f"Stoppe Client {name}...")
-    stop_events[name].set()
+        # Signal thread to stop
+        logger.info(f"Stoppe Client {name}...")
+        stop_event.set()
 
     # Wait briefly for thread to exit (deregistration happens in eureka_lifecycle)
-    thread = client_threads[name]
     thread.join(timeout=10)
 
     if thread.is_alive():
@@ -191,10 +485,145 @@ def stop_client(name: str):
 
     return {"message": f"Client {name} stopped and deregistered."}
 
+@app.get("/clients/{name}/events")
+def client_event_journal(
+    name: str,
+    type: Annotated[Optional[List[str]], Query()] = None,
+    since: Optional[float] = None,
+    min_latency_ms: Optional[float] = None,
+    cursor: Annotated[Optional[int], Query(ge=0)] = None,
+    limit: Annotated[int, Query(ge=1, le=1000)] = 100,
+):
+    """
+    Letzte Lifecycle-Events eines Clients aus dem Journal, neueste zuerst. Filter: type (mehrfach
+    oder kommagetrennt), since (Unix-Zeit), min_latency_ms (nur Heartbeats ab dieser Latenz).
+    nextCursor als cursor übergeben, um ältere Einträge zu laden.
+    """
+    name = name.upper()
+    journal = journals.get(name)
+    if journal is None and name not in clients:
+        raise HTTPException(status_code=404, detail="Client not found")
+
+    types = None
+    if type:
+        types = {part.strip() for value in type for part in value.split(",") if part.strip()}
+        unknown = sorted(types.difference(EVENT_TYPES))
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unbekannte Event-Typen: {', '.join(unknown)}")
+
+    if journal is None:
+        return {"items": [], "nextCursor": None, "total": 0, "capacity": journals.capacity}
+    items, next_cursor = journal.query(types=types, since=since, min_latency_ms=min_latency_ms, before=cursor, limit=limit)
+    return {"items": items, "nextCursor": next_cursor, "total": journal.total, "capacity": journal.capacity}
+
+@app.get("/clients/{name}/heartbeats")
+def client_heartbeat_history(
+    name: str,
+    window: Annotated[Optional[float], Query(gt=0)] = None,
+    points: Annotated[int, Query(ge=1, le=1440)] = 96,
+):
+    """Heartbeat-Verlauf eines Clients, heruntergerechnet auf höchstens `points` Punkte."""
+    name = name.upper()
+    history = heartbeat_history.get(name)
+    if history is None and name not in clients:
+        raise HTTPException(status_code=404, detail="Client not found")
+    if history is None:
+        return {"bucketSeconds": heartbeat_history.bucket_seconds, "summary": None, "series": []}
+    summary, series = history.overview(window, points)
+    return {"bucketSeconds": history.bucket_seconds, "summary": summary, "series": series}
+
+# --- Status- und Metadaten-Updates ohne Neu-Registrierung ---
+
+def _running_clients(names: Optional[List[str]]) -> List[str]:
+    if names is None:
+        return [name for name in clients if is_running(name)]
+    # Doppelte Namen nur einmal an Eureka schicken
+    selected = list(dict.fromkeys(name.upper() for name in names))
+    unknown = [name for name in selected if name not in clients]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Clients not found: {', '.join(unknown)}")
+    not_running = [name for name in selected if not is_running(name)]
+    if not_running:
+        raise HTTPException(status_code=400, detail=f"Clients not running: {', '.join(not_running)}")
+    return selected
+
+def _apply_status(name: str, status: str) -> None:
+    clients.set_status_override(name, status)
+    journals.record(name, f"status_{status.lower()}")
+    status_hub.publish(name, f"status_{status.lower()}")
+
+@app.put("/clients/status")
+async def update_clients_status(update: BatchStatusUpdate):
+    names = _running_clients(update.names)
+    results = await async_update_status_batch([clients[name] for name in names], update.status, get_eureka_transport())
+    by_name = {name: results[get_instance_id(clients[name])] for name in names}
+    for name, ok in by_name.items():
+        if ok:
+            _apply_status(name, update.status)
+    return {"status": update.status, "results": by_name}
+
+@app.put("/clients/metadata")
+async def update_clients_metadata(update: BatchMetadataUpdate):
+    names = _running_clients(update.names)
+    results = await async_update_metadata_batch([clients[name] for name in names], update.metadata, get_eureka_transport())
+    return {"results": {name: results[get_instance_id(clients[name])] for name in names}}
+
+@app.put("/clients/{name}/status")
+async def update_client_status(name: str, update: StatusUpdate):
+    name = _running_clients([name])[0]
+    if not await async_update_status(clients[name], update.status, get_eureka_transport(), logger=logging.getLogger(name)):
+        raise HTTPException(status_code=502, detail="Eureka hat den Status nicht übernommen")
+    _apply_status(name, update.status)
+    return {"message": f"Status von {name} auf {update.status} gesetzt."}
+
+@app.put("/clients/{name}/metadata")
+async def update_client_metadata(name: str, update: MetadataUpdate):
+    name = _running_clients([name])[0]
+    if not await async_update_metadata(clients[name], update.metadata, get_eureka_transport(), logger=logging.getLogger(name)):
+        raise HTTPException(status_code=502, detail="Eureka hat die Metadaten nicht übernommen")
+    return {"message": f"Metadaten von {name} aktualisiert."}
+
+# --- Admin ---
+
+@app.get("/admin/profile")
+async def profile_threads(
+    seconds: Annotated[float, Query(gt=0, le=60)] = 5.0,
+    interval_ms: Annotated[float, Query(ge=1, le=1000)] = 10.0,
+    prefix: str = "eureka-",
+    format: Annotated[str, Query(pattern="^(collapsed|json)$")] = "collapsed",
+):
+    """
+    Tastet die Lifecycle-Threads (Name eureka-<SERVICE>) für `seconds` Sekunden ab.
+    collapsed liefert eine Datei für flamegraph.pl/speedscope, json zusätzlich die CPU-Zeit pro Thread.
+    """
+    if not profile_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="Profiler läuft bereits")
+    try:
+        profiler = SamplingProfiler(interval=interval_ms / 1000, thread_prefix=prefix)
+        report = await asyncio.to_thread(profiler.run, seconds)
+    finally:
+        profile_lock.release()
+
+    if format == "json":
+        return {
+            "duration": round(report.duration, 3),
+            "samples": report.samples,
+            "threads": report.threads,
+            "stacks": report.stacks,
+        }
+    filename = time.strftime("profile-%Y%m%d-%H%M%S.folded")
+    return PlainTextResponse(report.collapsed(), headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+@app.get("/admin/trace")
+def export_trace():
+    """Inhalt des Span-Ringpuffers im Chrome-Trace-Format (chrome://tracing, ui.perfetto.dev)."""
+    filename = time.strftime("trace-%Y%m%d-%H%M%S.json")
+    return JSONResponse(tracer.exporter.chrome_trace(), headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
 @app.get("/clients/{name}/logs")
 def stream_logs(name: str):
     name = name.upper()
-    log_path = f"logs/{name}.log"
+    log_path = f"{LOG_DIR}/{name}.log"
     if not os.path.exists(log_path):
         raise HTTPException(status_code=404, detail="Logfile nicht gefunden")
 